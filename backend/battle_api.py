@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 
-from .battle_rooms import create_room, join_room, rooms
+from .battle_rooms import create_room, get_room, get_room_manager, join_room
 
 
 router = APIRouter(prefix="/api/battle", tags=["battle"])
@@ -75,7 +75,7 @@ def get_game_info(game: str = Query(..., description="Game ID")):
     """
     给大厅 / 观战用的简单信息：A/B 是否已经有人，下一位加入会分到哪一边。
     """
-    room = rooms.get(game)
+    room = get_room(game)
     if not room:
         raise HTTPException(status_code=404, detail="Game not found")
 
@@ -91,3 +91,9 @@ def get_game_info(game: str = Query(..., description="Game ID")):
         has_player_b=room.player_b is not None,
         next_side=next_side,
     )
+
+
+@router.get("/metrics")
+def get_battle_metrics():
+    """Room/socket counts, eviction and rate-limit counters, broadcast latency."""
+    return get_room_manager().metrics()
@@ -1,6 +1,40 @@
+"""
+In-memory battle rooms.
+
+Rooms live in a RoomManager, split over ROOM_SHARDS dicts with a lock each
+so HTTP handlers (thread pool) and websocket handlers (event loop) do not
+contend on one lock. Rooms nobody is connected to are evicted once idle
+for ROOM_IDLE_TTL_S; the sweep runs piggy-backed on room creation and
+lookups at most every ROOM_SWEEP_INTERVAL_S, so there is no timer thread.
+
+Each room also rate-limits the messages it relays (token bucket of
+ROOM_MSG_RATE per second, bursts up to ROOM_MSG_BURST), and the manager
+keeps the counters and broadcast latencies reported by /api/battle/metrics.
+
+Environment:
+    ROOM_SHARDS            lock shards (default 16)
+    ROOM_IDLE_TTL_S        seconds an unconnected room is kept (default 1800)
+    ROOM_SWEEP_INTERVAL_S  minimum seconds between eviction sweeps (default 30)
+    ROOM_MSG_RATE          relayed messages per second per room (default 30)
+    ROOM_MSG_BURST         burst size of the same limit (default 60)
+"""
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, Optional, Any
+from typing import Any, Deque, Dict, List, Optional
+import os
 import secrets
+import threading
+import time
+import zlib
+
+ROOM_SHARDS = max(1, int(os.getenv("ROOM_SHARDS", "16")))
+ROOM_IDLE_TTL_S = float(os.getenv("ROOM_IDLE_TTL_S", "1800"))
+ROOM_SWEEP_INTERVAL_S = float(os.getenv("ROOM_SWEEP_INTERVAL_S", "30"))
+ROOM_MSG_RATE = float(os.getenv("ROOM_MSG_RATE", "30"))
+ROOM_MSG_BURST = float(os.getenv("ROOM_MSG_BURST", "60"))
+
+# Broadcast latencies kept for the metrics percentiles.
+_LATENCY_SAMPLES = 1024
 
 
 @dataclass
@@ -19,9 +53,160 @@ class BattleRoom:
     ready: Dict[str, bool] = field(default_factory=lambda: {"a": False, "b": False})
     tower_types: Dict[str, Optional[str]] = field(default_factory=lambda: {"a": None, "b": None})
     spectator_counter: int = 0
+    last_active: float = field(default_factory=time.monotonic)
+    # Token bucket for relayed messages.
+    msg_tokens: float = ROOM_MSG_BURST
+    msg_checked: float = field(default_factory=time.monotonic)
+
+    def touch(self) -> None:
+        self.last_active = time.monotonic()
+
+    def allow_message(self, rate: float = ROOM_MSG_RATE, burst: float = ROOM_MSG_BURST) -> bool:
+        """Take one token from the room's bucket; False when the room is over its rate."""
+        now = time.monotonic()
+        self.msg_tokens = min(burst, self.msg_tokens + (now - self.msg_checked) * rate)
+        self.msg_checked = now
+        if self.msg_tokens < 1.0:
+            return False
+        self.msg_tokens -= 1.0
+        return True
+
+
+class RoomManager:
+    def __init__(
+        self,
+        *,
+        shards: int = ROOM_SHARDS,
+        idle_ttl_s: float = ROOM_IDLE_TTL_S,
+        sweep_interval_s: float = ROOM_SWEEP_INTERVAL_S,
+    ):
+        self.idle_ttl_s = idle_ttl_s
+        self.sweep_interval_s = sweep_interval_s
+        self._shards: List[Dict[str, BattleRoom]] = [{} for _ in range(max(1, shards))]
+        self._locks = [threading.Lock() for _ in self._shards]
+        self._stats_lock = threading.Lock()
+        self._next_sweep = time.monotonic() + sweep_interval_s
+        self._latencies: Deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+        self._stats = {
+            "rooms_created": 0,
+            "rooms_evicted": 0,
+            "broadcasts": 0,
+            "sockets_dropped": 0,
+            "messages_rate_limited": 0,
+        }
+
+    def _shard(self, game_id: str) -> int:
+        return zlib.crc32(game_id.encode("utf-8")) % len(self._shards)
+
+    # --- rooms ------------------------------------------------------------
+
+    def get(self, game_id: str) -> Optional[BattleRoom]:
+        self.maybe_sweep()
+        index = self._shard(game_id)
+        with self._locks[index]:
+            return self._shards[index].get(game_id)
+
+    def create(self) -> BattleRoom:
+        self.maybe_sweep()
+        while True:
+            game_id = generate_game_id()
+            index = self._shard(game_id)
+            with self._locks[index]:
+                if game_id in self._shards[index]:
+                    continue
+                room = BattleRoom(game_id=game_id)
+                self._shards[index][game_id] = room
+            self._count("rooms_created")
+            return room
+
+    def remove(self, game_id: str) -> Optional[BattleRoom]:
+        index = self._shard(game_id)
+        with self._locks[index]:
+            return self._shards[index].pop(game_id, None)
+
+    def maybe_sweep(self) -> int:
+        now = time.monotonic()
+        with self._stats_lock:
+            if now < self._next_sweep:
+                return 0
+            self._next_sweep = now + self.sweep_interval_s
+        return self.evict_idle(now)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Drop rooms with no connected socket that have been idle past the TTL."""
+        now = time.monotonic() if now is None else now
+        evicted = 0
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                stale = [
+                    game_id
+                    for game_id, room in shard.items()
+                    if not room.sockets and now - room.last_active >= self.idle_ttl_s
+                ]
+                for game_id in stale:
+                    del shard[game_id]
+            evicted += len(stale)
+        if evicted:
+            self._count("rooms_evicted", evicted)
+        return evicted
 
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
 
-rooms: Dict[str, BattleRoom] = {}
+    # --- metrics ----------------------------------------------------------
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def record_broadcast(self, seconds: float, dropped: int) -> None:
+        with self._stats_lock:
+            self._stats["broadcasts"] += 1
+            self._stats["sockets_dropped"] += dropped
+            self._latencies.append(seconds)
+
+    def record_dropped(self) -> None:
+        self._count("sockets_dropped")
+
+    def record_rate_limited(self) -> None:
+        self._count("messages_rate_limited")
+
+    def metrics(self) -> Dict[str, Any]:
+        rooms = sockets = 0
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                rooms += len(shard)
+                sockets += sum(len(room.sockets) for room in shard.values())
+        with self._stats_lock:
+            latencies = sorted(self._latencies)
+            stats = dict(self._stats)
+
+        def percentile(share: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(share * len(latencies)))] * 1000, 3)
+
+        return dict(stats, rooms=rooms, sockets=sockets, broadcast_p50_ms=percentile(0.5), broadcast_p95_ms=percentile(0.95))
+
+
+_MANAGER: Optional[RoomManager] = None
+_MANAGER_LOCK = threading.Lock()
+
+
+def get_room_manager() -> RoomManager:
+    global _MANAGER
+    with _MANAGER_LOCK:
+        if _MANAGER is None:
+            _MANAGER = RoomManager()
+        return _MANAGER
+
+
+def configure_room_manager(**kwargs: Any) -> RoomManager:
+    """Replace the process-wide manager (existing rooms are dropped)."""
+    global _MANAGER
+    with _MANAGER_LOCK:
+        _MANAGER = RoomManager(**kwargs)
+        return _MANAGER
 
 
 def generate_game_id() -> str:
@@ -34,9 +219,7 @@ def create_room(user_id: Optional[str]) -> tuple[BattleRoom, str]:
     创建房间，并且让创建者直接占掉 A 位。
     返回 (room, side)；side 永远是 "a"。
     """
-    game_id = generate_game_id()
-    room = BattleRoom(game_id=game_id)
-    rooms[game_id] = room
+    room = get_room_manager().create()
 
     # 创建者 = A
     room.player_a = BattlePlayer(user_id=user_id, side="a")
@@ -51,9 +234,10 @@ def join_room(game_id: str, user_id: Optional[str]) -> tuple[Optional[BattleRoom
     - 否则：spectate
     返回 (room, side)；如果房间不存在，返回 (None, None)。
     """
-    room = rooms.get(game_id)
+    room = get_room_manager().get(game_id)
     if not room:
         return None, None
+    room.touch()
 
     # 正常流程：房主已经是 A，所以第一次 join 应该走 B。
     if room.player_a is None:
@@ -66,3 +250,7 @@ def join_room(game_id: str, user_id: Optional[str]) -> tuple[Optional[BattleRoom
 
     # A / B 都满了，剩下的都是观战
     return room, "spectate"
+
+
+def get_room(game_id: str) -> Optional[BattleRoom]:
+    return get_room_manager().get(game_id)
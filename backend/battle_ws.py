@@ -1,16 +1,96 @@
+"""
+Battle websocket: relays moves between the two players and to spectators.
+
+Broadcasts serialise the payload once and send it to every socket of the
+room concurrently, each send bounded by BATTLE_SEND_TIMEOUT_S; a socket
+that fails or times out is dropped from the room (and closed) instead of
+holding back everyone else.
+
+Environment:
+    BATTLE_SEND_TIMEOUT_S  per-socket send deadline (default 2)
+"""
+import asyncio
+import json
+import os
+import time
+from typing import Any, Optional
+
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
-from .battle_rooms import rooms
+from .battle_rooms import BattleRoom, get_room_manager
+
+BATTLE_SEND_TIMEOUT_S = float(os.getenv("BATTLE_SEND_TIMEOUT_S", "2"))
 
+RELAYED_TYPES = ("deploy", "deploy_request", "ruler_move", "ruler_move_request", "surrender", "tower_setup", "state_update")
 
 ws_router = APIRouter()
 
 
+class RoomSocket:
+    """A room member's websocket; the lock keeps concurrent broadcasts from interleaving frames."""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self._lock = asyncio.Lock()
+
+    async def send_text(self, text: str, timeout: float = BATTLE_SEND_TIMEOUT_S) -> None:
+        async def send() -> None:
+            async with self._lock:
+                await self.websocket.send_text(text)
+
+        await asyncio.wait_for(send(), timeout)
+
+    async def send_json(self, payload: dict, timeout: float = BATTLE_SEND_TIMEOUT_S) -> None:
+        await self.send_text(json.dumps(payload), timeout)
+
+    async def close(self) -> None:
+        try:
+            await asyncio.wait_for(self.websocket.close(code=1011), BATTLE_SEND_TIMEOUT_S)
+        except Exception:
+            pass
+
+
+def _drop(room: BattleRoom, key: str, peer: RoomSocket) -> bool:
+    """Remove and close `peer`; False if another broadcast (or a reconnect) got there first."""
+    if room.sockets.get(key) is not peer:
+        return False
+    room.sockets.pop(key, None)
+    if key in ("a", "b"):
+        room.ready[key] = False
+    asyncio.get_running_loop().create_task(peer.close())
+    return True
+
+
+async def broadcast(room: BattleRoom, payload: Any, exclude: Optional[str] = None) -> int:
+    """Send `payload` to every socket in the room but `exclude`; returns how many were dropped."""
+    targets = [(key, peer) for key, peer in list(room.sockets.items()) if key != exclude]
+    if not targets:
+        return 0
+    text = json.dumps(payload)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(peer.send_text(text) for _, peer in targets), return_exceptions=True)
+    dropped = 0
+    for (key, peer), outcome in zip(targets, results):
+        if isinstance(outcome, BaseException) and _drop(room, key, peer):
+            dropped += 1
+    get_room_manager().record_broadcast(time.perf_counter() - started, dropped)
+    return dropped
+
+
+def _start_message(key: str, room: BattleRoom) -> dict:
+    return {
+        "type": "start",
+        "side": key if key in ("a", "b") else "spectate",
+        "towers": room.tower_types,
+    }
+
+
 @ws_router.websocket("/ws/battle/{game_id}")
 async def battle_ws(websocket: WebSocket, game_id: str):
     await websocket.accept()
 
-    room = rooms.get(game_id)
+    manager = get_room_manager()
+    room = manager.get(game_id)
     if not room:
         await websocket.close(code=1000)
         return
@@ -24,42 +104,30 @@ async def battle_ws(websocket: WebSocket, game_id: str):
         room.spectator_counter += 1
         side = f"spectate-{room.spectator_counter}"
 
-    room.sockets[side] = websocket
+    peer = RoomSocket(websocket)
+    room.sockets[side] = peer
+    room.touch()
     if side in ("a", "b"):
         room.ready[side] = False
 
-    await websocket.send_json({"type": "side", "side": "spectate" if side.startswith("spectate") else side})
-
-    async def broadcast(payload: dict, exclude: str | None = None):
-        for s_key, ws in list(room.sockets.items()):
-            if exclude and s_key == exclude:
-                continue
-            try:
-                await ws.send_json(payload)
-            except Exception:
-                continue
-
     def other_side(current: str) -> str:
         return "b" if current == "a" else "a"
 
     try:
+        await peer.send_json({"type": "side", "side": "spectate" if side.startswith("spectate") else side})
+
         # Notify when both players are connected
         if "a" in room.sockets and "b" in room.sockets:
-            await broadcast({"type": "players_connected"})
+            await broadcast(room, {"type": "players_connected"})
 
         # If game already started, sync late joiners (spectators)
         if room.ready.get("a") and room.ready.get("b"):
-            await websocket.send_json(
-                {
-                    "type": "start",
-                    "side": side if side in ("a", "b") else "spectate",
-                    "towers": room.tower_types,
-                }
-            )
+            await peer.send_json(_start_message(side, room))
 
         while True:
             msg = await websocket.receive_json()
             msg_type = msg.get("type")
+            room.touch()
 
             if msg_type == "ready":
                 if side not in ("a", "b"):
@@ -69,25 +137,38 @@ async def battle_ws(websocket: WebSocket, game_id: str):
                 tower = msg.get("tower")
                 if tower:
                     room.tower_types[side] = tower
-                await broadcast({"type": "opponent_ready", "side": side, "tower": tower}, exclude=side)
+                await broadcast(room, {"type": "opponent_ready", "side": side, "tower": tower}, exclude=side)
 
                 if room.ready["a"] and room.ready["b"]:
-                    for s_key, ws in list(room.sockets.items()):
-                        await ws.send_json(
-                            {
-                                "type": "start",
-                                "side": s_key if s_key in ("a", "b") else "spectate",
-                                "towers": room.tower_types,
-                            }
-                        )
-
-            elif msg_type in ("deploy", "deploy_request", "ruler_move", "ruler_move_request", "surrender", "tower_setup", "state_update"):
-                await broadcast(msg, exclude=side)
+                    await asyncio.gather(
+                        *(
+                            member.send_json(_start_message(key, room))
+                            for key, member in list(room.sockets.items())
+                        ),
+                        return_exceptions=True,
+                    )
+
+            elif msg_type in RELAYED_TYPES:
+                if not room.allow_message():
+                    manager.record_rate_limited()
+                    await peer.send_json({"type": "error", "error": "rate_limited"})
+                    continue
+                await broadcast(room, msg, exclude=side)
 
             else:
-                await websocket.send_json({"type": "error", "error": "unknown_type"})
-    except WebSocketDisconnect:
-        room.sockets.pop(side, None)
-        if side in ("a", "b"):
-            room.ready[side] = False
-        await broadcast({"type": "opponent_disconnected"}, exclude=side)
+                await peer.send_json({"type": "error", "error": "unknown_type"})
+    except asyncio.TimeoutError:
+        # Too slow to take its own messages: same fate as in broadcast().
+        manager.record_dropped()
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        holder = room.sockets.get(side)
+        if holder is peer:
+            room.sockets.pop(side, None)
+            if side in ("a", "b"):
+                room.ready[side] = False
+        room.touch()
+        # Also after a broadcast dropped this socket, unless the side has reconnected.
+        if holder is peer or holder is None:
+            await broadcast(room, {"type": "opponent_disconnected"}, exclude=side)
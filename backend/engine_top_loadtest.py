@@ -0,0 +1,95 @@
+"""
+Local load test for /api/study/engine_top.
+
+Replays a stream of board positions from several concurrent "viewers" (the
+positions of one game, with viewers overlapping on the same moves the way a
+shared study does) against engine_top, once with a fresh engine per request
+(the old behaviour) and once with the warm pool, coalescing and cache, and
+prints p50/p95 latency for both.
+
+Usage:
+    python -m backend.engine_top_loadtest --engine /usr/local/bin/stockfish
+    python -m backend.engine_top_loadtest --clients 8 --requests 400 --depth 10
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence
+
+import chess
+
+from .engine_top_service import configure_engine_top_service
+from .study_api import ENGINE_DEFAULT, EngineTopRequest, engine_top
+
+
+def _percentile(values: Sequence[float], share: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(share * len(ordered)) - 1))]
+
+
+def _game_fens(plies: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    board = chess.Board()
+    fens = [board.fen()]
+    for _ in range(plies):
+        moves = list(board.legal_moves)
+        if not moves:
+            break
+        board.push(rng.choice(moves))
+        fens.append(board.fen())
+    return fens
+
+
+def run(engine_path: str, *, clients: int, requests: int, depth: int, multipv: int, seed: int) -> Dict[str, float]:
+    fens = _game_fens(40, seed)
+    rng = random.Random(seed)
+    # Viewers cluster around the same part of the game, so positions repeat.
+    stream = [fens[min(len(fens) - 1, int(rng.triangular(0, len(fens), 0)))] for _ in range(requests)]
+
+    def one(fen: str) -> float:
+        start = time.perf_counter()
+        engine_top(EngineTopRequest(fen=fen, depth=depth, multipv=multipv, engine_path=engine_path))
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = list(pool.map(one, stream))
+    wall = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "wall_s": round(wall, 3),
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 1),
+        "max_ms": round(max(latencies) * 1000, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare engine_top latency with and without the warm engine pool.")
+    parser.add_argument("--engine", default=ENGINE_DEFAULT)
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent viewers")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--depth", type=int, default=12)
+    parser.add_argument("--multipv", type=int, default=5)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    common = dict(clients=args.clients, requests=args.requests, depth=args.depth, multipv=args.multipv, seed=args.seed)
+    configure_engine_top_service(pool_enabled=False, cache_size=0, coalesce=False)
+    before = run(args.engine, **common)
+    service = configure_engine_top_service(pool_enabled=True, pool_size=args.pool_size)
+    after = run(args.engine, **common)
+    print(json.dumps({"before": before, "after": dict(after, **service.stats())}, indent=2))
+    service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Warm engines, request coalescing and a result cache for /api/study/engine_top.
+
+The website asks for the top moves on every board change, so starting a
+Stockfish per request dominated its latency. Instead:
+
+- engines stay running in a small pool per engine path and are borrowed
+  for one search at a time (crashed engines are dropped and respawned);
+- identical (engine path, FEN, depth, multipv) requests that arrive while
+  the same search is running wait for it instead of starting their own;
+- finished results are kept in a bounded LRU cache.
+
+Environment:
+    ENGINE_TOP_POOL_ENABLED  "0" starts a fresh engine per search (default "1")
+    ENGINE_TOP_POOL_SIZE     warm engines per engine path (default 2)
+    ENGINE_TOP_CACHE_SIZE    cached results, 0 disables the cache (default 512)
+"""
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+import chess
+import chess.engine
+
+
+ENGINE_TOP_POOL_ENABLED = os.getenv("ENGINE_TOP_POOL_ENABLED", "1").lower() not in ("0", "false", "no")
+ENGINE_TOP_POOL_SIZE = max(1, int(os.getenv("ENGINE_TOP_POOL_SIZE", "2")))
+ENGINE_TOP_CACHE_SIZE = max(0, int(os.getenv("ENGINE_TOP_CACHE_SIZE", "512")))
+
+
+class EngineUnavailable(Exception):
+    """The engine binary could not be started."""
+
+
+class _EnginePool:
+    """At most `size` long-lived engines per path, handed out exclusively."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._idle: Dict[str, List[chess.engine.SimpleEngine]] = {}
+        self._live: Dict[str, int] = {}
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def borrow(self, engine_path: str) -> Iterator[chess.engine.SimpleEngine]:
+        with self._cond:
+            while True:
+                idle = self._idle.setdefault(engine_path, [])
+                if idle:
+                    engine = idle.pop()
+                    break
+                if self._live.get(engine_path, 0) < self.size:
+                    self._live[engine_path] = self._live.get(engine_path, 0) + 1
+                    engine = None
+                    break
+                self._cond.wait()
+        if engine is None:
+            try:
+                engine = chess.engine.SimpleEngine.popen_uci(engine_path)
+            except Exception as exc:
+                self._forget(engine_path)
+                raise EngineUnavailable(str(exc)) from exc
+        healthy = True
+        try:
+            yield engine
+        except (chess.engine.EngineError, chess.engine.EngineTerminatedError):
+            healthy = False
+            raise
+        finally:
+            if healthy:
+                with self._cond:
+                    self._idle[engine_path].append(engine)
+                    self._cond.notify()
+            else:
+                _quit(engine)
+                self._forget(engine_path)
+
+    def _forget(self, engine_path: str) -> None:
+        with self._cond:
+            self._live[engine_path] -= 1
+            self._cond.notify()
+
+    def close(self) -> None:
+        with self._cond:
+            engines = [engine for idle in self._idle.values() for engine in idle]
+            for path, idle in self._idle.items():
+                self._live[path] -= len(idle)
+                idle.clear()
+        for engine in engines:
+            _quit(engine)
+
+
+def _quit(engine: chess.engine.SimpleEngine) -> None:
+    try:
+        engine.quit()
+    except Exception:
+        pass
+
+
+@contextmanager
+def _fresh_engine(engine_path: str) -> Iterator[chess.engine.SimpleEngine]:
+    try:
+        engine = chess.engine.SimpleEngine.popen_uci(engine_path)
+    except Exception as exc:
+        raise EngineUnavailable(str(exc)) from exc
+    try:
+        yield engine
+    finally:
+        _quit(engine)
+
+
+class EngineTopService:
+    """Runs engine_top searches through the pool, the in-flight table and the cache."""
+
+    def __init__(
+        self,
+        *,
+        pool_enabled: bool = ENGINE_TOP_POOL_ENABLED,
+        pool_size: int = ENGINE_TOP_POOL_SIZE,
+        cache_size: int = ENGINE_TOP_CACHE_SIZE,
+        coalesce: bool = True,
+    ):
+        self._pool = _EnginePool(pool_size) if pool_enabled else None
+        self.cache_size = cache_size
+        self.coalesce = coalesce
+        self._cache: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"searches": 0, "coalesced": 0, "cache_hits": 0}
+
+    def borrow(self, engine_path: str):
+        return self._pool.borrow(engine_path) if self._pool is not None else _fresh_engine(engine_path)
+
+    def top_moves(
+        self,
+        engine_path: str,
+        board: chess.Board,
+        depth: int,
+        multipv: int,
+        build: Callable[[chess.Board, List[chess.engine.InfoDict]], Any],
+    ) -> Any:
+        """
+        Return build(board, infos) for a depth/multipv search of `board`,
+        sharing a running search or a cached result for the same key.
+        `build` turns the raw infos into the (immutable) value that is cached.
+        """
+        key: Tuple[str, str, int, int] = (engine_path, board.fen(), depth, multipv)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self._stats["cache_hits"] += 1
+                return self._cache[key]
+            future = self._inflight.get(key) if self.coalesce else None
+            owner = future is None
+            if owner:
+                future = Future()
+                if self.coalesce:
+                    self._inflight[key] = future
+                self._stats["searches"] += 1
+            else:
+                self._stats["coalesced"] += 1
+        if not owner:
+            return future.result()
+
+        try:
+            with self.borrow(engine_path) as engine:
+                infos = engine.analyse(board, chess.engine.Limit(depth=depth), multipv=multipv)
+            value = build(board, infos)
+        except BaseException as exc:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            self._inflight.pop(key, None)
+            if self.cache_size:
+                self._cache[key] = value
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        future.set_result(value)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, cached=len(self._cache), inflight=len(self._inflight))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+
+
+_SERVICE: Optional[EngineTopService] = None
+_SERVICE_LOCK = threading.Lock()
+
+
+def get_engine_top_service() -> EngineTopService:
+    global _SERVICE
+    with _SERVICE_LOCK:
+        if _SERVICE is None:
+            _SERVICE = EngineTopService()
+        return _SERVICE
+
+
+def configure_engine_top_service(**kwargs: Any) -> EngineTopService:
+    """Replace the process-wide service (quitting the old one's engines)."""
+    global _SERVICE
+    with _SERVICE_LOCK:
+        if _SERVICE is not None:
+            _SERVICE.close()
+        _SERVICE = EngineTopService(**kwargs)
+        return _SERVICE
+
+
+@atexit.register
+def _close_service() -> None:
+    if _SERVICE is not None:
+        _SERVICE.close()
+
+
+__all__ = [
+    "EngineTopService",
+    "EngineUnavailable",
+    "configure_engine_top_service",
+    "get_engine_top_service",
+]
@@ -0,0 +1,122 @@
+"""
+Benchmark for deleting a folder tree in the workspace.
+
+Builds a generated tree (default: 3 levels of fan-out 10, 10k studies with
+realistic payloads) in a throwaway SQLite database, then deletes the root
+once with the previous per-folder ORM recursion and once with the
+set-based _delete_folder_recursive, checking both leave the same rows.
+
+Usage:
+    python -m backend.folder_delete_benchmark
+    python -m backend.folder_delete_benchmark --studies 20000 --fanout 8 --depth 4
+    python -m backend.folder_delete_benchmark --database-url postgresql://.../scratch  # tables are dropped
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import Session, sessionmaker
+
+from .db import Base
+from .models import Folder, Study
+from .workspace_api import _delete_folder_recursive
+
+OWNER = "bench-user"
+
+
+def _orm_delete_recursive(db: Session, folder: Folder, owner_id: str) -> None:
+    """The previous implementation, kept as the reference."""
+    studies = db.query(Study).filter(Study.folder_id == folder.id, Study.owner_id == owner_id).all()
+    for study in studies:
+        db.delete(study)
+    children = db.query(Folder).filter(Folder.parent_id == folder.id, Folder.owner_id == owner_id).all()
+    for child in children:
+        _orm_delete_recursive(db, child, owner_id)
+    db.delete(folder)
+
+
+def _build_tree(db: Session, *, fanout: int, depth: int, studies: int, payload_bytes: int) -> str:
+    root = Folder(name="root", owner_id=OWNER)
+    db.add(root)
+    db.flush()
+    folders: List[str] = [root.id]
+    level = [root.id]
+    for depth_index in range(depth):
+        next_level = []
+        for parent_id in level:
+            for child_index in range(fanout):
+                child = Folder(name=f"f{depth_index}-{child_index}", parent_id=parent_id, owner_id=OWNER)
+                db.add(child)
+                db.flush()
+                next_level.append(child.id)
+        folders.extend(next_level)
+        level = next_level
+    payload = {"moves": ["e4"] * (payload_bytes // 8)}
+    db.bulk_save_objects(
+        [
+            Study(name=f"s{index}", folder_id=folders[index % len(folders)], owner_id=OWNER, data=payload,
+                  report_html="<p></p>" * (payload_bytes // 14))
+            for index in range(studies)
+        ]
+    )
+    # An unrelated folder that must survive.
+    db.add(Folder(name="keep", owner_id=OWNER))
+    db.commit()
+    return root.id
+
+
+def _counting(engine) -> Dict[str, int]:
+    counter = {"statements": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(*_args, **_kwargs):
+        counter["statements"] += 1
+
+    return counter
+
+
+def run_once(database_url: str, delete, **tree) -> Dict[str, float]:
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    make_session = sessionmaker(bind=engine, autoflush=False)
+    with make_session() as db:
+        root_id = _build_tree(db, **tree)
+    counter = _counting(engine)
+    with make_session() as db:
+        start = time.perf_counter()
+        folder = db.get(Folder, root_id)
+        delete(db, folder, OWNER)
+        db.commit()
+        elapsed = time.perf_counter() - start
+        left = (db.query(func.count(Folder.id)).scalar(), db.query(func.count(Study.id)).scalar())
+    engine.dispose()
+    return {"ms": round(elapsed * 1000, 1), "statements": counter["statements"], "folders_left": left[0], "studies_left": left[1]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare ORM-recursive and set-based folder tree deletion.")
+    parser.add_argument("--database-url", default=None, help="Scratch database (its tables are dropped); defaults to a temporary SQLite file")
+    parser.add_argument("--studies", type=int, default=10000)
+    parser.add_argument("--fanout", type=int, default=10)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--payload-bytes", type=int, default=2000)
+    args = parser.parse_args()
+
+    tree = dict(fanout=args.fanout, depth=args.depth, studies=args.studies, payload_bytes=args.payload_bytes)
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        before = run_once(url, _orm_delete_recursive, **tree)
+        after = run_once(url, _delete_folder_recursive, **tree)
+    assert (before["folders_left"], before["studies_left"]) == (after["folders_left"], after["studies_left"])
+    print(json.dumps({"tree": tree, "orm_recursive": before, "set_based": after}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+"""
+In-process background jobs for the long-running study endpoints.
+
+Submitting a job returns its id straight away; the work runs on a small
+pool of worker threads owned by this process (no broker, nothing to deploy).
+A job reports progress and partial results through its JobContext, can be
+cancelled cooperatively, and on success its result is saved as a Study so
+it outlives the process.
+
+Scheduling is per owner: an owner (user id, or the client address for
+anonymous callers) runs at most JOB_MAX_RUNNING_PER_USER jobs at a time and
+may queue at most JOB_MAX_QUEUED_PER_USER more; the workers skip owners at
+their limit, so one account cannot occupy every worker.
+
+Environment:
+    JOB_WORKERS               worker threads (default 2)
+    JOB_MAX_RUNNING_PER_USER  concurrent jobs per owner (default 1)
+    JOB_MAX_QUEUED_PER_USER   queued + running jobs per owner (default 5)
+    JOB_RETENTION_S           seconds finished jobs stay pollable (default 3600)
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from uuid import uuid4
+
+from .db import SessionLocal
+from .models import Study
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = max(1, int(os.getenv("JOB_WORKERS", "2")))
+JOB_MAX_RUNNING_PER_USER = max(1, int(os.getenv("JOB_MAX_RUNNING_PER_USER", "1")))
+JOB_MAX_QUEUED_PER_USER = max(1, int(os.getenv("JOB_MAX_QUEUED_PER_USER", "5")))
+JOB_RETENTION_S = float(os.getenv("JOB_RETENTION_S", "3600"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobLimitError(Exception):
+    """The owner already has JOB_MAX_QUEUED_PER_USER unfinished jobs."""
+
+
+class JobCancelled(Exception):
+    """Raised by JobContext.check_cancelled() to unwind a cancelled job."""
+
+
+@dataclass
+class StudyRecord:
+    """What a finished job saves: Study.data, plus optional title and report HTML."""
+    data: Dict[str, Any]
+    title: Optional[str] = None
+    report_html: Optional[str] = None
+    is_public: bool = False
+
+
+@dataclass(eq=False)
+class Job:
+    id: str
+    kind: str
+    owner: str
+    user_id: Optional[str]
+    fn: Callable[["JobContext"], StudyRecord]
+    status: str = QUEUED
+    progress: Dict[str, Any] = field(default_factory=dict)
+    partial_results: List[Any] = field(default_factory=list)
+    error: Optional[str] = None
+    study_id: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    # Bumped on every change; streams wait on `changed` for a newer version.
+    version: int = 0
+    changed: threading.Condition = field(default_factory=threading.Condition)
+    finished_monotonic: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def touch(self, **updates: Any) -> None:
+        with self.changed:
+            for key, value in updates.items():
+                setattr(self, key, value)
+            self.version += 1
+            self.changed.notify_all()
+
+    def wait_for_change(self, version: int, timeout: float) -> int:
+        """Block until the job moves past `version` (or `timeout`); return the current version."""
+        with self.changed:
+            self.changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+    def snapshot(self, since: int = 0) -> Dict[str, Any]:
+        """JSON-ready view with the partial results from index `since` on."""
+        with self.changed:
+            return {
+                "job_id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "progress": dict(self.progress),
+                "partial_results": list(self.partial_results[since:]),
+                "partial_count": len(self.partial_results),
+                "error": self.error,
+                "study_id": self.study_id,
+                "created_at": self.created_at.isoformat() + "Z",
+                "started_at": self.started_at.isoformat() + "Z" if self.started_at else None,
+                "finished_at": self.finished_at.isoformat() + "Z" if self.finished_at else None,
+                "version": self.version,
+            }
+
+
+class JobContext:
+    """Handle a running job uses to report progress and notice cancellation."""
+
+    def __init__(self, job: Job):
+        self._job = job
+
+    @property
+    def cancel_event(self) -> threading.Event:
+        return self._job.cancel_event
+
+    @property
+    def cancelled(self) -> bool:
+        return self._job.cancel_event.is_set()
+
+    def check_cancelled(self) -> None:
+        if self.cancelled:
+            raise JobCancelled()
+
+    def progress(self, **fields: Any) -> None:
+        job = self._job
+        with job.changed:
+            job.progress.update(fields)
+            job.version += 1
+            job.changed.notify_all()
+
+    def emit(self, item: Any) -> None:
+        """Publish one partial result (already JSON-ready)."""
+        job = self._job
+        with job.changed:
+            job.partial_results.append(item)
+            job.version += 1
+            job.changed.notify_all()
+
+
+class JobManager:
+    """Bounded worker pool running queued jobs with per-owner limits."""
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        *,
+        max_running_per_user: int = JOB_MAX_RUNNING_PER_USER,
+        max_queued_per_user: int = JOB_MAX_QUEUED_PER_USER,
+        retention_s: float = JOB_RETENTION_S,
+    ):
+        self.workers = max(1, workers)
+        self.max_running_per_user = max(1, max_running_per_user)
+        self.max_queued_per_user = max(self.max_running_per_user, max_queued_per_user)
+        self.retention_s = retention_s
+        self._jobs: Dict[str, Job] = {}
+        self._queue: List[Job] = []
+        self._running: Dict[str, int] = {}
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._shutdown = False
+
+    def _ensure_workers(self) -> None:
+        # Started on first submit so importing the API never spawns threads.
+        if self._threads:
+            return
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(
+        self,
+        kind: str,
+        owner: str,
+        fn: Callable[[JobContext], StudyRecord],
+        *,
+        user_id: Optional[str] = None,
+    ) -> Job:
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("job manager is shut down")
+            self._prune()
+            unfinished = sum(1 for job in self._jobs.values() if job.owner == owner and not job.finished)
+            if unfinished >= self.max_queued_per_user:
+                raise JobLimitError(f"at most {self.max_queued_per_user} unfinished jobs per user")
+            job = Job(id=uuid4().hex, kind=kind, owner=owner, user_id=user_id, fn=fn)
+            self._jobs[job.id] = job
+            self._queue.append(job)
+            self._ensure_workers()
+            self._cond.notify()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def jobs_for(self, owner: str) -> List[Job]:
+        with self._cond:
+            self._prune()
+            return sorted(
+                (job for job in self._jobs.values() if job.owner == owner),
+                key=lambda job: job.created_at,
+                reverse=True,
+            )
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Drop a queued job, or ask a running one to stop at its next check."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return job
+            job.cancel_event.set()
+            if job in self._queue:
+                self._queue.remove(job)
+                self._finish(job, CANCELLED)
+        return job
+
+    def _next_job(self) -> Optional[Job]:
+        for job in self._queue:
+            if self._running.get(job.owner, 0) < self.max_running_per_user:
+                self._queue.remove(job)
+                self._running[job.owner] = self._running.get(job.owner, 0) + 1
+                return job
+        return None
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                job = None
+                while not self._shutdown:
+                    job = self._next_job()
+                    if job is not None:
+                        break
+                    self._cond.wait()
+                if job is None:
+                    return
+            job.touch(status=RUNNING, started_at=datetime.utcnow())
+            status, error, study_id = self._run(job)
+            with self._cond:
+                self._running[job.owner] -= 1
+                if not self._running[job.owner]:
+                    del self._running[job.owner]
+                self._finish(job, status, error=error, study_id=study_id)
+                # The owner may have freed a slot for one of its queued jobs.
+                self._cond.notify_all()
+
+    def _run(self, job: Job):
+        context = JobContext(job)
+        try:
+            context.check_cancelled()
+            record = job.fn(context)
+            context.check_cancelled()
+        except JobCancelled:
+            return CANCELLED, None, None
+        except Exception as exc:
+            logger.warning("Job %s (%s) failed: %s", job.id, job.kind, exc)
+            logger.debug("%s", traceback.format_exc())
+            return FAILED, getattr(exc, "detail", None) or str(exc) or type(exc).__name__, None
+        try:
+            study_id = _save_study(job, record)
+        except Exception as exc:
+            return FAILED, f"could not save result: {exc}", None
+        return SUCCEEDED, None, study_id
+
+    def _finish(self, job: Job, status: str, *, error: Optional[str] = None, study_id: Optional[str] = None) -> None:
+        job.finished_monotonic = time.monotonic()
+        job.touch(status=status, error=error, study_id=study_id, finished_at=datetime.utcnow())
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_monotonic is not None and now - job.finished_monotonic > self.retention_s
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def shutdown(self) -> None:
+        with self._cond:
+            self._shutdown = True
+            for job in self._jobs.values():
+                job.cancel_event.set()
+            self._cond.notify_all()
+
+
+def _save_study(job: Job, record: StudyRecord) -> str:
+    data = dict(record.data)
+    data["job"] = {"job_id": job.id, "kind": job.kind}
+    db = SessionLocal()
+    try:
+        study = Study(
+            title=record.title,
+            data=data,
+            owner_id=job.user_id,
+            is_public=record.is_public,
+            report_html=record.report_html,
+        )
+        db.add(study)
+        db.commit()
+        db.refresh(study)
+        return study.id
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+_MANAGER: Optional[JobManager] = None
+_MANAGER_LOCK = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    global _MANAGER
+    with _MANAGER_LOCK:
+        if _MANAGER is None:
+            _MANAGER = JobManager()
+        return _MANAGER
+
+
+def configure_job_manager(**kwargs: Any) -> JobManager:
+    """Replace the process-wide manager (shutting the old one down)."""
+    global _MANAGER
+    with _MANAGER_LOCK:
+        if _MANAGER is not None:
+            _MANAGER.shutdown()
+        _MANAGER = JobManager(**kwargs)
+        return _MANAGER
+
+
+__all__ = [
+    "CANCELLED",
+    "FAILED",
+    "FINISHED",
+    "QUEUED",
+    "RUNNING",
+    "SUCCEEDED",
+    "Job",
+    "JobCancelled",
+    "JobContext",
+    "JobLimitError",
+    "JobManager",
+    "StudyRecord",
+    "configure_job_manager",
+    "get_job_manager",
+]
@@ -0,0 +1,228 @@
+"""
+Background-job versions of the long-running endpoints (see jobs.py).
+
+    POST /api/jobs/quick_wins      body as /api/study/quick_wins
+    POST /api/jobs/analyze         body as /api/study/analyze
+    POST /api/jobs/style_report    {"player_id": ..., "max_games": ...}
+    GET  /api/jobs                 the caller's jobs
+    GET  /api/jobs/{id}?since=N    status, progress, partial results from N
+    GET  /api/jobs/{id}/events     NDJSON stream of the same until the job ends
+    POST /api/jobs/{id}/cancel
+
+Submitting returns 202 with the job snapshot; the finished result is saved
+as a Study whose id is reported as `study_id`.
+"""
+import json
+import threading
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from .auth_api import get_current_user
+from .auth_models import User
+from .jobs import FINISHED, Job, JobContext, JobLimitError, StudyRecord, get_job_manager
+from .study_api import (
+    ENGINE_DEFAULT,
+    AnalyzeRequest,
+    QuickWinRequest,
+    QuickWinsResponse,
+    _analysis_result_json,
+    _start_quick_win_scan,
+    _validate_quick_win_request,
+    get_current_user_optional,
+)
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+# Seconds an /events stream waits for a change before sending a keep-alive snapshot.
+EVENTS_KEEPALIVE_S = 15.0
+
+# run_full_report shares per-player folders and a module-level override, so
+# reports are generated one at a time even when several jobs are running.
+_REPORT_LOCK = threading.Lock()
+
+
+class StyleReportJobRequest(BaseModel):
+    player_id: str
+    max_games: Optional[int] = None
+
+
+def _owner_key(request: Request, user: Optional[User]) -> str:
+    if user is not None:
+        return f"user:{user.id}"
+    host = request.client.host if request.client else "unknown"
+    return f"anon:{host}"
+
+
+def _submit(kind: str, fn, request: Request, user: Optional[User]) -> dict:
+    try:
+        job = get_job_manager().submit(
+            kind,
+            _owner_key(request, user),
+            fn,
+            user_id=user.id if user else None,
+        )
+    except JobLimitError as exc:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(exc))
+    return job.snapshot()
+
+
+def _owned_job(job_id: str, request: Request, user: Optional[User]) -> Job:
+    job = get_job_manager().get(job_id)
+    if job is None or job.owner != _owner_key(request, user):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+# ----------------------------
+# Job bodies
+# ----------------------------
+
+def _quick_wins_job(req: QuickWinRequest):
+    def run(ctx: JobContext) -> StudyRecord:
+        total_games, scan = _start_quick_win_scan(req, ctx.cancel_event)
+        ctx.progress(total_games=total_games, matches=0)
+        matches = []
+        scanned = total_games
+        for index, match in scan:
+            matches.append(match)
+            ctx.emit(jsonable_encoder(match))
+            ctx.progress(games_scanned=index, matches=len(matches))
+            if len(matches) >= req.max_results:
+                scanned = index
+        # The scan ends early, quitting its engines, once the job is cancelled.
+        ctx.check_cancelled()
+        response = QuickWinsResponse(
+            total_games_scanned=scanned,
+            qualifying_games=matches,
+            engine_info=f"{req.engine_path or ENGINE_DEFAULT} depth={req.depth}",
+        )
+        filters = req.model_dump()
+        filters.pop("pgn_text", None)
+        return StudyRecord(
+            title=f"Quick wins snapshot {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}",
+            data={
+                "quick_win_response": jsonable_encoder(response),
+                "filters": filters,
+                "engine_info": response.engine_info,
+            },
+        )
+
+    return run
+
+
+def _analyze_job(req: AnalyzeRequest):
+    def run(ctx: JobContext) -> StudyRecord:
+        ctx.progress(stage="predicting")
+        return StudyRecord(title=getattr(req, "title", None), data=_analysis_result_json(req), is_public=True)
+
+    return run
+
+
+def _style_report_job(req: StyleReportJobRequest):
+    def run(ctx: JobContext) -> StudyRecord:
+        from style_report.scripts.run_full_report import generate_report
+
+        ctx.progress(stage="waiting")
+        with _REPORT_LOCK:
+            ctx.check_cancelled()
+            ctx.progress(stage="generating")
+            report = generate_report(player_id=req.player_id, max_games=req.max_games)
+        report_html = report.pop("report_html", None)
+        return StudyRecord(
+            title=f"Style report {req.player_id}",
+            data=jsonable_encoder(report),
+            report_html=report_html,
+        )
+
+    return run
+
+
+# ----------------------------
+# Endpoints
+# ----------------------------
+
+@router.post("/quick_wins", status_code=status.HTTP_202_ACCEPTED)
+def submit_quick_wins(
+    req: QuickWinRequest,
+    request: Request,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+):
+    _validate_quick_win_request(req)
+    return _submit("quick_wins", _quick_wins_job(req), request, current_user)
+
+
+@router.post("/analyze", status_code=status.HTTP_202_ACCEPTED)
+def submit_analyze(
+    req: AnalyzeRequest,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+):
+    return _submit("analyze", _analyze_job(req), request, current_user)
+
+
+@router.post("/style_report", status_code=status.HTTP_202_ACCEPTED)
+def submit_style_report(
+    req: StyleReportJobRequest,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+):
+    return _submit("style_report", _style_report_job(req), request, current_user)
+
+
+@router.get("")
+def list_jobs(
+    request: Request,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+) -> List[dict]:
+    jobs = get_job_manager().jobs_for(_owner_key(request, current_user))
+    # Partial results can be large; fetch them per job.
+    return [dict(job.snapshot(), partial_results=[]) for job in jobs]
+
+
+@router.get("/{job_id}")
+def get_job(
+    job_id: str,
+    request: Request,
+    since: int = 0,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+):
+    return _owned_job(job_id, request, current_user).snapshot(max(0, since))
+
+
+@router.get("/{job_id}/events")
+def job_events(
+    job_id: str,
+    request: Request,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+):
+    """NDJSON: one snapshot per change, carrying only the new partial results."""
+    job = _owned_job(job_id, request, current_user)
+
+    def events() -> Iterator[str]:
+        sent = 0
+        while True:
+            snapshot = job.snapshot(sent)
+            sent = snapshot["partial_count"]
+            version = snapshot["version"]
+            yield json.dumps(snapshot, ensure_ascii=False) + "\n"
+            if snapshot["status"] in FINISHED:
+                return
+            job.wait_for_change(version, EVENTS_KEEPALIVE_S)
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@router.post("/{job_id}/cancel")
+def cancel_job(
+    job_id: str,
+    request: Request,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+):
+    job = _owned_job(job_id, request, current_user)
+    get_job_manager().cancel(job.id)
+    return job.snapshot()
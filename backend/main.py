@@ -11,6 +11,7 @@ from .study_api import router as study_router
 from .workspace_api import router as workspace_router
 from .battle_api import router as battle_router
 from .battle_ws import ws_router as battle_ws_router
+from .jobs_api import router as jobs_router
 
 # 自动创建数据库表
 Base.metadata.create_all(bind=engine)
@@ -51,6 +52,7 @@ app.include_router(study_router)
 app.include_router(workspace_router)
 app.include_router(battle_router)
 app.include_router(battle_ws_router)
+app.include_router(jobs_router)
 
 
 @app.get("/")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, JSON, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, Boolean, Integer, JSON, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship, synonym
 from datetime import datetime
 from nanoid import generate
@@ -35,7 +35,9 @@ class Study(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    folder = relationship("Folder", back_populates="studies", lazy="joined")
+    # Loaded on access only: most reads want the study alone, and a joined
+    # folder on every Study query was pure overhead.
+    folder = relationship("Folder", back_populates="studies", lazy="select")
 
 
 class Folder(Base):
@@ -53,4 +55,39 @@ class Folder(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     parent = relationship("Folder", remote_side=[id], backref="children", lazy="selectin")
-    studies = relationship("Study", back_populates="folder", lazy="selectin")
+    # Not "selectin": that pulled every study (with its data blob) whenever a
+    # folder was loaded.
+    studies = relationship("Study", back_populates="folder", lazy="select")
+
+
+class StudyGame(Base):
+    """
+    Header index of a study imported from a multi-game PGN, so game lists
+    can be filtered by player, rating, result, ECO or date without
+    reparsing PGN or loading Study.data.
+    """
+    __tablename__ = "study_games"
+
+    # SQLite only enforces the cascade with PRAGMA foreign_keys=ON, so the
+    # workspace delete paths remove these rows themselves.
+    study_id = Column(String, ForeignKey("studies.id", ondelete="CASCADE"), primary_key=True)
+    owner_id = Column(String, nullable=True, index=True)
+    import_id = Column(String, nullable=True, index=True)
+    game_index = Column(Integer, nullable=False)
+
+    white = Column(String, nullable=True)
+    black = Column(String, nullable=True)
+    white_elo = Column(Integer, nullable=True)
+    black_elo = Column(Integer, nullable=True)
+    result = Column(String(8), nullable=True)
+    eco = Column(String(8), nullable=True)
+    # PGN date as written ("2024.03.??"), which sorts correctly as text.
+    date = Column(String(10), nullable=True)
+    event = Column(String, nullable=True)
+    ply_count = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        Index("ix_study_games_owner_white", "owner_id", "white"),
+        Index("ix_study_games_owner_black", "owner_id", "black"),
+        Index("ix_study_games_owner_date", "owner_id", "date"),
+    )
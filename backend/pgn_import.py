@@ -0,0 +1,206 @@
+"""
+Streaming import of multi-game PGN files into one Study per game.
+
+The upload is spooled to a temporary file (in memory up to
+PGN_IMPORT_SPOOL_BYTES, then on disk) and read back one game at a time
+with a chess.pgn visitor that keeps only the headers and the mainline SAN:
+variations are skipped by the reader and comments are never built into a
+game tree. Games are written in batches of PGN_IMPORT_BATCH with set-based
+inserts, together with a StudyGame header row per game, so memory stays
+bounded by one batch whatever the size of the file.
+
+Environment:
+    PGN_IMPORT_MAX_BYTES    largest accepted upload (default 512 MiB)
+    PGN_IMPORT_SPOOL_BYTES  upload bytes kept in memory before spilling to disk (default 8 MiB)
+    PGN_IMPORT_BATCH        games per insert/commit (default 500)
+"""
+from __future__ import annotations
+
+import io
+import os
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+import chess
+import chess.pgn
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from .models import Study, StudyGame, generate_study_id
+
+PGN_IMPORT_MAX_BYTES = int(os.getenv("PGN_IMPORT_MAX_BYTES", str(512 * 1024 * 1024)))
+PGN_IMPORT_SPOOL_BYTES = int(os.getenv("PGN_IMPORT_SPOOL_BYTES", str(8 * 1024 * 1024)))
+PGN_IMPORT_BATCH = max(1, int(os.getenv("PGN_IMPORT_BATCH", "500")))
+
+
+@dataclass
+class ParsedGame:
+    headers: Dict[str, str]
+    san_moves: List[str]
+    errors: List[str] = field(default_factory=list)
+
+
+class MainlineVisitor(chess.pgn.BaseVisitor[ParsedGame]):
+    """Headers and mainline SAN of one game; variations and comments are dropped."""
+
+    def begin_game(self) -> None:
+        self.game = ParsedGame(headers={}, san_moves=[])
+
+    def visit_header(self, tagname: str, tagvalue: str) -> None:
+        self.game.headers[tagname] = tagvalue
+
+    def begin_variation(self) -> chess.pgn.SkipType:
+        return chess.pgn.SKIP
+
+    def visit_move(self, board: chess.Board, move: chess.Move) -> None:
+        self.game.san_moves.append(board.san(move))
+
+    def handle_error(self, error: Exception) -> None:
+        self.game.errors.append(str(error))
+
+    def result(self) -> ParsedGame:
+        return self.game
+
+
+def iter_parsed_games(handle: IO[str]) -> Iterator[ParsedGame]:
+    while True:
+        game = chess.pgn.read_game(handle, Visitor=MainlineVisitor)
+        if game is None:
+            return
+        yield game
+
+
+def new_spool() -> "tempfile.SpooledTemporaryFile[bytes]":
+    return tempfile.SpooledTemporaryFile(max_size=PGN_IMPORT_SPOOL_BYTES, mode="w+b")
+
+
+def _int_header(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return None
+    digits = "".join(ch for ch in value if ch.isdigit())
+    return int(digits) if digits else None
+
+
+def _known(value: Optional[str], max_length: Optional[int] = None) -> Optional[str]:
+    if not value or value in ("?", "*"):
+        return None
+    return value[:max_length] if max_length else value
+
+
+@dataclass
+class ImportProgress:
+    import_id: str
+    games_imported: int = 0
+    games_skipped: int = 0
+    first_study_id: Optional[str] = None
+
+
+def import_games(
+    db: Session,
+    spool: IO[bytes],
+    *,
+    owner_id: Optional[str],
+    import_id: str,
+    folder_id: Optional[str] = None,
+    title: Optional[str] = None,
+    is_public: bool = False,
+    batch_size: int = PGN_IMPORT_BATCH,
+) -> Iterator[ImportProgress]:
+    """
+    Store every game of the spooled PGN as its own Study plus StudyGame row,
+    committing and yielding the running totals after each batch. Games the
+    reader reports errors for are counted as skipped.
+    """
+    spool.seek(0)
+    text = io.TextIOWrapper(spool, encoding="utf-8-sig", errors="replace", newline="")
+    progress = ImportProgress(import_id=import_id)
+    studies: List[Dict[str, Any]] = []
+    index_rows: List[Dict[str, Any]] = []
+
+    def flush() -> bool:
+        """Insert and commit the pending batch; False when it was empty."""
+        if not studies:
+            return False
+        db.execute(insert(Study), studies)
+        db.execute(insert(StudyGame), index_rows)
+        db.commit()
+        studies.clear()
+        index_rows.clear()
+        return True
+
+    # (imported, skipped) of the last progress event, so the final event is
+    # only sent when it has news, but always at least once.
+    reported: Optional[Tuple[int, int]] = None
+
+    game_index = 0
+    try:
+        for game in iter_parsed_games(text):
+            game_index += 1
+            if game.errors:
+                progress.games_skipped += 1
+                continue
+            headers = game.headers
+            white, black = _known(headers.get("White")), _known(headers.get("Black"))
+            name = f"{white or '?'} - {black or '?'}"
+            study_id = generate_study_id()
+            now = datetime.utcnow()
+            studies.append(
+                {
+                    "id": study_id,
+                    "name": name,
+                    "title": f"{title} #{game_index}" if title else name,
+                    "folder_id": folder_id,
+                    "owner_id": owner_id,
+                    "is_public": is_public,
+                    "payload": {
+                        "moves": game.san_moves,
+                        "headers": headers,
+                        "source": "pgn_import",
+                        "import_id": import_id,
+                    },
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+            index_rows.append(
+                {
+                    "study_id": study_id,
+                    "owner_id": owner_id,
+                    "import_id": import_id,
+                    "game_index": game_index,
+                    "white": white,
+                    "black": black,
+                    "white_elo": _int_header(headers.get("WhiteElo")),
+                    "black_elo": _int_header(headers.get("BlackElo")),
+                    "result": _known(headers.get("Result"), 8),
+                    "eco": _known(headers.get("ECO"), 8),
+                    "date": _known(headers.get("Date"), 10),
+                    "event": _known(headers.get("Event")),
+                    "ply_count": len(game.san_moves),
+                }
+            )
+            progress.games_imported += 1
+            if progress.first_study_id is None:
+                progress.first_study_id = study_id
+            if len(studies) >= batch_size:
+                flush()
+                reported = (progress.games_imported, progress.games_skipped)
+                yield progress
+        flushed = flush()
+    finally:
+        text.detach()
+    if flushed or reported != (progress.games_imported, progress.games_skipped):
+        yield progress
+
+
+__all__ = [
+    "ImportProgress",
+    "MainlineVisitor",
+    "ParsedGame",
+    "PGN_IMPORT_MAX_BYTES",
+    "import_games",
+    "iter_parsed_games",
+    "new_spool",
+]
@@ -0,0 +1,158 @@
+"""
+Async front for the blocking predictor pipeline behind /api/study/analyze.
+
+The pipeline has two stages: an engine search that yields candidate moves
+(seconds), and tagging + GM probabilities for those candidates (one full
+analyze_position per move, often much longer). Each stage has its own
+thread pool, never the event loop, so taggings that outlive their requests
+cannot hold up the searches of new ones. The request waits for the search,
+then for tagging up to a deadline; if tagging is late the caller answers
+with the engine-only result and gets a future for the tagged one, which
+keeps running in the background.
+
+At most PREDICTOR_MAX_PENDING predictions (including ones still tagging in
+the background) are accepted at a time; beyond that PredictorBusy is raised
+so the endpoint can shed load instead of queueing without bound.
+
+Environment:
+    PREDICTOR_WORKERS           threads for the engine search (default 2)
+    PREDICTOR_TAG_WORKERS       threads for tagging (default PREDICTOR_WORKERS)
+    PREDICTOR_MAX_PENDING       accepted predictions in flight (default 8)
+    PREDICTOR_SEARCH_TIMEOUT_S  deadline for the engine search (default 30)
+    PREDICTOR_TAG_TIMEOUT_S     wait for tagging before answering engine-only (default 5)
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+PREDICTOR_WORKERS = max(1, int(os.getenv("PREDICTOR_WORKERS", "2")))
+PREDICTOR_TAG_WORKERS = max(1, int(os.getenv("PREDICTOR_TAG_WORKERS", str(PREDICTOR_WORKERS))))
+PREDICTOR_MAX_PENDING = max(1, int(os.getenv("PREDICTOR_MAX_PENDING", "8")))
+PREDICTOR_SEARCH_TIMEOUT_S = float(os.getenv("PREDICTOR_SEARCH_TIMEOUT_S", "30"))
+PREDICTOR_TAG_TIMEOUT_S = float(os.getenv("PREDICTOR_TAG_TIMEOUT_S", "5"))
+
+S = TypeVar("S")
+R = TypeVar("R")
+
+
+class PredictorBusy(Exception):
+    """PREDICTOR_MAX_PENDING predictions are already in flight."""
+
+
+class PredictorTimeout(Exception):
+    """The engine search missed PREDICTOR_SEARCH_TIMEOUT_S."""
+
+
+@dataclass
+class Prediction(Generic[S, R]):
+    """Outcome of PredictorService.predict."""
+    search: S
+    # Set when tagging finished within the deadline.
+    result: Optional[R] = None
+    # Set instead when tagging is still running; resolves to the tagged result.
+    pending: Optional["Future[R]"] = None
+
+
+class PredictorService:
+    def __init__(
+        self,
+        *,
+        workers: int = PREDICTOR_WORKERS,
+        tag_workers: int = PREDICTOR_TAG_WORKERS,
+        max_pending: int = PREDICTOR_MAX_PENDING,
+        search_timeout_s: float = PREDICTOR_SEARCH_TIMEOUT_S,
+        tag_timeout_s: float = PREDICTOR_TAG_TIMEOUT_S,
+    ):
+        self.search_timeout_s = search_timeout_s
+        self.tag_timeout_s = tag_timeout_s
+        self.max_pending = max(1, max_pending)
+        self._search_executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="predictor-search")
+        self._tag_executor = ThreadPoolExecutor(max_workers=max(1, tag_workers), thread_name_prefix="predictor-tag")
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+    async def call(self, fn: Callable[..., R], *args: Any) -> R:
+        """Run a blocking helper on the predictor's search threads."""
+        return await asyncio.wrap_future(self._search_executor.submit(fn, *args))
+
+    async def predict(self, search: Callable[[], S], tag: Callable[[S], R]) -> Prediction[S, R]:
+        """
+        Run `search`, then `tag(search_result)`, off the event loop.
+        Raises PredictorBusy when full and PredictorTimeout when the search
+        is late; exceptions from either stage propagate.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise PredictorBusy(f"{self.max_pending} predictions already in flight")
+        # The slot is held until the last stage started for this prediction
+        # ends, even when that happens after the request has been answered.
+        try:
+            search_future = self._search_executor.submit(search)
+        except BaseException:
+            self._slots.release()
+            raise
+        try:
+            # shield: giving up on a stage must not cancel the running thread job.
+            candidates = await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(search_future)),
+                self.search_timeout_s,
+            )
+        except asyncio.TimeoutError:
+            search_future.add_done_callback(self._release)
+            raise PredictorTimeout(f"engine search exceeded {self.search_timeout_s:g}s") from None
+        except BaseException:
+            search_future.add_done_callback(self._release)
+            raise
+        try:
+            tagging = self._tag_executor.submit(tag, candidates)
+        except BaseException:
+            self._slots.release()
+            raise
+        tagging.add_done_callback(self._release)
+        try:
+            result = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(tagging)), self.tag_timeout_s)
+        except asyncio.TimeoutError:
+            return Prediction(search=candidates, pending=tagging)
+        return Prediction(search=candidates, result=result)
+
+    def _release(self, _: Future) -> None:
+        self._slots.release()
+
+    def shutdown(self) -> None:
+        self._search_executor.shutdown(wait=False, cancel_futures=True)
+        self._tag_executor.shutdown(wait=False, cancel_futures=True)
+
+
+_SERVICE: Optional[PredictorService] = None
+_SERVICE_LOCK = threading.Lock()
+
+
+def get_predictor_service() -> PredictorService:
+    global _SERVICE
+    with _SERVICE_LOCK:
+        if _SERVICE is None:
+            _SERVICE = PredictorService()
+        return _SERVICE
+
+
+def configure_predictor_service(**kwargs: Any) -> PredictorService:
+    """Replace the process-wide service."""
+    global _SERVICE
+    with _SERVICE_LOCK:
+        if _SERVICE is not None:
+            _SERVICE.shutdown()
+        _SERVICE = PredictorService(**kwargs)
+        return _SERVICE
+
+
+__all__ = [
+    "Prediction",
+    "PredictorBusy",
+    "PredictorService",
+    "PredictorTimeout",
+    "configure_predictor_service",
+    "get_predictor_service",
+]
@@ -1,7 +1,13 @@
 import os
 import io
+import importlib.util
 import uuid
-from typing import Optional, List, Any, Dict, Iterator
+import queue
+import threading
+from collections import deque
+from dataclasses import asdict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Optional, List, Any, Dict, Iterator, Deque, Tuple
 import json
 from pathlib import Path
 import sys
@@ -12,9 +18,10 @@ import jwt
 import chess
 import chess.pgn
 import chess.engine
-from fastapi import APIRouter, FastAPI, HTTPException, Depends, Request
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, FastAPI, HTTPException, Depends, Query, Request
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from sqlalchemy import or_
@@ -22,8 +29,11 @@ from sqlalchemy.orm import Session
 
 from .auth_api import get_current_user
 from .auth_models import User
-from .db import get_db
-from .models import Study
+from .db import SessionLocal, get_db
+from .engine_top_service import EngineUnavailable, get_engine_top_service
+from .predictor_service import PredictorBusy, PredictorTimeout, get_predictor_service
+from .models import Folder, Study, StudyGame
+from .pgn_import import PGN_IMPORT_MAX_BYTES, import_games, new_spool
 from .auth_utils import SECRET_KEY, ALGORITHM
 
 
@@ -174,11 +184,13 @@ _predictor_root_path: Optional[Path] = None
 _fetch_engine_moves = None
 _tag_moves = None
 _load_player_summaries = None
-_compute_move_probabilities = None
+_get_player_model = None
 
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 ENGINE_DEFAULT = os.getenv("STOCKFISH_PATH", "/usr/local/bin/stockfish")
+# Stockfish processes a quick-win scan spreads its games over.
+QUICK_WIN_WORKERS = max(1, int(os.getenv("QUICK_WIN_WORKERS", str(min(4, os.cpu_count() or 1)))))
 
 # Optional auth helper: returns user when token present/valid, else None (keeps public access working)
 def get_current_user_optional(request: Request, db: Session = Depends(get_db)) -> Optional[User]:
@@ -291,7 +303,7 @@ def _build_local_note(req: CoachNoteRequest) -> str:
 def _ensure_predictor():
     """Lazy import predictor pipeline (engine + tagger + probability)"""
     global _predictor_ready, _predictor_err, _predictor_root_path
-    global _fetch_engine_moves, _tag_moves, _load_player_summaries, _compute_move_probabilities  # noqa: PLW0603
+    global _fetch_engine_moves, _tag_moves, _load_player_summaries, _get_player_model  # noqa: PLW0603
     if _predictor_ready:
         return
     env_root_raw = os.getenv("PREDICTOR_ROOT")
@@ -316,41 +328,40 @@ def _ensure_predictor():
         from superchess_predictor.backend.engine_utils import fetch_engine_moves as fem  # type: ignore
         from superchess_predictor.backend.tagger_utils import tag_moves as tm  # type: ignore
         from superchess_predictor.backend.file_utils import load_player_summaries as lps  # type: ignore
-        from superchess_predictor.backend.predictor import compute_move_probabilities as cmp  # type: ignore
+        from superchess_predictor.backend.predictor import get_player_model as gpm  # type: ignore
     except Exception as exc:  # pragma: no cover
         _predictor_err = str(exc)
         return
     _fetch_engine_moves = fem
     _tag_moves = tm
     _load_player_summaries = lps
-    _compute_move_probabilities = cmp
+    _get_player_model = gpm
     _predictor_ready = True
 
 
-def _predict_with_pipeline(fen: str, engine_path: Optional[str]) -> AnalyzeResponse:
+def _predictor_candidates(fen: str, engine_bin: str) -> List[dict]:
+    """Predictor stage 1: the engine's candidate moves for `fen`."""
     _ensure_predictor()
-    if not _predictor_ready or not _fetch_engine_moves or not _tag_moves or not _load_player_summaries or not _compute_move_probabilities:
+    if not _predictor_ready or not _fetch_engine_moves or not _tag_moves or not _load_player_summaries or not _get_player_model:
         raise HTTPException(status_code=500, detail=_predictor_err or "predictor not ready")
+    return _fetch_engine_moves(fen, engine_path=engine_bin)
+
 
+def _predict_with_pipeline(fen: str, engine_path: Optional[str]) -> AnalyzeResponse:
     engine_bin = engine_path or ENGINE_DEFAULT
+    return _tagged_prediction(fen, engine_bin, _predictor_candidates(fen, engine_bin))
 
-    tagged_moves = _tag_moves(
-        fen,
-        _fetch_engine_moves(
-            fen,
-            engine_path=engine_bin,
-        ),
-        engine_path=engine_bin,
-    )
+
+def _tagged_prediction(fen: str, engine_bin: str, candidates: List[dict]) -> AnalyzeResponse:
+    """Predictor stage 2: tag the candidates and score them against the reference players."""
+    tagged_moves = _tag_moves(fen, candidates, engine_path=engine_bin)
     player_summaries_root = (_predictor_root_path or Path(".")) / "superchess_predictor" / "reports"
     player_summaries = _load_player_summaries(player_summaries_root)
     if not player_summaries:
         raise HTTPException(status_code=500, detail="No player summaries found.")
 
-    probabilities = _compute_move_probabilities(
-        tagged_moves,
-        {name: summary["tag_distribution"] for name, summary in player_summaries.items()},
-    )
+    # Compiled once per change of the summary files (see predictor.get_player_model).
+    probabilities = _get_player_model(player_summaries_root).probabilities(tagged_moves)
 
     moves_output = []
     for move, probs in zip(tagged_moves, probabilities):
@@ -374,6 +385,24 @@ def _predict_with_pipeline(fen: str, engine_path: Optional[str]) -> AnalyzeRespo
     return payload
 
 
+def _candidates_prediction(candidates: List[dict], engine_bin: str, reason: str) -> AnalyzeResponse:
+    """Engine-only answer built from stage-1 candidates while tagging is still running."""
+    return AnalyzeResponse(
+        study_id="",
+        players=["engine_only"],
+        moves=[
+            AnalyzeMove(san=move["san"], uci=move["uci"], score_cp=move.get("score_cp"), tags=[])
+            for move in candidates
+        ],
+        metadata={
+            "mode": "engine_only",
+            "reason": reason,
+            "pending": True,
+            "engine_path": engine_bin,
+        },
+    )
+
+
 def _engine_only_prediction(fen: str, engine_path: Optional[str], reason: str) -> AnalyzeResponse:
     """
     Fallback when predictor is unavailable: reuse engine_top so UI still renders.
@@ -404,11 +433,57 @@ def _engine_only_prediction(fen: str, engine_path: Optional[str], reason: str) -
     )
 
 
+# One JSONL file per UTC day (log_YYYYMMDD.jsonl, then log_YYYYMMDD_1.jsonl ...
+# past PREDICTOR_LOG_MAX_BYTES), appended in batches by a background thread.
+# PREDICTOR_LOG_ENABLED=0 turns it off; see chess_imitator.jsonl_log.
+_PREDICTOR_LOG = None
+_predictor_log_err = None
+_PREDICTOR_LOG_LOCK = threading.Lock()
+
+
+def _load_jsonl_log():
+    """
+    Import chess_imitator/jsonl_log.py by path: the folder may be the
+    trailing-space 'chess_imitator ', which is not importable as a package.
+    """
+    path = _players_dir().parent / "jsonl_log.py"
+    spec = importlib.util.spec_from_file_location("chess_imitator_jsonl_log", path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"jsonl_log not found at {path}")
+    module = importlib.util.module_from_spec(spec)
+    # Registered before exec so its dataclasses can resolve their module.
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _ensure_predictor_log():
+    """Lazily open the predictor call log; None (logging off) if jsonl_log cannot be loaded."""
+    global _PREDICTOR_LOG, _predictor_log_err
+    with _PREDICTOR_LOG_LOCK:
+        if _PREDICTOR_LOG is None and _predictor_log_err is None:
+            try:
+                jsonl_log = _load_jsonl_log()
+                _PREDICTOR_LOG = jsonl_log.open_log(
+                    jsonl_log.JsonlLogConfig.from_env(
+                        "PREDICTOR_LOG",
+                        directory=Path(__file__).resolve().parent.parent / "website" / "predictor_log",
+                        name_pattern="log_%Y%m%d",
+                        utc=True,
+                        max_bytes=20 * 1024 * 1024,
+                    )
+                )
+            except Exception as exc:  # pragma: no cover
+                sys.modules.pop("chess_imitator_jsonl_log", None)
+                _predictor_log_err = str(exc)
+        return _PREDICTOR_LOG
+
+
 def _log_predictor_call(fen: str, result: AnalyzeResponse, engine_path: Optional[str]):
+    log = _ensure_predictor_log()
+    if log is None:
+        return
     try:
-        log_dir = Path(__file__).resolve().parent.parent / "website" / "predictor_log"
-        log_dir.mkdir(parents=True, exist_ok=True)
-        log_path = log_dir / f"log_{datetime.utcnow().strftime('%Y%m%d')}.jsonl"
         entry = {
             "ts_utc": datetime.utcnow().isoformat() + "Z",
             "fen": fen,
@@ -417,8 +492,7 @@ def _log_predictor_call(fen: str, result: AnalyzeResponse, engine_path: Optional
             "moves": [m.model_dump() for m in result.moves],
             "metadata": result.metadata,
         }
-        with log_path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        log.write(entry)
     except Exception:
         pass
 
@@ -471,44 +545,74 @@ def _export_game_pgn(game: chess.pgn.Game) -> str:
     return game.accept(exporter)
 
 
+def _quick_win_headers_ok(headers: chess.pgn.Headers, req: QuickWinRequest) -> bool:
+    """Filters that need only the PGN tags: decisive result, ratings and PlyCount when present."""
+    if not _winner_from_result(headers.get("Result")):
+        return False
+    for key in ("WhiteElo", "BlackElo"):
+        elo = _parse_rating(headers.get(key))
+        if elo is not None and (elo < req.min_rating or elo > req.max_rating):
+            return False
+    ply_count = _parse_rating(headers.get("PlyCount"))
+    if req.max_moves > 0 and ply_count is not None and ply_count > req.max_moves:
+        return False
+    return True
+
+
+def _scan_quick_win_headers(pgn_text: str, req: QuickWinRequest) -> Tuple[int, List[Tuple[int, int]]]:
+    """
+    Read only the headers of every game. Returns the number of games and, for
+    the games passing _quick_win_headers_ok, their 1-based index and offset.
+    """
+    stream = io.StringIO(pgn_text)
+    total = 0
+    candidates: List[Tuple[int, int]] = []
+    while True:
+        offset = stream.tell()
+        headers = chess.pgn.read_headers(stream)
+        if headers is None:
+            break
+        total += 1
+        if _quick_win_headers_ok(headers, req):
+            candidates.append((total, offset))
+    return total, candidates
+
+
 def _evaluate_for_quick_win(
     game: chess.pgn.Game,
     engine: chess.engine.SimpleEngine,
     limit: chess.engine.Limit,
     req: QuickWinRequest,
+    stop_event: Optional[threading.Event] = None,
 ) -> Optional[QuickWinMatch]:
+    if not _quick_win_headers_ok(game.headers, req):
+        return None
     moves = list(game.mainline_moves())
     move_count = len(moves)
-    max_moves = req.max_moves if req.max_moves > 0 else None
-    if max_moves and move_count > max_moves:
-        return None
-    white_elo = _parse_rating(game.headers.get("WhiteElo"))
-    black_elo = _parse_rating(game.headers.get("BlackElo"))
-    if white_elo is not None and (white_elo < req.min_rating or white_elo > req.max_rating):
-        return None
-    if black_elo is not None and (black_elo < req.min_rating or black_elo > req.max_rating):
+    if req.max_moves > 0 and move_count > req.max_moves:
         return None
     winner = _winner_from_result(game.headers.get("Result"))
-    if not winner:
-        return None
 
     errors = {"white": 0, "black": 0}
     board = game.board()
+    # Each position is searched once: its eval is the "after" of one ply and
+    # the "before" of the next.
+    before_cp = _score_cp(engine, board, limit)
     for move in moves:
+        if stop_event is not None and stop_event.is_set():
+            return None
         turn_color = board.turn
-        before_cp = _score_cp(engine, board, limit)
         board.push(move)
         after_cp = _score_cp(engine, board, limit)
-        if before_cp is None or after_cp is None:
-            continue
-        turn_sign = 1 if turn_color == chess.WHITE else -1
-        delta = (after_cp - before_cp) * turn_sign
-        if delta < -req.threshold_cp:
-            side = "white" if turn_color == chess.WHITE else "black"
-            errors[side] += 1
-
-    if errors[winner] > req.max_errors:
-        return None
+        if before_cp is not None and after_cp is not None:
+            turn_sign = 1 if turn_color == chess.WHITE else -1
+            delta = (after_cp - before_cp) * turn_sign
+            if delta < -req.threshold_cp:
+                side = "white" if turn_color == chess.WHITE else "black"
+                errors[side] += 1
+                if errors[winner] > req.max_errors:
+                    return None
+        before_cp = after_cp
 
     return QuickWinMatch(
         title=game.headers.get("Event") or game.headers.get("Site") or "Imported Quick Win",
@@ -516,12 +620,141 @@ def _evaluate_for_quick_win(
         result=game.headers.get("Result") or "*",
         winner=winner,
         move_count=move_count,
-        white_elo=white_elo,
-        black_elo=black_elo,
+        white_elo=_parse_rating(game.headers.get("WhiteElo")),
+        black_elo=_parse_rating(game.headers.get("BlackElo")),
         errors=errors,
     )
 
 
+def _close_quick_win_engines(engines: "queue.Queue[chess.engine.SimpleEngine]") -> None:
+    while True:
+        try:
+            engine = engines.get_nowait()
+        except queue.Empty:
+            return
+        try:
+            engine.quit()
+        except Exception:
+            pass
+
+
+def _open_quick_win_engines(engine_path: str, count: int) -> "queue.Queue[chess.engine.SimpleEngine]":
+    engines: "queue.Queue[chess.engine.SimpleEngine]" = queue.Queue()
+    try:
+        for _ in range(count):
+            engines.put(chess.engine.SimpleEngine.popen_uci(engine_path))
+    except Exception as exc:
+        _close_quick_win_engines(engines)
+        raise HTTPException(status_code=500, detail=f"Engine not available: {exc}")
+    return engines
+
+
+def _run_quick_win_job(
+    game: chess.pgn.Game,
+    engines: "queue.Queue[chess.engine.SimpleEngine]",
+    limit: chess.engine.Limit,
+    req: QuickWinRequest,
+    stop_event: threading.Event,
+) -> Optional[QuickWinMatch]:
+    engine = engines.get()
+    try:
+        return _evaluate_for_quick_win(game, engine, limit, req, stop_event)
+    finally:
+        engines.put(engine)
+
+
+def _iter_quick_wins(
+    pgn_text: str,
+    candidates: List[Tuple[int, int]],
+    engines: "queue.Queue[chess.engine.SimpleEngine]",
+    workers: int,
+    req: QuickWinRequest,
+    cancel_event: Optional[threading.Event] = None,
+) -> Iterator[Tuple[int, QuickWinMatch]]:
+    """
+    Evaluate the candidate games on `workers` engines and yield
+    (game index, match) in PGN order, stopping at req.max_results or when
+    `cancel_event` is set. Owns `engines` and quits them when the scan ends
+    or is abandoned.
+    """
+    limit = chess.engine.Limit(depth=req.depth)
+    stop_event = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="quick-win")
+    stream = io.StringIO(pgn_text)
+    todo = iter(candidates)
+    # Games in flight, oldest first; a small window keeps every engine busy
+    # without parsing and queueing games past an early stop.
+    pending: Deque[Tuple[int, Future]] = deque()
+    found = 0
+    try:
+        while True:
+            while len(pending) < workers * 2:
+                candidate = next(todo, None)
+                if candidate is None:
+                    break
+                index, offset = candidate
+                stream.seek(offset)
+                game = chess.pgn.read_game(stream)
+                if game is None:
+                    continue
+                pending.append((index, executor.submit(_run_quick_win_job, game, engines, limit, req, stop_event)))
+            if not pending:
+                return
+            index, future = pending.popleft()
+            while cancel_event is not None:
+                if cancel_event.is_set():
+                    return
+                try:
+                    future.result(timeout=0.2)
+                    break
+                except FutureTimeout:
+                    continue
+            match = future.result()
+            if match:
+                found += 1
+                yield index, match
+                if found >= req.max_results:
+                    return
+    finally:
+        stop_event.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        _close_quick_win_engines(engines)
+
+
+def _validate_quick_win_request(req: QuickWinRequest) -> str:
+    """Reject bad filters with a 400; returns the stripped PGN text."""
+    pgn_text = (req.pgn_text or "").strip()
+    if not pgn_text:
+        raise HTTPException(status_code=400, detail="PGN text is empty.")
+    if req.min_rating > req.max_rating:
+        raise HTTPException(status_code=400, detail="min_rating cannot exceed max_rating.")
+    if req.depth <= 0:
+        raise HTTPException(status_code=400, detail="depth must be positive.")
+    if req.threshold_cp <= 0:
+        raise HTTPException(status_code=400, detail="threshold_cp must be positive.")
+    if req.max_errors < 0:
+        raise HTTPException(status_code=400, detail="max_errors must be non-negative.")
+    if req.max_results <= 0:
+        raise HTTPException(status_code=400, detail="max_results must be positive.")
+    return pgn_text
+
+
+def _start_quick_win_scan(
+    req: QuickWinRequest,
+    cancel_event: Optional[threading.Event] = None,
+) -> Tuple[int, Iterator[Tuple[int, QuickWinMatch]]]:
+    """Validate the request, pre-filter on headers and start the engines."""
+    pgn_text = _validate_quick_win_request(req)
+    total_games, candidates = _scan_quick_win_headers(pgn_text, req)
+    if total_games == 0:
+        raise HTTPException(status_code=400, detail="No valid PGN games were parsed.")
+    if not candidates:
+        return total_games, iter(())
+    workers = min(QUICK_WIN_WORKERS, len(candidates))
+    engines = _open_quick_win_engines(req.engine_path or ENGINE_DEFAULT, workers)
+    return total_games, _iter_quick_wins(pgn_text, candidates, engines, workers, req, cancel_event)
+
+
 # ----------------------------
 # Endpoint: import PGN
 # ----------------------------
@@ -558,6 +791,156 @@ def import_pgn(req: ImportPGNRequest):
     )
 
 
+class StudyGameOut(BaseModel):
+    study_id: str
+    import_id: Optional[str] = None
+    game_index: int
+    white: Optional[str] = None
+    black: Optional[str] = None
+    white_elo: Optional[int] = None
+    black_elo: Optional[int] = None
+    result: Optional[str] = None
+    eco: Optional[str] = None
+    date: Optional[str] = None
+    event: Optional[str] = None
+    ply_count: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
+class StudyGamesResponse(BaseModel):
+    games: List[StudyGameOut]
+    next_offset: Optional[int] = None
+
+
+@router.post("/import_pgn/stream")
+async def import_pgn_stream(
+    request: Request,
+    title: Optional[str] = None,
+    folder_id: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Import every game of a PGN file sent as the raw (optionally chunked)
+    request body, one private Study per game plus a StudyGame header row.
+    Answers NDJSON: {"type": "progress"} after each stored batch, then
+    {"type": "done"} with the import_id (or {"type": "error"}).
+    """
+    if folder_id:
+        folder = await run_in_threadpool(
+            lambda: db.query(Folder.id).filter(Folder.id == folder_id, Folder.owner_id == current_user.id).first()
+        )
+        if folder is None:
+            raise HTTPException(status_code=404, detail="Folder not found")
+
+    spool = new_spool()
+    size = 0
+    try:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > PGN_IMPORT_MAX_BYTES:
+                raise HTTPException(status_code=413, detail=f"PGN larger than {PGN_IMPORT_MAX_BYTES} bytes.")
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    if size == 0:
+        spool.close()
+        raise HTTPException(status_code=400, detail="Empty PGN.")
+
+    import_id = uuid.uuid4().hex
+    owner_id = current_user.id
+
+    def line(event: dict) -> str:
+        return json.dumps(event, ensure_ascii=False) + "\n"
+
+    def events() -> Iterator[str]:
+        # The request's DB session is closed once the response starts streaming.
+        stream_db = SessionLocal()
+        progress = None
+        try:
+            for progress in import_games(
+                stream_db, spool, owner_id=owner_id, import_id=import_id, folder_id=folder_id, title=title
+            ):
+                yield line({"type": "progress", **asdict(progress)})
+        except Exception as exc:
+            stream_db.rollback()
+            done = asdict(progress) if progress else {"import_id": import_id}
+            yield line({"type": "error", "detail": f"Import stopped: {exc}", **done})
+            return
+        finally:
+            stream_db.close()
+            spool.close()
+        if progress.games_imported == 0 and progress.games_skipped == 0:
+            yield line({"type": "error", "detail": "No valid PGN games were parsed.", **asdict(progress)})
+            return
+        yield line({"type": "done", **asdict(progress)})
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@router.get("/games", response_model=StudyGamesResponse)
+def list_study_games(
+    player: Optional[str] = None,
+    white: Optional[str] = None,
+    black: Optional[str] = None,
+    result: Optional[str] = None,
+    eco: Optional[str] = None,
+    min_rating: Optional[int] = None,
+    max_rating: Optional[int] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    import_id: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Filter the caller's imported games through the StudyGame header index.
+    Ratings apply to each known rating, dates compare as PGN "YYYY.MM.DD" text.
+    """
+    query = (
+        db.query(StudyGame)
+        .join(Study, Study.id == StudyGame.study_id)
+        .filter(StudyGame.owner_id == current_user.id)
+    )
+    if player:
+        query = query.filter(or_(StudyGame.white == player, StudyGame.black == player))
+    if white:
+        query = query.filter(StudyGame.white == white)
+    if black:
+        query = query.filter(StudyGame.black == black)
+    if result:
+        query = query.filter(StudyGame.result == result)
+    if eco:
+        query = query.filter(StudyGame.eco.startswith(eco))
+    for column in (StudyGame.white_elo, StudyGame.black_elo):
+        if min_rating is not None:
+            query = query.filter(or_(column.is_(None), column >= min_rating))
+        if max_rating is not None:
+            query = query.filter(or_(column.is_(None), column <= max_rating))
+    if date_from:
+        query = query.filter(StudyGame.date >= date_from)
+    if date_to:
+        query = query.filter(StudyGame.date <= date_to)
+    if import_id:
+        query = query.filter(StudyGame.import_id == import_id)
+    rows = (
+        query.order_by(StudyGame.import_id, StudyGame.game_index)
+        .offset(offset)
+        .limit(limit + 1)
+        .all()
+    )
+    next_offset = offset + limit if len(rows) > limit else None
+    return StudyGamesResponse(
+        games=[StudyGameOut.model_validate(row) for row in rows[:limit]],
+        next_offset=next_offset,
+    )
+
+
 def _record_quick_win_study(
     db: Session,
     response: QuickWinsResponse,
@@ -591,74 +974,79 @@ def quick_wins(
     db: Session = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user_optional),
 ):
-    pgn_text = (req.pgn_text or "").strip()
-    if not pgn_text:
-        raise HTTPException(status_code=400, detail="PGN text is empty.")
-    if req.min_rating > req.max_rating:
-        raise HTTPException(status_code=400, detail="min_rating cannot exceed max_rating.")
-    if req.depth <= 0:
-        raise HTTPException(status_code=400, detail="depth must be positive.")
-    if req.threshold_cp <= 0:
-        raise HTTPException(status_code=400, detail="threshold_cp must be positive.")
-    if req.max_errors < 0:
-        raise HTTPException(status_code=400, detail="max_errors must be non-negative.")
-    if req.max_results <= 0:
-        raise HTTPException(status_code=400, detail="max_results must be positive.")
-
-    engine_path = req.engine_path or ENGINE_DEFAULT
-    try:
-        engine = chess.engine.SimpleEngine.popen_uci(engine_path)
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=f"Engine not available: {exc}")
-
-    limit = chess.engine.Limit(depth=req.depth)
-    total_games = 0
+    total_games, scan = _start_quick_win_scan(req)
     matches: List[QuickWinMatch] = []
-
-    try:
-        for game in _iterate_pgn_games(pgn_text):
-            total_games += 1
-            match = _evaluate_for_quick_win(game, engine, limit, req)
-            if match:
-                matches.append(match)
-                if len(matches) >= req.max_results:
-                    break
-    finally:
-        engine.quit()
-
-    if total_games == 0:
-        raise HTTPException(status_code=400, detail="No valid PGN games were parsed.")
+    for index, match in scan:
+        matches.append(match)
+        if len(matches) >= req.max_results:
+            # Games after the last match were never looked at.
+            total_games = index
 
     payload = QuickWinsResponse(
         total_games_scanned=total_games,
         qualifying_games=matches,
-        engine_info=f"{engine_path} depth={req.depth}",
+        engine_info=f"{req.engine_path or ENGINE_DEFAULT} depth={req.depth}",
     )
     _record_quick_win_study(db, payload, req, current_user)
     return payload
 
 
-# ----------------------------
-# Endpoint: engine top moves (local engine)
-# ----------------------------
+@router.post("/quick_wins/stream")
+def quick_wins_stream(
+    req: QuickWinRequest,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+):
+    """
+    Same scan as /quick_wins, streamed as NDJSON: one {"type": "match"} line
+    per qualifying game as soon as it is found, then a {"type": "done"}
+    summary (or {"type": "error"} if the engine fails mid-scan).
+    """
+    total_games, scan = _start_quick_win_scan(req)
+    engine_info = f"{req.engine_path or ENGINE_DEFAULT} depth={req.depth}"
 
-@router.post("/engine_top", response_model=EngineTopResponse)
-def engine_top(req: EngineTopRequest):
-    engine_path = req.engine_path or ENGINE_DEFAULT
-    board = chess.Board(req.fen)
+    def line(event: dict) -> str:
+        return json.dumps(jsonable_encoder(event), ensure_ascii=False) + "\n"
 
-    try:
-        engine = chess.engine.SimpleEngine.popen_uci(engine_path)
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=f"Engine not available: {exc}")
+    def events() -> Iterator[str]:
+        scanned = total_games
+        matches: List[QuickWinMatch] = []
+        try:
+            for index, match in scan:
+                matches.append(match)
+                if len(matches) >= req.max_results:
+                    scanned = index
+                yield line({"type": "match", "games_scanned": index, "match": match})
+        except HTTPException as exc:
+            yield line({"type": "error", "detail": exc.detail})
+            return
+        payload = QuickWinsResponse(
+            total_games_scanned=scanned,
+            qualifying_games=matches,
+            engine_info=engine_info,
+        )
+        # The request's DB session is closed once the response starts streaming.
+        db = SessionLocal()
+        try:
+            _record_quick_win_study(db, payload, req, current_user)
+        finally:
+            db.close()
+        yield line(
+            {
+                "type": "done",
+                "total_games_scanned": scanned,
+                "match_count": len(matches),
+                "engine_info": engine_info,
+            }
+        )
 
-    try:
-        limit = chess.engine.Limit(depth=req.depth)
-        infos = engine.analyse(board, limit, multipv=req.multipv)
-    except Exception as exc:
-        engine.quit()
-        raise HTTPException(status_code=500, detail=f"Engine error: {exc}")
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+# ----------------------------
+# Endpoint: engine top moves (local engine)
+# ----------------------------
 
+def _engine_top_moves(board: chess.Board, infos: List[chess.engine.InfoDict]) -> List[EngineTopMove]:
     moves: List[EngineTopMove] = []
     for entry in infos:
         pv = entry.get("pv")
@@ -699,11 +1087,25 @@ def engine_top(req: EngineTopRequest):
                 pv_san=pv_san,
             )
         )
+    return moves
+
 
-    engine.quit()
+@router.post("/engine_top", response_model=EngineTopResponse)
+def engine_top(req: EngineTopRequest):
+    engine_path = req.engine_path or ENGINE_DEFAULT
+    board = chess.Board(req.fen)
+
+    # Warm pooled engine; concurrent identical requests share one search and
+    # repeats come from the result cache (see engine_top_service.py).
+    try:
+        moves = get_engine_top_service().top_moves(engine_path, board, req.depth, req.multipv, _engine_top_moves)
+    except EngineUnavailable as exc:
+        raise HTTPException(status_code=500, detail=f"Engine not available: {exc}")
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Engine error: {exc}")
 
     return EngineTopResponse(
-        moves=moves,
+        moves=list(moves),
         info=f"engine={engine_path} depth={req.depth} multipv={req.multipv}",
     )
 
@@ -712,12 +1114,14 @@ def engine_top(req: EngineTopRequest):
 # Endpoint: predictor analyze (engine + tagger + GM prob)
 # ----------------------------
 
-@router.post("/analyze", response_model=AnalyzeResponse)
-def analyze(
-    req: AnalyzeRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
+def _analysis_json(payload: AnalyzeResponse) -> dict:
+    result_data = payload.model_dump()
+    result_data.pop("study_id", None)
+    return jsonable_encoder(result_data)
+
+
+def _analysis_result_json(req: AnalyzeRequest) -> dict:
+    """Run the predictor (engine-only fallback), log the call, return the Study payload."""
     engine_bin = req.engine_path or ENGINE_DEFAULT
     predictor_error = None
     try:
@@ -729,23 +1133,100 @@ def analyze(
         predictor_error = str(exc)
         payload = _engine_only_prediction(req.fen, engine_bin, predictor_error)
     _log_predictor_call(req.fen, payload, engine_bin)
+    return _analysis_json(payload)
 
-    result_data = payload.model_dump()
-    result_data.pop("study_id", None)
-    result_json = jsonable_encoder(result_data)
 
+def _save_analysis_study(db: Session, req: AnalyzeRequest, result_json: dict, owner_id: str) -> str:
     study = Study(
         title=getattr(req, "title", None),
         data=result_json,
         is_public=True,
-        owner_id=current_user.id,
+        owner_id=owner_id,
     )
     db.add(study)
     db.commit()
     db.refresh(study)
+    return study.id
+
+
+# Patches the engine-only Study once background tagging finishes; one thread
+# keeps those small writes off the predictor and request threads.
+_STUDY_PATCH_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="study-patch")
+
+
+def _patch_analysis_study(study_id: str, fen: str, engine_bin: str, tagging: "Future[AnalyzeResponse]") -> None:
+    error = tagging.exception()
+    db = SessionLocal()
+    try:
+        study = db.get(Study, study_id)
+        if study is None:
+            return
+        if error is None:
+            payload = tagging.result()
+            _log_predictor_call(fen, payload, engine_bin)
+            study.data = _analysis_json(payload)
+        else:
+            data = dict(study.data or {})
+            data["metadata"] = dict(data.get("metadata") or {}, pending=False, tagging_error=str(error))
+            study.data = data
+        db.commit()
+    except Exception:
+        db.rollback()
+    finally:
+        db.close()
+
+
+def _schedule_study_patch(study_id: str, fen: str, engine_bin: str, tagging: "Future[AnalyzeResponse]") -> None:
+    try:
+        _STUDY_PATCH_EXECUTOR.submit(_patch_analysis_study, study_id, fen, engine_bin, tagging)
+    except RuntimeError:
+        pass  # interpreter shutting down
+
+
+@router.post("/analyze", response_model=AnalyzeResponse)
+async def analyze(
+    req: AnalyzeRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Engine search and tagging run on the predictor service's threads. If
+    tagging misses PREDICTOR_TAG_TIMEOUT_S the engine-only result is saved
+    and returned with metadata.pending = true, and the Study is patched
+    with the tagged result when it is ready. A busy service or a search past
+    PREDICTOR_SEARCH_TIMEOUT_S answers 503: an engine-only fallback would
+    start a second search while the late one is still running.
+    """
+    engine_bin = req.engine_path or ENGINE_DEFAULT
+    service = get_predictor_service()
+    tagging = None
+    try:
+        prediction = await service.predict(
+            lambda: _predictor_candidates(req.fen, engine_bin),
+            lambda candidates: _tagged_prediction(req.fen, engine_bin, candidates),
+        )
+    except PredictorBusy as exc:
+        raise HTTPException(status_code=503, detail=f"Predictor busy: {exc}")
+    except PredictorTimeout as exc:
+        raise HTTPException(status_code=503, detail=f"Predictor timed out: {exc}")
+    except Exception as exc:
+        predictor_error = getattr(exc, "detail", None) or str(exc)
+        payload = await run_in_threadpool(_engine_only_prediction, req.fen, engine_bin, predictor_error)
+    else:
+        if prediction.pending is None:
+            payload = prediction.result
+        else:
+            tagging = prediction.pending
+            payload = _candidates_prediction(prediction.search, engine_bin, "tagging in progress")
+
+    result_json = _analysis_json(payload)
+    _log_predictor_call(req.fen, payload, engine_bin)
+    study_id = await run_in_threadpool(_save_analysis_study, db, req, result_json, current_user.id)
+    if tagging is not None:
+        tagging.add_done_callback(lambda done: _schedule_study_patch(study_id, req.fen, engine_bin, done))
 
     return AnalyzeResponse(
-        study_id=study.id,
+        study_id=study_id,
         **result_json,
     )
 
@@ -1,15 +1,19 @@
+import base64
+import hashlib
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Iterator, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from pydantic import BaseModel
+from sqlalchemy import DateTime, and_, delete, func, literal, or_, select
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import Session
 from uuid import uuid4
 
 from .auth_api import get_current_user
 from .auth_models import User
 from .db import get_db
-from .models import Folder, Study
+from .models import Folder, Study, StudyGame
 
 router = APIRouter(prefix="/api/workspace", tags=["workspace"])
 
@@ -48,8 +52,8 @@ class StudySummary(BaseModel):
     id: str
     name: Optional[str] = None
     folder_id: Optional[str] = None
-    created_at: datetime
-    updated_at: datetime
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -58,16 +62,134 @@ class StudySummary(BaseModel):
 class WorkspaceSnapshot(BaseModel):
     folders: List[FolderOut]
     studies: List[StudySummary]
+    # Set when `limit` cut the study list short; pass it back as `cursor`.
+    next_cursor: Optional[str] = None
+    # Totals for the whole workspace, so an incremental client can tell
+    # that something was deleted (updated_since only reports live rows).
+    folder_count: int = 0
+    study_count: int = 0
+
+
+# Summary columns only: the snapshot never touches Study.data/report_html.
+_FOLDER_COLUMNS = (
+    Folder.id,
+    Folder.name,
+    Folder.parent_id,
+    Folder.color,
+    Folder.image_key,
+    Folder.created_at,
+    Folder.updated_at,
+)
+# Legacy rows can have a NULL updated_at (or created_at); studies are paged
+# by this non-NULL stand-in so the keyset comparison and the cursor hold.
+_EPOCH = datetime(1970, 1, 1)
+_STUDY_SORT_AT = func.coalesce(Study.updated_at, Study.created_at, literal(_EPOCH, DateTime)).label("sort_at")
+_STUDY_COLUMNS = (Study.id, Study.name, Study.folder_id, Study.created_at, Study.updated_at, _STUDY_SORT_AT)
+
+SNAPSHOT_MAX_LIMIT = 1000
+
+
+def _encode_cursor(updated_at: datetime, study_id: str) -> str:
+    raw = f"{updated_at.isoformat()}|{study_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        stamp, study_id = raw.split("|", 1)
+        return datetime.fromisoformat(stamp), study_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _workspace_etag(db: Session, owner_id: Optional[str], *params: Any) -> Tuple[str, int, int]:
+    """
+    (etag, folder_count, study_count) for the owner's workspace. The tag
+    hashes the row counts and newest updated_at of folders and studies
+    (every create/rename/move bumps one, every delete changes a count)
+    together with the query params.
+    """
+    folder_count, folder_latest = (
+        db.query(func.count(Folder.id), func.max(Folder.updated_at)).filter(Folder.owner_id == owner_id).one()
+    )
+    study_count, study_latest = (
+        db.query(func.count(Study.id), func.max(Study.updated_at)).filter(Study.owner_id == owner_id).one()
+    )
+    version = "|".join(
+        str(part) for part in (owner_id, folder_count, folder_latest, study_count, study_latest, *params)
+    )
+    digest = hashlib.sha1(version.encode("utf-8")).hexdigest()
+    return f'W/"{digest}"', folder_count, study_count
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    tags = {tag.strip() for tag in header.split(",")}
+    return "*" in tags or etag in tags or etag[2:] in tags
 
 
 @router.get("/snapshot", response_model=WorkspaceSnapshot)
 def get_workspace_snapshot(
-    db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=SNAPSHOT_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    updated_since: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
 ):
+    """
+    Folders and study summaries of the current user.
+
+    - `limit`/`cursor` page through studies ordered by (updated_at, id),
+      a NULL updated_at counting as created_at (or the epoch); folders
+      come with the first page only.
+    - `updated_since` returns only rows changed after that instant.
+    - The response carries an ETag; `If-None-Match` with the same tag
+      answers 304 without building the snapshot.
+    """
     owner_id = (current_user.id if current_user and current_user.id else None)
-    folders = db.query(Folder).filter(Folder.owner_id == owner_id).all()
-    studies = db.query(Study).filter(Study.owner_id == owner_id).all()
-    return WorkspaceSnapshot(folders=folders, studies=studies)
+    etag, folder_count, study_count = _workspace_etag(db, owner_id, limit, cursor, updated_since)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+
+    folders = []
+    if cursor is None:
+        folder_query = db.query(*_FOLDER_COLUMNS).filter(Folder.owner_id == owner_id)
+        if updated_since is not None:
+            folder_query = folder_query.filter(Folder.updated_at > updated_since)
+        folders = folder_query.order_by(Folder.created_at, Folder.id).all()
+
+    study_query = db.query(*_STUDY_COLUMNS).filter(Study.owner_id == owner_id)
+    if updated_since is not None:
+        study_query = study_query.filter(_STUDY_SORT_AT > updated_since)
+    if cursor is not None:
+        after_ts, after_id = _decode_cursor(cursor)
+        study_query = study_query.filter(
+            or_(_STUDY_SORT_AT > after_ts, and_(_STUDY_SORT_AT == after_ts, Study.id > after_id))
+        )
+    study_query = study_query.order_by(_STUDY_SORT_AT, Study.id)
+
+    next_cursor = None
+    if limit is None:
+        studies = study_query.all()
+    else:
+        studies = study_query.limit(limit + 1).all()
+        if len(studies) > limit:
+            studies = studies[:limit]
+            next_cursor = _encode_cursor(studies[-1].sort_at, studies[-1].id)
+
+    return WorkspaceSnapshot(
+        folders=[FolderOut.model_validate(row) for row in folders],
+        studies=[StudySummary.model_validate(row) for row in studies],
+        next_cursor=next_cursor,
+        folder_count=folder_count,
+        study_count=study_count,
+    )
 
 
 @router.post("/folders", response_model=FolderOut, status_code=status.HTTP_201_CREATED)
@@ -145,15 +267,87 @@ def update_folder(
     return folder
 
 
+# Keeps IN (...) lists under SQLite's default bound-parameter limit.
+_DELETE_CHUNK = 500
+# update_folder does not reject parent cycles; this bounds the CTE if one exists.
+_MAX_FOLDER_DEPTH = 1000
+
+
+def _chunks(ids: List[str], size: int = _DELETE_CHUNK) -> Iterator[List[str]]:
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def _subtree_folder_ids(db: Session, root_id: str, owner_id: Optional[str]) -> List[str]:
+    """
+    Ids of `root_id` and all of its descendants owned by `owner_id`,
+    deepest first, from a single recursive CTE. Databases that reject
+    WITH RECURSIVE (SQLite before 3.8.3) fall back to one IN query per
+    tree level. Must run before the transaction has pending writes.
+    """
+    subtree = (
+        select(Folder.id, literal(0).label("depth"))
+        .where(Folder.id == root_id, Folder.owner_id == owner_id)
+        .cte("subtree", recursive=True)
+    )
+    subtree = subtree.union(
+        select(Folder.id, (subtree.c.depth + 1).label("depth")).where(
+            Folder.parent_id == subtree.c.id,
+            Folder.owner_id == owner_id,
+            subtree.c.depth < _MAX_FOLDER_DEPTH,
+        )
+    )
+    try:
+        rows = db.execute(select(subtree.c.id, subtree.c.depth).order_by(subtree.c.depth.desc())).all()
+    except DBAPIError:
+        db.rollback()
+    else:
+        # A parent cycle can list a folder at several depths; keep its deepest.
+        return list(dict.fromkeys(row.id for row in rows))
+
+    levels = [[root_id]]
+    seen = {root_id}
+    while levels[-1]:
+        children: List[str] = []
+        for chunk in _chunks(levels[-1]):
+            rows = db.execute(
+                select(Folder.id).where(Folder.parent_id.in_(chunk), Folder.owner_id == owner_id)
+            ).scalars()
+            children.extend(child for child in rows if child not in seen)
+        seen.update(children)
+        levels.append(children)
+    return [folder_id for level in reversed(levels) for folder_id in level]
+
+
 def _delete_folder_recursive(db: Session, folder: Folder, owner_id: str):
-    """Delete a folder, its studies, and any child folders recursively."""
-    studies = db.query(Study).filter(Study.folder_id == folder.id, Study.owner_id == owner_id).all()
-    for study in studies:
-        db.delete(study)
-    children = db.query(Folder).filter(Folder.parent_id == folder.id, Folder.owner_id == owner_id).all()
-    for child in children:
-        _delete_folder_recursive(db, child, owner_id)
-    db.delete(folder)
+    """
+    Delete a folder, its studies (with their StudyGame rows) and every
+    descendant folder with set-based statements; no study rows are loaded.
+    The caller commits.
+    """
+    folder_ids = _subtree_folder_ids(db, folder.id, owner_id)
+    for chunk in _chunks(folder_ids):
+        # Explicit: SQLite does not enforce StudyGame's ON DELETE CASCADE.
+        doomed = select(Study.id).where(Study.folder_id.in_(chunk), Study.owner_id == owner_id)
+        db.execute(
+            delete(StudyGame)
+            .where(StudyGame.study_id.in_(doomed))
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            delete(Study)
+            .where(Study.folder_id.in_(chunk), Study.owner_id == owner_id)
+            .execution_options(synchronize_session=False)
+        )
+    # Deepest first, so parent_id never points at an already deleted row
+    # when the subtree spans several chunks.
+    for chunk in _chunks(folder_ids):
+        db.execute(
+            delete(Folder)
+            .where(Folder.id.in_(chunk), Folder.owner_id == owner_id)
+            .execution_options(synchronize_session=False)
+        )
+    db.expunge(folder)
 
 
 @router.delete("/folders/{folder_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -283,6 +477,11 @@ def delete_study(
         raise HTTPException(status_code=404, detail="Study not found")
 
     try:
+        db.execute(
+            delete(StudyGame)
+            .where(StudyGame.study_id == study.id)
+            .execution_options(synchronize_session=False)
+        )
         db.delete(study)
         db.commit()
     except Exception as exc:
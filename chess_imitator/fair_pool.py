@@ -0,0 +1,137 @@
+"""Round-robin worker pool shared by the sessions of the multi-game server.
+
+A plain ThreadPoolExecutor is FIFO: one game submitting ten MultiPV
+candidates makes every other game wait behind all ten.  ``FairPool`` keeps
+one queue per session and its workers take the next job from the sessions
+in turn, so each game with pending work gets an equal share of the workers.
+``FairPool.session(key)`` returns an ``Executor`` view for one session that
+tagger_bridge.tag_candidates_payload accepts as its ``executor``; call
+``FairPool.close_session(key)`` when the session ends.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Deque, Dict, Hashable, Tuple
+
+_Job = Tuple[Future, Callable[..., Any], Tuple[Any, ...], Dict[str, Any]]
+
+
+class FairPool:
+    """Fixed set of worker threads serving per-session job queues round-robin."""
+
+    def __init__(self, workers: int, *, thread_name_prefix: str = "fair"):
+        self.max_workers = max(1, workers)
+        self._queues: "OrderedDict[Hashable, Deque[_Job]]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._shutdown = False
+        # Per-session counts are dropped by close_session; the total is kept.
+        self._completed: Dict[Hashable, int] = {}
+        self._completed_total = 0
+        self._threads = [
+            threading.Thread(target=self._work, name=f"{thread_name_prefix}-{index}", daemon=True)
+            for index in range(self.max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def session(self, key: Hashable) -> "SessionExecutor":
+        return SessionExecutor(self, key)
+
+    def submit(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        future: Future = Future()
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new jobs after shutdown")
+            self._queues.setdefault(key, deque()).append((future, fn, args, kwargs))
+            self._completed.setdefault(key, 0)
+            self._cond.notify()
+        return future
+
+    def _cancel_queued(self, key: Hashable) -> None:
+        """Cancel the jobs of *key* that have not started yet."""
+        with self._cond:
+            jobs = self._queues.pop(key, deque())
+        for future, _, _, _ in jobs:
+            future.cancel()
+
+    def close_session(self, key: Hashable) -> None:
+        """Cancel the queued jobs of *key* and forget its per-session stats."""
+        self._cancel_queued(key)
+        with self._cond:
+            self._completed.pop(key, None)
+
+    def _next_job(self) -> Tuple[Hashable, _Job]:
+        # The session at the front is served and rotated to the back.
+        key, jobs = next(iter(self._queues.items()))
+        job = jobs.popleft()
+        if jobs:
+            self._queues.move_to_end(key)
+        else:
+            del self._queues[key]
+        return key, job
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queues and not self._shutdown:
+                    self._cond.wait()
+                if not self._queues:
+                    return
+                key, (future, fn, args, kwargs) = self._next_job()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as exc:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+            with self._cond:
+                self._completed_total += 1
+                # A job still running when its session closed is not counted per session.
+                if key in self._completed:
+                    self._completed[key] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "workers": self.max_workers,
+                "queued": {str(key): len(jobs) for key, jobs in self._queues.items()},
+                "completed": {str(key): count for key, count in self._completed.items()},
+                "completed_total": self._completed_total,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Finish queued jobs and stop the workers."""
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+
+class SessionExecutor(Executor):
+    """``Executor`` view of a ``FairPool`` that files every job under one session."""
+
+    def __init__(self, pool: FairPool, key: Hashable):
+        self.pool = pool
+        self.key = key
+
+    @property
+    def max_workers(self) -> int:
+        return self.pool.max_workers
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        return self.pool.submit(self.key, fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        """The pool outlives its sessions; only *cancel_futures* has an effect."""
+        if cancel_futures:
+            self.pool._cancel_queued(self.key)
+
+
+__all__ = ["FairPool", "SessionExecutor"]
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Serve many concurrent imitator games from one process.
+
+Every TCP connection is one UCI session: it gets its own ``ImitatorEngine``
+(position, time manager, style) and its own Stockfish for the MultiPV search,
+while everything expensive to warm up is shared by all sessions of the
+process:
+
+- the tagging engines of engine_utils.pool and the tag/analysis caches,
+- the loaded style profiles (``_STYLE_CACHE``),
+- the tagging workers, as a ``FairPool`` that serves the sessions'
+  candidates round-robin so no game waits behind another game's batch.
+  Ponder tagging gets a smaller ``FairPool`` of its own, so a stopped ponder
+  never holds a worker that a real move is waiting for.
+
+A session picks its player with ``setoption name Style value <player>``
+(default: TARGET_PLAYER).  Pondering is off unless ``--ponder`` is given, as
+background work would compete with the other games for the same CPU.
+
+Usage:
+    python3 imitator_server.py --port 9877 --max-sessions 8 --workers 8
+    python3 imitator_server.py --connect 127.0.0.1:9877   # stdio<->TCP bridge for lichess-bot
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+DEFAULT_PORT = int(os.environ.get("CHESS_IMITATOR_SERVER_PORT", "9877"))
+DEFAULT_MAX_SESSIONS = int(os.environ.get("CHESS_IMITATOR_SERVER_SESSIONS", "8"))
+
+logger = logging.getLogger("imitator_server")
+
+
+class ImitatorServer:
+    """Accept UCI sessions over TCP and run them against shared resources."""
+
+    def __init__(self, *, max_sessions: int, workers: int, ponder: bool = False):
+        # Imported lazily: the engine module configures logging and prints its
+        # banner on import, which the --connect bridge must not do.
+        import imitator_uci_engine as engine_module
+        from fair_pool import FairPool
+
+        self._engine_module = engine_module
+        self.max_sessions = max(1, max_sessions)
+        self.ponder = ponder
+        self.pool = FairPool(workers, thread_name_prefix="tagger")
+        self.ponder_pool = FairPool(max(1, workers // 2), thread_name_prefix="ponder") if ponder else None
+        self.sessions = 0
+        self._ids = itertools.count(1)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        engine_module = self._engine_module
+        if self.sessions >= self.max_sessions:
+            writer.write(b"info string imitator server full\n")
+            await writer.drain()
+            writer.close()
+            return
+        session_id = next(self._ids)
+        self.sessions += 1
+        logger.info("Session %d opened (%d active).", session_id, self.sessions)
+        tag_executor = self.pool.session(session_id)
+        ponder_executor = self.ponder_pool.session(session_id) if self.ponder_pool is not None else None
+        stockfish = engine_module.StockfishProcess(engine_module.STOCKFISH_PATH)
+        engine: Optional[engine_module.ImitatorEngine] = None
+        try:
+            await stockfish.initialize()
+            engine = engine_module.ImitatorEngine(
+                stockfish,
+                ponder=self.ponder,
+                output=lambda line: writer.write(f"{line}\n".encode()),
+                tag_executor=tag_executor,
+                ponder_executor=ponder_executor,
+            )
+            while engine.running:
+                line = await reader.readline()
+                if not line:
+                    break
+                await engine.handle(line.decode(errors="replace").strip())
+                await writer.drain()
+        except (ConnectionError, OSError) as exc:
+            logger.warning("Session %d failed: %s", session_id, exc)
+        finally:
+            if engine is not None:
+                await engine.shutdown()
+            self.pool.close_session(session_id)
+            if self.ponder_pool is not None:
+                self.ponder_pool.close_session(session_id)
+            await stockfish.quit()
+            self.sessions -= 1
+            writer.close()
+            logger.info("Session %d closed (%d active).", session_id, self.sessions)
+
+    async def serve(self, host: str, port: int) -> None:
+        loop = asyncio.get_running_loop()
+        # Every session awaits its tagging through the default executor.
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=self.max_sessions * 2 + 4))
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"[IMITATOR_SERVER] listening on {addresses}", file=sys.stderr, flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.pool.shutdown(wait=False)
+            if self.ponder_pool is not None:
+                self.ponder_pool.shutdown(wait=False)
+
+
+async def bridge(host: str, port: int) -> None:
+    """Relay stdin/stdout to a server session so the server looks like a UCI executable."""
+    reader, writer = await asyncio.open_connection(host, port)
+    loop = asyncio.get_running_loop()
+    stdin = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(stdin), sys.stdin)
+
+    async def upstream() -> None:
+        while True:
+            line = await stdin.readline()
+            if not line:
+                break
+            writer.write(line)
+            await writer.drain()
+        writer.write_eof()
+
+    async def downstream() -> None:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            sys.stdout.write(line.decode(errors="replace"))
+            sys.stdout.flush()
+
+    sender = asyncio.create_task(upstream())
+    await downstream()
+    sender.cancel()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Host many imitator UCI sessions in one process.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on / connect to")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port (default %(default)s)")
+    parser.add_argument("--max-sessions", type=int, default=DEFAULT_MAX_SESSIONS, help="Concurrent games accepted")
+    parser.add_argument("--workers", type=int, default=None, help="Shared tagging workers (default: CHESS_IMITATOR_TAGGER_WORKERS)")
+    parser.add_argument("--ponder", action="store_true", help="Ponder on the opponent's clock in every session")
+    parser.add_argument("--connect", metavar="HOST:PORT", help="Bridge stdin/stdout to a running server instead")
+    args = parser.parse_args()
+
+    if args.connect:
+        host, _, port = args.connect.rpartition(":")
+        asyncio.run(bridge(host or args.host, int(port)))
+        return
+
+    workers = args.workers or int(os.environ.get("CHESS_IMITATOR_TAGGER_WORKERS", "4"))
+    # One warm tagging Stockfish per shared worker.
+    os.environ.setdefault("ENGINE_POOL_SIZE", str(workers))
+    server = ImitatorServer(max_sessions=args.max_sessions, workers=workers, ponder=args.ponder)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
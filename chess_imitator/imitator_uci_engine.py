@@ -1,24 +1,45 @@
 #!/usr/bin/env python3
-"""UCI wrapper that routes Stockfish output through the chess style imitator."""
+"""UCI wrapper that routes Stockfish output through the chess style imitator.
+
+The engine core runs on one asyncio event loop: UCI commands are read from
+stdin asynchronously, Stockfish is an asyncio subprocess and every ``go``
+becomes a search task.  ``bestmove`` is written the moment that task
+finishes, and ``stop`` reaches the tagging stage mid-flight through the
+task's stop event.  Tagging itself still runs on tagger_bridge's worker pool
+and is awaited through the loop's default executor.  Between moves a ponder
+task prepares the likely next positions on the opponent's clock (see
+ponder.py).
+"""
 
 from __future__ import annotations
 
 print("USING ENGINE FILE:", __file__, flush=True)
 
+import asyncio
+import functools
 import logging
 import os
-import queue
 import shutil
-import subprocess
 import sys
 import threading
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import chess
 
 from style_scorer import load_style_profile, pick_best_move
 from tagger_bridge import tag_candidates_payload
+from ponder import (
+    MIN_PONDER_SEARCH_MS,
+    PONDER_ENABLED,
+    PONDER_PREDICT_MS,
+    PONDER_REPLIES,
+    PonderBook,
+    PonderEntry,
+    predicted_replies,
+)
+from time_manager import GoParams, TimeManager
 
 print("[IMITATOR] VERSION OPENING_D6_TEST", file=sys.stderr, flush=True)
 
@@ -29,6 +50,9 @@ logger = logging.getLogger("imitator_uci_engine")
 MAX_THINK_TIME_S = 25.0     # total budget per move (Stockfish thinking budget target 20-30s)
 # Carve out a smaller Stockfish slice so the remaining time (used by tagging/scoring) doubles.
 STOCKFISH_FRACTION = 0.2    # portion reserved for Stockfish search
+# Tagging stops this long before the move budget ends so scoring and the
+# bestmove reply still fit; unfinished candidates are scored untagged.
+SCORING_RESERVE_S = float(os.environ.get("CHESS_IMITATOR_SCORING_RESERVE_S", "0.1"))
 # =======================================
 
 
@@ -48,9 +72,10 @@ def maybe_opening_move(board: chess.Board, initial_fen: str | None = None) -> st
         return "d7d6"
     return None
 
-# The wrapper always enforces MAX_THINK_TIME_S as the upper bound; Stockfish
-# only sees STOCKFISH_FRACTION of that time and ignores lichess-provided
-# wtime/btime/movetime. The remaining time is reserved for tagging/scoring.
+# The wrapper always enforces MAX_THINK_TIME_S as the upper bound. Within it,
+# time_manager.TimeManager derives the move budget from the go command's
+# wtime/btime/winc/binc/movestogo (or movetime), gives Stockfish
+# STOCKFISH_FRACTION of it and sizes MultiPV to what tagging can finish.
 
 _DEFAULT_TARGET_PLAYER = "Kasparov"
 TARGET_PLAYER = os.environ.get("TARGET_PLAYER", _DEFAULT_TARGET_PLAYER)
@@ -58,6 +83,9 @@ _DEFAULT_STOCKFISH = "/usr/local/bin/stockfish"
 _USER_STOCKFISH = os.environ.get("CHESS_IMITATOR_STOCKFISH_PATH")
 STOCKFISH_PATH = _USER_STOCKFISH or shutil.which("stockfish") or _DEFAULT_STOCKFISH
 MULTIPV = int(os.environ.get("CHESS_IMITATOR_MULTIPV", "10"))
+TAGGER_WORKERS = int(os.environ.get("CHESS_IMITATOR_TAGGER_WORKERS", "4"))
+# Give every tagging worker its own warm Stockfish from engine_utils.pool.
+os.environ.setdefault("ENGINE_POOL_SIZE", str(TAGGER_WORKERS))
 
 
 _STYLE_CACHE: Dict[str, Dict[str, Any]] = {}
@@ -72,6 +100,22 @@ def _get_style_profile(name: str) -> Dict[str, Any]:
     return profile
 
 
+def _write_stdout(line: str) -> None:
+    print(line, flush=True)
+
+
+def _parse_setoption(command: str) -> Tuple[str, str]:
+    """Split ``setoption name <name> [value <value>]`` into (name, value)."""
+    tokens = command.split()
+    if "name" not in tokens:
+        return "", ""
+    start = tokens.index("name") + 1
+    if "value" in tokens[start:]:
+        split = tokens.index("value", start)
+        return " ".join(tokens[start:split]), " ".join(tokens[split + 1 :])
+    return " ".join(tokens[start:]), ""
+
+
 def _parse_position(command: str, board: chess.Board) -> Tuple[chess.Board, Optional[str]]:
     tokens = command.split()
     if len(tokens) < 2:
@@ -97,127 +141,452 @@ def _parse_position(command: str, board: chess.Board) -> Tuple[chess.Board, Opti
 
 
 class StockfishProcess:
-    """Manage a long-lived Stockfish instance."""
+    """Manage a long-lived Stockfish instance as an asyncio subprocess."""
 
     def __init__(self, path: str):
         self.path = path
-        self.process = subprocess.Popen(
-            [self.path],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
+        self.process: Optional[asyncio.subprocess.Process] = None
+
+    async def start(self) -> None:
+        self.process = await asyncio.create_subprocess_exec(
+            self.path,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
         )
-        self._stdin_lock = threading.Lock()
 
     def send(self, command: str) -> None:
-        if self.process.stdin is None:
+        if self.process is None or self.process.stdin is None:
             raise RuntimeError("Stockfish stdin closed.")
-        with self._stdin_lock:
-            self.process.stdin.write(f"{command}\n")
-            self.process.stdin.flush()
+        self.process.stdin.write(f"{command}\n".encode())
 
-    def readline(self) -> Optional[str]:
-        if self.process.stdout is None:
+    async def readline(self) -> Optional[str]:
+        if self.process is None or self.process.stdout is None:
+            return None
+        line = await self.process.stdout.readline()
+        if not line:
             return None
-        return self.process.stdout.readline()
+        return line.decode(errors="replace")
 
-    def drain(self, sentinel: str) -> None:
+    async def drain(self, sentinel: str) -> None:
         while True:
-            line = self.readline()
+            line = await self.readline()
             if line is None:
                 break
             if line.strip() == sentinel:
                 break
 
-    def initialize(self) -> None:
+    async def initialize(self) -> None:
+        await self.start()
         self.send("uci")
-        self.drain("uciok")
+        await self.drain("uciok")
         self.send("isready")
-        self.drain("readyok")
+        await self.drain("readyok")
 
     def stop(self) -> None:
         self.send("stop")
 
-    def quit(self) -> None:
-        self.send("quit")
-        self.process.wait()
-
-
-class CommandReader(threading.Thread):
-    """Read UCI lines from stdin without blocking the main loop."""
-
-    def __init__(self, command_queue: queue.Queue[Optional[str]]):
-        super().__init__(daemon=True)
-        self._queue = command_queue
-
-    def run(self) -> None:
-        while True:
-            line = sys.stdin.readline()
-            if not line:
-                self._queue.put(None)
-                break
-            self._queue.put(line.strip())
+    async def quit(self) -> None:
+        if self.process is None:
+            return
+        if self.process.returncode is None:
+            try:
+                self.send("quit")
+            except (RuntimeError, ConnectionError):
+                pass
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout=5.0)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+
+
+async def read_commands(commands: "asyncio.Queue[Optional[str]]") -> None:
+    """Feed stripped UCI lines from stdin into *commands*; None marks EOF."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    try:
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    except (ValueError, OSError):
+        # stdin is a regular file (or otherwise not pollable): hand lines over
+        # from a daemon thread instead.
+        def pump() -> None:
+            for line in sys.stdin:
+                loop.call_soon_threadsafe(commands.put_nowait, line.strip())
+            loop.call_soon_threadsafe(commands.put_nowait, None)
+
+        threading.Thread(target=pump, name="uci-stdin", daemon=True).start()
+        return
+    while True:
+        line = await reader.readline()
+        if not line:
+            await commands.put(None)
+            return
+        await commands.put(line.decode(errors="replace").strip())
+
+
+def _score_to_cp(score_cp: Optional[int], mate: Optional[int]) -> float:
+    if score_cp is not None:
+        return float(score_cp)
+    if mate is not None:
+        return 100000.0 if mate > 0 else -100000.0
+    return 0.0
+
+
+def _parse_info(line: str) -> Dict[str, Any]:
+    fields: Dict[str, Any] = {}
+    tokens = line.split()
+    i = 1
+    while i < len(tokens):
+        token = tokens[i]
+        if token == "multipv" and i + 1 < len(tokens):
+            fields["multipv"] = int(tokens[i + 1])
+            i += 2
+        elif token == "score" and i + 2 < len(tokens):
+            if tokens[i + 1] == "cp":
+                fields["score_cp"] = int(tokens[i + 2])
+                i += 3
+            elif tokens[i + 1] == "mate":
+                fields["mate"] = int(tokens[i + 2])
+                i += 3
+            else:
+                i += 1
+        elif token == "pv":
+            fields["pv"] = tokens[i + 1 :]
+            break
+        else:
+            i += 1
+    fields.setdefault("multipv", 1)
+    return fields
 
 
-class SearchWorker(threading.Thread):
-    """Run a Stockfish search and surface style-aware output."""
+class ImitatorEngine:
+    """UCI front end: owns the Stockfish process, the current position and the search/ponder tasks."""
 
     def __init__(
         self,
         stockfish: StockfishProcess,
-        go_command: str,
-        position_fen: str,
-        style_player: str,
-        result_queue: queue.Queue[Dict[str, Any]],
-        stop_event: threading.Event,
-        multipv: int,
-        initial_fen: Optional[str],
+        *,
+        style_player: str = TARGET_PLAYER,
+        multipv: int = MULTIPV,
+        time_manager: Optional[TimeManager] = None,
+        ponder: bool = PONDER_ENABLED,
+        output: Callable[[str], None] = _write_stdout,
+        tag_executor: Optional[Executor] = None,
+        ponder_executor: Optional[Executor] = None,
     ):
-        super().__init__(daemon=True)
         self.stockfish = stockfish
-        self.go_command = go_command
-        self.position_fen = position_fen
+        self.output = output
+        # Runs the tagging of this engine's candidates (tagger_bridge's own pool when None).
+        self.tag_executor = tag_executor
+        # Runs the tagging of pondered positions. It never shares workers with
+        # tag_executor, so a ponder stopped by a miss cannot hold up the real
+        # move (tagger_bridge's per-call workers when None).
+        self.ponder_executor = ponder_executor
         self.style_player = style_player
-        self.result_queue = result_queue
-        self.stop_event = stop_event
         self.multipv = multipv
-        self.initial_fen = initial_fen
+        self.time_manager = time_manager or TimeManager(MAX_THINK_TIME_S, STOCKFISH_FRACTION, multipv)
+        self.board = chess.Board()
+        self.initial_fen: Optional[str] = "startpos"
+        self.position_command = "position startpos"
+        self.search_task: Optional[asyncio.Task] = None
+        self.stop_event = threading.Event()
+        self.ponder = ponder
+        self.ponder_book = PonderBook()
+        self.ponder_task: Optional[asyncio.Task] = None
+        self.ponder_stop = threading.Event()
+        self._ponder_searching = False
+        self.running = True
+
+    @property
+    def searching(self) -> bool:
+        return self.search_task is not None and not self.search_task.done()
+
+    @property
+    def pondering(self) -> bool:
+        return self.ponder_task is not None and not self.ponder_task.done()
+
+    async def handle(self, command: str) -> None:
+        """Apply one UCI command."""
+        if command == "uci":
+            self.output("id name chess_imitator")
+            self.output("id author codex")
+            self.output(f"option name Style type string default {self.style_player}")
+            self.output("uciok")
+            return
+        if command == "isready":
+            if self.searching or self.pondering:
+                # Stockfish's output belongs to the running search; answer directly.
+                self.output("readyok")
+                return
+            self.stockfish.send("isready")
+            await self.stockfish.drain("readyok")
+            self.output("readyok")
+            return
+        if command == "ucinewgame":
+            await self._stop_pondering()
+            self._report_ponder_game()
+            self.stockfish.send("ucinewgame")
+            return
+        if command.startswith("setoption"):
+            name, value = _parse_setoption(command)
+            if name.lower() == "style":
+                self._set_style(value)
+                return
+            await self._stop_pondering()
+            self.stockfish.send(command)
+            return
+        if command.startswith("position"):
+            # Forwarded right before the search so pondering can use Stockfish meanwhile.
+            self.position_command = command
+            parsed_board, parsed_initial = _parse_position(command, self.board)
+            self.board = parsed_board
+            if parsed_initial is not None:
+                self.initial_fen = parsed_initial
+            return
+        if command.startswith("go"):
+            if self.searching:
+                logger.warning("Ignoring new go while previous search still running.")
+                return
+            self.stop_event = threading.Event()
+            self.search_task = asyncio.create_task(
+                self._go(command, self.board.copy(), self.position_command, self.initial_fen, self.stop_event)
+            )
+            return
+        if command == "stop":
+            if self.searching:
+                self.stop_event.set()
+                self.stockfish.stop()
+            return
+        if command == "quit":
+            self.running = False
+            return
+        await self._stop_pondering()
+        self.stockfish.send(command)
+
+    async def shutdown(self) -> None:
+        """Stop a running search (still answering its bestmove) and any pondering."""
+        if self.searching:
+            self.stop_event.set()
+            self.stockfish.stop()
+            await self.search_task
+        await self._stop_pondering()
+        self._report_ponder_game()
+
+    async def _go(
+        self,
+        go_command: str,
+        board: chess.Board,
+        position_command: str,
+        initial_fen: Optional[str],
+        stop_event: threading.Event,
+    ) -> None:
+        await self._stop_pondering()
+        predicted = bool(self.ponder_book.prepared)
+        pondered = self.ponder_book.take(board.fen())
+        try:
+            result = await self.search(go_command, board.fen(), initial_fen, stop_event, position_command, pondered)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Search failed; no bestmove produced.")
+            return
+        self._emit(result)
+        if predicted:
+            self.ponder_book.record_saved(result["ponder_saved_s"])
+            print(
+                f"[IMITATOR] ponder {'hit' if pondered is not None else 'miss'}: "
+                f"saved={result['ponder_saved_s']:.3f}s, game {self.ponder_book.stats.summary()}",
+                file=sys.stderr,
+                flush=True,
+            )
+        if self.ponder and result["final_move"] and not stop_event.is_set():
+            self._start_pondering(board, result["final_move"], result.get("ponder_reply"), result["search_ms"])
+
+    def _set_style(self, player: str) -> None:
+        player = player.strip() or TARGET_PLAYER
+        try:
+            _get_style_profile(player)
+        except OSError as exc:
+            logger.warning("Unknown style %r (%s); keeping %s.", player, exc, self.style_player)
+            return
+        self.style_player = player
+
+    def _emit(self, result: Dict[str, Any]) -> None:
+        logger.info(
+            "Selected %s score=%s tags=%s (engine best=%s)",
+            result["final_move"],
+            result["style_score"],
+            result["tags"],
+            result["engine_bestmove"],
+        )
+        move = result["final_move"] or result["fallback"]
+        if move:
+            self.output(f"bestmove {move}")
+
+    # ------------------------------------------------------------ pondering
+    def _start_pondering(self, board: chess.Board, move: str, pv_reply: Optional[str], search_ms: int) -> None:
+        after = board.copy()
+        try:
+            after.push_uci(move)
+        except ValueError:
+            return
+        if after.is_game_over():
+            return
+        self.ponder_stop = threading.Event()
+        self.ponder_task = asyncio.create_task(
+            self._ponder(after, pv_reply, max(search_ms, MIN_PONDER_SEARCH_MS), self.ponder_stop)
+        )
+
+    async def _stop_pondering(self) -> None:
+        if not self.pondering:
+            return
+        self.ponder_stop.set()
+        if self._ponder_searching:
+            self.stockfish.stop()
+        await self.ponder_task
+
+    async def _ponder(
+        self,
+        board: chess.Board,
+        pv_reply: Optional[str],
+        search_ms: int,
+        stop: threading.Event,
+    ) -> None:
+        """Search and tag the positions after the opponent's most likely replies."""
+        start = time.time()
+        try:
+            ranked: List[str] = []
+            if PONDER_REPLIES > (1 if pv_reply else 0):
+                searched = await self._ponder_search(board, PONDER_PREDICT_MS, PONDER_REPLIES, stop)
+                if searched is None:
+                    return
+                ranked = [candidate["uci"] for candidate in searched[1]]
+            targets = []
+            for reply in predicted_replies(board, pv_reply, ranked):
+                target = board.copy()
+                target.push(reply)
+                if not target.is_game_over():
+                    targets.append(target)
+            self.ponder_book.prepare(target.fen() for target in targets)
+            for target in targets:
+                search_start = time.time()
+                searched = await self._ponder_search(target, search_ms, self.multipv, stop)
+                if searched is None:
+                    return
+                best_move, candidates = searched
+                entry = PonderEntry(
+                    fen=target.fen(),
+                    candidates=candidates,
+                    best_move=best_move,
+                    search_s=time.time() - search_start,
+                )
+                self.ponder_book.add(entry)
+                if not candidates or stop.is_set():
+                    return
+                tag_start = time.time()
+                entry.tagged_payload = await asyncio.get_running_loop().run_in_executor(
+                    None,
+                    functools.partial(
+                        tag_candidates_payload,
+                        {"fen": entry.fen, "candidates": candidates},
+                        workers=TAGGER_WORKERS,
+                        executor=self.ponder_executor,
+                        stop_event=stop,
+                    ),
+                )
+                entry.tag_s = time.time() - tag_start
+        except Exception:
+            logger.exception("Pondering failed.")
+        finally:
+            self.ponder_book.record_pondered(time.time() - start)
 
-    def run(self) -> None:
+    async def _ponder_search(
+        self,
+        board: chess.Board,
+        movetime_ms: int,
+        multipv: int,
+        stop: threading.Event,
+    ) -> Optional[Tuple[Optional[str], List[Dict[str, Any]]]]:
+        """Run one background search; None if pondering was stopped before it completed."""
+        if stop.is_set():
+            return None
+        root = board.root()
+        moves = " ".join(move.uci() for move in board.move_stack)
+        self.stockfish.send(f"position fen {root.fen()}" + (f" moves {moves}" if moves else ""))
+        self.stockfish.send(f"setoption name MultiPV value {multipv}")
+        self.stockfish.send(f"go movetime {movetime_ms}")
+        self._ponder_searching = True
+        try:
+            searched = await self._collect_candidates(multipv)
+        finally:
+            self._ponder_searching = False
+        return None if stop.is_set() else searched
+
+    def _report_ponder_game(self) -> None:
+        stats = self.ponder_book.reset()
+        if stats.moves or stats.pondered_s:
+            print(f"[IMITATOR] ponder game summary: {stats.summary()}", file=sys.stderr, flush=True)
+
+    # --------------------------------------------------------------- search
+    async def search(
+        self,
+        go_command: str,
+        position_fen: str,
+        initial_fen: Optional[str],
+        stop_event: threading.Event,
+        position_command: Optional[str] = None,
+        pondered: Optional[PonderEntry] = None,
+    ) -> Dict[str, Any]:
+        """Run a Stockfish search, tag and style-score its candidates and return the choice."""
         best_move: Optional[str] = None
         candidates: List[Dict[str, Any]] = []
         selected: Optional[Dict[str, Any]] = None
         tagged_payload: Optional[Dict[str, Any]] = None
-        sf_time = MAX_THINK_TIME_S * STOCKFISH_FRACTION
-        move_time_ms = max(int(sf_time * 1000), 1)
-        forced_go_command = f"go movetime {move_time_ms}"
-        board = chess.Board(self.position_fen)
-        opening_move = maybe_opening_move(board, self.initial_fen)
+        board = chess.Board(position_fen)
+        budget = self.time_manager.allocate(GoParams.parse(go_command), board)
+        sf_time = budget.search_s
+        forced_go_command = f"go movetime {budget.search_ms}"
+        multipv = min(self.multipv, budget.multipv)
+        opening_move = maybe_opening_move(board, initial_fen)
         if opening_move:
             print(
                 f"[IMITATOR] opening move forced: {opening_move}",
                 file=sys.stderr,
                 flush=True,
             )
-            self.result_queue.put(
-                {
-                    "final_move": opening_move,
-                    "style_score": float("-inf"),
-                    "tags": [],
-                    "engine_bestmove": opening_move,
-                    "fallback": opening_move,
-                }
-            )
-            return
+            return {
+                "final_move": opening_move,
+                "style_score": float("-inf"),
+                "tags": [],
+                "engine_bestmove": opening_move,
+                "fallback": opening_move,
+                "ponder_reply": None,
+                "search_ms": budget.search_ms,
+                "ponder_saved_s": 0.0,
+            }
         t0 = time.time()
+        deadline = time.monotonic() + budget.total_s - SCORING_RESERVE_S
         error = False
+        saved = 0.0
         try:
-            self.stockfish.send(f"setoption name MultiPV value {self.multipv}")
-            logger.debug("Forcing search '%s' (ignoring %s).", forced_go_command, self.go_command)
-            self.stockfish.send(forced_go_command)
-            best_move, candidates = self._collect_candidates()
+            if pondered is not None and pondered.candidates:
+                best_move = pondered.best_move
+                candidates = pondered.candidates[:multipv]
+                saved += pondered.search_s
+            else:
+                self.stockfish.send(position_command or f"position fen {position_fen}")
+                self.stockfish.send(f"setoption name MultiPV value {multipv}")
+                logger.debug(
+                    "Budget %.3fs (%s): search '%s' for '%s', multipv=%d.",
+                    budget.total_s,
+                    budget.reason,
+                    forced_go_command,
+                    go_command,
+                    multipv,
+                )
+                self.stockfish.send(forced_go_command)
+                best_move, candidates = await self._collect_candidates(multipv)
             if not candidates:
                 raise RuntimeError("Stockfish emitted no candidates.")
         except Exception:
@@ -225,18 +594,45 @@ class SearchWorker(threading.Thread):
             error = True
         t1 = time.time()
         spent = t1 - t0
-        remain = MAX_THINK_TIME_S - spent
+        remain = budget.total_s - spent
         used_tagger = False
         tagger_spent = 0.0
-        if not error:
+        if not error and budget.tag and not stop_event.is_set():
             tagger_start = time.time()
-            payload = {"fen": self.position_fen, "candidates": candidates}
-            tagged_payload = tag_candidates_payload(payload)
+            reused = pondered.tagged_for(multipv) if pondered is not None else None
+            if reused is not None:
+                tagged_payload = reused
+                saved += pondered.tag_s
+            else:
+                payload = {"fen": position_fen, "candidates": candidates}
+                tagged_payload = await asyncio.get_running_loop().run_in_executor(
+                    None,
+                    functools.partial(
+                        tag_candidates_payload,
+                        payload,
+                        workers=TAGGER_WORKERS,
+                        executor=self.tag_executor,
+                        deadline=deadline,
+                        stop_event=stop_event,
+                    ),
+                )
             tagger_spent = time.time() - tagger_start
-            if tagger_spent > remain:
+            tagging = tagged_payload.get("tagging", {})
+            if pondered is None:
+                # Pondered moves are mostly cache hits and would skew the cost estimates.
+                self.time_manager.observe(tagging)
+            print(
+                f"[IMITATOR] tagged {tagging.get('tagged')}/{len(tagged_payload.get('candidates', []))} candidates "
+                f"mode={tagging.get('mode')} workers={tagging.get('workers')} "
+                f"candidate_ms={tagging.get('candidate_ms')}",
+                file=sys.stderr,
+                flush=True,
+            )
+            if tagging.get("untagged"):
                 print(
-                    f"[IMITATOR] tagging exceeded remaining budget "
-                    f"({tagger_spent:.3f}s > {remain:.3f}s).",
+                    f"[IMITATOR] tagging {'stopped' if stop_event.is_set() else 'deadline hit'} "
+                    f"after {tagger_spent:.3f}s (remain={remain:.3f}s); scoring {tagging.get('tagged')} "
+                    f"tagged candidates, {tagging.get('untagged')} left untagged.",
                     file=sys.stderr,
                     flush=True,
                 )
@@ -244,7 +640,8 @@ class SearchWorker(threading.Thread):
             selected = pick_best_move(tagged_payload, style_profile)
             used_tagger = True
         print(
-            f"[IMITATOR] sf_time={sf_time:.3f}s, spent={spent:.3f}s, remain={remain:.3f}s,"
+            f"[IMITATOR] budget={budget.total_s:.3f}s ({budget.reason}), multipv={multipv},"
+            f" sf_time={sf_time:.3f}s, spent={spent:.3f}s, remain={remain:.3f}s,"
             f" used_tagger={used_tagger}, tagger_spent={tagger_spent:.3f}s",
             file=sys.stderr,
             flush=True,
@@ -256,38 +653,39 @@ class SearchWorker(threading.Thread):
             else:
                 selected = {"uci": best_move, "tags": [], "sf_eval": 0.0}
             selected.setdefault("style_score", float("-inf"))
-        self.result_queue.put(
-            {
-                "final_move": selected.get("uci"),
-                "style_score": selected.get("style_score"),
-                "tags": selected.get("tags", []),
-                "engine_bestmove": best_move,
-                "fallback": best_move,
-            }
-        )
-
-    def _collect_candidates(self) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        pv = (selected.get("sf_pv") or "").split()
+        return {
+            "final_move": selected.get("uci"),
+            "style_score": selected.get("style_score"),
+            "tags": selected.get("tags", []),
+            "engine_bestmove": best_move,
+            "fallback": best_move,
+            "ponder_reply": pv[1] if len(pv) > 1 else None,
+            "search_ms": budget.search_ms,
+            "ponder_saved_s": saved,
+        }
+
+    async def _collect_candidates(self, max_multipv: int) -> Tuple[Optional[str], List[Dict[str, Any]]]:
         seen: Dict[int, Dict[str, Any]] = {}
         best_move: Optional[str] = None
-        stop_sent = False
         while True:
-            line = self.stockfish.readline()
+            line = await self.stockfish.readline()
             if line is None:
                 break
             stripped = line.strip()
             if not stripped:
                 continue
             if stripped.startswith("info"):
-                info = self._parse_info(stripped)
+                info = _parse_info(stripped)
                 if not info:
                     continue
                 multipv = info.get("multipv", 1)
-                if multipv > self.multipv:
+                if multipv > max_multipv:
                     continue
                 pv = info.get("pv", [])
                 if not pv:
                     continue
-                score_cp = self._score_to_cp(info.get("score_cp"), info.get("mate"))
+                score_cp = _score_to_cp(info.get("score_cp"), info.get("mate"))
                 seen[multipv] = {
                     "multipv": multipv,
                     "uci": pv[0],
@@ -300,9 +698,6 @@ class SearchWorker(threading.Thread):
                 if len(tokens) > 1:
                     best_move = tokens[1]
                 break
-            if self.stop_event.is_set() and not stop_sent:
-                self.stockfish.send("stop")
-                stop_sent = True
         sorted_candidates = [seen[idx] for idx in sorted(seen)]
         if not sorted_candidates and best_move:
             sorted_candidates = [
@@ -316,138 +711,25 @@ class SearchWorker(threading.Thread):
             ]
         return best_move, sorted_candidates
 
-    @staticmethod
-    def _score_to_cp(score_cp: Optional[int], mate: Optional[int]) -> float:
-        if score_cp is not None:
-            return float(score_cp)
-        if mate is not None:
-            return 100000.0 if mate > 0 else -100000.0
-        return 0.0
-
-    @staticmethod
-    def _parse_info(line: str) -> Dict[str, Any]:
-        fields: Dict[str, Any] = {}
-        tokens = line.split()
-        i = 1
-        while i < len(tokens):
-            token = tokens[i]
-            if token == "multipv" and i + 1 < len(tokens):
-                fields["multipv"] = int(tokens[i + 1])
-                i += 2
-            elif token == "score" and i + 2 < len(tokens):
-                if tokens[i + 1] == "cp":
-                    fields["score_cp"] = int(tokens[i + 2])
-                    i += 3
-                elif tokens[i + 1] == "mate":
-                    fields["mate"] = int(tokens[i + 2])
-                    i += 3
-                else:
-                    i += 1
-            elif token == "pv":
-                fields["pv"] = tokens[i + 1 :]
-                break
-            else:
-                i += 1
-        fields.setdefault("multipv", 1)
-        return fields
-
 
-def main() -> None:
+async def serve() -> None:
     stockfish = StockfishProcess(STOCKFISH_PATH)
-    stockfish.initialize()
-    current_board = chess.Board()
-    current_fen = current_board.fen()
-    current_initial_fen: Optional[str] = "startpos"
-    command_queue: queue.Queue[Optional[str]] = queue.Queue()
-    result_queue: queue.Queue[Dict[str, Any]] = queue.Queue()
-    reader = CommandReader(command_queue)
-    reader.start()
-    active_search: Optional[SearchWorker] = None
-    stop_event = threading.Event()
-    running = True
-
-    while running:
-        while True:
-            try:
-                result = result_queue.get_nowait()
-            except queue.Empty:
-                break
-            logger.info(
-                "Selected %s score=%s tags=%s (engine best=%s)",
-                result["final_move"],
-                result["style_score"],
-                result["tags"],
-                result["engine_bestmove"],
-            )
-            move = result["final_move"] or result["fallback"]
-            if move:
-                print(f"bestmove {move}", flush=True)
-            active_search = None
-            stop_event.clear()
-
-        try:
-            command = command_queue.get(timeout=0.1)
-        except queue.Empty:
-            continue
+    await stockfish.initialize()
+    engine = ImitatorEngine(stockfish)
+    commands: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+    reader = asyncio.create_task(read_commands(commands))
+    while engine.running:
+        command = await commands.get()
         if command is None:
             break
-        if command == "uci":
-            print("id name chess_imitator", flush=True)
-            print("id author codex", flush=True)
-            print("uciok", flush=True)
-            continue
-        if command == "isready":
-            stockfish.send("isready")
-            stockfish.drain("readyok")
-            print("readyok", flush=True)
-            continue
-        if command == "ucinewgame":
-            stockfish.send("ucinewgame")
-            continue
-        if command.startswith("setoption"):
-            stockfish.send(command)
-            continue
-        if command.startswith("position"):
-            stockfish.send(command)
-            parsed_board, parsed_initial = _parse_position(command, current_board)
-            current_board = parsed_board
-            if parsed_initial is not None:
-                current_initial_fen = parsed_initial
-            current_fen = current_board.fen()
-            continue
-        if command.startswith("go"):
-            if active_search and active_search.is_alive():
-                logger.warning("Ignoring new go while previous search still running.")
-                continue
-            stop_event.clear()
-            stop_event = threading.Event()
-            active_search = SearchWorker(
-                stockfish=stockfish,
-                go_command=command,
-                position_fen=current_fen,
-                style_player=TARGET_PLAYER,
-                result_queue=result_queue,
-                stop_event=stop_event,
-                multipv=MULTIPV,
-                initial_fen=current_initial_fen,
-            )
-            active_search.start()
-            continue
-        if command == "stop":
-            if active_search and active_search.is_alive():
-                stop_event.set()
-                stockfish.send("stop")
-            continue
-        if command == "quit":
-            running = False
-            break
-        stockfish.send(command)
+        await engine.handle(command)
+    await engine.shutdown()
+    reader.cancel()
+    await stockfish.quit()
+
 
-    if active_search and active_search.is_alive():
-        stop_event.set()
-        stockfish.send("stop")
-        active_search.join()
-    stockfish.quit()
+def main() -> None:
+    asyncio.run(serve())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,288 @@
+"""Buffered, rotating JSONL writer for the structured logs.
+
+Callers hand ``JsonlLogWriter.write`` a JSON-ready dict and return at once:
+entries go into a bounded in-memory queue and one background thread
+serialises them and appends them to the current file in batches, keeping
+the file open between batches.  When the queue is full the entry is dropped
+and counted rather than blocking the caller (a game clock or an HTTP request
+matters more than a log line).  Entries must not be mutated after ``write``.
+
+Files are named ``<stem>.jsonl``, ``<stem>_1.jsonl``, ... where the stem is
+``time.strftime(name_pattern)``, so a dated pattern such as ``log_%Y%m%d``
+rotates daily (in UTC when ``utc`` is set).  Within a stem a new index starts once the current file
+reaches ``max_bytes`` (measured as the write position of the open file,
+never by counting lines).
+Rotated files can be gzipped (``<name>.jsonl.gz``).
+
+``JsonlLogConfig.from_env(PREFIX, ...)`` reads the overrides:
+- PREFIX_ENABLED: "0" turns the log off (default "1")
+- PREFIX_DIR: directory of the log files
+- PREFIX_MAX_BYTES: size at which a file is rotated
+- PREFIX_COMPRESS: "1" gzips rotated files
+- PREFIX_QUEUE_SIZE: entries buffered before dropping
+"""
+
+from __future__ import annotations
+
+import atexit
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+_EXT = ".jsonl"
+_STOP = object()
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.lower() not in ("0", "false", "no")
+
+
+@dataclass(frozen=True)
+class JsonlLogConfig:
+    directory: Path
+    name_pattern: str
+    enabled: bool = True
+    max_bytes: int = 5 * 1024 * 1024
+    compress: bool = False
+    utc: bool = False
+    queue_size: int = 10000
+    batch_size: int = 256
+    flush_interval_s: float = 0.5
+
+    @classmethod
+    def from_env(cls, prefix: str, *, directory: Path, name_pattern: str, **defaults: Any) -> "JsonlLogConfig":
+        base = cls(directory=Path(directory), name_pattern=name_pattern, **defaults)
+        return replace(
+            base,
+            enabled=_env_flag(f"{prefix}_ENABLED", base.enabled),
+            directory=Path(os.getenv(f"{prefix}_DIR", str(base.directory))),
+            max_bytes=max(1, int(os.getenv(f"{prefix}_MAX_BYTES", str(base.max_bytes)))),
+            compress=_env_flag(f"{prefix}_COMPRESS", base.compress),
+            queue_size=max(1, int(os.getenv(f"{prefix}_QUEUE_SIZE", str(base.queue_size)))),
+        )
+
+
+def _file_name(stem: str, index: int) -> str:
+    return f"{stem}{_EXT}" if index <= 0 else f"{stem}_{index}{_EXT}"
+
+
+def _file_index(name: str, stem: str) -> int:
+    """Rotation index of *name* within *stem* (plain or gzipped), -1 if unrelated."""
+    if name.endswith(".gz"):
+        name = name[:-3]
+    if not name.endswith(_EXT):
+        return -1
+    base = name[: -len(_EXT)]
+    if base == stem:
+        return 0
+    prefix = f"{stem}_"
+    if base.startswith(prefix) and base[len(prefix):].isdigit():
+        return int(base[len(prefix):])
+    return -1
+
+
+class JsonlLogWriter:
+    """Background writer for one rotating JSONL log (see module docstring)."""
+
+    def __init__(
+        self,
+        config: JsonlLogConfig,
+        *,
+        clock: Callable[[], float] = time.time,
+        autostart: bool = True,
+    ):
+        self.config = config
+        self._clock = clock
+        self._autostart = autostart
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=config.queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+        # Writer-thread state.
+        self._handle: Optional[TextIO] = None
+        self._path: Optional[Path] = None
+        self._stem: Optional[str] = None
+        self._index = 0
+        # Producers count drops while the writer thread counts the rest.
+        self._stats_lock = threading.Lock()
+        self._stats = {"written": 0, "dropped": 0, "batches": 0, "rotations": 0, "errors": 0}
+
+    # --- producer side ----------------------------------------------------
+
+    def write(self, entry: Dict[str, Any]) -> bool:
+        """Queue *entry*; False if the log is disabled, closed or full (dropped)."""
+        if not self.config.enabled or self._closed:
+            return False
+        if self._autostart:
+            self.start()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self._count("dropped")
+            return False
+        return True
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name="jsonl-log", daemon=True)
+                self._thread.start()
+
+    def flush(self) -> None:
+        """Block until everything queued so far is on disk."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write what is queued, then stop the thread and close the file."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            counters = dict(self._stats)
+        return dict(counters, queued=self._queue.qsize(), path=str(self._path) if self._path else None)
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    # --- writer thread ----------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=self.config.flush_interval_s)
+            except queue.Empty:
+                continue
+            batch: List[Any] = [first]
+            while len(batch) < self.config.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(item is _STOP for item in batch)
+            entries = [item for item in batch if item is not _STOP]
+            try:
+                if entries:
+                    self._write_batch(entries)
+            except Exception as exc:  # noqa: BLE001 - logging must never take the caller down
+                self._count("errors")
+                _LOGGER.error("Failed to write %d log entries to %s: %s", len(entries), self._path, exc)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                self._close_handle()
+                return
+
+    def _write_batch(self, entries: List[Dict[str, Any]]) -> None:
+        lines = []
+        for entry in entries:
+            try:
+                lines.append(json.dumps(entry, ensure_ascii=False, default=str))
+            except (TypeError, ValueError) as exc:
+                self._count("errors")
+                _LOGGER.error("Unserialisable log entry skipped: %s", exc)
+        if not lines:
+            return
+        handle = self._current_handle()
+        handle.write("\n".join(lines) + "\n")
+        handle.flush()
+        self._count("written", len(lines))
+        self._count("batches")
+
+    def _current_handle(self) -> TextIO:
+        to_struct = time.gmtime if self.config.utc else time.localtime
+        stem = time.strftime(self.config.name_pattern, to_struct(self._clock()))
+        if self._handle is not None and stem == self._stem and self._handle.tell() < self.config.max_bytes:
+            return self._handle
+        if self._handle is not None:
+            self._close_handle(rotated=True)
+            self._count("rotations")
+        if stem != self._stem:
+            self._stem = stem
+            self._index = self._resume_index(stem)
+        else:
+            self._index += 1
+        self._path = self.config.directory / _file_name(stem, self._index)
+        self._handle = self._path.open("a", encoding="utf-8")
+        return self._handle
+
+    def _resume_index(self, stem: str) -> int:
+        """Index to continue writing *stem* at: the last file unless it is full or gzipped."""
+        directory = self.config.directory
+        directory.mkdir(parents=True, exist_ok=True)
+        found: List[Tuple[int, Path]] = []
+        for path in directory.glob(f"{stem}*{_EXT}*"):
+            index = _file_index(path.name, stem)
+            if index >= 0:
+                found.append((index, path))
+        if not found:
+            return 0
+        index, path = max(found)
+        if path.suffix == ".gz" or path.stat().st_size >= self.config.max_bytes:
+            return index + 1
+        return index
+
+    def _close_handle(self, rotated: bool = False) -> None:
+        if self._handle is None:
+            return
+        self._handle.close()
+        self._handle = None
+        # Only finished files are compressed; the last one is resumed next run.
+        if rotated and self.config.compress and self._path is not None and self._path.exists():
+            self._gzip(self._path)
+
+    def _gzip(self, path: Path) -> None:
+        target = path.with_name(path.name + ".gz")
+        try:
+            with path.open("rb") as source, gzip.open(target, "wb") as sink:
+                shutil.copyfileobj(source, sink)
+            path.unlink()
+        except OSError as exc:
+            _LOGGER.error("Failed to compress %s: %s", path, exc)
+
+
+_WRITERS: List[JsonlLogWriter] = []
+_WRITERS_LOCK = threading.Lock()
+
+
+def open_log(config: JsonlLogConfig) -> JsonlLogWriter:
+    """Create a writer that is flushed and closed at interpreter exit."""
+    writer = JsonlLogWriter(config)
+    with _WRITERS_LOCK:
+        _WRITERS.append(writer)
+    return writer
+
+
+@atexit.register
+def _close_all() -> None:
+    with _WRITERS_LOCK:
+        writers = list(_WRITERS)
+    for writer in writers:
+        writer.close()
+
+
+__all__ = ["JsonlLogConfig", "JsonlLogWriter", "open_log"]
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""Simulate K concurrent games against a running imitator server.
+
+Each simulated game opens its own session, selects a style, and plays the
+imitator against a random (seeded) opponent under a real clock: every
+``go`` carries the remaining wtime/btime, and the round trip to ``bestmove``
+is charged to the imitator's clock.  The report gives throughput and the
+p50/p95 move latency over all games.
+
+Usage:
+    python3 load_generator.py --games 8 --moves 20 --tc 180+2
+    python3 load_generator.py --games 4 --spawn        # start a server just for this run
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import chess
+
+from imitator_server import DEFAULT_PORT
+from simulate_time_control import parse_time_control
+
+
+@dataclass
+class GameReport:
+    moves: int = 0
+    flagged: bool = False
+    latencies: List[float] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def percentile(values: Sequence[float], share: float) -> float:
+    """Nearest-rank percentile of *values* (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(share * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def _expect(reader: asyncio.StreamReader, prefix: str, timeout: float) -> str:
+    while True:
+        line = await asyncio.wait_for(reader.readline(), timeout)
+        if not line:
+            raise ConnectionError(f"session closed while waiting for {prefix!r}")
+        text = line.decode(errors="replace").strip()
+        if text.startswith(prefix):
+            return text
+
+
+async def play_game(
+    host: str,
+    port: int,
+    game_index: int,
+    *,
+    moves: int,
+    tc: str,
+    style: Optional[str],
+    seed: int,
+    move_timeout: float,
+) -> GameReport:
+    """Play one game; the imitator has White in even-numbered games."""
+    report = GameReport()
+    rng = random.Random(seed + game_index)
+    base, increment = parse_time_control(tc)
+    clocks = {chess.WHITE: base, chess.BLACK: base}
+    imitator = chess.WHITE if game_index % 2 == 0 else chess.BLACK
+    board = chess.Board()
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError as exc:
+        report.error = str(exc)
+        return report
+
+    def send(command: str) -> None:
+        writer.write(f"{command}\n".encode())
+
+    try:
+        send("uci")
+        await _expect(reader, "uciok", move_timeout)
+        if style:
+            send(f"setoption name Style value {style}")
+        send("ucinewgame")
+        send("isready")
+        await _expect(reader, "readyok", move_timeout)
+        while report.moves < moves and not board.is_game_over():
+            if board.turn != imitator:
+                board.push(rng.choice(list(board.legal_moves)))
+                continue
+            inc_ms = int(increment * 1000)
+            moves_played = " ".join(move.uci() for move in board.move_stack)
+            send("position startpos" + (f" moves {moves_played}" if moves_played else ""))
+            start = time.monotonic()
+            send(
+                f"go wtime {int(clocks[chess.WHITE] * 1000)} btime {int(clocks[chess.BLACK] * 1000)} "
+                f"winc {inc_ms} binc {inc_ms}"
+            )
+            line = await _expect(reader, "bestmove", move_timeout)
+            elapsed = time.monotonic() - start
+            report.latencies.append(elapsed)
+            report.moves += 1
+            clocks[imitator] -= elapsed
+            if clocks[imitator] < 0:
+                report.flagged = True
+                break
+            clocks[imitator] += increment
+            board.push_uci(line.split()[1])
+        send("quit")
+        await writer.drain()
+    except (OSError, ConnectionError, asyncio.TimeoutError, ValueError, IndexError) as exc:
+        report.error = f"{type(exc).__name__}: {exc}"
+    finally:
+        writer.close()
+    return report
+
+
+async def run_load(
+    host: str,
+    port: int,
+    *,
+    games: int,
+    moves: int,
+    tc: str = "180+2",
+    styles: Sequence[str] = (),
+    seed: int = 0,
+    move_timeout: float = 120.0,
+) -> Dict[str, object]:
+    """Play *games* concurrent games and summarise throughput and latency."""
+    start = time.monotonic()
+    reports = await asyncio.gather(
+        *(
+            play_game(
+                host,
+                port,
+                index,
+                moves=moves,
+                tc=tc,
+                style=styles[index % len(styles)] if styles else None,
+                seed=seed,
+                move_timeout=move_timeout,
+            )
+            for index in range(games)
+        )
+    )
+    wall_s = time.monotonic() - start
+    latencies = [latency for report in reports for latency in report.latencies]
+    total_moves = sum(report.moves for report in reports)
+    return {
+        "games": games,
+        "moves": total_moves,
+        "wall_s": round(wall_s, 3),
+        "throughput_moves_per_s": round(total_moves / wall_s, 3) if wall_s else 0.0,
+        "latency_p50_s": round(percentile(latencies, 0.50), 3),
+        "latency_p95_s": round(percentile(latencies, 0.95), 3),
+        "latency_max_s": round(max(latencies), 3) if latencies else 0.0,
+        "flagged": sum(1 for report in reports if report.flagged),
+        "errors": [report.error for report in reports if report.error],
+    }
+
+
+def _spawn_server(args: argparse.Namespace) -> subprocess.Popen:
+    command = [
+        sys.executable,
+        str(Path(__file__).with_name("imitator_server.py")),
+        "--host",
+        args.host,
+        "--port",
+        str(args.port),
+        "--max-sessions",
+        str(args.games),
+    ]
+    if args.workers:
+        command += ["--workers", str(args.workers)]
+    process = subprocess.Popen(command, stderr=subprocess.PIPE, text=True, env=dict(os.environ))
+    for line in process.stderr:
+        if "listening on" in line:
+            # Keep draining the server's log so it never blocks on a full pipe.
+            threading.Thread(target=process.stderr.read, daemon=True).start()
+            return process
+    raise RuntimeError("imitator server exited before listening")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the multi-game imitator server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--games", type=int, default=4, help="Concurrent games")
+    parser.add_argument("--moves", type=int, default=20, help="Imitator moves per game")
+    parser.add_argument("--tc", default="180+2", help="Time control as base+increment seconds")
+    parser.add_argument("--styles", default="", help="Comma-separated players assigned to games in turn")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spawn", action="store_true", help="Start a server for the run")
+    parser.add_argument("--workers", type=int, default=None, help="Tagging workers of a spawned server")
+    args = parser.parse_args()
+
+    server = _spawn_server(args) if args.spawn else None
+    try:
+        report = asyncio.run(
+            run_load(
+                args.host,
+                args.port,
+                games=args.games,
+                moves=args.moves,
+                tc=args.tc,
+                styles=[style for style in args.styles.split(",") if style],
+                seed=args.seed,
+            )
+        )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import sys
+import threading
 from pathlib import Path
 from typing import Any, Dict, List
 
@@ -10,7 +11,7 @@ _RULE_TAGGER_PATH = Path(__file__).resolve().parent.parent / "rule_tagger_liches
 if str(_RULE_TAGGER_PATH) not in sys.path:
     sys.path.insert(0, str(_RULE_TAGGER_PATH))
 
-from rule_tagger_lichessbot.codex_utils import analyze_position
+from rule_tagger_lichessbot.codex_utils import analyze_position, prepare_root_analysis
 
 
 def _extract_tags_from_analysis(analysis: Dict[str, Any]) -> List[str]:
@@ -28,19 +29,38 @@ def tag_single_move(
     fen: str,
     move_uci: str,
     engine_meta: Dict[str, Any] | None = None,
+    root: Any = None,
+    stop_event: threading.Event | None = None,
 ) -> Dict[str, Any]:
     """
     Run the real rule_tagger on a single engine candidate.
 
+    ``root`` is an optional shared root analysis from ``prepare_root``.
+    Once ``stop_event`` is set the tagger stops at its next engine borrow by
+    raising ``engine_utils.pool.BorrowCancelled``.
     Returns a normalized result that includes the list of tags and the raw analysis.
     """
     engine_meta = engine_meta or {}
     engine_path = engine_meta.get("engine_path")
 
-    analysis = analyze_position(fen, move_uci, engine_path=engine_path)
+    analysis = analyze_position(fen, move_uci, engine_path=engine_path, root=root, stop_event=stop_event)
     tags = _extract_tags_from_analysis(analysis)
 
     return {
         "tags": tags,
         "analysis": analysis,
     }
+
+
+def prepare_root(
+    fen: str,
+    engine_meta: Dict[str, Any] | None = None,
+    moves: List[str] | None = None,
+) -> Any:
+    """
+    Analyse the position before the move once so that every candidate of
+    *fen* can reuse it via ``tag_single_move(..., root=...)``. Skipped when
+    all *moves* are already cached.
+    """
+    engine_meta = engine_meta or {}
+    return prepare_root_analysis(fen, engine_path=engine_meta.get("engine_path"), moves=moves)
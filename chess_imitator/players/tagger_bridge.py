@@ -5,12 +5,25 @@ from __future__ import annotations
 import argparse
 import json
 import logging
+import os
 import sys
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    BrokenExecutor,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from pathlib import Path
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from players.api_single_move import tag_single_move
+from players.api_single_move import prepare_root, tag_single_move
 
+from engine_utils.pool import BorrowCancelled
 from rule_tagger_lichessbot.tag_postprocess import normalize_candidate_tags
 
 logger = logging.getLogger(__name__)
@@ -18,6 +31,21 @@ logger.addHandler(logging.NullHandler())
 
 _TAGGER_EMPTY = "_TAGGER_EMPTY"
 _TAGGER_ERROR = "_TAGGER_ERROR"
+# Marks candidates that were not tagged before the caller's deadline.
+_TAGGER_TIMEOUT = "_TAGGER_TIMEOUT"
+
+# Concurrency for tag_candidates_payload. "thread" shares the warm engines of
+# engine_utils.pool (size it with ENGINE_POOL_SIZE >= workers); "process" gives
+# every worker its own interpreter and engine pool; "serial" tags one by one.
+TAGGER_MODES = ("serial", "thread", "process")
+DEFAULT_TAGGER_MODE = os.environ.get("CHESS_IMITATOR_TAGGER_MODE", "thread")
+DEFAULT_TAGGER_WORKERS = int(os.environ.get("CHESS_IMITATOR_TAGGER_WORKERS", "4"))
+
+# How often a deadline-bound wait re-checks the caller's stop event.
+_STOP_POLL_S = 0.05
+
+_EXECUTORS: Dict[Tuple[str, int], Executor] = {}
+_EXECUTORS_LOCK = threading.Lock()
 
 
 def _collect_tags(result: Dict[str, Any], candidate: Dict[str, Any]) -> List[str]:
@@ -35,45 +63,325 @@ def _collect_tags(result: Dict[str, Any], candidate: Dict[str, Any]) -> List[str
     return []
 
 
-def tag_candidates_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+def _get_executor(mode: str, workers: int) -> Executor:
+    """Return a long-lived executor so worker engines stay warm between moves."""
+    key = (mode, workers)
+    with _EXECUTORS_LOCK:
+        executor = _EXECUTORS.get(key)
+        if executor is None:
+            if mode == "process":
+                executor = ProcessPoolExecutor(max_workers=workers)
+            else:
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tagger")
+            _EXECUTORS[key] = executor
+        return executor
+
+
+def _discard_executor(executor: Executor) -> None:
+    """Drop a broken cached executor so the next call starts a fresh one."""
+    with _EXECUTORS_LOCK:
+        keys = [key for key, cached in _EXECUTORS.items() if cached is executor]
+        for key in keys:
+            del _EXECUTORS[key]
+    if keys:
+        logger.warning("Tagger executor %s broke; it will be recreated.", keys[0])
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _prepare_roots(fen: str, candidates: List[Dict[str, Any]]) -> Dict[Optional[str], Any]:
+    """
+    Analyse the root position once per engine path used by *candidates*.
+
+    A failed root analysis maps to None so those candidates fall back to the
+    single-move path and report their own error.
+    """
+    roots: Dict[Optional[str], Any] = {}
+    for candidate in candidates:
+        engine_meta = candidate.get("engine_meta") or {}
+        engine_path = engine_meta.get("engine_path")
+        if engine_path in roots:
+            continue
+        moves = [
+            other["uci"]
+            for other in candidates
+            if (other.get("engine_meta") or {}).get("engine_path") == engine_path
+        ]
+        try:
+            roots[engine_path] = prepare_root(fen, engine_meta=engine_meta, moves=moves)
+        except Exception as exc:  # pragma: no cover (defensive logging)
+            logger.warning("Root analysis failed for %s: %s", fen, exc)
+            roots[engine_path] = None
+    return roots
+
+
+def _start_root_analysis(fen: str, candidates: List[Dict[str, Any]]) -> Future:
+    """
+    Run ``_prepare_roots`` on a thread of its own and return its future.
+
+    A root analysis abandoned at a deadline or stop cannot be interrupted and
+    keeps running; on a shared worker it would hold up the root analysis of
+    the next call, so every interruptible call gets a fresh thread.
+    """
+    future: Future = Future()
+
+    def _run() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(_prepare_roots(fen, candidates))
+        except BaseException as exc:  # pragma: no cover (re-raised by result())
+            future.set_exception(exc)
+
+    threading.Thread(target=_run, name="tagger-root", daemon=True).start()
+    return future
+
+
+def _tag_candidate(
+    fen: str,
+    candidate: Dict[str, Any],
+    root: Any = None,
+    stop_event: Optional[threading.Event] = None,
+) -> Dict[str, Any]:
+    """
+    Tag one candidate, mapping failures to the _TAGGER_ERROR/_TAGGER_EMPTY markers.
+
+    Once *stop_event* is set the tagger gives up at its next engine borrow
+    and the candidate comes back untagged.
+    """
+    uci = candidate.get("uci")
+    engine_meta = candidate.get("engine_meta")
+    candidate_copy = dict(candidate)
+    tags: List[str] = []
+    analysis: Dict[str, Any] = {}
+    start = time.perf_counter()
+    try:
+        result = tag_single_move(fen, uci, engine_meta=engine_meta, root=root, stop_event=stop_event)
+    except BorrowCancelled:
+        return _untagged_candidate(candidate)
+    except Exception as exc:  # pragma: no cover (defensive logging)
+        print(
+            f"[TAGGER_BRIDGE] failed to tag {uci}: {exc}",
+            file=sys.stderr,
+            flush=True,
+        )
+        tags = list(candidate_copy.get("tags", []))
+        if _TAGGER_ERROR not in tags:
+            tags.append(_TAGGER_ERROR)
+    else:
+        analysis = result.get("analysis", {})
+        tags = _collect_tags(result, candidate_copy)
+        if not tags:
+            tags = [_TAGGER_EMPTY]
+    candidate_copy["tags"] = normalize_candidate_tags(tags, analysis)
+    candidate_copy["tagged"] = True
+    candidate_copy["tag_ms"] = round((time.perf_counter() - start) * 1000.0, 1)
+    return candidate_copy
+
+
+def _failed_candidate(candidate: Dict[str, Any]) -> Dict[str, Any]:
+    """Return *candidate* with the _TAGGER_ERROR marker, for work lost with its worker."""
+    candidate_copy = dict(candidate)
+    tags = list(candidate_copy.get("tags", []))
+    if _TAGGER_ERROR not in tags:
+        tags.append(_TAGGER_ERROR)
+    candidate_copy["tags"] = normalize_candidate_tags(tags, {})
+    candidate_copy["tagged"] = True
+    candidate_copy["tag_ms"] = None
+    return candidate_copy
+
+
+def _submit(executor: Executor, *args: Any) -> Future:
+    """Submit ``_tag_candidate``; a broken *executor* yields a failed future."""
+    try:
+        return executor.submit(_tag_candidate, *args)
+    except BrokenExecutor as exc:
+        future: Future = Future()
+        future.set_exception(exc)
+        return future
+
+
+def _is_broken(future: Future) -> bool:
+    return future.done() and not future.cancelled() and isinstance(future.exception(), BrokenExecutor)
+
+
+def _untagged_candidate(candidate: Dict[str, Any]) -> Dict[str, Any]:
+    """Return *candidate* marked as skipped because the deadline hit first."""
+    candidate_copy = dict(candidate)
+    candidate_copy["tags"] = [_TAGGER_TIMEOUT]
+    candidate_copy["tagged"] = False
+    candidate_copy["tag_ms"] = None
+    return candidate_copy
+
+
+def _wait_until(
+    futures: List[Future],
+    deadline: Optional[float],
+    stop_event: Optional[threading.Event],
+) -> None:
+    """Block until *futures* finish, *deadline* (time.monotonic()) passes or *stop_event* is set."""
+    pending = set(futures)
+    while pending:
+        if stop_event is not None and stop_event.is_set():
+            return
+        timeout = None if deadline is None else deadline - time.monotonic()
+        if timeout is not None and timeout <= 0:
+            return
+        if stop_event is not None:
+            timeout = _STOP_POLL_S if timeout is None else min(timeout, _STOP_POLL_S)
+        _, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+
+def _gather_until(
+    futures: List[Future],
+    candidates: List[Dict[str, Any]],
+    deadline: Optional[float],
+    stop_event: Optional[threading.Event],
+) -> List[Dict[str, Any]]:
+    """
+    Wait for *futures* until they finish, *deadline* (time.monotonic()) passes
+    or *stop_event* is set; unfinished candidates come back untagged and
+    those lost to a broken executor (e.g. a dead process worker) errored.
+    """
+    _wait_until(futures, deadline, stop_event)
+    results: List[Dict[str, Any]] = []
+    for future, candidate in zip(futures, candidates):
+        if _is_broken(future):
+            results.append(_failed_candidate(candidate))
+        elif future.done() and not future.cancelled():
+            results.append(future.result())
+        else:
+            # Queued work is dropped; a candidate already being tagged stops
+            # at its next engine borrow once the caller sets its stop event.
+            future.cancel()
+            results.append(_untagged_candidate(candidate))
+    return results
+
+
+def tag_candidates_payload(
+    payload: Dict[str, Any],
+    workers: Optional[int] = None,
+    mode: Optional[str] = None,
+    deadline: Optional[float] = None,
+    stop_event: Optional[threading.Event] = None,
+    executor: Optional[Executor] = None,
+) -> Dict[str, Any]:
     """
     Tag every candidate move inside *payload* with rule_tagger2 tags.
 
     The payload should contain a FEN and a list of candidates similar to
-    the output from a UCI engine running `multipv`.
+    the output from a UCI engine running `multipv`. Candidates are tagged
+    concurrently (see TAGGER_MODES) but returned in their original order,
+    each with its own wall time in ``tag_ms``; the payload gains a
+    ``tagging`` summary with the mode, worker count and total wall time.
+    The root position is analysed once up front (``root_ms``) and shared by
+    every candidate, so workers only run the per-move part of the tagger.
+
+    Tagging is anytime: with a *deadline* (a ``time.monotonic()`` timestamp)
+    or a *stop_event*, candidates are tagged in payload (MultiPV) order and
+    whatever is finished when the deadline hits or the event is set is
+    returned. The rest keep their engine data but carry ``tagged: False``
+    and the ``_TAGGER_TIMEOUT`` marker instead of tags.  A stop during the
+    root analysis returns every candidate untagged right away.
+
+    Work abandoned at the deadline never delays the next call: the root
+    analysis runs on a thread of its own, queued candidates are cancelled,
+    and in "serial"/"thread" mode the candidates run on workers created for
+    this call, so one still busy with an abandoned candidate does not hold up
+    the next call's queue. Those candidates also stop at their next engine
+    borrow (engine_utils.pool.cancel_borrows), so they neither keep pooled
+    engines busy nor make the next call's candidates wait for one. "process"
+    mode keeps its long-lived workers and lets abandoned candidates finish.
+
+    A caller-owned *executor* (e.g. a session's share of a fair pool in the
+    multi-game server) runs the candidates instead of the module's executors;
+    *mode* and *workers* are then ignored.
     """
     fen = payload.get("fen", "")
     candidates = payload.get("candidates", [])
-    tagged: List[Dict[str, Any]] = []
+    mode = (mode or DEFAULT_TAGGER_MODE).lower()
+    if mode not in TAGGER_MODES:
+        logger.warning("Unknown tagger mode %r; falling back to serial.", mode)
+        mode = "serial"
+    workers = max(1, workers if workers is not None else DEFAULT_TAGGER_WORKERS)
+
+    runnable: List[Dict[str, Any]] = []
     for candidate in candidates:
-        uci = candidate.get("uci")
-        if not uci:
+        if not candidate.get("uci"):
             logger.warning("Skipping candidate without a UCI string: %s", candidate)
             continue
-        engine_meta = candidate.get("engine_meta")
-        candidate_copy = dict(candidate)
-        tags: List[str] = []
-        analysis: Dict[str, Any] = {}
-        try:
-            result = tag_single_move(fen, uci, engine_meta=engine_meta)
-        except Exception as exc:  # pragma: no cover (defensive logging)
-            print(
-                f"[TAGGER_BRIDGE] failed to tag {uci}: {exc}",
-                file=sys.stderr,
-                flush=True,
-            )
-            tags = list(candidate_copy.get("tags", []))
-            if _TAGGER_ERROR not in tags:
-                tags.append(_TAGGER_ERROR)
+        runnable.append(candidate)
+
+    interruptible = deadline is not None or stop_event is not None
+    start = time.perf_counter()
+    roots: Dict[Optional[str], Any] = {}
+    interrupted = False
+    if runnable and interruptible:
+        # The root analysis cannot be cut short, but waiting for it can: on
+        # stop/deadline every candidate comes back untagged and the analysis
+        # finishes in the background on its own thread.
+        root_future = _start_root_analysis(fen, runnable)
+        _wait_until([root_future], deadline, stop_event)
+        if root_future.done():
+            roots = root_future.result()
         else:
-            analysis = result.get("analysis", {})
-            tags = _collect_tags(result, candidate_copy)
-            if not tags:
-                tags = [_TAGGER_EMPTY]
-        candidate_copy["tags"] = normalize_candidate_tags(tags, analysis)
-        tagged.append(candidate_copy)
+            interrupted = True
+    elif runnable:
+        roots = _prepare_roots(fen, runnable)
+    root_ms = round((time.perf_counter() - start) * 1000.0, 1)
+
+    def _root_for(candidate: Dict[str, Any]) -> Any:
+        return roots.get((candidate.get("engine_meta") or {}).get("engine_path"))
+
+    call_executor: Optional[ThreadPoolExecutor] = None
+    if executor is not None:
+        mode = "shared"
+        workers = getattr(executor, "max_workers", workers)
+    elif mode == "serial" or workers == 1 or len(runnable) <= 1:
+        mode = "serial"
+        if interruptible and not interrupted:
+            # A single background worker keeps serial tagging interruptible.
+            executor = call_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tagger-call")
+    elif mode == "thread" and interruptible and not interrupted:
+        # Threads are cheap and the engines live in engine_utils.pool, so the
+        # workers of an interruptible call are its own.
+        executor = call_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tagger-call")
+    else:
+        executor = _get_executor(mode, workers)
+
+    # Set once this call stops waiting, so candidates still running on threads
+    # give up their engines; an Event cannot be sent to process workers.
+    abandon = threading.Event() if interruptible and mode != "process" else None
+
+    if interrupted:
+        tagged = [_untagged_candidate(candidate) for candidate in runnable]
+    elif executor is None:
+        tagged = [_tag_candidate(fen, candidate, _root_for(candidate)) for candidate in runnable]
+    else:
+        futures = [_submit(executor, fen, candidate, _root_for(candidate), abandon) for candidate in runnable]
+        try:
+            tagged = _gather_until(futures, runnable, deadline, stop_event)
+        finally:
+            if abandon is not None:
+                abandon.set()
+            if call_executor is not None:
+                # Abandoned candidates wind down in the background on this call's threads.
+                call_executor.shutdown(wait=False, cancel_futures=True)
+        if any(_is_broken(future) for future in futures):
+            _discard_executor(executor)
+    wall_ms = round((time.perf_counter() - start) * 1000.0, 1)
+    untagged = sum(1 for candidate in tagged if not candidate["tagged"])
+
     payload_copy = dict(payload)
     payload_copy["candidates"] = tagged
+    payload_copy["tagging"] = {
+        "mode": mode,
+        "workers": 1 if mode == "serial" else workers,
+        "wall_ms": wall_ms,
+        "root_ms": root_ms,
+        "candidate_ms": [candidate["tag_ms"] for candidate in tagged],
+        "tagged": len(tagged) - untagged,
+        "untagged": untagged,
+    }
     return payload_copy
 
 
@@ -93,11 +401,30 @@ def cli_main(argv: Iterable[str] | None = None) -> None:
     )
     parser.add_argument("input", type=Path, help="JSON file describing a FEN and move candidates.")
     parser.add_argument("output", type=Path, help="Path to write the tagged payload.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_TAGGER_WORKERS,
+        help="Number of candidates tagged concurrently.",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=TAGGER_MODES,
+        default=DEFAULT_TAGGER_MODE,
+        help="Concurrency mode used to tag the candidates.",
+    )
     args = parser.parse_args(argv)
     payload = _read_payload(args.input)
-    tagged = tag_candidates_payload(payload)
+    tagged = tag_candidates_payload(payload, workers=args.workers, mode=args.mode)
     _write_payload(tagged, args.output)
-    logger.info("Tagged %d candidates from %s", len(tagged["candidates"]), args.input)
+    logger.info(
+        "Tagged %d candidates from %s in %.1f ms (%s, %d workers)",
+        len(tagged["candidates"]),
+        args.input,
+        tagged["tagging"]["wall_ms"],
+        tagged["tagging"]["mode"],
+        tagged["tagging"]["workers"],
+    )
 
 
 __all__ = ["tag_candidates_payload", "cli_main"]
@@ -0,0 +1,153 @@
+"""Background work on the opponent's clock for the imitator UCI engine.
+
+After the imitator answers ``bestmove`` it predicts the opponent's likely
+replies (the reply in Stockfish's PV first, then the best replies of a short
+MultiPV search), runs the candidate search and tagging for each resulting
+position and files the results in a ``PonderBook``.  When the next
+``position ... moves`` lands on one of those positions the engine reuses the
+candidates (and the tagged payload, if tagging finished) instead of paying
+for them on its own clock.  Tagging interrupted by the real ``go`` is not
+lost either: finished candidates are served by the tagger's result cache.
+
+Environment:
+    CHESS_IMITATOR_PONDER             "0" disables pondering (default "1").
+    CHESS_IMITATOR_PONDER_REPLIES     Opponent replies prepared per move (2).
+    CHESS_IMITATOR_PONDER_PREDICT_MS  Search used to rank replies beyond the
+                                      PV reply, in ms (100).
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import chess
+
+PONDER_ENABLED = os.environ.get("CHESS_IMITATOR_PONDER", "1").lower() not in ("0", "false", "no")
+PONDER_REPLIES = max(1, int(os.environ.get("CHESS_IMITATOR_PONDER_REPLIES", "2")))
+PONDER_PREDICT_MS = int(os.environ.get("CHESS_IMITATOR_PONDER_PREDICT_MS", "100"))
+# Floor for the candidate search of a pondered position.
+MIN_PONDER_SEARCH_MS = 100
+
+
+def predicted_replies(
+    board: chess.Board,
+    pv_reply: Optional[str],
+    ranked: Iterable[str],
+    limit: int = PONDER_REPLIES,
+) -> List[chess.Move]:
+    """Legal replies for *board*: the PV reply first, then *ranked*, without duplicates."""
+    replies: List[chess.Move] = []
+    for uci in ([pv_reply] if pv_reply else []) + list(ranked):
+        try:
+            move = chess.Move.from_uci(uci)
+        except ValueError:
+            continue
+        if move in replies or not board.is_legal(move):
+            continue
+        replies.append(move)
+        if len(replies) >= limit:
+            break
+    return replies
+
+
+@dataclass
+class PonderEntry:
+    """Precomputed search (and possibly tagging) for one predicted position."""
+
+    fen: str
+    candidates: List[Dict[str, Any]]
+    best_move: Optional[str]
+    search_s: float
+    tagged_payload: Optional[Dict[str, Any]] = None
+    tag_s: float = 0.0
+
+    def tagged_for(self, multipv: int) -> Optional[Dict[str, Any]]:
+        """The tagged payload cut to *multipv* candidates, if every one of them was tagged."""
+        if self.tagged_payload is None:
+            return None
+        candidates = self.tagged_payload.get("candidates", [])[:multipv]
+        if not candidates or not all(candidate.get("tagged") for candidate in candidates):
+            return None
+        payload = dict(self.tagged_payload)
+        payload["candidates"] = candidates
+        return payload
+
+
+@dataclass
+class PonderStats:
+    """Per-game ponder telemetry."""
+
+    moves: int = 0
+    hits: int = 0
+    saved_s: float = 0.0
+    pondered_s: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.moves if self.moves else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"hits={self.hits}/{self.moves} ({self.hit_rate:.0%}) saved={self.saved_s:.2f}s "
+            f"pondered={self.pondered_s:.2f}s"
+        )
+
+
+@dataclass
+class PonderBook:
+    """Predicted positions of the current move and what was precomputed for them."""
+
+    prepared: Set[str] = field(default_factory=set)
+    entries: Dict[str, PonderEntry] = field(default_factory=dict)
+    stats: PonderStats = field(default_factory=PonderStats)
+
+    def prepare(self, fens: Iterable[str]) -> None:
+        self.prepared = set(fens)
+        self.entries = {}
+
+    def add(self, entry: PonderEntry) -> None:
+        self.entries[entry.fen] = entry
+
+    def take(self, fen: str) -> Optional[PonderEntry]:
+        """
+        Return the entry for *fen* (if any) and forget this move's predictions.
+
+        Only moves that had predictions count towards the hit rate.
+        """
+        if not self.prepared:
+            return None
+        entry = self.entries.get(fen)
+        self.stats.moves += 1
+        if entry is not None:
+            self.stats.hits += 1
+        self.prepared = set()
+        self.entries = {}
+        return entry
+
+    def record_saved(self, seconds: float) -> None:
+        self.stats.saved_s += seconds
+
+    def record_pondered(self, seconds: float) -> None:
+        self.stats.pondered_s += seconds
+
+    def reset(self) -> PonderStats:
+        """Start a new game; return the finished game's stats."""
+        finished = self.stats
+        self.prepared = set()
+        self.entries = {}
+        self.stats = PonderStats()
+        return finished
+
+
+__all__ = [
+    "MIN_PONDER_SEARCH_MS",
+    "PONDER_ENABLED",
+    "PONDER_PREDICT_MS",
+    "PONDER_REPLIES",
+    "PonderBook",
+    "PonderEntry",
+    "PonderStats",
+    "predicted_replies",
+]
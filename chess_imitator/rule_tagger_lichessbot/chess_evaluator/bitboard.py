@@ -0,0 +1,378 @@
+"""
+Bitboard implementation of the five ChessEvaluator components.
+
+Produces exactly the ``components`` dict of ``ChessEvaluator.evaluate`` (same
+per-side rounding, same float accumulation order) from mask arithmetic and
+popcounts over the board's bitboards, without ``piece_at`` scans,
+``is_attacked_by`` calls or the per-piece detail payload. Attack maps are
+built once per side and shared by king safety, centre control, mobility and
+the hanging-piece check.
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+import chess
+
+from .constants import CENTER_SQUARES, EXTENDED_CENTER, MOBILITY_BONUS
+
+_popcount = chess.popcount
+
+BB_CENTER = 0
+for _sq in CENTER_SQUARES:
+    BB_CENTER |= chess.BB_SQUARES[_sq]
+BB_EXTENDED_CENTER = 0
+for _sq in EXTENDED_CENTER:
+    BB_EXTENDED_CENTER |= chess.BB_SQUARES[_sq]
+
+# Files f-1 and f+1 (without f itself).
+_ADJACENT_FILES = [
+    (chess.BB_FILES[f - 1] if f > 0 else 0) | (chess.BB_FILES[f + 1] if f < 7 else 0) for f in range(8)
+]
+# Files f-1, f and f+1.
+_NEAR_FILES = [_ADJACENT_FILES[f] | chess.BB_FILES[f] for f in range(8)]
+
+
+def _ranks_ahead(color: chess.Color, rank: int) -> int:
+    mask = 0
+    for r in range(8):
+        if (color == chess.WHITE and r > rank) or (color == chess.BLACK and r < rank):
+            mask |= chess.BB_RANKS[r]
+    return mask
+
+
+# [color][square]: squares strictly ahead of the square's rank.
+_AHEAD = [[_ranks_ahead(color, chess.square_rank(sq)) for sq in chess.SQUARES] for color in (chess.BLACK, chess.WHITE)]
+
+
+def _pawn_shield_mask(color: chess.Color, king: int) -> int:
+    direction = 1 if color == chess.WHITE else -1
+    king_file, king_rank = chess.square_file(king), chess.square_rank(king)
+    mask = 0
+    for file_offset in (-1, 0, 1):
+        for rank_offset in (direction, direction * 2):
+            file_idx, rank_idx = king_file + file_offset, king_rank + rank_offset
+            if 0 <= file_idx <= 7 and 0 <= rank_idx <= 7:
+                mask |= chess.BB_SQUARES[chess.square(file_idx, rank_idx)]
+    return mask
+
+
+_SHIELD = [[_pawn_shield_mask(color, sq) for sq in chess.SQUARES] for color in (chess.BLACK, chess.WHITE)]
+# The king square plus its neighbours.
+_KING_ZONE = [chess.BB_KING_ATTACKS[sq] | chess.BB_SQUARES[sq] for sq in chess.SQUARES]
+# Squares diagonally behind a pawn, where a defending pawn stands.
+_PAWN_SUPPORT = [chess.BB_PAWN_ATTACKS[not color] for color in (chess.BLACK, chess.WHITE)]
+
+# Direction rays from every square, in the scan order of tactics._find_pins.
+_DIRECTIONS: Tuple[Tuple[int, int, bool], ...] = (
+    # (file step, rank step, straight)
+    (1, 0, True),
+    (-1, 0, True),
+    (0, 1, True),
+    (0, -1, True),
+    (1, 1, False),
+    (-1, 1, False),
+    (-1, -1, False),
+    (1, -1, False),
+)
+
+
+def _ray(square: int, file_step: int, rank_step: int) -> List[int]:
+    squares = []
+    file_idx, rank_idx = chess.square_file(square) + file_step, chess.square_rank(square) + rank_step
+    while 0 <= file_idx <= 7 and 0 <= rank_idx <= 7:
+        squares.append(chess.square(file_idx, rank_idx))
+        file_idx += file_step
+        rank_idx += rank_step
+    return squares
+
+
+# [square] -> list of (ray mask, ray ascends, straight) per direction.
+_RAYS: List[List[Tuple[int, bool, bool]]] = []
+for _sq in chess.SQUARES:
+    entries = []
+    for _file_step, _rank_step, _straight in _DIRECTIONS:
+        squares = _ray(_sq, _file_step, _rank_step)
+        mask = 0
+        for _target in squares:
+            mask |= chess.BB_SQUARES[_target]
+        entries.append((mask, bool(squares) and squares[0] > _sq, _straight))
+    _RAYS.append(entries)
+
+_HANGING_PAIRS = (
+    (chess.BB_FILE_C | chess.BB_FILE_D) & (chess.BB_RANK_4 | chess.BB_RANK_5),
+    (chess.BB_FILE_D | chess.BB_FILE_E) & (chess.BB_RANK_4 | chess.BB_RANK_5),
+)
+
+
+def _nearest(mask: int, ascending: bool) -> int:
+    return chess.lsb(mask) if ascending else chess.msb(mask)
+
+
+def _piece_attacks(board: chess.Board, piece_type: chess.PieceType, square: int) -> int:
+    occupied = board.occupied
+    if piece_type == chess.KNIGHT:
+        return chess.BB_KNIGHT_ATTACKS[square]
+    if piece_type == chess.BISHOP:
+        return chess.BB_DIAG_ATTACKS[square][chess.BB_DIAG_MASKS[square] & occupied]
+    if piece_type == chess.ROOK:
+        return (
+            chess.BB_RANK_ATTACKS[square][chess.BB_RANK_MASKS[square] & occupied]
+            | chess.BB_FILE_ATTACKS[square][chess.BB_FILE_MASKS[square] & occupied]
+        )
+    if piece_type == chess.QUEEN:
+        return (
+            chess.BB_DIAG_ATTACKS[square][chess.BB_DIAG_MASKS[square] & occupied]
+            | chess.BB_RANK_ATTACKS[square][chess.BB_RANK_MASKS[square] & occupied]
+            | chess.BB_FILE_ATTACKS[square][chess.BB_FILE_MASKS[square] & occupied]
+        )
+    if piece_type == chess.KING:
+        return chess.BB_KING_ATTACKS[square]
+    return 0
+
+
+def _pawn_attacks(pawns: int, color: chess.Color) -> int:
+    if color == chess.WHITE:
+        return (((pawns & ~chess.BB_FILE_A) << 7) | ((pawns & ~chess.BB_FILE_H) << 9)) & chess.BB_ALL
+    return ((pawns & ~chess.BB_FILE_A) >> 9) | ((pawns & ~chess.BB_FILE_H) >> 7)
+
+
+class _Side:
+    """Attack maps of one color, built once and shared by all components."""
+
+    __slots__ = ("color", "own", "pawns", "pawn_attacks", "piece_attacks", "attacked", "king")
+
+    def __init__(self, board: chess.Board, color: chess.Color):
+        self.color = color
+        self.own = board.occupied_co[color]
+        self.pawns = board.pawns & self.own
+        self.pawn_attacks = _pawn_attacks(self.pawns, color)
+        self.king = board.king(color)
+        # (piece type, square, attack mask) for the mobility pieces.
+        self.piece_attacks: List[Tuple[int, int, int]] = []
+        attacked = self.pawn_attacks
+        for piece_type, pieces in (
+            (chess.QUEEN, board.queens),
+            (chess.ROOK, board.rooks),
+            (chess.BISHOP, board.bishops),
+            (chess.KNIGHT, board.knights),
+        ):
+            for square in chess.scan_forward(pieces & self.own):
+                mask = _piece_attacks(board, piece_type, square)
+                self.piece_attacks.append((piece_type, square, mask))
+                attacked |= mask
+        for square in chess.scan_forward(board.kings & self.own):
+            attacked |= chess.BB_KING_ATTACKS[square]
+        self.attacked = attacked
+
+
+def _pinned(board: chess.Board, us: _Side, them: _Side) -> int:
+    """Own pieces that are the single blocker between our king and an enemy slider."""
+    king = us.king
+    if king is None:
+        return 0
+    rook_like = (board.rooks | board.queens) & them.own
+    bishop_like = (board.bishops | board.queens) & them.own
+    snipers = (chess.BB_RANK_ATTACKS[king][0] | chess.BB_FILE_ATTACKS[king][0]) & rook_like
+    snipers |= chess.BB_DIAG_ATTACKS[king][0] & bishop_like
+    pinned = 0
+    for sniper in chess.scan_forward(snipers):
+        blockers = chess.between(king, sniper) & board.occupied
+        if blockers and not blockers & (blockers - 1):
+            pinned |= blockers
+    return pinned & us.own
+
+
+def _king_safety(board: chess.Board, us: _Side, them: _Side) -> float:
+    king = us.king
+    if king is None:
+        return -10.0
+    color = us.color
+    king_file = chess.square_file(king)
+    pawn_shield = _popcount(_SHIELD[color][king] & us.pawns)
+    open_files = 0
+    semi_open_files = 0
+    for file_idx in (king_file - 1, king_file, king_file + 1):
+        if not 0 <= file_idx <= 7:
+            continue
+        file_mask = chess.BB_FILES[file_idx]
+        if not file_mask & us.pawns:
+            if file_mask & them.pawns:
+                semi_open_files += 1
+            else:
+                open_files += 1
+    attacks_on_zone = _popcount(_KING_ZONE[king] & them.attacked)
+    if color == chess.WHITE:
+        castled = king in (chess.G1, chess.C1)
+    else:
+        castled = king in (chess.G8, chess.C8)
+
+    score = 0.0
+    score += pawn_shield * 0.3
+    score -= open_files * 0.4
+    score -= semi_open_files * 0.2
+    score -= attacks_on_zone * 0.1
+    if castled:
+        score += 0.5
+    return round(score, 2)
+
+
+def _mobility(board: chess.Board, us: _Side, them: _Side) -> float:
+    area = chess.BB_ALL & ~us.own & ~them.pawn_attacks
+    if them.king is not None:
+        area &= ~_KING_ZONE[them.king]
+    # mobility._pin_line only admits a checking slider's line, which cannot
+    # contain a pinned piece, so pinned pieces have no mobility squares.
+    pinned = _pinned(board, us, them)
+    score_cp = 0
+    for piece_type, square, attacks in us.piece_attacks:
+        count = 0 if pinned & chess.BB_SQUARES[square] else _popcount(attacks & area)
+        table = MOBILITY_BONUS[piece_type]
+        score_cp += table[min(count, len(table) - 1)]
+    return round(score_cp / 100.0, 2)
+
+
+def _center_control(us: _Side) -> float:
+    center_4 = _popcount(BB_CENTER & us.attacked) + _popcount(BB_CENTER & us.own)
+    extended = _popcount(BB_EXTENDED_CENTER & us.attacked)
+    return round(center_4 * 0.3 + extended * 0.05, 2)
+
+
+def _pawn_structure(board: chess.Board, us: _Side, them: _Side) -> float:
+    color = us.color
+    pawns = us.pawns
+    squares = list(chess.scan_forward(pawns))
+    ahead = _AHEAD[color]
+    support = _PAWN_SUPPORT[color]
+
+    isolated = doubled = backward = passed = 0
+    files_seen = 0
+    for file_idx in range(8):
+        on_file = _popcount(pawns & chess.BB_FILES[file_idx])
+        if on_file:
+            files_seen |= 1 << file_idx
+            if on_file > 1:
+                doubled += on_file
+    direction = 8 if color == chess.WHITE else -8
+    for square in squares:
+        file_idx = chess.square_file(square)
+        if not pawns & _ADJACENT_FILES[file_idx]:
+            isolated += 1
+        forward = square + direction
+        if (
+            0 <= forward < 64
+            and not board.occupied & chess.BB_SQUARES[forward]
+            and pawns & _ADJACENT_FILES[file_idx] & ahead[square]
+            and them.attacked & chess.BB_SQUARES[forward]
+        ):
+            backward += 1
+        if not them.pawns & _NEAR_FILES[file_idx] & ahead[square]:
+            passed += 1
+
+    # Same greedy, non-transitive grouping as pawn_structure._find_pawn_chains.
+    chains: List[int] = []
+    visited = 0
+    rank_step = 1 if color == chess.WHITE else -1
+    for square in squares:
+        if visited & chess.BB_SQUARES[square]:
+            continue
+        visited |= chess.BB_SQUARES[square]
+        length = 1
+        file_idx, rank = chess.square_file(square), chess.square_rank(square)
+        for other in squares:
+            if other == square or visited & chess.BB_SQUARES[other]:
+                continue
+            if abs(chess.square_file(other) - file_idx) == 1 and chess.square_rank(other) - rank == rank_step:
+                length += 1
+                visited |= chess.BB_SQUARES[other]
+        if length > 1:
+            chains.append(length)
+
+    islands = 0
+    previous = -2
+    for file_idx in range(8):
+        if files_seen >> file_idx & 1:
+            if file_idx - previous > 1:
+                islands += 1
+            previous = file_idx
+
+    hanging = 0
+    for pair_mask in _HANGING_PAIRS:
+        pair = pawns & pair_mask
+        if _popcount(pair) == 2:
+            supported = any(support[sq] & pawns for sq in chess.scan_forward(pair))
+            if not supported:
+                hanging += 2
+    center_pawns = _popcount(pawns & BB_CENTER)
+
+    score = 0.0
+    score -= isolated * 0.5
+    score -= doubled * 0.3
+    score -= backward * 0.4
+    score += passed * 0.8
+    score += sum(length * 0.2 for length in chains)
+    score -= islands * 0.3
+    score -= hanging * 0.4
+    score += center_pawns * 0.3
+    return round(score, 2)
+
+
+def _pin_signs(board: chess.Board, sides: Tuple[_Side, _Side]) -> List[float]:
+    """+/-0.3 per pin, in the order tactics._find_pins reports them."""
+    signs: List[float] = []
+    occupied = board.occupied
+    for us in sides:
+        king = us.king
+        if king is None:
+            continue
+        enemy = occupied & ~us.own
+        for ray, ascending, straight in _RAYS[king]:
+            blockers = ray & occupied
+            if not blockers:
+                continue
+            first = _nearest(blockers, ascending)
+            first_bb = chess.BB_SQUARES[first]
+            if not first_bb & us.own or first_bb & board.kings:
+                continue
+            blockers &= ~first_bb
+            if not blockers:
+                continue
+            second_bb = chess.BB_SQUARES[_nearest(blockers, ascending)]
+            if not second_bb & enemy:
+                continue
+            sliders = (board.rooks if straight else board.bishops) | board.queens
+            if second_bb & sliders:
+                signs.append(0.3 if us.color == chess.BLACK else -0.3)
+    return signs
+
+
+def _tactics(board: chess.Board, white: _Side, black: _Side) -> float:
+    score = 0.0
+    for sign in _pin_signs(board, (white, black)):
+        score += sign
+    non_kings = board.occupied & ~board.kings
+    hanging = non_kings & (
+        (white.own & black.attacked & ~white.attacked) | (black.own & white.attacked & ~black.attacked)
+    )
+    for square in chess.scan_forward(hanging):
+        if white.own & chess.BB_SQUARES[square]:
+            score -= 0.2
+        else:
+            score += 0.2
+    return round(score, 2)
+
+
+def evaluate_components(board: chess.Board) -> Dict[str, float]:
+    """The ``components`` of ``ChessEvaluator.evaluate`` for ``board``."""
+    white = _Side(board, chess.WHITE)
+    black = _Side(board, chess.BLACK)
+    return {
+        "king_safety": _king_safety(board, white, black) - _king_safety(board, black, white),
+        "mobility": _mobility(board, white, black) - _mobility(board, black, white),
+        "center_control": _center_control(white) - _center_control(black),
+        "structure": _pawn_structure(board, white, black) - _pawn_structure(board, black, white),
+        "tactics": _tactics(board, white, black),
+    }
+
+
+__all__ = ["evaluate_components"]
@@ -8,6 +8,7 @@ from typing import Any, Dict
 import chess
 
 from . import center_control, king_safety, mobility, pawn_structure, tactics
+from .bitboard import evaluate_components
 
 
 class ChessEvaluator:
@@ -45,5 +46,9 @@ class ChessEvaluator:
             "components": components,
         }
 
+    def components(self) -> Dict[str, float]:
+        """Only the ``components`` of :meth:`evaluate`, computed on bitboards without the detail payload."""
+        return evaluate_components(self.board)
+
 
 __all__ = ["ChessEvaluator"]
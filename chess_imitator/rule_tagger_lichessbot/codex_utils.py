@@ -1,9 +1,16 @@
 import os
+import threading
 from dataclasses import fields
-from typing import Any, Dict
+from typing import Any, Dict, List, Sequence
 
+from rule_tagger2.core.config_snapshot import config_fingerprint
+from rule_tagger2.core.facade import _use_new_pipeline
 from rule_tagger2.core.facade import tag_position as tag_position_impl
+from rule_tagger2.core.facade import tag_position_batch as tag_position_batch_impl
+from rule_tagger2.legacy.core import prepare_root
+from rule_tagger2.legacy.root_analysis import RootAnalysis
 from rule_tagger2.models import TagResult
+from tag_cache import get_tag_cache, make_key
 
 DEFAULT_ENGINE_PATH = os.getenv("STOCKFISH_PATH", "/usr/local/bin/stockfish")
 
@@ -35,19 +42,120 @@ def _extract_tag_flags(result: TagResult) -> Dict[str, bool]:
     return flags
 
 
-def analyze_position(fen: str, move: str, engine_path: str | None = None, use_new: bool | None = None) -> Dict[str, Any]:
+def analyze_position(
+    fen: str,
+    move: str,
+    engine_path: str | None = None,
+    use_new: bool | None = None,
+    root: RootAnalysis | None = None,
+    depth: int = 14,
+    multipv: int = 6,
+    stop_event: threading.Event | None = None,
+) -> Dict[str, Any]:
     """
     Run the rule-based tagger and normalize the response structure for the UI.
 
+    Results are served from the tag_cache when the same (FEN, move, depth,
+    multipv, pipeline, engine, config fingerprint) was tagged before.
+
     Args:
         fen: Position FEN string
         move: Move in UCI format
         engine_path: Path to Stockfish engine (optional)
         use_new: Force pipeline version (None=consult NEW_PIPELINE env, True=force new, False=force legacy)
+        root: Shared root analysis from prepare_root_analysis (optional)
+        depth: Engine analysis depth
+        multipv: Number of principal variations
+        stop_event: Abandons tagging at the next engine borrow once set
+            (raises engine_utils.pool.BorrowCancelled)
+    """
+    engine = engine_path or DEFAULT_ENGINE_PATH
+    cache = get_tag_cache()
+    key = _cache_key(fen, move, engine, use_new, depth, multipv)
+    cached = cache.get(key)
+    if cached is not None:
+        cached["fen"], cached["move"] = fen, move
+        return cached
+    result = tag_position_impl(
+        engine, fen, move, depth=depth, multipv=multipv, use_new=use_new, root=root, stop_event=stop_event
+    )
+    analysis = _normalize_result(fen, move, result)
+    cache.put(key, analysis)
+    return analysis
+
+
+def _cache_key(fen: str, move: str, engine: str, use_new: bool | None, depth: int, multipv: int) -> str:
+    pipeline = "new" if (_use_new_pipeline() if use_new is None else use_new) else "legacy"
+    return make_key(
+        fen,
+        move,
+        depth=depth,
+        multipv=multipv,
+        pipeline=pipeline,
+        engine_path=engine,
+        fingerprint=config_fingerprint(),
+    )
+
+
+def prepare_root_analysis(
+    fen: str,
+    engine_path: str | None = None,
+    depth: int = 14,
+    multipv: int = 6,
+    moves: Sequence[str] | None = None,
+    use_new: bool | None = None,
+) -> RootAnalysis | None:
+    """
+    Analyse the root of *fen* once so several analyze_position calls can share it.
+
+    Returns None when the active tagger path does not use a shared root, or
+    when every one of *moves* is already in the tag_cache.
     """
     engine = engine_path or DEFAULT_ENGINE_PATH
-    result = tag_position_impl(engine, fen, move, use_new=use_new)
+    if moves:
+        cache = get_tag_cache()
+        if all(cache.contains(_cache_key(fen, move, engine, use_new, depth, multipv)) for move in moves):
+            return None
+    return prepare_root(engine, fen, depth=depth, multipv=multipv)
+
+
+def analyze_positions(
+    fen: str,
+    moves: Sequence[str],
+    engine_path: str | None = None,
+    use_new: bool | None = None,
+    depth: int = 14,
+    multipv: int = 6,
+) -> List[Dict[str, Any]]:
+    """
+    Batch variant of analyze_position for several moves of the same FEN.
+
+    Cached moves are served from the tag_cache; the root position is analysed
+    once and shared by the remaining moves. The returned list matches
+    ``[analyze_position(fen, move) for move in moves]``.
+    """
+    engine = engine_path or DEFAULT_ENGINE_PATH
+    cache = get_tag_cache()
+    keys = [_cache_key(fen, move, engine, use_new, depth, multipv) for move in moves]
+    analyses: List[Dict[str, Any] | None] = []
+    for move, key in zip(moves, keys):
+        cached = cache.get(key)
+        if cached is not None:
+            cached["fen"], cached["move"] = fen, move
+        analyses.append(cached)
+    missing = [idx for idx, analysis in enumerate(analyses) if analysis is None]
+    if missing:
+        results = tag_position_batch_impl(
+            engine, fen, [moves[idx] for idx in missing], depth=depth, multipv=multipv, use_new=use_new
+        )
+        for idx, result in zip(missing, results):
+            analyses[idx] = _normalize_result(fen, moves[idx], result)
+            cache.put(keys[idx], analyses[idx])
+    return analyses
+
 
+def _normalize_result(fen: str, move: str, result: TagResult) -> Dict[str, Any]:
+    """Flatten a TagResult into the response structure used by the UI."""
     engine_meta = result.analysis_context.get("engine_meta", {})
     tag_flags = _extract_tag_flags(result)
     triggered = [name for name, active in tag_flags.items() if active]
@@ -0,0 +1,377 @@
+"""
+Transposition-aware cache of fixed-depth engine analyses.
+
+The tagger asks Stockfish about the same positions over and over: the root
+of every candidate of a FEN, positions reached by transposition, the
+"played" position that is also the best-move position, repeat tagging runs.
+Call sites route their searches through ``cached_analyse`` instead of
+``engine.analyse``:
+
+    with borrow_engine(engine_path) as eng:
+        info = cached_analyse(eng, engine_path, board, depth=14, multipv=6)
+
+Entries are keyed by (engine path, ``chess.polyglot.zobrist_hash``) and hold
+the depth and MultiPV width they were searched with. A request at depth d
+and MultiPV m is served by the shallowest stored entry with depth >= d and
+MultiPV >= m (truncated to m lines), so a repeat request gets exactly the
+search it got the first time.  Probes whose point is the depth itself (the
+shallow/deep checks of ``analyse_candidates``) pass ``exact_depth=True``. Only the score, PV and depth of each line are
+kept. Results are shared by the legacy helpers and StockfishEngineClient.
+
+Environment variables:
+- ENGINE_CACHE_ENABLED: Set to "0" to always search (default: "1")
+- ENGINE_CACHE_SIZE: Max cached positions in memory (default: 4096)
+- ENGINE_CACHE_PATH: Optional SQLite file persisting entries across runs
+  (default: unset, memory only)
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import chess
+import chess.engine
+import chess.polyglot
+
+logger = logging.getLogger(__name__)
+
+# One analysed line: (cp, mate, pv as UCI strings, depth), scores relative to the side to move.
+_Line = Tuple[Optional[int], Optional[int], Tuple[str, ...], Optional[int]]
+_Key = Tuple[str, int]
+
+
+@dataclass(frozen=True)
+class AnalysisCacheConfig:
+    """Sizing and persistence policy for an :class:`AnalysisCache`."""
+
+    enabled: bool = True
+    size: int = 4096
+    path: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> "AnalysisCacheConfig":
+        return cls(
+            enabled=os.getenv("ENGINE_CACHE_ENABLED", "1").lower() not in ("0", "false", "no"),
+            size=max(1, int(os.getenv("ENGINE_CACHE_SIZE", str(cls.size)))),
+            path=os.getenv("ENGINE_CACHE_PATH") or None,
+        )
+
+
+@dataclass(frozen=True)
+class _Entry:
+    depth: int
+    multipv: int
+    lines: Tuple[_Line, ...]
+    engine_ms: float
+
+
+def _encode_line(info: Dict[str, Any]) -> _Line:
+    score = info.get("score")
+    cp = mate = None
+    if score is not None:
+        relative = score.relative
+        if relative.is_mate():
+            mate = relative.mate()
+        else:
+            cp = relative.score()
+    pv = tuple(move.uci() for move in info.get("pv", []) or [])
+    return cp, mate, pv, info.get("depth")
+
+
+def _decode_line(line: _Line, turn: chess.Color) -> Dict[str, Any]:
+    cp, mate, pv, depth = line
+    info: Dict[str, Any] = {}
+    if mate is not None:
+        relative = chess.engine.MateGiven if mate == 0 else chess.engine.Mate(mate)
+        info["score"] = chess.engine.PovScore(relative, turn)
+    elif cp is not None:
+        info["score"] = chess.engine.PovScore(chess.engine.Cp(cp), turn)
+    if pv:
+        info["pv"] = [chess.Move.from_uci(uci) for uci in pv]
+    if depth is not None:
+        info["depth"] = depth
+    return info
+
+
+class AnalysisCache:
+    """Thread-safe LRU (plus optional SQLite tier) of engine analyses."""
+
+    def __init__(self, config: Optional[AnalysisCacheConfig] = None):
+        self.config = config or AnalysisCacheConfig.from_env()
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[_Key, List[_Entry]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._stats: Dict[str, float] = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evicted": 0,
+            "disk_hits": 0,
+            "engine_ms": 0.0,
+            "saved_engine_ms": 0.0,
+        }
+
+    # ------------------------------------------------------------------ disk
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if not self.config.path:
+            return None
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+        Path(self.config.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.config.path, timeout=5.0, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS engine_analyses ("
+            " engine_path TEXT NOT NULL,"
+            " zobrist TEXT NOT NULL,"
+            " depth INTEGER NOT NULL,"
+            " multipv INTEGER NOT NULL,"
+            " lines TEXT NOT NULL,"
+            " engine_ms REAL NOT NULL,"
+            " PRIMARY KEY (engine_path, zobrist, depth, multipv))"
+        )
+        conn.commit()
+        self._conn = conn
+        self._conn_pid = os.getpid()
+        return conn
+
+    def _load_from_disk(self, key: _Key, depth: int, multipv: int, exact_depth: bool) -> Optional[_Entry]:
+        try:
+            conn = self._connection()
+            if conn is None:
+                return None
+            row = conn.execute(
+                "SELECT depth, multipv, lines, engine_ms FROM engine_analyses"
+                " WHERE engine_path = ? AND zobrist = ? AND depth " + ("=" if exact_depth else ">=") + " ? AND multipv >= ?"
+                " ORDER BY depth, multipv LIMIT 1",
+                (key[0], format(key[1], "016x"), depth, multipv),
+            ).fetchone()
+        except sqlite3.Error as exc:
+            logger.warning("Engine cache read failed: %s", exc)
+            return None
+        if row is None:
+            return None
+        lines = tuple(
+            (cp, mate, tuple(pv), line_depth) for cp, mate, pv, line_depth in json.loads(row[2])
+        )
+        return _Entry(depth=row[0], multipv=row[1], lines=lines, engine_ms=row[3])
+
+    def _save_to_disk(self, key: _Key, entry: _Entry) -> None:
+        try:
+            conn = self._connection()
+            if conn is None:
+                return
+            conn.execute(
+                "INSERT OR REPLACE INTO engine_analyses VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key[0],
+                    format(key[1], "016x"),
+                    entry.depth,
+                    entry.multipv,
+                    json.dumps([list(line) for line in entry.lines]),
+                    entry.engine_ms,
+                ),
+            )
+            conn.commit()
+        except sqlite3.Error as exc:
+            logger.warning("Engine cache write failed: %s", exc)
+
+    # ---------------------------------------------------------------- memory
+    @staticmethod
+    def _best_entry(entries: List[_Entry], depth: int, multipv: int, exact_depth: bool) -> Optional[_Entry]:
+        usable = [
+            entry
+            for entry in entries
+            if (entry.depth == depth if exact_depth else entry.depth >= depth) and entry.multipv >= multipv
+        ]
+        if not usable:
+            return None
+        return min(usable, key=lambda entry: (entry.depth, entry.multipv))
+
+    def _insert(self, key: _Key, entry: _Entry) -> None:
+        entries = self._entries.setdefault(key, [])
+        entries[:] = [
+            other for other in entries if not (other.depth == entry.depth and other.multipv == entry.multipv)
+        ]
+        entries.append(entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.config.size:
+            self._entries.popitem(last=False)
+            self._stats["evicted"] += 1
+
+    def lookup(
+        self,
+        engine_path: str,
+        board: chess.Board,
+        depth: int,
+        multipv: int,
+        *,
+        exact_depth: bool = False,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Return cached lines for *board* at >= *depth* (or exactly *depth*) / >= *multipv*, or None."""
+        if not self.config.enabled:
+            return None
+        key = (engine_path, chess.polyglot.zobrist_hash(board))
+        with self._lock:
+            entry = self._best_entry(self._entries.get(key, []), depth, multipv, exact_depth)
+            if entry is None:
+                entry = self._load_from_disk(key, depth, multipv, exact_depth)
+                if entry is not None:
+                    self._insert(key, entry)
+                    self._stats["disk_hits"] += 1
+            else:
+                self._entries.move_to_end(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            self._stats["saved_engine_ms"] += entry.engine_ms
+        return [_decode_line(line, board.turn) for line in entry.lines[:multipv]]
+
+    def store(
+        self,
+        engine_path: str,
+        board: chess.Board,
+        depth: int,
+        multipv: int,
+        infos: List[Dict[str, Any]],
+        engine_ms: float,
+    ) -> None:
+        """Record the lines an engine returned for *board* at *depth* / *multipv*."""
+        with self._lock:
+            self._stats["engine_ms"] += engine_ms
+        if not self.config.enabled:
+            return
+        key = (engine_path, chess.polyglot.zobrist_hash(board))
+        entry = _Entry(
+            depth=depth,
+            multipv=multipv,
+            lines=tuple(_encode_line(info) for info in infos),
+            engine_ms=engine_ms,
+        )
+        with self._lock:
+            self._insert(key, entry)
+            self._stats["stores"] += 1
+            self._save_to_disk(key, entry)
+
+    def analyse(
+        self,
+        engine: chess.engine.SimpleEngine,
+        engine_path: str,
+        board: chess.Board,
+        depth: int,
+        multipv: Optional[int] = None,
+        *,
+        exact_depth: bool = False,
+    ) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Drop-in for ``engine.analyse(board, Limit(depth=depth), multipv=multipv)``:
+        a list of lines when *multipv* is given, otherwise a single info dict.
+        """
+        width = max(1, multipv or 1)
+        lines = self.lookup(engine_path, board, depth, width, exact_depth=exact_depth)
+        if lines is None:
+            start = time.perf_counter()
+            if multipv is None:
+                result = engine.analyse(board, chess.engine.Limit(depth=depth))
+            else:
+                result = engine.analyse(board, chess.engine.Limit(depth=depth), multipv=width)
+            engine_ms = (time.perf_counter() - start) * 1000.0
+            infos = result if isinstance(result, list) else [result]
+            self.store(engine_path, board, depth, width, infos, engine_ms)
+            return result
+        if multipv is None:
+            return lines[0] if lines else {}
+        return lines
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                "enabled": self.config.enabled,
+                "positions": len(self._entries),
+                "hits": int(self._stats["hits"]),
+                "disk_hits": int(self._stats["disk_hits"]),
+                "misses": int(self._stats["misses"]),
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+                "stores": int(self._stats["stores"]),
+                "evicted": int(self._stats["evicted"]),
+                "engine_ms": round(self._stats["engine_ms"], 1),
+                "saved_engine_ms": round(self._stats["saved_engine_ms"], 1),
+                "path": self.config.path,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            conn = self._connection()
+            if conn is not None:
+                conn.execute("DELETE FROM engine_analyses")
+                conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+            self._conn_pid = None
+
+
+_CACHE: Optional[AnalysisCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """Return the process-wide cache, creating it from the environment on first use."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = AnalysisCache(AnalysisCacheConfig.from_env())
+        return _CACHE
+
+
+def configure_analysis_cache(config: AnalysisCacheConfig) -> AnalysisCache:
+    """Replace the process-wide cache (closing the previous one)."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is not None:
+            _CACHE.close()
+        _CACHE = AnalysisCache(config)
+        return _CACHE
+
+
+def cached_analyse(
+    engine: chess.engine.SimpleEngine,
+    engine_path: str,
+    board: chess.Board,
+    depth: int,
+    multipv: Optional[int] = None,
+    *,
+    exact_depth: bool = False,
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    """``engine.analyse`` at a fixed depth, served from the process-wide cache when possible."""
+    return get_analysis_cache().analyse(engine, engine_path, board, depth, multipv, exact_depth=exact_depth)
+
+
+def analysis_cache_stats() -> Dict[str, Any]:
+    """Hit rate and engine time saved by the process-wide cache."""
+    return get_analysis_cache().stats()
+
+
+__all__ = [
+    "AnalysisCache",
+    "AnalysisCacheConfig",
+    "analysis_cache_stats",
+    "cached_analyse",
+    "configure_analysis_cache",
+    "get_analysis_cache",
+]
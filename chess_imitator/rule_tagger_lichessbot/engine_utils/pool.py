@@ -0,0 +1,391 @@
+"""
+Process-wide pool of warm UCI engines shared by every rule_tagger2 call site.
+
+Spawning Stockfish (process start, UCI handshake, hash allocation) costs far
+more than the shallow searches the tagger runs, so callers borrow an engine
+from here instead of calling ``SimpleEngine.popen_uci`` themselves:
+
+    with borrow_engine(engine_path) as eng:
+        info = eng.analyse(board, chess.engine.Limit(depth=14))
+
+Engines are keyed by engine path. A borrowed engine is exclusive to the
+caller until the ``with`` block exits. Engines that crash (or raise an
+``EngineError``) are discarded and transparently respawned on the next borrow.
+
+Work that may be abandoned mid-way (e.g. candidate tagging past a deadline)
+runs inside ``cancel_borrows(stop_event)``: once the event is set, every
+further borrow on that thread raises ``BorrowCancelled`` instead of taking (or
+waiting for) an engine, so the work stops at its next engine call.
+
+Environment variables:
+- ENGINE_POOL_ENABLED: Set to "0" to spawn a fresh engine per borrow (default: "1")
+- ENGINE_POOL_SIZE: Max pooled engines per engine path (default: 2)
+- ENGINE_POOL_HASH_POLICY: "reuse" keeps the transposition table warm between
+  borrows, "clear" clears it on every borrow (default: "reuse")
+- ENGINE_POOL_HEALTHCHECK_S: Ping engines idle for longer than this before
+  handing them out (default: 30)
+- ENGINE_POOL_BORROW_TIMEOUT_S: How long to wait for a busy pool before
+  spawning a transient overflow engine (default: 10)
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+
+import chess.engine
+
+logger = logging.getLogger(__name__)
+
+HASH_POLICY_REUSE = "reuse"
+HASH_POLICY_CLEAR = "clear"
+HASH_POLICIES = (HASH_POLICY_REUSE, HASH_POLICY_CLEAR)
+
+# How often a borrow waiting on a busy pool re-checks its cancel_borrows event.
+_CANCEL_POLL_S = 0.05
+
+
+class BorrowCancelled(RuntimeError):
+    """Raised by a borrow whose ``cancel_borrows`` event has been set."""
+
+
+_SCOPE = threading.local()
+
+
+def current_cancel_event() -> Optional[threading.Event]:
+    """Return the event of the innermost ``cancel_borrows`` on this thread."""
+    return getattr(_SCOPE, "event", None)
+
+
+@contextmanager
+def cancel_borrows(stop_event: Optional[threading.Event]) -> Iterator[None]:
+    """Make borrows on this thread raise ``BorrowCancelled`` once *stop_event* is set."""
+    previous = current_cancel_event()
+    _SCOPE.event = stop_event if stop_event is not None else previous
+    try:
+        yield
+    finally:
+        _SCOPE.event = previous
+
+
+def _check_cancelled(stop_event: Optional[threading.Event]) -> None:
+    if stop_event is not None and stop_event.is_set():
+        raise BorrowCancelled("Engine borrow cancelled.")
+
+
+@dataclass(frozen=True)
+class EnginePoolConfig:
+    """Sizing and lifecycle policy for an :class:`EnginePool`."""
+
+    enabled: bool = True
+    size: int = 2
+    hash_policy: str = HASH_POLICY_REUSE
+    healthcheck_idle_s: float = 30.0
+    borrow_timeout_s: float = 10.0
+
+    @classmethod
+    def from_env(cls) -> "EnginePoolConfig":
+        enabled = os.getenv("ENGINE_POOL_ENABLED", "1").lower() not in ("0", "false", "no")
+        size = max(1, int(os.getenv("ENGINE_POOL_SIZE", str(cls.size))))
+        hash_policy = os.getenv("ENGINE_POOL_HASH_POLICY", cls.hash_policy).lower()
+        if hash_policy not in HASH_POLICIES:
+            hash_policy = cls.hash_policy  # fallback
+        healthcheck_idle_s = float(os.getenv("ENGINE_POOL_HEALTHCHECK_S", str(cls.healthcheck_idle_s)))
+        borrow_timeout_s = float(os.getenv("ENGINE_POOL_BORROW_TIMEOUT_S", str(cls.borrow_timeout_s)))
+        return cls(
+            enabled=enabled,
+            size=size,
+            hash_policy=hash_policy,
+            healthcheck_idle_s=healthcheck_idle_s,
+            borrow_timeout_s=borrow_timeout_s,
+        )
+
+
+@dataclass
+class _PooledEngine:
+    engine: Any
+    stack: ExitStack
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    borrows: int = 0
+
+
+@dataclass
+class _PathSlot:
+    idle: Deque[_PooledEngine] = field(default_factory=deque)
+    live: int = 0
+
+
+def _spawn_engine(engine_path: str) -> _PooledEngine:
+    stack = ExitStack()
+    engine = stack.enter_context(chess.engine.SimpleEngine.popen_uci(engine_path))
+    return _PooledEngine(engine=engine, stack=stack)
+
+
+def _is_alive(engine: Any) -> bool:
+    returncode = getattr(engine, "returncode", None)
+    done = getattr(returncode, "done", None)
+    return not (callable(done) and done())
+
+
+class EnginePool:
+    """Thread-safe, per-engine-path pool of long-lived UCI engines."""
+
+    def __init__(
+        self,
+        config: Optional[EnginePoolConfig] = None,
+        spawn: Callable[[str], _PooledEngine] = _spawn_engine,
+    ):
+        self._cfg = config or EnginePoolConfig.from_env()
+        self._spawn = spawn
+        self._slots: Dict[str, _PathSlot] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._stats: Dict[str, int] = {
+            "borrows": 0,
+            "spawned": 0,
+            "reused": 0,
+            "respawned": 0,
+            "overflow": 0,
+            "discarded": 0,
+        }
+
+    @property
+    def config(self) -> EnginePoolConfig:
+        return self._cfg
+
+    @contextmanager
+    def borrow(self, engine_path: str) -> Iterator[Any]:
+        """Yield an engine for *engine_path* with exclusive access."""
+        _check_cancelled(current_cancel_event())
+        if not self._cfg.enabled:
+            with chess.engine.SimpleEngine.popen_uci(engine_path) as eng:
+                yield eng
+            return
+
+        entry, pooled = self._acquire(engine_path)
+        healthy = True
+        try:
+            yield entry.engine
+        except (chess.engine.EngineError, chess.engine.EngineTerminatedError):
+            healthy = False
+            raise
+        finally:
+            self._release(engine_path, entry, pooled, healthy)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return borrow/spawn counters and per-path occupancy."""
+        with self._cond:
+            snapshot: Dict[str, Any] = dict(self._stats)
+            snapshot["paths"] = {
+                path: {"live": slot.live, "idle": len(slot.idle)}
+                for path, slot in self._slots.items()
+            }
+        return snapshot
+
+    def close(self) -> None:
+        """Quit every idle engine; engines still borrowed are quit on release."""
+        with self._cond:
+            self._closed = True
+            entries = []
+            for slot in self._slots.values():
+                while slot.idle:
+                    entries.append(slot.idle.popleft())
+                    slot.live -= 1
+            self._cond.notify_all()
+        for entry in entries:
+            self._quit(entry)
+
+    # --- internals --------------------------------------------------------
+
+    def _acquire(self, engine_path: str) -> tuple[_PooledEngine, bool]:
+        deadline = time.monotonic() + self._cfg.borrow_timeout_s
+        stop_event = current_cancel_event()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Engine pool is closed.")
+            self._stats["borrows"] += 1
+            slot = self._slots.setdefault(engine_path, _PathSlot())
+            overflow = False
+            while True:
+                if slot.idle:
+                    entry = slot.idle.pop()  # LIFO keeps the warmest hash in use
+                    break
+                if slot.live < self._cfg.size:
+                    slot.live += 1
+                    entry = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    # Nested borrows or a saturated pool: never deadlock, use a one-off engine.
+                    self._stats["overflow"] += 1
+                    overflow = True
+                    break
+                if stop_event is not None:
+                    remaining = min(remaining, _CANCEL_POLL_S)
+                self._cond.wait(remaining)
+                if stop_event is not None and stop_event.is_set():
+                    # Pass on a release notification this waiter may have consumed.
+                    self._cond.notify()
+                    raise BorrowCancelled("Engine borrow cancelled.")
+
+        if overflow:
+            logger.debug("Engine pool for %s exhausted; spawning overflow engine.", engine_path)
+            return self._spawn(engine_path), False
+
+        if entry is None:
+            try:
+                entry = self._spawn(engine_path)
+            except Exception:
+                with self._cond:
+                    slot.live -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._stats["spawned"] += 1
+        else:
+            entry = self._ensure_healthy(engine_path, entry)
+            with self._cond:
+                self._stats["reused"] += 1
+
+        if self._cfg.hash_policy == HASH_POLICY_CLEAR and entry.borrows:
+            self._clear_hash(entry.engine)
+        entry.borrows += 1
+        return entry, True
+
+    def _ensure_healthy(self, engine_path: str, entry: _PooledEngine) -> _PooledEngine:
+        idle_for = time.monotonic() - entry.last_used
+        healthy = _is_alive(entry.engine)
+        if healthy and idle_for >= self._cfg.healthcheck_idle_s:
+            ping = getattr(entry.engine, "ping", None)
+            if callable(ping):
+                try:
+                    ping()
+                except Exception:
+                    healthy = False
+        if healthy:
+            return entry
+        logger.warning("Pooled engine for %s failed health check; respawning.", engine_path)
+        self._quit(entry)
+        try:
+            replacement = self._spawn(engine_path)
+        except Exception:
+            with self._cond:
+                self._slots[engine_path].live -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._stats["respawned"] += 1
+        return replacement
+
+    def _release(self, engine_path: str, entry: _PooledEngine, pooled: bool, healthy: bool) -> None:
+        if not pooled:
+            self._quit(entry)
+            return
+        healthy = healthy and _is_alive(entry.engine)
+        entry.last_used = time.monotonic()
+        with self._cond:
+            slot = self._slots[engine_path]
+            if healthy and not self._closed:
+                slot.idle.append(entry)
+                entry = None
+            else:
+                slot.live -= 1
+                self._stats["discarded"] += 1
+            self._cond.notify()
+        if entry is not None:
+            self._quit(entry)
+
+    @staticmethod
+    def _clear_hash(engine: Any) -> None:
+        options = getattr(engine, "options", None) or {}
+        if "Clear Hash" not in options:
+            return
+        try:
+            engine.configure({"Clear Hash": None})
+        except Exception:
+            logger.debug("Clear Hash failed on pooled engine.", exc_info=True)
+
+    @staticmethod
+    def _quit(entry: _PooledEngine) -> None:
+        try:
+            entry.stack.close()
+        except Exception:
+            logger.debug("Error while closing pooled engine.", exc_info=True)
+
+
+_POOL: Optional[EnginePool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_engine_pool() -> EnginePool:
+    """Return the process-wide engine pool, creating it from the environment."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = EnginePool()
+        return _POOL
+
+
+def configure_engine_pool(config: EnginePoolConfig) -> EnginePool:
+    """Replace the process-wide pool (closing the previous one) with *config*."""
+    global _POOL
+    with _POOL_LOCK:
+        previous, _POOL = _POOL, EnginePool(config)
+    if previous is not None:
+        previous.close()
+    return _POOL
+
+
+def shutdown_engine_pool() -> None:
+    """Quit all pooled engines; the next borrow starts a fresh pool."""
+    global _POOL
+    with _POOL_LOCK:
+        previous, _POOL = _POOL, None
+    if previous is not None:
+        previous.close()
+
+
+@contextmanager
+def borrow_engine(engine_path: str) -> Iterator[Any]:
+    """Borrow a warm engine for *engine_path* from the process-wide pool."""
+    with get_engine_pool().borrow(engine_path) as eng:
+        yield eng
+
+
+def _forget_pool_after_fork() -> None:
+    # Pooled engines (and their event-loop threads) belong to the parent; a
+    # forked worker must start from an empty pool instead of sharing pipes.
+    global _POOL, _POOL_LOCK
+    _POOL = None
+    _POOL_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_pool_after_fork)
+
+# SimpleEngine drives each engine from a non-daemon thread, and the interpreter
+# joins those threads *before* running atexit hooks; register ahead of the join
+# (as concurrent.futures does) so pooled engines cannot block shutdown.
+getattr(threading, "_register_atexit", atexit.register)(shutdown_engine_pool)
+
+
+__all__ = [
+    "BorrowCancelled",
+    "EnginePool",
+    "EnginePoolConfig",
+    "HASH_POLICY_CLEAR",
+    "HASH_POLICY_REUSE",
+    "borrow_engine",
+    "cancel_borrows",
+    "configure_engine_pool",
+    "current_cancel_event",
+    "get_engine_pool",
+    "shutdown_engine_pool",
+]
@@ -1,14 +1,25 @@
+"""
+Plan-drop probe: how much the played move disrupted the opponent's plans.
+
+The opponent's MultiPV plans are searched before (with a null move) and after
+the move on one engine borrowed from ``engine_utils.pool``, and through
+``engine_utils.analysis_cache``, so repeated positions are served from the
+shared cache (persisted across runs and workers when ENGINE_CACHE_PATH is
+set) instead of a fresh Stockfish per search.
+"""
 import math
 import random
 import statistics
 import time
 from dataclasses import dataclass
-from functools import lru_cache
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import chess
 import chess.engine
 
+from engine_utils.analysis_cache import cached_analyse
+from engine_utils.pool import borrow_engine
+
 
 @dataclass(frozen=True)
 class PlanDropResult:
@@ -28,12 +39,9 @@ class PlanDropResult:
 PlanList = List[Tuple[str, int]]
 
 
-@lru_cache(maxsize=512)
-def _cached_plans(engine_path: str, fen: str, depth: int, multipv: int) -> PlanList:
-    board = chess.Board(fen)
+def _cached_plans(engine: Any, engine_path: str, board: chess.Board, depth: int, multipv: int) -> PlanList:
     try:
-        with chess.engine.SimpleEngine.popen_uci(engine_path) as engine:
-            info = engine.analyse(board, chess.engine.Limit(depth=depth), multipv=multipv)
+        info = cached_analyse(engine, engine_path, board, depth, multipv=multipv)
     except Exception:
         return []
 
@@ -57,6 +65,27 @@ def _cached_plans(engine_path: str, fen: str, depth: int, multipv: int) -> PlanL
     return plans
 
 
+def sample_plan_drop(sample_rate: float) -> bool:
+    """Draw whether a plan-drop probe is run (always when *sample_rate* >= 1)."""
+    return sample_rate >= 1.0 or random.random() <= sample_rate
+
+
+def plan_probe_boards(
+    board_before: chess.Board, board_after: chess.Board
+) -> Optional[Tuple[chess.Board, chess.Board]]:
+    """The (null-move baseline, after) positions whose plans are compared, or None if not comparable."""
+    if board_before.is_check():
+        return None
+    baseline = board_before.copy(stack=False)
+    try:
+        baseline.push(chess.Move.null())
+    except ValueError:
+        return None
+    if baseline.turn != board_after.turn:
+        return None
+    return baseline, board_after
+
+
 def detect_prophylaxis_plan_drop(
     engine_path: str,
     board_before: chess.Board,
@@ -67,15 +96,23 @@ def detect_prophylaxis_plan_drop(
     sample_rate: float,
     variance_cap: float,
     runtime_cap_ms: float,
+    sampled: Optional[bool] = None,
 ) -> Optional[PlanDropResult]:
-    """Measure how much the played move disrupted the opponent's plans."""
+    """
+    Measure how much the played move disrupted the opponent's plans.
+
+    *sampled* is a sampling decision already drawn with ``sample_plan_drop``;
+    when None it is drawn here from *sample_rate*.
+    """
     if depth <= 0 or multipv <= 1:
         return None
 
     if board_before.is_check():
         return None
 
-    if sample_rate < 1.0 and random.random() > sample_rate:
+    if sampled is None:
+        sampled = sample_plan_drop(sample_rate)
+    if not sampled:
         return PlanDropResult(
             psi=0.0,
             pei=0.0,
@@ -90,24 +127,23 @@ def detect_prophylaxis_plan_drop(
             variance_after=0.0,
         )
 
-    baseline = board_before.copy(stack=False)
-    try:
-        baseline.push(chess.Move.null())
-    except ValueError:
+    boards = plan_probe_boards(board_before, board_after)
+    if boards is None:
         return None
-    if baseline.turn == board_after.turn:
-        before_plans = _cached_plans(engine_path, baseline.fen(), depth, multipv)
-    else:
-        before_plans = []
+    baseline, after = boards
 
-    if not before_plans:
+    try:
+        with borrow_engine(engine_path) as engine:
+            before_plans = _cached_plans(engine, engine_path, baseline, depth, multipv)
+            if not before_plans:
+                return None
+            start = time.perf_counter()
+            after_plans = _cached_plans(engine, engine_path, after, depth, multipv)
+            runtime_ms = (time.perf_counter() - start) * 1000.0
+    except Exception:
         return None
-
-    start = time.perf_counter()
-    after_plans = _cached_plans(engine_path, board_after.fen(), depth, multipv)
     if not after_plans:
         return None
-    runtime_ms = (time.perf_counter() - start) * 1000.0
 
     mean_before = sum(score for _, score in before_plans) / len(before_plans)
     mean_after = sum(score for _, score in after_plans) / len(after_plans)
@@ -138,7 +174,6 @@ def detect_prophylaxis_plan_drop(
         reasons.append("runtime_cap")
     if variance_before > variance_cap * 10000 or variance_after > variance_cap * 10000:
         reasons.append("variance_cap")
-    sampled = True
 
     combined = 0.7 * pei + 0.3 * plan_loss
     psi = 1.0 / (1.0 + math.exp(-combined / 0.4))
@@ -2,7 +2,7 @@
 Next-generation rule tagger pipeline with staged architecture.
 """
 
-from .core.facade import tag_position
+from .core.facade import tag_position, tag_position_batch
 from .pipeline.runner import TaggingPipeline, run_pipeline
 from .models.pipeline import FinalResult, FeatureBundle, ModeDecision, TagBundle
 
@@ -14,4 +14,5 @@ __all__ = [
     "ModeDecision",
     "TagBundle",
     "tag_position",
+    "tag_position_batch",
 ]
@@ -355,6 +355,23 @@ def print_config_snapshot(
     print("\n" + "=" * 80)
 
 
+def config_fingerprint() -> str:
+    """
+    Short hash identifying the active tagger configuration.
+
+    Combines the snapshot hash (thresholds, YAML overrides, CONTROL config)
+    with the CONTROL_/TENSION_/USE_NEW_ environment switches, so result
+    caches keyed on it are invalidated whenever a threshold changes.
+    """
+    snapshot = build_config_snapshot(include_hash=True, include_env=True)
+    metadata = snapshot["_metadata"]
+    payload = json.dumps(
+        {"config": metadata["hash"], "env": metadata.get("env_vars", {})},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
 if __name__ == "__main__":
     # When run as a script, print the full config snapshot
     snapshot = build_config_snapshot()
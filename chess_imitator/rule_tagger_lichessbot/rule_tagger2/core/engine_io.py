@@ -3,15 +3,19 @@ Engine interface abstractions for the v2 rule tagger core.
 """
 from __future__ import annotations
 
-from typing import Any, Dict, List, Protocol, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Protocol, Sequence, Tuple
 
 import chess
 import chess.engine
 
 from chess_evaluator import ChessEvaluator, pov
+from engine_utils.analysis_cache import cached_analyse
+from engine_utils.pool import borrow_engine, cancel_borrows, current_cancel_event, get_engine_pool
 
 from rule_tagger2.legacy.config import STYLE_COMPONENT_KEYS
 from ..models import Candidate
+from rule_tagger2.legacy.contact import contact_profile
 from rule_tagger2.legacy.move_utils import classify_move
 
 
@@ -97,7 +101,7 @@ class StockfishEngine(EngineClient):
         List[Dict[str, float]],
         List[Dict[str, float]],
     ]:
-        with chess.engine.SimpleEngine.popen_uci(self._engine_path) as engine:
+        with borrow_engine(self._engine_path) as engine:
             return simulate_followup_metrics(
                 engine,
                 board,
@@ -109,24 +113,6 @@ class StockfishEngine(EngineClient):
 
 # --- Helpers migrated from the frozen rule_tagger v1 implementation -------
 
-def contact_profile(board: chess.Board) -> Tuple[float, int, int, int]:
-    total_moves = 0
-    capture_moves = 0
-    checking_moves = 0
-    for mv in board.legal_moves:
-        total_moves += 1
-        if board.is_capture(mv):
-            capture_moves += 1
-        else:
-            board.push(mv)
-            if board.is_check():
-                checking_moves += 1
-            board.pop()
-    contact_moves = capture_moves + checking_moves
-    ratio = (contact_moves / total_moves) if total_moves else 0.0
-    return ratio, total_moves, capture_moves, checking_moves
-
-
 def material_balance(board: chess.Board, actor: chess.Color) -> float:
     piece_values = {
         chess.PAWN: 1.0,
@@ -162,16 +148,16 @@ def analyse_candidates(
 ) -> Tuple[List[Candidate], int, Dict[str, Any]]:
     contact_ratio, total_moves, capture_count, checking_count = contact_profile(board)
 
-    with chess.engine.SimpleEngine.popen_uci(engine_path) as eng:
+    with borrow_engine(engine_path) as eng:
         low_cp = None
         low_score = None
         if depth_low and depth_low < depth:
-            low_info = eng.analyse(board, chess.engine.Limit(depth=depth_low), multipv=1)
+            low_info = cached_analyse(eng, engine_path, board, depth_low, multipv=1, exact_depth=True)
             low_root = low_info[0] if isinstance(low_info, list) else low_info
             low_score = low_root["score"].pov(board.turn)
             low_cp = low_score.score(mate_score=10000)
 
-        root = eng.analyse(board, chess.engine.Limit(depth=depth), multipv=max(1, multipv))
+        root = cached_analyse(eng, engine_path, board, depth, multipv=max(1, multipv))
         root1 = root[0]
         root_score = root1["score"].pov(board.turn)
         eval_before_cp = root_score.score(mate_score=10000)
@@ -180,7 +166,7 @@ def analyse_candidates(
         high_score = None
         depth_high = max(depth + 4, depth + 2)
         if depth_high > depth:
-            high_info = eng.analyse(board, chess.engine.Limit(depth=depth_high), multipv=1)
+            high_info = cached_analyse(eng, engine_path, board, depth_high, multipv=1, exact_depth=True)
             high_root = high_info[0] if isinstance(high_info, list) else high_info
             high_score = high_root["score"].pov(board.turn)
             high_cp = high_score.score(mate_score=10000)
@@ -191,7 +177,7 @@ def analyse_candidates(
                 continue
             mv = line["pv"][0]
             sc = line["score"].pov(board.turn).score(mate_score=10000)
-            cands.append(Candidate(move=mv, score_cp=sc, kind=classify_move(board, mv)))
+            cands.append(Candidate(move=mv, score_cp=sc, kind=classify_move(board, mv), pv=tuple(line["pv"])))
 
     cands.sort(key=lambda c: c.score_cp, reverse=True)
     score_gap_cp = cands[0].score_cp - cands[1].score_cp if len(cands) > 1 else 0
@@ -233,10 +219,10 @@ def eval_specific_move(
     move: chess.Move,
     depth: int = 14,
 ) -> int:
-    with chess.engine.SimpleEngine.popen_uci(engine_path) as eng:
+    with borrow_engine(engine_path) as eng:
         board = board.copy(stack=False)
         board.push(move)
-        info = eng.analyse(board, chess.engine.Limit(depth=depth), multipv=1)
+        info = cached_analyse(eng, engine_path, board, depth, multipv=1)
         root = info[0] if isinstance(info, list) else info
         return root["score"].pov(not board.turn).score(mate_score=10000)
 
@@ -244,8 +230,11 @@ def eval_specific_move(
 def evaluation_and_metrics(
     board: chess.Board,
     actor: chess.Color,
+    detail: bool = True,
 ) -> Tuple[Dict[str, float], Dict[str, float], Dict[str, Any]]:
-    evaluation = ChessEvaluator(board).evaluate()
+    """Style metrics from ``actor``'s view; ``detail=False`` returns only the components as evaluation."""
+    evaluator = ChessEvaluator(board)
+    evaluation = evaluator.evaluate() if detail else {"components": evaluator.components()}
     comps = evaluation["components"]
     metrics = {key: round(pov(comps[key], actor), 3) for key in STYLE_COMPONENT_KEYS}
     opp_metrics = {key: round(-metrics[key], 3) for key in STYLE_COMPONENT_KEYS}
@@ -256,30 +245,99 @@ def metrics_delta(lhs: Dict[str, float], rhs: Dict[str, float]) -> Dict[str, flo
     return {key: round(rhs.get(key, 0.0) - lhs.get(key, 0.0), 3) for key in STYLE_COMPONENT_KEYS}
 
 
+FollowupMetrics = Tuple[Dict[str, float], Dict[str, float], List[Dict[str, float]], List[Dict[str, float]]]
+
+
+def followup_pv_covers(board: chess.Board, pv: Sequence[chess.Move], steps: int) -> bool:
+    """True if *pv* supplies every follow-up ply (or reaches game over) from *board*."""
+    future_board = board.copy(stack=False)
+    for move in list(pv)[:steps]:
+        if future_board.is_game_over() or not future_board.is_legal(move):
+            return future_board.is_game_over()
+        future_board.push(move)
+    return len(pv) >= steps or future_board.is_game_over()
+
+
 def simulate_followup_metrics(
-    engine: chess.engine.SimpleEngine,
+    engine: Optional[chess.engine.SimpleEngine],
     board: chess.Board,
     actor: chess.Color,
     steps: int = 3,
     depth: int = 6,
-) -> Tuple[Dict[str, float], Dict[str, float], List[Dict[str, float]], List[Dict[str, float]]]:
+    pv: Sequence[chess.Move] = (),
+) -> FollowupMetrics:
+    """
+    Metrics of *board* and after each of the next *steps* plies.
+
+    Plies come from *pv* (typically the rest of a MultiPV line) while its
+    moves stay legal and from ``engine.play`` after that; *engine* may be
+    None when ``followup_pv_covers`` holds.
+    """
     future_board = board.copy(stack=False)
-    base_metrics, base_opp_metrics, _ = evaluation_and_metrics(future_board, actor)
+    base_metrics, base_opp_metrics, _ = evaluation_and_metrics(future_board, actor, detail=False)
     metrics_seq: List[Dict[str, float]] = []
     opp_seq: List[Dict[str, float]] = []
+    pending = list(pv)
     for _ in range(steps):
         if future_board.is_game_over():
             break
-        result = engine.play(future_board, chess.engine.Limit(depth=depth))
-        if result.move is None:
+        move = pending.pop(0) if pending else None
+        if move is None or not future_board.is_legal(move):
+            pending = []
+            if engine is None:
+                raise ValueError("simulate_followup_metrics needs an engine once the PV runs out.")
+            result = engine.play(future_board, chess.engine.Limit(depth=depth))
+            move = result.move
+        if move is None:
             break
-        future_board.push(result.move)
-        metrics, opp_metrics, _ = evaluation_and_metrics(future_board, actor)
+        future_board.push(move)
+        metrics, opp_metrics, _ = evaluation_and_metrics(future_board, actor, detail=False)
         metrics_seq.append(metrics)
         opp_seq.append(opp_metrics)
     return base_metrics, base_opp_metrics, metrics_seq, opp_seq
 
 
+def simulate_followups(
+    engine_path: str,
+    jobs: Sequence[Tuple[chess.Board, Sequence[chess.Move]]],
+    actor: chess.Color,
+    steps: int = 3,
+    depth: int = 6,
+) -> List[FollowupMetrics]:
+    """
+    ``simulate_followup_metrics`` for several ``(board, pv)`` jobs.
+
+    Jobs whose PV covers every ply need no engine and run inline; the rest
+    run concurrently, each on its own engine borrowed from the pool (at most
+    the pool size at a time). Results are in job order.
+    """
+    results: List[Optional[FollowupMetrics]] = [None] * len(jobs)
+    engine_jobs: List[int] = []
+    for index, (board, pv) in enumerate(jobs):
+        if followup_pv_covers(board, pv, steps):
+            results[index] = simulate_followup_metrics(None, board, actor, steps=steps, depth=depth, pv=pv)
+        else:
+            engine_jobs.append(index)
+
+    # Worker threads honour the caller's cancel_borrows scope.
+    stop_event = current_cancel_event()
+
+    def run(index: int) -> FollowupMetrics:
+        board, pv = jobs[index]
+        with cancel_borrows(stop_event), borrow_engine(engine_path) as engine:
+            return simulate_followup_metrics(engine, board, actor, steps=steps, depth=depth, pv=pv)
+
+    workers = min(len(engine_jobs), get_engine_pool().config.size)
+    if workers <= 1:
+        for index in engine_jobs:
+            results[index] = run(index)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for index, outcome in zip(engine_jobs, executor.map(run, engine_jobs)):
+                results[index] = outcome
+    return results  # type: ignore[return-value]
+
+
 def estimate_phase_ratio(board: chess.Board) -> float:
     phase_weights = {
         chess.PAWN: 0,
@@ -307,7 +365,9 @@ __all__ = [
     "eval_specific_move",
     "evaluation_and_metrics",
     "estimate_phase_ratio",
+    "followup_pv_covers",
     "material_balance",
     "metrics_delta",
     "simulate_followup_metrics",
+    "simulate_followups",
 ]
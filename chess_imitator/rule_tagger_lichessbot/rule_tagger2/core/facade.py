@@ -16,13 +16,21 @@ Example:
     NEW_PIPELINE=0 python script.py
     # or
     result = tag_position(engine_path, fen, move_uci, use_new=False)
+
+    # Tag several candidates of one position, analysing the root once
+    results = tag_position_batch(engine_path, fen, ["e2e4", "d2d4"])
 """
 from __future__ import annotations
 
 import os
-from typing import Any, Optional
+import threading
+from typing import Any, List, Optional
+
+from engine_utils.pool import cancel_borrows
 
+from ..legacy.core import prepare_root
 from ..legacy.core import tag_position as _legacy_tag_position
+from ..legacy.root_analysis import RootAnalysis
 
 
 def _use_new_pipeline() -> bool:
@@ -45,6 +53,8 @@ def tag_position(
     cp_threshold: int = 100,
     small_drop_cp: int = 30,
     use_new: Optional[bool] = None,
+    root: Optional[RootAnalysis] = None,
+    stop_event: Optional[threading.Event] = None,
 ) -> Any:
     """
     Execute the tagging pipeline with new detector support by default.
@@ -63,6 +73,10 @@ def tag_position(
         small_drop_cp: Small eval drop threshold
         use_new: If None (default), consult NEW_PIPELINE env var;
                  if True, force new pipeline; if False, force legacy
+        root: Optional shared root analysis of the same FEN/depth/multipv
+              (see tag_position_batch)
+        stop_event: Optional event; once set, the next engine borrow raises
+                    engine_utils.pool.BorrowCancelled and tagging stops
 
     Returns:
         TagResult object with tags, notes, and analysis context
@@ -75,6 +89,31 @@ def tag_position(
         # Explicit True or False: honor caller's choice
         should_use_new = use_new
 
+    with cancel_borrows(stop_event):
+        return _tag_position(
+            engine_path,
+            fen,
+            played_move_uci,
+            depth=depth,
+            multipv=multipv,
+            cp_threshold=cp_threshold,
+            small_drop_cp=small_drop_cp,
+            should_use_new=should_use_new,
+            root=root,
+        )
+
+
+def _tag_position(
+    engine_path: str,
+    fen: str,
+    played_move_uci: str,
+    depth: int,
+    multipv: int,
+    cp_threshold: int,
+    small_drop_cp: int,
+    should_use_new: bool,
+    root: Optional[RootAnalysis],
+) -> Any:
     if should_use_new:
         # Import here to avoid circular dependency
         from ..orchestration.pipeline import run_pipeline
@@ -87,6 +126,7 @@ def tag_position(
             multipv=multipv,
             cp_threshold=cp_threshold,
             small_drop_cp=small_drop_cp,
+            root=root,
             use_legacy=False,  # Use new detectors
         )
 
@@ -106,6 +146,7 @@ def tag_position(
             multipv=multipv,
             cp_threshold=cp_threshold,
             small_drop_cp=small_drop_cp,
+            root=root,
         )
 
         # Mark result as coming from legacy
@@ -117,3 +158,40 @@ def tag_position(
             engine_meta["__maneuver_v2__"] = True
 
     return result
+
+
+def tag_position_batch(
+    engine_path: str,
+    fen: str,
+    played_moves_uci: List[str],
+    depth: int = 14,
+    multipv: int = 6,
+    cp_threshold: int = 100,
+    small_drop_cp: int = 30,
+    use_new: Optional[bool] = None,
+) -> List[Any]:
+    """
+    Tag several candidate moves of the same position.
+
+    The root-position work (MultiPV search, root evaluation, contact profile,
+    "before"/best-move follow-ups) runs once and is shared by every move;
+    each result is identical to the corresponding tag_position call.
+
+    Returns:
+        TagResult objects in the order of played_moves_uci
+    """
+    root = prepare_root(engine_path, fen, depth=depth, multipv=multipv)
+    return [
+        tag_position(
+            engine_path,
+            fen,
+            move_uci,
+            depth=depth,
+            multipv=multipv,
+            cp_threshold=cp_threshold,
+            small_drop_cp=small_drop_cp,
+            use_new=use_new,
+            root=root,
+        )
+        for move_uci in played_moves_uci
+    ]
@@ -24,6 +24,7 @@ from typing import Dict, List, Optional
 import chess
 import chess.engine
 
+from engine_utils.pool import borrow_engine
 from rule_tagger2.detectors.base import DetectorMetadata, TagDetector
 from rule_tagger2.orchestration.context import AnalysisContext
 
@@ -173,7 +174,7 @@ class FailedProphylacticDetector(TagDetector):
         failing_move = None
 
         try:
-            with chess.engine.SimpleEngine.popen_uci(context.engine_path) as eng:
+            with borrow_engine(context.engine_path) as eng:
                 # Get opponent's top-N candidate moves
                 result = eng.analyse(
                     board_after,
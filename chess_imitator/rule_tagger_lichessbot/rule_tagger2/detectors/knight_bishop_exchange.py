@@ -30,6 +30,7 @@ from typing import Dict, List, Optional, Tuple
 import chess
 import chess.engine
 
+from engine_utils.pool import borrow_engine
 from rule_tagger2.detectors.base import DetectorMetadata, TagDetector
 from rule_tagger2.orchestration.context import AnalysisContext
 
@@ -323,7 +324,7 @@ class KnightBishopExchangeDetector(TagDetector):
             return True, 1, []
 
         try:
-            with chess.engine.SimpleEngine.popen_uci(context.engine_path) as eng:
+            with borrow_engine(context.engine_path) as eng:
                 result = eng.analyse(
                     board_after,
                     chess.engine.Limit(depth=self._depth),
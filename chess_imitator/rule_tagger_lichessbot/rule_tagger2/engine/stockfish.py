@@ -8,6 +8,8 @@ from typing import Dict, List, Tuple
 
 import chess
 
+from engine_utils.pool import borrow_engine
+
 from ..legacy.engine import analyse_candidates, eval_specific_move, simulate_followup_metrics
 from ..models import Candidate, EngineCandidates, EngineMove
 from .protocol import EngineClient
@@ -80,7 +82,7 @@ class StockfishEngineClient(EngineClient):
         List[Dict[str, float]],
     ]:
         board = chess.Board(fen)
-        with chess.engine.SimpleEngine.popen_uci(self._cfg.engine_path) as eng:
+        with borrow_engine(self._cfg.engine_path) as eng:
             return simulate_followup_metrics(
                 eng,
                 board,
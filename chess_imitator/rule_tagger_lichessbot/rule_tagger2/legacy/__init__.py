@@ -27,6 +27,7 @@ from .core import (  # noqa: F401
     apply_tactical_gating,
     parse_move,
     tag_position,
+    tag_position_batch,
 )
 from .engine import (  # noqa: F401
     analyse_candidates,
@@ -65,4 +66,5 @@ __all__ = [
     "main",
     "parse_move",
     "tag_position",
+    "tag_position_batch",
 ]
@@ -0,0 +1,139 @@
+"""
+Contact statistics of a position: how many legal moves capture or give check.
+
+``contact_profile`` walks the legal moves without pushing them; captures and
+checks are read off bitboards.  A move checks if the moved (or promoted)
+piece attacks the king from its target square with the origin vacated, if it
+was the only blocker between one of our sliders and the king (discovered
+check), or, in the turn-flipped probes of ``control_helpers``, if it leaves an
+existing check unblocked.  Only castling, which moves two pieces, falls back
+to ``board.gives_check``.
+
+Results can be memoized per Zobrist key for the duration of a ``with
+contact_memo():`` block (``tag_position_batch`` wraps a whole batch in one),
+since the same before/played/best boards are profiled repeatedly.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Tuple
+
+import chess
+import chess.polyglot
+
+ContactProfile = Tuple[float, int, int, int]
+
+_MEMO: ContextVar[Optional[Dict[int, ContactProfile]]] = ContextVar("contact_profile_memo", default=None)
+
+
+@contextmanager
+def contact_memo() -> Iterator[Dict[int, ContactProfile]]:
+    """Memoize ``contact_profile`` per Zobrist key inside the block (nested blocks share the outer memo)."""
+    memo = _MEMO.get()
+    if memo is not None:
+        yield memo
+        return
+    memo = {}
+    token = _MEMO.set(memo)
+    try:
+        yield memo
+    finally:
+        _MEMO.reset(token)
+
+
+def _slider_attacks(piece_type: chess.PieceType, square: chess.Square, occupied: int) -> int:
+    attacks = 0
+    if piece_type in (chess.BISHOP, chess.QUEEN):
+        attacks |= chess.BB_DIAG_ATTACKS[square][chess.BB_DIAG_MASKS[square] & occupied]
+    if piece_type in (chess.ROOK, chess.QUEEN):
+        attacks |= (
+            chess.BB_RANK_ATTACKS[square][chess.BB_RANK_MASKS[square] & occupied]
+            | chess.BB_FILE_ATTACKS[square][chess.BB_FILE_MASKS[square] & occupied]
+        )
+    return attacks
+
+
+def _discovery_lines(board: chess.Board, us: chess.Color, king: chess.Square) -> Dict[chess.Square, int]:
+    """Our pieces that alone block one of our sliders from *king*, mapped to the blocked line(s)."""
+    ours = board.occupied_co[us]
+    rook_like = (board.rooks | board.queens) & ours
+    bishop_like = (board.bishops | board.queens) & ours
+    snipers = (chess.BB_RANK_ATTACKS[king][0] | chess.BB_FILE_ATTACKS[king][0]) & rook_like
+    snipers |= chess.BB_DIAG_ATTACKS[king][0] & bishop_like
+    lines: Dict[chess.Square, int] = {}
+    for sniper in chess.scan_forward(snipers):
+        between = chess.between(king, sniper)
+        blockers = between & board.occupied
+        if blockers and not blockers & (blockers - 1) and blockers & ours:
+            blocker = chess.lsb(blockers)
+            lines[blocker] = lines.get(blocker, 0) | between
+    return lines
+
+
+def _profile(board: chess.Board) -> ContactProfile:
+    us = board.turn
+    king = board.king(not us)
+    king_bb = chess.BB_SQUARES[king] if king is not None else 0
+    discoveries = _discovery_lines(board, us, king) if king is not None else {}
+    # Pieces already giving check (only possible when the turn was flipped), with the squares that block them.
+    checkers = [
+        (chess.BB_SQUARES[checker], chess.between(king, checker))
+        for checker in chess.scan_forward(board.attackers_mask(us, king) if king is not None else 0)
+    ]
+    occupied = board.occupied
+    theirs = board.occupied_co[not us]
+    ep_square = board.ep_square
+
+    total_moves = 0
+    capture_moves = 0
+    checking_moves = 0
+    for move in board.generate_legal_moves():
+        total_moves += 1
+        from_sq, to_sq = move.from_square, move.to_square
+        from_bb, to_bb = chess.BB_SQUARES[from_sq], chess.BB_SQUARES[to_sq]
+        if to_bb & theirs or (to_sq == ep_square and from_bb & board.pawns):
+            capture_moves += 1
+            continue
+        if not king_bb:
+            continue
+        if board.is_castling(move):
+            checking_moves += board.gives_check(move)
+            continue
+        if any(not checker & from_bb and not blocks & to_bb for checker, blocks in checkers):
+            checking_moves += 1
+            continue
+        line = discoveries.get(from_sq)
+        if line is not None and not line & to_bb:
+            checking_moves += 1
+            continue
+        piece_type = move.promotion or board.piece_type_at(from_sq)
+        if piece_type == chess.KNIGHT:
+            gives_check = bool(chess.BB_KNIGHT_ATTACKS[to_sq] & king_bb)
+        elif piece_type == chess.PAWN:
+            gives_check = bool(chess.BB_PAWN_ATTACKS[us][to_sq] & king_bb)
+        elif piece_type == chess.KING:
+            gives_check = False
+        else:
+            after = (occupied & ~from_bb) | to_bb
+            gives_check = bool(_slider_attacks(piece_type, to_sq, after) & king_bb)
+        checking_moves += gives_check
+
+    contact_moves = capture_moves + checking_moves
+    ratio = (contact_moves / total_moves) if total_moves else 0.0
+    return ratio, total_moves, capture_moves, checking_moves
+
+
+def contact_profile(board: chess.Board) -> ContactProfile:
+    """Return ``(contact ratio, legal moves, capturing moves, non-capturing checking moves)``."""
+    memo = _MEMO.get()
+    if memo is None:
+        return _profile(board)
+    key = chess.polyglot.zobrist_hash(board)
+    cached = memo.get(key)
+    if cached is None:
+        cached = memo[key] = _profile(board)
+    return cached
+
+
+__all__ = ["contact_memo", "contact_profile"]
@@ -4,7 +4,7 @@ import chess
 import chess.engine
 from typing import Any, Dict, List, Optional, Set, Tuple
 
-from engine_utils.prophylaxis import detect_prophylaxis_plan_drop, PlanDropResult
+from engine_utils.prophylaxis import detect_prophylaxis_plan_drop, PlanDropResult, sample_plan_drop
 from rule_tagger2.legacy.prophylaxis import (
     ProphylaxisConfig,
     classify_prophylaxis_quality,
@@ -12,6 +12,7 @@ from rule_tagger2.legacy.prophylaxis import (
     estimate_opponent_threat,
     is_full_material,
     is_prophylaxis_candidate,
+    prefetch_prophylaxis_probes,
     prophylaxis_pattern_reason,
 )
 
@@ -52,8 +53,8 @@ from .config import (
     TENSION_SYMMETRY_TOL,
     NEUTRAL_TENSION_BAND,
 )
+from rule_tagger2.legacy.contact import contact_memo
 from rule_tagger2.core.engine_io import (
-    analyse_candidates,
     contact_profile,
     defended_square_count,
     eval_specific_move,
@@ -61,7 +62,6 @@ from rule_tagger2.core.engine_io import (
     estimate_phase_ratio,
     material_balance,
     metrics_delta,
-    simulate_followup_metrics,
 )
 from .analysis import (
     _soft_gate_weight,
@@ -77,7 +77,9 @@ from .analysis import (
     is_attacking_pawn_push,
     open_file_score,
 )
+from .feature_graph import FeatureGraph
 from .models import Candidate, StyleTracker, TagResult
+from .root_analysis import FOLLOWUP_STEPS, RootAnalysis, analyse_root
 from .move_utils import classify_move, parse_move, is_dynamic, is_quiet
 from ..detectors.control import detect_control_patterns
 
@@ -249,8 +251,21 @@ def tag_position(
     depth: int = 14,
     multipv: int = 6,
     cp_threshold: int = 100,
-    small_drop_cp: int = 30
+    small_drop_cp: int = 30,
+    root: Optional[RootAnalysis] = None,
 ) -> TagResult:
+    """
+    Tag *played_move_uci* in *fen*.
+
+    ``root`` is an optional ``analyse_root`` snapshot of the same FEN, depth
+    and MultiPV (see ``tag_position_batch``); it is computed here when absent.
+    The v8 path used when control tagging is disabled ignores it.
+
+    Per-move engine probes and the heavier static features are declared on a
+    ``FeatureGraph`` and only computed when the tagging logic reads them, so
+    gated-off probes cost nothing; their cost is reported by
+    ``feature_graph.feature_cost_report()``.
+    """
     control_cfg, control_enabled, control_strict = _resolve_control_config()
     if not control_enabled:
         return legacy_tag_position_v8(
@@ -262,18 +277,75 @@ def tag_position(
             cp_threshold=cp_threshold,
             small_drop_cp=small_drop_cp,
         )
+    if root is None:
+        root = analyse_root(engine_path, fen, depth=depth, multipv=multipv)
+    elif not root.matches(fen, depth, multipv):
+        raise ValueError(
+            f"Root analysis was computed for {root.fen!r} (depth={root.depth}, multipv={root.multipv}), "
+            f"not {fen!r} (depth={depth}, multipv={multipv})."
+        )
     board = chess.Board(fen)
-    actor = board.turn
-    metrics_before, opp_metrics_before, evaluation_before = evaluation_and_metrics(board, actor)
-    coverage_before = defended_square_count(board, actor)
+    actor = root.actor
+    metrics_before = deepcopy(root.metrics_before)
+    opp_metrics_before = deepcopy(root.opp_metrics_before)
+    evaluation_before = deepcopy(root.evaluation_before)
+    coverage_before = root.coverage_before
     played_move = parse_move(board, played_move_uci)
     is_capture_played = board.is_capture(played_move)
+    played_board = board.copy(stack=False)
+    played_board.push(played_move)
 
-    candidates, eval_before_cp, analysis_meta = analyse_candidates(
-        engine_path, board, depth=depth, multipv=multipv
+    features = FeatureGraph()
+    features.define("played_score_cp", lambda: eval_specific_move(engine_path, board, played_move, depth=depth))
+    features.define("evaluation_played", lambda: evaluation_and_metrics(played_board, actor))
+    features.define("contact_played", lambda: contact_profile(played_board))
+    features.define("followup_played", lambda: deepcopy(root.followup_played(engine_path, played_move)))
+    features.define("passed_push_before", lambda: _count_passed_push_targets(board, not actor))
+    features.define("passed_push_after", lambda: _count_passed_push_targets(played_board, not actor))
+    features.define(
+        "threat_before",
+        lambda _probes: root.threat_before(engine_path, board, config=PROPHYLAXIS_CONFIG),
+        deps=("prophylaxis_probes",),
+    )
+    features.define(
+        "threat_after",
+        lambda _probes: estimate_opponent_threat(engine_path, played_board, actor, config=PROPHYLAXIS_CONFIG),
+        deps=("prophylaxis_probes",),
+    )
+    features.define(
+        "threat_delta",
+        lambda before, after: round(before - after, 3),
+        deps=("threat_before", "threat_after"),
+    )
+    features.define(
+        "plan_drop",
+        lambda _probes, sampled: detect_prophylaxis_plan_drop(
+            engine_path,
+            board,
+            played_board,
+            depth=PLAN_DROP_DEPTH,
+            multipv=PLAN_DROP_MULTIPV,
+            sample_rate=PLAN_DROP_SAMPLE_RATE,
+            variance_cap=PLAN_DROP_VARIANCE_CAP,
+            runtime_cap_ms=PLAN_DROP_RUNTIME_CAP_MS,
+            sampled=sampled,
+        ),
+        deps=("prophylaxis_probes", "plan_drop_sampled"),
+    )
+    features.define(
+        "file_pressure_c",
+        lambda: file_pressure(
+            board,
+            played_board,
+            actor,
+            chess.FILE_NAMES.index("c"),
+            chess.C7 if actor == chess.WHITE else chess.C2,
+        ),
     )
-    if not candidates:
-        raise RuntimeError("Engine returned no candidates.")
+
+    candidates = list(root.candidates)
+    eval_before_cp = root.eval_before_cp
+    analysis_meta = deepcopy(root.analysis_meta)
 
     # TODO[v2-prepare]: Store engine candidates for preparation detector
     analysis_meta.setdefault('engine_candidates', [])
@@ -293,7 +365,7 @@ def tag_position(
 
     played_entry: Optional[Candidate] = next((c for c in in_band if c.move == played_move), None)
     if played_entry is None:
-        played_score_cp = eval_specific_move(engine_path, board, played_move, depth=depth)
+        played_score_cp = features["played_score_cp"]
         played_kind = classify_move(board, played_move)
     else:
         played_score_cp = played_entry.score_cp
@@ -308,19 +380,19 @@ def tag_position(
 
     has_dynamic_in_band = any(c.kind == "dynamic" for c in in_band)
 
-    played_board = board.copy(stack=False)
-    played_board.push(played_move)
-    metrics_played, opp_metrics_played, evaluation_played = evaluation_and_metrics(played_board, actor)
+    metrics_played, opp_metrics_played, evaluation_played = features["evaluation_played"]
     coverage_after = defended_square_count(played_board, actor)
 
     best_board = board.copy(stack=False)
     best_board.push(best.move)
-    metrics_best, opp_metrics_best, evaluation_best = evaluation_and_metrics(best_board, actor)
-    coverage_best = defended_square_count(best_board, actor)
-
-    contact_ratio_before, _, _, _ = contact_profile(board)
-    contact_ratio_played, _, _, _ = contact_profile(played_board)
-    contact_ratio_best, _, _, _ = contact_profile(best_board)
+    metrics_best = deepcopy(root.metrics_best)
+    opp_metrics_best = deepcopy(root.opp_metrics_best)
+    evaluation_best = deepcopy(root.evaluation_best)
+    coverage_best = root.coverage_best
+
+    contact_ratio_before = root.contact_ratio_before
+    contact_ratio_played, _, _, _ = features["contact_played"]
+    contact_ratio_best = root.contact_ratio_best
     contact_delta_played = contact_ratio_played - contact_ratio_before
     contact_delta_best = contact_ratio_best - contact_ratio_before
     analysis_meta.setdefault("tension_support", {})
@@ -351,7 +423,7 @@ def tag_position(
     opp_vs_best = {key: round(-opp_component_deltas[key], 3) for key in STYLE_COMPONENT_KEYS}
     coverage_delta = coverage_after - coverage_before
 
-    followup_steps = 3
+    followup_steps = FOLLOWUP_STEPS
 
     def _compute_delta_sequence(base: Dict[str, float], sequence: List[Dict[str, float]]) -> List[Dict[str, float]]:
         deltas: List[Dict[str, float]] = []
@@ -359,16 +431,9 @@ def tag_position(
             deltas.append({key: round(metrics[key] - base[key], 3) for key in STYLE_COMPONENT_KEYS})
         return deltas
 
-    with chess.engine.SimpleEngine.popen_uci(engine_path) as follow_engine:
-        base_self_before, base_opp_before, seq_self_before, seq_opp_before = simulate_followup_metrics(
-            follow_engine, board, actor, steps=followup_steps
-        )
-        base_self_played, base_opp_played, seq_self_played, seq_opp_played = simulate_followup_metrics(
-            follow_engine, played_board, actor, steps=followup_steps
-        )
-        base_self_best, base_opp_best, seq_self_best, seq_opp_best = simulate_followup_metrics(
-            follow_engine, best_board, actor, steps=followup_steps
-        )
+    base_self_before, base_opp_before, seq_self_before, seq_opp_before = deepcopy(root.followup_before)
+    base_self_played, base_opp_played, seq_self_played, seq_opp_played = features["followup_played"]
+    base_self_best, base_opp_best, seq_self_best, seq_opp_best = deepcopy(root.followup_best)
 
     follow_self_deltas = _compute_delta_sequence(base_self_before, seq_self_played)
     follow_opp_deltas = _compute_delta_sequence(base_opp_before, seq_opp_played)
@@ -577,8 +642,8 @@ def tag_position(
     ctx["enabled"] = control_enabled
     ctx["strict_mode"] = control_strict
     ctx["config_snapshot"] = dict(config_snapshot)
-    opp_passed_push_before, blockers_before = _count_passed_push_targets(board, not actor)
-    opp_passed_push_after, blockers_after = _count_passed_push_targets(played_board, not actor)
+    opp_passed_push_before, blockers_before = features["passed_push_before"]
+    opp_passed_push_after, blockers_after = features["passed_push_after"]
     blockade_established = False
     blockade_file: Optional[str] = None
     moved_piece = board.piece_at(played_move.from_square)
@@ -737,6 +802,26 @@ def tag_position(
         and mode != "tactical"
     )
     plan_candidate = restriction_candidate or passive_candidate
+    # Threat and plan-drop probes search the same two positions: run whichever
+    # of them the gates below will read in one engine session.
+    features.define(
+        "plan_drop_sampled",
+        lambda: PLAN_DROP_ENABLED and plan_candidate and sample_plan_drop(PLAN_DROP_SAMPLE_RATE),
+    )
+    features.define(
+        "prophylaxis_probes",
+        lambda plans_sampled: prefetch_prophylaxis_probes(
+            engine_path,
+            board,
+            played_board,
+            actor,
+            config=PROPHYLAXIS_CONFIG,
+            threats=allow_positional and is_prophylaxis_candidate(board, played_move),
+            plan_depth=PLAN_DROP_DEPTH,
+            plan_multipv=PLAN_DROP_MULTIPV if plans_sampled else 0,
+        ),
+        deps=("plan_drop_sampled",),
+    )
     intent_meta = analysis_meta["intent_hint"]
     intent_meta["restriction_candidate"] = restriction_candidate
     intent_meta["passive_candidate"] = passive_candidate
@@ -985,9 +1070,9 @@ def tag_position(
             opp_mobility_change = opp_vs_best["mobility"]
             opp_tactics_change = opp_vs_best["tactics"]
 
-            threat_before = estimate_opponent_threat(engine_path, board, actor, config=PROPHYLAXIS_CONFIG)
-            threat_after = estimate_opponent_threat(engine_path, played_board, actor, config=PROPHYLAXIS_CONFIG)
-            threat_delta = round(threat_before - threat_after, 3)
+            threat_before = features["threat_before"]
+            threat_after = features["threat_after"]
+            threat_delta = features["threat_delta"]
             threat_reduced = threat_delta >= PROPHYLAXIS_CONFIG.threat_drop
 
             opp_restrained = (
@@ -1124,16 +1209,7 @@ def tag_position(
 
         plan_drop_result = None
         if PLAN_DROP_ENABLED and plan_candidate:
-            plan_drop_result = detect_prophylaxis_plan_drop(
-                engine_path,
-                board,
-                played_board,
-                depth=PLAN_DROP_DEPTH,
-                multipv=PLAN_DROP_MULTIPV,
-                sample_rate=PLAN_DROP_SAMPLE_RATE,
-                variance_cap=PLAN_DROP_VARIANCE_CAP,
-                runtime_cap_ms=PLAN_DROP_RUNTIME_CAP_MS,
-            )
+            plan_drop_result = features["plan_drop"]
         if plan_drop_result:
             plan_pass = (
                 plan_drop_result.sampled
@@ -1407,13 +1483,7 @@ def tag_position(
     file_pressure_info: Dict[str, Any] = {}
     file_pressure_score = 0.0
     if board.piece_at(played_move.from_square):
-        file_pressure_score, file_pressure_info = file_pressure(
-            board,
-            played_board,
-            actor,
-            chess.FILE_NAMES.index("c"),
-            chess.C7 if actor == chess.WHITE else chess.C2,
-        )
+        file_pressure_score, file_pressure_info = features["file_pressure_c"]
         analysis_meta.setdefault("directional_pressure", {})
         file_pressure_info["score"] = round(file_pressure_score, 3)
         file_pressure_info["triggered"] = file_pressure_score >= FILE_PRESSURE_THRESHOLD
@@ -2361,6 +2431,7 @@ def tag_position(
     analysis_meta["trigger_order"] = trigger_order
 
     _maybe_attach_control_context_snapshot(ctx, notes)
+    features.close()
 
     return TagResult(
         played_move=played_move_uci,
@@ -2459,3 +2530,54 @@ def tag_position(
         prepare_quality_score=prepare_quality_score,
         prepare_consensus_score=prepare_consensus_score,
     )
+
+
+def prepare_root(
+    engine_path: str,
+    fen: str,
+    depth: int = 14,
+    multipv: int = 6,
+) -> Optional[RootAnalysis]:
+    """
+    Return a shareable root snapshot for *fen*, or None on the v8 path
+    (control tagging disabled), which does not consume one.
+    """
+    _, control_enabled, _ = _resolve_control_config()
+    if not control_enabled:
+        return None
+    return analyse_root(engine_path, fen, depth=depth, multipv=multipv)
+
+
+def tag_position_batch(
+    engine_path: str,
+    fen: str,
+    played_moves_uci: List[str],
+    depth: int = 14,
+    multipv: int = 6,
+    cp_threshold: int = 100,
+    small_drop_cp: int = 30,
+) -> List[TagResult]:
+    """
+    Tag several candidate moves of one position, analysing the root once.
+
+    Results are in input order and identical to calling ``tag_position`` for
+    each move.  Contact profiles are memoized for the whole batch.
+    """
+    with contact_memo():
+        root = prepare_root(engine_path, fen, depth=depth, multipv=multipv)
+        if root is not None:
+            board = chess.Board(fen)
+            root.prefetch_followups(engine_path, [parse_move(board, move_uci) for move_uci in played_moves_uci])
+        return [
+            tag_position(
+                engine_path,
+                fen,
+                move_uci,
+                depth=depth,
+                multipv=multipv,
+                cp_threshold=cp_threshold,
+                small_drop_cp=small_drop_cp,
+                root=root,
+            )
+            for move_uci in played_moves_uci
+        ]
@@ -4,6 +4,7 @@ import chess.engine
 from typing import Any, Dict, List, Optional, Tuple
 
 from engine_utils.prophylaxis import detect_prophylaxis_plan_drop, PlanDropResult
+from engine_utils.pool import borrow_engine
 from rule_tagger2.legacy.prophylaxis import (
     ProphylaxisConfig,
     classify_prophylaxis_quality,
@@ -442,7 +443,7 @@ def tag_position(
             deltas.append({key: round(metrics[key] - base[key], 3) for key in STYLE_COMPONENT_KEYS})
         return deltas
 
-    with chess.engine.SimpleEngine.popen_uci(engine_path) as follow_engine:
+    with borrow_engine(engine_path) as follow_engine:
         base_self_before, base_opp_before, seq_self_before, seq_opp_before = simulate_followup_metrics(
             follow_engine, board, actor, steps=followup_steps
         )
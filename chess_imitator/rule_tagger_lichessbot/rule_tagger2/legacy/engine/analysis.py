@@ -9,30 +9,15 @@ import chess
 import chess.engine
 
 from chess_evaluator import ChessEvaluator, pov
+from engine_utils.analysis_cache import cached_analyse
+from engine_utils.pool import borrow_engine
 
 from ..config import STYLE_COMPONENT_KEYS
 from ..models import Candidate
+from ..contact import contact_profile
 from ..move_utils import classify_move
 
 
-def contact_profile(board: chess.Board) -> Tuple[float, int, int, int]:
-    total_moves = 0
-    capture_moves = 0
-    checking_moves = 0
-    for mv in board.legal_moves:
-        total_moves += 1
-        if board.is_capture(mv):
-            capture_moves += 1
-        else:
-            board.push(mv)
-            if board.is_check():
-                checking_moves += 1
-            board.pop()
-    contact_moves = capture_moves + checking_moves
-    ratio = (contact_moves / total_moves) if total_moves else 0.0
-    return ratio, total_moves, capture_moves, checking_moves
-
-
 def material_balance(board: chess.Board, actor: chess.Color) -> float:
     piece_values = {
         chess.PAWN: 1.0,
@@ -58,16 +43,16 @@ def analyse_candidates(
 ) -> Tuple[List[Candidate], int, Dict[str, Any]]:
     contact_ratio, total_moves, capture_count, checking_count = contact_profile(board)
 
-    with chess.engine.SimpleEngine.popen_uci(engine_path) as eng:
+    with borrow_engine(engine_path) as eng:
         low_cp = None
         low_score = None
         if depth_low and depth_low < depth:
-            low_info = eng.analyse(board, chess.engine.Limit(depth=depth_low), multipv=1)
+            low_info = cached_analyse(eng, engine_path, board, depth_low, multipv=1, exact_depth=True)
             low_root = low_info[0] if isinstance(low_info, list) else low_info
             low_score = low_root["score"].pov(board.turn)
             low_cp = low_score.score(mate_score=10000)
 
-        root = eng.analyse(board, chess.engine.Limit(depth=depth), multipv=max(1, multipv))
+        root = cached_analyse(eng, engine_path, board, depth, multipv=max(1, multipv))
         root1 = root[0]
         root_score = root1["score"].pov(board.turn)
         eval_before_cp = root_score.score(mate_score=10000)
@@ -76,7 +61,7 @@ def analyse_candidates(
         high_score = None
         depth_high = max(depth + 4, depth + 2)
         if depth_high > depth:
-            high_info = eng.analyse(board, chess.engine.Limit(depth=depth_high), multipv=1)
+            high_info = cached_analyse(eng, engine_path, board, depth_high, multipv=1, exact_depth=True)
             high_root = high_info[0] if isinstance(high_info, list) else high_info
             high_score = high_root["score"].pov(board.turn)
             high_cp = high_score.score(mate_score=10000)
@@ -129,10 +114,10 @@ def eval_specific_move(
     move: chess.Move,
     depth: int = 14,
 ) -> int:
-    with chess.engine.SimpleEngine.popen_uci(engine_path) as eng:
+    with borrow_engine(engine_path) as eng:
         board = board.copy(stack=False)
         board.push(move)
-        info = eng.analyse(board, chess.engine.Limit(depth=depth), multipv=1)
+        info = cached_analyse(eng, engine_path, board, depth, multipv=1)
         root = info[0] if isinstance(info, list) else info
         return root["score"].pov(not board.turn).score(mate_score=10000)
 
@@ -140,8 +125,11 @@ def eval_specific_move(
 def evaluation_and_metrics(
     board: chess.Board,
     actor: chess.Color,
+    detail: bool = True,
 ) -> Tuple[Dict[str, float], Dict[str, float], Dict[str, Any]]:
-    evaluation = ChessEvaluator(board).evaluate()
+    """Style metrics from ``actor``'s view; ``detail=False`` returns only the components as evaluation."""
+    evaluator = ChessEvaluator(board)
+    evaluation = evaluator.evaluate() if detail else {"components": evaluator.components()}
     comps = evaluation["components"]
     metrics = {key: round(pov(comps[key], actor), 3) for key in STYLE_COMPONENT_KEYS}
     opp_metrics = {key: round(-metrics[key], 3) for key in STYLE_COMPONENT_KEYS}
@@ -160,7 +148,7 @@ def simulate_followup_metrics(
     depth: int = 6,
 ) -> Tuple[Dict[str, float], Dict[str, float], List[Dict[str, float]], List[Dict[str, float]]]:
     future_board = board.copy(stack=False)
-    base_metrics, base_opp_metrics, _ = evaluation_and_metrics(future_board, actor)
+    base_metrics, base_opp_metrics, _ = evaluation_and_metrics(future_board, actor, detail=False)
     metrics_seq: List[Dict[str, float]] = []
     opp_seq: List[Dict[str, float]] = []
     for _ in range(steps):
@@ -170,7 +158,7 @@ def simulate_followup_metrics(
         if result.move is None:
             break
         future_board.push(result.move)
-        metrics, opp_metrics, _ = evaluation_and_metrics(future_board, actor)
+        metrics, opp_metrics, _ = evaluation_and_metrics(future_board, actor, detail=False)
         metrics_seq.append(metrics)
         opp_seq.append(opp_metrics)
     return base_metrics, base_opp_metrics, metrics_seq, opp_seq
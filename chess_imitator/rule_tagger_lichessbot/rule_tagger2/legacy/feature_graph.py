@@ -0,0 +1,111 @@
+"""
+Lazy per-move feature graph used by ``tag_position``.
+
+Each feature is declared once as a node with the features it depends on and
+is computed on first access, then cached for the rest of the move, so a
+probe that gating never reads (threat estimates, plan-drop search, ...) is
+never run.  Every computation is timed, exclusive of its dependencies, into
+a process-wide cost table; ``feature_cost_report()`` returns calls, total
+and mean milliseconds per feature, plus how many moves declared the feature
+without reading it.
+
+Environment:
+    FEATURE_COSTS_ENABLED  "0" turns the cost table off (default "1")
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+FEATURE_COSTS_ENABLED = os.getenv("FEATURE_COSTS_ENABLED", "1").lower() not in ("0", "false", "no")
+
+_COSTS: Dict[str, Dict[str, float]] = {}
+_COSTS_LOCK = threading.Lock()
+
+
+def _record(name: str, *, calls: int = 0, ms: float = 0.0, skipped: int = 0) -> None:
+    if not FEATURE_COSTS_ENABLED:
+        return
+    with _COSTS_LOCK:
+        entry = _COSTS.setdefault(name, {"calls": 0, "ms": 0.0, "skipped": 0})
+        entry["calls"] += calls
+        entry["ms"] += ms
+        entry["skipped"] += skipped
+
+
+def feature_cost_report() -> Dict[str, Dict[str, float]]:
+    """Per-feature ``calls``, ``ms``, ``mean_ms`` and ``skipped``, most expensive first."""
+    with _COSTS_LOCK:
+        rows = {name: dict(entry) for name, entry in _COSTS.items()}
+    for entry in rows.values():
+        entry["ms"] = round(entry["ms"], 3)
+        entry["mean_ms"] = round(entry["ms"] / entry["calls"], 3) if entry["calls"] else 0.0
+    return dict(sorted(rows.items(), key=lambda item: item[1]["ms"], reverse=True))
+
+
+def reset_feature_costs() -> None:
+    with _COSTS_LOCK:
+        _COSTS.clear()
+
+
+class FeatureGraph:
+    """Declared features of one move, computed on first access and cached."""
+
+    def __init__(self) -> None:
+        self._nodes: Dict[str, Tuple[Callable[..., Any], Tuple[str, ...]]] = {}
+        self._values: Dict[str, Any] = {}
+        self._resolving: List[str] = []
+
+    def define(self, name: str, compute: Callable[..., Any], *, deps: Sequence[str] = ()) -> None:
+        """Declare *name*; *compute* receives the values of *deps* positionally."""
+        if name in self._nodes:
+            raise ValueError(f"Feature {name!r} is already defined.")
+        self._nodes[name] = (compute, tuple(deps))
+
+    def feature(self, name: str, *, deps: Sequence[str] = ()) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """Decorator form of :meth:`define`."""
+
+        def register(compute: Callable[..., Any]) -> Callable[..., Any]:
+            self.define(name, compute, deps=deps)
+            return compute
+
+        return register
+
+    def get(self, name: str) -> Any:
+        if name in self._values:
+            return self._values[name]
+        if name not in self._nodes:
+            raise KeyError(f"Unknown feature {name!r}.")
+        if name in self._resolving:
+            cycle = " -> ".join(self._resolving[self._resolving.index(name):] + [name])
+            raise ValueError(f"Feature dependency cycle: {cycle}")
+        compute, deps = self._nodes[name]
+        self._resolving.append(name)
+        try:
+            args = [self.get(dep) for dep in deps]
+            started = time.perf_counter()
+            value = compute(*args)
+            _record(name, calls=1, ms=(time.perf_counter() - started) * 1000.0)
+        finally:
+            self._resolving.pop()
+        self._values[name] = value
+        return value
+
+    __getitem__ = get
+
+    def computed(self, name: str) -> bool:
+        return name in self._values
+
+    def skipped(self) -> List[str]:
+        """Declared features that were never read."""
+        return [name for name in self._nodes if name not in self._values]
+
+    def close(self) -> None:
+        """Count the features this move declared but never needed."""
+        for name in self.skipped():
+            _record(name, skipped=1)
+
+
+__all__ = ["FeatureGraph", "feature_cost_report", "reset_feature_costs"]
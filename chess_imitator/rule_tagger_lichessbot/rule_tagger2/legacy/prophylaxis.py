@@ -7,11 +7,19 @@ preventive play so that the core tagger can focus on orchestration.
 
 from __future__ import annotations
 
+import logging
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
 import chess
 import chess.engine
+import chess.polyglot
+
+from engine_utils.analysis_cache import cached_analyse, get_analysis_cache
+from engine_utils.pool import borrow_engine
+from engine_utils.prophylaxis import plan_probe_boards
+
+logger = logging.getLogger(__name__)
 
 FULL_MATERIAL_COUNT = 32
 
@@ -30,6 +38,21 @@ class ProphylaxisConfig:
     threat_drop: float = 0.35
 
 
+def _threat_probe_board(board: chess.Board, actor: chess.Color) -> chess.Board:
+    """The position searched for the opponent's threats: *board*, with a null move if *actor* is to move."""
+    probe = board.copy(stack=False)
+    if probe.turn == actor and not probe.is_check():
+        try:
+            probe.push(chess.Move.null())
+        except ValueError:
+            pass
+    return probe
+
+
+def _threat_depth(config: ProphylaxisConfig) -> int:
+    return max(config.threat_depth, 8)
+
+
 def estimate_opponent_threat(
     engine_path: str,
     board: chess.Board,
@@ -41,28 +64,14 @@ def estimate_opponent_threat(
     Probe the position with a fixed-depth search to estimate the opponent's
     immediate tactical resources. Used to grade prophylaxis attempts.
     """
-    temp = board.copy(stack=False)
-    if temp.is_game_over():
+    if board.is_game_over():
         return 0.0
-    needs_null = temp.turn == actor
-    null_pushed = False
+    probe = _threat_probe_board(board, actor)
     try:
-        with chess.engine.SimpleEngine.popen_uci(engine_path) as eng:
-            if needs_null and not temp.is_check():
-                try:
-                    temp.push(chess.Move.null())
-                    null_pushed = True
-                except ValueError:
-                    null_pushed = False
-            depth = max(config.threat_depth, 8)
-            info = eng.analyse(temp, chess.engine.Limit(depth=depth))
+        with borrow_engine(engine_path) as eng:
+            info = cached_analyse(eng, engine_path, probe, _threat_depth(config))
     except Exception:
-        if null_pushed:
-            temp.pop()
         return 0.0
-    finally:
-        if null_pushed and len(temp.move_stack) and temp.move_stack[-1] == chess.Move.null():
-            temp.pop()
 
     score_obj = info.get("score")
     if score_obj is None:
@@ -84,6 +93,53 @@ def estimate_opponent_threat(
     return round(min(threat, config.safety_cap), 3)
 
 
+def prefetch_prophylaxis_probes(
+    engine_path: str,
+    board: chess.Board,
+    played_board: chess.Board,
+    actor: chess.Color,
+    *,
+    config: ProphylaxisConfig,
+    threats: bool = True,
+    plan_depth: int = 0,
+    plan_multipv: int = 0,
+) -> None:
+    """
+    Run the searches behind the threat probes of *board* / *played_board* and,
+    with ``plan_multipv > 1``, the plan-drop probe, on one borrowed engine.
+
+    Both probes look at the same two positions (the null-move baseline and
+    the position after the move), so a plan search at least as deep as the
+    threat depth answers the threat probe as well.  Results go to the
+    analysis cache, where ``estimate_opponent_threat`` and
+    ``detect_prophylaxis_plan_drop`` pick them up; with the cache disabled
+    this is a no-op.
+    """
+    if not get_analysis_cache().config.enabled:
+        return
+    searches: List[Tuple[chess.Board, int, Optional[int]]] = []
+    if plan_depth > 0 and plan_multipv > 1:
+        searches.extend((probe, plan_depth, plan_multipv) for probe in plan_probe_boards(board, played_board) or ())
+    if threats:
+        threat_depth = _threat_depth(config)
+        covered = {chess.polyglot.zobrist_hash(probe) for probe, depth, _ in searches if depth >= threat_depth}
+        for source in (board, played_board):
+            if source.is_game_over():
+                continue
+            probe = _threat_probe_board(source, actor)
+            if chess.polyglot.zobrist_hash(probe) not in covered:
+                searches.append((probe, threat_depth, None))
+    if not searches:
+        return
+    try:
+        with borrow_engine(engine_path) as eng:
+            for probe, depth, multipv in searches:
+                cached_analyse(eng, engine_path, probe, depth, multipv)
+    except Exception:
+        # The probes search (and handle failures) on their own when the cache misses.
+        logger.debug("Prophylaxis probe prefetch failed.", exc_info=True)
+
+
 def prophylaxis_pattern_reason(
     board: chess.Board,
     move: chess.Move,
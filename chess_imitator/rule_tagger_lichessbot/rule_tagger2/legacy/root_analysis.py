@@ -0,0 +1,239 @@
+"""
+Root-position analysis shared by every candidate move of one FEN.
+
+``tag_position`` spends most of its engine time on work that only depends on
+the position before the move: the MultiPV candidate search (three depths),
+the static evaluation and coverage of the root, its contact profile, the
+"before" follow-up simulation and the same quantities for the engine's best
+move.  ``analyse_root`` computes all of that once so ``tag_position_batch``
+can fan out only the per-move parts.  The snapshot is treated as read-only;
+``tag_position`` deep-copies the mutable pieces before using them, so a
+batched result is identical to a single-move call.
+
+Follow-up simulations replay the MultiPV lines where they are long enough
+and only ask the engine (``engine.play``) for the missing plies.  The
+"before" sequence is additionally memoized per root (FOLLOWUP_MEMO_SIZE
+entries), and the played-move sequences are memoized on the snapshot and can
+be prefetched concurrently for a whole batch.
+
+Environment:
+    FOLLOWUP_MEMO_SIZE  root positions whose "before" follow-up is kept (default 512)
+"""
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import chess
+
+from rule_tagger2.core.engine_io import (
+    analyse_candidates,
+    contact_profile,
+    defended_square_count,
+    evaluation_and_metrics,
+    simulate_followups,
+)
+from rule_tagger2.legacy.prophylaxis import estimate_opponent_threat
+
+from .models import Candidate
+
+FOLLOWUP_STEPS = 3
+FOLLOWUP_MEMO_SIZE = max(0, int(os.getenv("FOLLOWUP_MEMO_SIZE", "512")))
+
+FollowupMetrics = Tuple[
+    Dict[str, float], Dict[str, float], List[Dict[str, float]], List[Dict[str, float]]
+]
+
+_BEFORE_MEMO: "OrderedDict[Tuple[str, str, int, int], FollowupMetrics]" = OrderedDict()
+_BEFORE_MEMO_LOCK = threading.Lock()
+
+
+def _memoized_before(key: Tuple[str, str, int, int]) -> Optional[FollowupMetrics]:
+    with _BEFORE_MEMO_LOCK:
+        value = _BEFORE_MEMO.get(key)
+        if value is not None:
+            _BEFORE_MEMO.move_to_end(key)
+        return value
+
+
+def _memoize_before(key: Tuple[str, str, int, int], value: FollowupMetrics) -> None:
+    if not FOLLOWUP_MEMO_SIZE:
+        return
+    with _BEFORE_MEMO_LOCK:
+        _BEFORE_MEMO[key] = value
+        _BEFORE_MEMO.move_to_end(key)
+        while len(_BEFORE_MEMO) > FOLLOWUP_MEMO_SIZE:
+            _BEFORE_MEMO.popitem(last=False)
+
+
+def clear_followup_memo() -> None:
+    with _BEFORE_MEMO_LOCK:
+        _BEFORE_MEMO.clear()
+
+
+def _played_pv(candidates: Sequence[Candidate], move: chess.Move) -> Tuple[chess.Move, ...]:
+    """The continuation after *move* from its MultiPV line, if it has one."""
+    for candidate in candidates:
+        if candidate.move == move:
+            return tuple(candidate.pv[1:])
+    return ()
+
+
+@dataclass(frozen=True)
+class RootAnalysis:
+    """Everything ``tag_position`` derives from the position before the move."""
+
+    fen: str
+    depth: int
+    multipv: int
+    actor: chess.Color
+    candidates: Tuple[Candidate, ...]
+    eval_before_cp: int
+    analysis_meta: Dict[str, Any]
+    metrics_before: Dict[str, float]
+    opp_metrics_before: Dict[str, float]
+    evaluation_before: Dict[str, Any]
+    coverage_before: int
+    contact_ratio_before: float
+    followup_before: FollowupMetrics
+    metrics_best: Dict[str, float]
+    opp_metrics_best: Dict[str, float]
+    evaluation_best: Dict[str, Any]
+    coverage_best: int
+    contact_ratio_best: float
+    followup_best: FollowupMetrics
+    _threat_memo: Dict[str, float] = field(default_factory=dict, compare=False, repr=False)
+    _threat_lock: threading.Lock = field(default_factory=threading.Lock, compare=False, repr=False)
+    _followup_memo: Dict[Tuple[str, str], FollowupMetrics] = field(default_factory=dict, compare=False, repr=False)
+    _followup_lock: threading.Lock = field(default_factory=threading.Lock, compare=False, repr=False)
+
+    @property
+    def best(self) -> Candidate:
+        return self.candidates[0]
+
+    def matches(self, fen: str, depth: int, multipv: int) -> bool:
+        """Return True if this snapshot was computed for the given request."""
+        return (self.fen, self.depth, self.multipv) == (fen, depth, multipv)
+
+    def threat_before(self, engine_path: str, board: chess.Board, *, config) -> float:
+        """Opponent threat of the root position, probed at most once per engine."""
+        with self._threat_lock:
+            cached = self._threat_memo.get(engine_path)
+        if cached is not None:
+            return cached
+        value = estimate_opponent_threat(engine_path, board, self.actor, config=config)
+        with self._threat_lock:
+            return self._threat_memo.setdefault(engine_path, value)
+
+    def prefetch_followups(self, engine_path: str, moves: Iterable[chess.Move]) -> None:
+        """Simulate the played-move follow-ups of *moves* concurrently, skipping memoized ones."""
+        board = chess.Board(self.fen)
+        with self._followup_lock:
+            missing = list(
+                dict.fromkeys(
+                    move for move in moves if (engine_path, move.uci()) not in self._followup_memo
+                )
+            )
+        jobs = []
+        for move in missing:
+            played_board = board.copy(stack=False)
+            played_board.push(move)
+            jobs.append((played_board, _played_pv(self.candidates, move)))
+        results = simulate_followups(engine_path, jobs, self.actor, steps=FOLLOWUP_STEPS)
+        with self._followup_lock:
+            for move, value in zip(missing, results):
+                self._followup_memo.setdefault((engine_path, move.uci()), value)
+
+    def followup_played(self, engine_path: str, move: chess.Move) -> FollowupMetrics:
+        """Follow-up metrics after *move*, simulated at most once per engine."""
+        key = (engine_path, move.uci())
+        with self._followup_lock:
+            cached = self._followup_memo.get(key)
+        if cached is None:
+            self.prefetch_followups(engine_path, [move])
+            with self._followup_lock:
+                cached = self._followup_memo[key]
+        return cached
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = dict(self.__dict__)
+        state.pop("_threat_lock", None)
+        state.pop("_followup_lock", None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        object.__setattr__(self, "_threat_lock", threading.Lock())
+        object.__setattr__(self, "_followup_lock", threading.Lock())
+
+
+def analyse_root(
+    engine_path: str,
+    fen: str,
+    depth: int = 14,
+    multipv: int = 6,
+) -> RootAnalysis:
+    """
+    Run the move-independent part of ``tag_position`` for *fen*.
+
+    Raises:
+        RuntimeError: if the engine returns no candidate lines.
+    """
+    board = chess.Board(fen)
+    actor = board.turn
+    metrics_before, opp_metrics_before, evaluation_before = evaluation_and_metrics(board, actor)
+    coverage_before = defended_square_count(board, actor)
+
+    candidates, eval_before_cp, analysis_meta = analyse_candidates(
+        engine_path, board, depth=depth, multipv=multipv
+    )
+    if not candidates:
+        raise RuntimeError("Engine returned no candidates.")
+
+    best_board = board.copy(stack=False)
+    best_board.push(candidates[0].move)
+    metrics_best, opp_metrics_best, evaluation_best = evaluation_and_metrics(best_board, actor)
+    coverage_best = defended_square_count(best_board, actor)
+
+    contact_ratio_before, _, _, _ = contact_profile(board)
+    contact_ratio_best, _, _, _ = contact_profile(best_board)
+
+    best_pv = tuple(candidates[0].pv)
+    memo_key = (engine_path, fen, depth, multipv)
+    followup_before = _memoized_before(memo_key)
+    jobs = [(best_board, best_pv[1:])]
+    if followup_before is None:
+        jobs.append((board, best_pv))
+    followups = simulate_followups(engine_path, jobs, actor, steps=FOLLOWUP_STEPS)
+    followup_best = followups[0]
+    if followup_before is None:
+        followup_before = followups[1]
+        _memoize_before(memo_key, followup_before)
+
+    return RootAnalysis(
+        fen=fen,
+        depth=depth,
+        multipv=multipv,
+        actor=actor,
+        candidates=tuple(candidates),
+        eval_before_cp=eval_before_cp,
+        analysis_meta=analysis_meta,
+        metrics_before=metrics_before,
+        opp_metrics_before=opp_metrics_before,
+        evaluation_before=evaluation_before,
+        coverage_before=coverage_before,
+        contact_ratio_before=contact_ratio_before,
+        followup_before=followup_before,
+        metrics_best=metrics_best,
+        opp_metrics_best=opp_metrics_best,
+        evaluation_best=evaluation_best,
+        coverage_best=coverage_best,
+        contact_ratio_best=contact_ratio_best,
+        followup_best=followup_best,
+    )
+
+
+__all__ = ["FOLLOWUP_STEPS", "RootAnalysis", "analyse_root", "clear_followup_memo"]
@@ -4,7 +4,7 @@ Shared datamodels reused across the refactored core.
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import chess
 
@@ -16,6 +16,8 @@ class Candidate:
     move: chess.Move
     score_cp: int
     kind: str
+    # Principal variation of the MultiPV line, starting with ``move``.
+    pv: Tuple[chess.Move, ...] = ()
 
 
 @dataclass
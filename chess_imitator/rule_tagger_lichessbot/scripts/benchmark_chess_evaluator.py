@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+ChessEvaluator Benchmark
+
+Evaluates the golden-case positions (plus random playout positions) with the
+reference ChessEvaluator.evaluate() and with the bitboard components-only
+path, checks that both agree, and reports evaluations per second of each.
+
+Usage:
+    python3 scripts/benchmark_chess_evaluator.py
+    python3 scripts/benchmark_chess_evaluator.py --random 500 --repeat 5
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import chess
+
+from chess_evaluator import ChessEvaluator
+from chess_evaluator.bitboard import evaluate_components
+
+TESTS_DIR = Path(__file__).parent.parent / "tests"
+
+
+def load_positions(random_count: int, seed: int) -> List[chess.Board]:
+    boards = []
+    for path in [TESTS_DIR / "golden_cases.json", *sorted((TESTS_DIR / "golden_cases").glob("*.json"))]:
+        for case in json.loads(path.read_text(encoding="utf-8")):
+            if isinstance(case, dict) and case.get("fen"):
+                boards.append(chess.Board(case["fen"]))
+    rng = random.Random(seed)
+    for _ in range(random_count):
+        board = chess.Board()
+        for _ in range(rng.randint(10, 120)):
+            moves = list(board.legal_moves)
+            if not moves:
+                break
+            board.push(rng.choice(moves))
+        boards.append(board)
+    return boards
+
+
+def rate(fn: Callable[[chess.Board], object], boards: List[chess.Board], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for board in boards:
+            fn(board)
+    return repeat * len(boards) / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark ChessEvaluator evaluate() vs bitboard components")
+    parser.add_argument("--random", type=int, default=200, help="Random playout positions added to the golden set")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    boards = load_positions(args.random, args.seed)
+    mismatches = sum(
+        1 for board in boards if ChessEvaluator(board).evaluate()["components"] != evaluate_components(board)
+    )
+    reference = rate(lambda board: ChessEvaluator(board).evaluate(), boards, args.repeat)
+    bitboard = rate(evaluate_components, boards, args.repeat)
+
+    print(f"positions: {len(boards)}  repeat: {args.repeat}  mismatches: {mismatches}")
+    print(f"evaluate()            {reference:10.0f} evals/s")
+    print(f"bitboard components   {bitboard:10.0f} evals/s  ({bitboard / reference:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Engine Pool Benchmark
+
+Tags the same sample of (FEN, move) pairs from the Test_players fixtures twice:
+once spawning a fresh engine per call (ENGINE_POOL_ENABLED=0 behaviour) and
+once borrowing warm engines from engine_utils.pool, then reports moves/sec.
+
+Usage:
+    python3 scripts/benchmark_engine_pool.py --engine /usr/local/bin/stockfish
+    python3 scripts/benchmark_engine_pool.py --engine $(which stockfish) --moves 40 --pool-size 2
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import chess
+import chess.pgn
+
+from codex_utils import analyze_position
+from engine_utils.analysis_cache import AnalysisCacheConfig, configure_analysis_cache
+from engine_utils.pool import EnginePoolConfig, configure_engine_pool, shutdown_engine_pool
+from tag_cache import TagCacheConfig, configure_tag_cache
+
+DEFAULT_FIXTURES = Path(__file__).parent.parent / "Test_players"
+
+
+def collect_positions(fixtures: Path, limit: int, skip_plies: int) -> List[Tuple[str, str]]:
+    """
+    Walk every PGN in *fixtures* and return up to *limit* (fen, move_uci) pairs.
+    """
+    positions: List[Tuple[str, str]] = []
+    for pgn_path in sorted(fixtures.glob("*.pgn")):
+        with pgn_path.open("r", encoding="utf-8", errors="ignore") as handle:
+            while len(positions) < limit:
+                game = chess.pgn.read_game(handle)
+                if game is None:
+                    break
+                board = game.board()
+                for ply, move in enumerate(game.mainline_moves()):
+                    if ply >= skip_plies:
+                        positions.append((board.fen(), move.uci()))
+                        if len(positions) >= limit:
+                            break
+                    board.push(move)
+        if len(positions) >= limit:
+            break
+    return positions
+
+
+def run_pass(label: str, positions: List[Tuple[str, str]], engine_path: str, config: EnginePoolConfig) -> float:
+    """
+    Tag every position with the given pool configuration and return moves/sec.
+    """
+    pool = configure_engine_pool(config)
+    errors = 0
+    start = time.perf_counter()
+    for fen, move_uci in positions:
+        try:
+            analyze_position(fen, move_uci, engine_path=engine_path)
+        except Exception as exc:
+            errors += 1
+            print(f"  ! {label}: {fen} {move_uci}: {exc}")
+    elapsed = time.perf_counter() - start
+    rate = len(positions) / elapsed if elapsed else 0.0
+    print(f"{label:<10} {len(positions)} moves in {elapsed:7.2f}s  ->  {rate:6.2f} moves/sec  (errors={errors})")
+    if config.enabled:
+        stats = pool.stats()
+        print(
+            f"{'':<10} borrows={stats['borrows']} spawned={stats['spawned']} "
+            f"reused={stats['reused']} overflow={stats['overflow']}"
+        )
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark tagging throughput with and without the engine pool.")
+    parser.add_argument("--engine", default="/usr/local/bin/stockfish", help="Path to Stockfish engine")
+    parser.add_argument("--fixtures", type=Path, default=DEFAULT_FIXTURES, help="Directory of PGN fixtures")
+    parser.add_argument("--moves", type=int, default=30, help="Number of (FEN, move) pairs to tag per pass")
+    parser.add_argument("--skip-plies", type=int, default=8, help="Skip the first N plies of every game")
+    parser.add_argument("--pool-size", type=int, default=2, help="Engines per path in the pooled pass")
+    args = parser.parse_args()
+
+    if not Path(args.engine).exists():
+        print(f"❌ Engine not found: {args.engine}")
+        sys.exit(1)
+
+    # Both passes tag the same positions; the result caches would hide the engine cost.
+    configure_tag_cache(TagCacheConfig(enabled=False))
+    configure_analysis_cache(AnalysisCacheConfig(enabled=False))
+    positions = collect_positions(args.fixtures, args.moves, args.skip_plies)
+    if not positions:
+        print(f"No positions found under {args.fixtures}")
+        sys.exit(1)
+
+    print(f"Engine: {args.engine}")
+    print(f"Positions: {len(positions)} from {args.fixtures}")
+    print("-" * 60)
+    baseline = run_pass("no-pool", positions, args.engine, EnginePoolConfig(enabled=False))
+    pooled = run_pass("pool", positions, args.engine, EnginePoolConfig(size=args.pool_size))
+    shutdown_engine_pool()
+    print("-" * 60)
+    if baseline:
+        print(f"Speedup: {pooled / baseline:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
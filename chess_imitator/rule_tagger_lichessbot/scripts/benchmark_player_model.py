@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+GM-Probability Model Benchmark
+
+Scores one analysis worth of tagged candidate moves against N synthetic
+reference players, first with the original per-move, per-player loop and
+then with a compiled superchess_predictor PlayerModel, and reports the
+per-request latency of each.
+
+Usage:
+    python3 scripts/benchmark_player_model.py
+    python3 scripts/benchmark_player_model.py --players 500 --tags 120 --moves 7 --repeat 200
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from superchess_predictor.backend.predictor import PlayerModel
+
+
+def legacy_probabilities(tagged_moves: List[dict], player_distributions: Dict[str, Dict[str, float]]) -> List[Dict[str, float]]:
+    """The pre-compiled-model implementation: rebuilds everything per call."""
+    all_tags = sorted({tag for dist in player_distributions.values() for tag in dist})
+    player_vectors = {
+        player: np.array([dist.get(tag, 0.0) for tag in all_tags], dtype=float)
+        for player, dist in player_distributions.items()
+    }
+    for vec in player_vectors.values():
+        norm = np.linalg.norm(vec)
+        if norm > 0:
+            vec /= norm
+    player_names = list(player_vectors)
+    probabilities = []
+    for move in tagged_moves:
+        tags = set(move.get("tags") or [])
+        move_vec = np.array([1.0 if tag in tags else 0.0 for tag in all_tags], dtype=float)
+        norm = np.linalg.norm(move_vec)
+        if norm > 0:
+            move_vec /= norm
+        scores = np.array([float(np.dot(move_vec, player_vectors[p])) if norm > 0 else 0.0 for p in player_names])
+        exp_scores = np.exp(scores - np.max(scores))
+        probs = exp_scores / exp_scores.sum()
+        probabilities.append({player: float(prob) for player, prob in zip(player_names, probs)})
+    return probabilities
+
+
+def synthetic(players: int, tags: int, moves: int, seed: int) -> Tuple[List[dict], Dict[str, Dict[str, float]]]:
+    rng = random.Random(seed)
+    vocab = [f"tag_{index}" for index in range(tags)]
+    distributions = {
+        f"player_{index}": {tag: rng.random() for tag in rng.sample(vocab, rng.randint(tags // 4, tags))}
+        for index in range(players)
+    }
+    tagged = [{"tags": rng.sample(vocab, rng.randint(1, 6))} for _ in range(moves)]
+    return tagged, distributions
+
+
+def time_ms(fn, repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the GM-probability model.")
+    parser.add_argument("--players", type=int, default=500)
+    parser.add_argument("--tags", type=int, default=120)
+    parser.add_argument("--moves", type=int, default=7, help="Tagged candidates per request")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    tagged, distributions = synthetic(args.players, args.tags, args.moves, args.seed)
+
+    start = time.perf_counter()
+    model = PlayerModel(distributions)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    legacy = time_ms(lambda: legacy_probabilities(tagged, distributions), args.repeat)
+    compiled = time_ms(lambda: model.probabilities(tagged), args.repeat)
+
+    print(f"{args.players} players x {args.tags} tags, {args.moves} moves per request, {args.repeat} requests")
+    print(f"  model build (once):  {build_ms:8.2f} ms")
+    print(f"  legacy loop:  median {statistics.median(legacy):8.3f} ms   max {max(legacy):8.3f} ms")
+    print(f"  compiled:     median {statistics.median(compiled):8.3f} ms   max {max(compiled):8.3f} ms")
+    print(f"  speed-up:     {statistics.median(legacy) / statistics.median(compiled):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,10 +7,14 @@ rule-tagger pipeline (legacy or new).
 The default mode (`--pipeline auto`) respects NEW_PIPELINE, which keeps the
 batch analyses and Lichess bot in sync without extra flags. Pass `--compare` if
 you still need to exercise both pipelines for a regression sanity check.
+Pass `--feature-costs` to print the wall time and the per-feature cost table
+of the lazily computed tag_position features (calls, ms, and how many moves
+never needed the feature).
 """
 import argparse
 import json
 import sys
+import time
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
@@ -27,6 +31,7 @@ from rule_tagger_lichessbot.pipeline_mode import (
     pipeline_mode_from_env,
     use_new_from_mode,
 )
+from rule_tagger2.legacy.feature_graph import feature_cost_report, reset_feature_costs
 
 TENSION_FLAGS = ("tension_creation", "neutral_tension_creation")
 
@@ -149,6 +154,21 @@ def print_single_mode_summary(total: int, errors: int, mode: str) -> None:
     print("=" * 60)
 
 
+def print_feature_costs(elapsed_s: float, total: int) -> None:
+    report = feature_cost_report()
+    print("\n" + "=" * 60)
+    print("FEATURE COSTS")
+    print("=" * 60)
+    print(f"Wall time: {elapsed_s:.2f}s for {total} case(s)")
+    print(f"{'feature':<22}{'calls':>7}{'ms':>11}{'mean ms':>10}{'skipped':>9}")
+    for name, entry in report.items():
+        print(
+            f"{name:<22}{entry['calls']:>7}{entry['ms']:>11.1f}"
+            f"{entry['mean_ms']:>10.2f}{entry['skipped']:>9}"
+        )
+    print("=" * 60)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Run golden regression tests.")
     parser.add_argument(
@@ -174,6 +194,11 @@ def main() -> None:
         action="store_true",
         help="Run both pipelines and compare their tension flags (overrides --pipeline).",
     )
+    parser.add_argument(
+        "--feature-costs",
+        action="store_true",
+        help="Print wall time and per-feature compute costs after the run.",
+    )
 
     args = parser.parse_args()
 
@@ -213,6 +238,8 @@ def main() -> None:
     passed = 0
     failed = 0
     failures: List[Dict[str, Any]] = []
+    reset_feature_costs()
+    started = time.perf_counter()
 
     for index, case in enumerate(cases, start=1):
         case_id = case.get("id", f"case_{index}")
@@ -278,6 +305,8 @@ def main() -> None:
         print_summary(total, passed, failed)
     else:
         print_single_mode_summary(total, failed, pipelines[0])
+    if args.feature_costs:
+        print_feature_costs(time.perf_counter() - started, total)
 
     if failures:
         report_path = Path("test_failures_tension.json")
@@ -13,9 +13,11 @@ from pydantic import BaseModel
 
 from .engine_utils import fetch_engine_moves
 from .file_utils import load_player_summaries
-from .predictor import compute_move_probabilities
+from .predictor import get_player_model
 from .tagger_utils import tag_moves
 
+REPORTS_DIR = Path(__file__).resolve().parents[1] / "reports"
+
 app = FastAPI(title="Superchess Predictor API", version="1.0")
 app.add_middleware(
     CORSMiddleware,
@@ -31,6 +33,12 @@ class FENRequest(BaseModel):
     engine_path: Optional[str] = None
 
 
+@app.on_event("startup")
+def warm_player_model() -> None:
+    # Compile the reference players before the first request needs them.
+    get_player_model(REPORTS_DIR)
+
+
 @app.get("/health")
 def health_check() -> dict:
     return {"status": "ok"}
@@ -50,17 +58,12 @@ def analyze(request: FENRequest) -> dict:
     except Exception as exc:  # pylint: disable=broad-except
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
-    player_summaries = load_player_summaries(
-        Path(__file__).resolve().parents[1] / "reports"
-    )
+    player_summaries = load_player_summaries(REPORTS_DIR)
 
     if not player_summaries:
         raise HTTPException(status_code=500, detail="No player summaries found.")
 
-    probabilities = compute_move_probabilities(
-        tagged_moves,
-        {name: summary["tag_distribution"] for name, summary in player_summaries.items()},
-    )
+    probabilities = get_player_model(REPORTS_DIR).probabilities(tagged_moves)
 
     moves_output = []
     for move, probs in zip(tagged_moves, probabilities):
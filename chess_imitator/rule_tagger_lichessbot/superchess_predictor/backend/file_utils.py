@@ -2,9 +2,19 @@
 from __future__ import annotations
 
 import json
-from functools import lru_cache
+import os
+import threading
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Tuple
+
+SUMMARY_GLOB = "universal_*_summary.json"
+
+# reports dir -> (directory signature, summaries). The directory is only
+# re-globbed when its own mtime changes (a file was added or removed); the
+# known files are re-read when any of their mtimes or sizes change.
+_CACHE: Dict[str, Tuple[Tuple, Dict[str, Dict[str, object]]]] = {}
+_FILES: Dict[str, Tuple[int, Tuple[Path, ...]]] = {}
+_LOCK = threading.Lock()
 
 
 def _format_player_name(stem: str) -> str:
@@ -14,14 +24,29 @@ def _format_player_name(stem: str) -> str:
     return " ".join(part.capitalize() for part in parts)
 
 
-@lru_cache(maxsize=32)
-def load_player_summaries(reports_path: str = "reports") -> Dict[str, Dict[str, object]]:
-    base = Path(reports_path)
-    summaries: Dict[str, Dict[str, object]] = {}
-    if not base.exists():
-        return summaries
+def _summary_files(base: Path) -> Tuple[Path, ...]:
+    dir_mtime = base.stat().st_mtime_ns
+    known = _FILES.get(str(base))
+    if known is None or known[0] != dir_mtime:
+        known = (dir_mtime, tuple(sorted(base.glob(SUMMARY_GLOB))))
+        _FILES[str(base)] = known
+    return known[1]
+
+
+def _signature(files: Tuple[Path, ...]) -> Tuple:
+    entries = []
+    for path in files:
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((path.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(entries)
+
 
-    for path in base.glob("universal_*_summary.json"):
+def _read_summaries(files: Tuple[Path, ...]) -> Dict[str, Dict[str, object]]:
+    summaries: Dict[str, Dict[str, object]] = {}
+    for path in files:
         try:
             payload = json.loads(path.read_text(encoding="utf-8"))
         except (OSError, json.JSONDecodeError):
@@ -40,3 +65,27 @@ def load_player_summaries(reports_path: str = "reports") -> Dict[str, Dict[str,
             "tag_distribution": tag_ratios,
         }
     return summaries
+
+
+def load_player_summaries(reports_path: str | os.PathLike = "reports") -> Dict[str, Dict[str, object]]:
+    """
+    Player name -> {"meta", "tag_distribution"} for every summary in
+    `reports_path`. The same dict object is returned until a summary file
+    is added, removed or modified, so callers may cache work derived from it.
+    """
+    base = Path(reports_path)
+    if not base.exists():
+        return {}
+    with _LOCK:
+        try:
+            files = _summary_files(base)
+        except OSError:
+            files = ()
+        # Read exactly the files the signature was taken from.
+        signature = _signature(files)
+        cached = _CACHE.get(str(base))
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        summaries = _read_summaries(files)
+        _CACHE[str(base)] = (signature, summaries)
+        return summaries
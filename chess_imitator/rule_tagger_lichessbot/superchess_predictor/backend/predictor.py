@@ -1,58 +1,89 @@
 """Probability computation utilities."""
 from __future__ import annotations
 
-from typing import Dict, List
+import os
+import threading
+from typing import Dict, List, Tuple
 
 import numpy as np
 
+from .file_utils import load_player_summaries
+
+
+class PlayerModel:
+    """
+    Reference players compiled for scoring: the tag vocabulary, its index
+    map and a tag x player matrix of L2-normalised tag distributions.
+
+    Scoring a batch of moves is one (moves x tags) @ (tags x players)
+    product followed by a row-wise softmax, so cost grows with the matrix
+    size rather than with Python-level loops over players.
+    """
+
+    def __init__(self, player_distributions: Dict[str, Dict[str, float]]):
+        self.players: List[str] = list(player_distributions)
+        self.tags: List[str] = sorted({tag for dist in player_distributions.values() for tag in dist})
+        self.tag_index: Dict[str, int] = {tag: index for index, tag in enumerate(self.tags)}
+
+        matrix = np.zeros((len(self.players), len(self.tags)), dtype=float)
+        for row, dist in enumerate(player_distributions.values()):
+            for tag, value in dist.items():
+                matrix[row, self.tag_index[tag]] = value
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        self.matrix = np.ascontiguousarray(matrix.T)
+
+    def move_matrix(self, tagged_moves: List[dict]) -> np.ndarray:
+        """One L2-normalised tag-indicator row per move; unknown tags are ignored."""
+        moves = np.zeros((len(tagged_moves), len(self.tags)), dtype=float)
+        for row, move in enumerate(tagged_moves):
+            columns = {self.tag_index[tag] for tag in (move.get("tags") or []) if tag in self.tag_index}
+            if columns:
+                moves[row, list(columns)] = 1.0 / np.sqrt(len(columns))
+        return moves
+
+    def scores(self, tagged_moves: List[dict]) -> np.ndarray:
+        """Cosine similarity of every move to every player (moves x players)."""
+        return self.move_matrix(tagged_moves) @ self.matrix
+
+    def probabilities(self, tagged_moves: List[dict]) -> List[Dict[str, float]]:
+        if not tagged_moves:
+            return []
+        if not self.players:
+            return [{} for _ in tagged_moves]
+        scores = self.scores(tagged_moves)
+        # A move sharing no tag with anyone scores 0 everywhere, which the
+        # softmax turns into the uniform distribution.
+        exp_scores = np.exp(scores - scores.max(axis=1, keepdims=True))
+        probs = exp_scores / exp_scores.sum(axis=1, keepdims=True)
+        return [dict(zip(self.players, row)) for row in probs.tolist()]
+
 
 def compute_move_probabilities(
     tagged_moves: List[dict],
     player_distributions: Dict[str, Dict[str, float]],
 ) -> List[Dict[str, float]]:
+    """One-off scoring; servers should keep a model from get_player_model()."""
     if not tagged_moves:
         return []
+    return PlayerModel(player_distributions).probabilities(tagged_moves)
+
+
+_MODELS: Dict[str, Tuple[object, PlayerModel]] = {}
+_MODELS_LOCK = threading.Lock()
+
 
-    all_tags = sorted({tag for dist in player_distributions.values() for tag in dist})
-    if not all_tags:
-        return [
-            {player: 1.0 / len(player_distributions) for player in player_distributions}
-            for _ in tagged_moves
-        ]
-
-    player_vectors = {
-        player: np.array([dist.get(tag, 0.0) for tag in all_tags], dtype=float)
-        for player, dist in player_distributions.items()
-    }
-
-    for vec in player_vectors.values():
-        norm = np.linalg.norm(vec)
-        if norm > 0:
-            vec /= norm
-
-    probabilities: List[Dict[str, float]] = []
-    player_names = list(player_vectors.keys())
-
-    for move in tagged_moves:
-        tags = set(move.get("tags") or [])
-        move_vec = np.array([1.0 if tag in tags else 0.0 for tag in all_tags], dtype=float)
-        norm = np.linalg.norm(move_vec)
-        if norm > 0:
-            move_vec /= norm
-
-        scores = []
-        for player in player_names:
-            player_vec = player_vectors[player]
-            score = float(np.dot(move_vec, player_vec)) if norm > 0 else 0.0
-            scores.append(score)
-
-        scores_arr = np.array(scores, dtype=float)
-        if np.all(scores_arr == 0):
-            probs = np.full(len(player_names), 1.0 / len(player_names))
-        else:
-            exp_scores = np.exp(scores_arr - np.max(scores_arr))
-            probs = exp_scores / exp_scores.sum()
-
-        probabilities.append({player: float(prob) for player, prob in zip(player_names, probs)})
-
-    return probabilities
+def get_player_model(reports_path: str | os.PathLike = "reports") -> PlayerModel:
+    """
+    The PlayerModel for the summaries in `reports_path`, compiled once and
+    recompiled only when load_player_summaries() sees the files change.
+    """
+    summaries = load_player_summaries(reports_path)
+    key = str(reports_path)
+    with _MODELS_LOCK:
+        cached = _MODELS.get(key)
+        if cached is not None and cached[0] is summaries:
+            return cached[1]
+        model = PlayerModel({name: summary["tag_distribution"] for name, summary in summaries.items()})
+        _MODELS[key] = (summaries, model)
+        return model
@@ -0,0 +1,315 @@
+"""
+Two-tier cache for normalized tagger results (see codex_utils.analyze_position).
+
+Entries are keyed by (normalized FEN, move UCI, depth, multipv, pipeline,
+engine path, config fingerprint); the fingerprint comes from
+rule_tagger2.core.config_snapshot.config_fingerprint(), so changing any
+threshold, the CONTROL config or a tagger env switch misses cleanly.
+
+Tiers:
+    memory  LRU of JSON-encoded results, bounded by TAG_CACHE_SIZE entries.
+    disk    Optional SQLite file at TAG_CACHE_PATH shared by processes,
+            bounded by TAG_CACHE_MAX_ROWS (least recently used rows go first).
+
+Both tiers honour TAG_CACHE_TTL_S (0 disables expiry).
+
+Environment:
+    TAG_CACHE_ENABLED   "0" disables caching entirely (default "1").
+    TAG_CACHE_SIZE      In-memory entries (default 2048).
+    TAG_CACHE_PATH      SQLite file for the persistent tier (default: none).
+    TAG_CACHE_TTL_S     Entry lifetime in seconds (default 604800 = 7 days).
+    TAG_CACHE_MAX_ROWS  Row limit of the persistent tier (default 200000).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import chess
+
+logger = logging.getLogger(__name__)
+
+# Prune the persistent tier after this many writes.
+_PRUNE_EVERY = 256
+
+
+@dataclass(frozen=True)
+class TagCacheConfig:
+    enabled: bool = True
+    memory_size: int = 2048
+    path: Optional[str] = None
+    ttl_s: float = 7 * 24 * 3600.0
+    max_rows: int = 200_000
+
+    @classmethod
+    def from_env(cls) -> "TagCacheConfig":
+        return cls(
+            enabled=os.getenv("TAG_CACHE_ENABLED", "1").lower() not in ("0", "false", "no"),
+            memory_size=int(os.getenv("TAG_CACHE_SIZE", "2048")),
+            path=os.getenv("TAG_CACHE_PATH") or None,
+            ttl_s=float(os.getenv("TAG_CACHE_TTL_S", str(7 * 24 * 3600))),
+            max_rows=int(os.getenv("TAG_CACHE_MAX_ROWS", "200000")),
+        )
+
+
+def normalize_fen(fen: str) -> str:
+    """Canonical FEN: normalized spacing and only legal en-passant squares."""
+    return chess.Board(fen).fen(en_passant="legal")
+
+
+def make_key(
+    fen: str,
+    move_uci: str,
+    *,
+    depth: int,
+    multipv: int,
+    pipeline: str,
+    engine_path: str,
+    fingerprint: str,
+) -> str:
+    return "|".join(
+        [normalize_fen(fen), move_uci.strip().lower(), str(depth), str(multipv), pipeline, engine_path, fingerprint]
+    )
+
+
+@dataclass
+class _Counters:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    expired: int = 0
+    evicted: int = 0
+    errors: int = 0
+
+
+class TagResultCache:
+    """Thread-safe LRU + SQLite cache of JSON-serialisable tagger results."""
+
+    def __init__(self, config: Optional[TagCacheConfig] = None, clock=time.time):
+        self.config = config or TagCacheConfig.from_env()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._counters = _Counters()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._writes_since_prune = 0
+
+    # ------------------------------------------------------------------ tiers
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if not self.config.path:
+            return None
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+        Path(self.config.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.config.path, timeout=5.0, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tag_results ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS tag_results_accessed ON tag_results (accessed_at)")
+        conn.commit()
+        self._conn = conn
+        self._conn_pid = os.getpid()
+        return conn
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.config.ttl_s > 0 and now - created_at > self.config.ttl_s
+
+    def _remember(self, key: str, created_at: float, encoded: str) -> None:
+        self._memory[key] = (created_at, encoded)
+        self._memory.move_to_end(key)
+        while len(self._memory) > max(self.config.memory_size, 0):
+            self._memory.popitem(last=False)
+            self._counters.evicted += 1
+
+    # -------------------------------------------------------------------- api
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh copy of the cached result for *key*, or None."""
+        if not self.config.enabled:
+            return None
+        now = self._clock()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, encoded = entry
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self._counters.memory_hits += 1
+                    return json.loads(encoded)
+                del self._memory[key]
+                self._counters.expired += 1
+            try:
+                conn = self._connection()
+                row = None
+                if conn is not None:
+                    row = conn.execute(
+                        "SELECT value, created_at FROM tag_results WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None and self._expired(row[1], now):
+                        conn.execute("DELETE FROM tag_results WHERE key = ?", (key,))
+                        conn.commit()
+                        self._counters.expired += 1
+                        row = None
+                    elif row is not None:
+                        conn.execute("UPDATE tag_results SET accessed_at = ? WHERE key = ?", (now, key))
+                        conn.commit()
+            except sqlite3.Error as exc:
+                logger.warning("Tag cache read failed: %s", exc)
+                self._counters.errors += 1
+                row = None
+            if row is None:
+                self._counters.misses += 1
+                return None
+            encoded, created_at = row
+            self._remember(key, created_at, encoded)
+            self._counters.disk_hits += 1
+        return json.loads(encoded)
+
+    def contains(self, key: str) -> bool:
+        """Return True if *key* has a live entry, without touching counters or LRU order."""
+        if not self.config.enabled:
+            return False
+        now = self._clock()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry[0], now):
+                return True
+            try:
+                conn = self._connection()
+                if conn is None:
+                    return False
+                row = conn.execute("SELECT created_at FROM tag_results WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error:
+                return False
+            return row is not None and not self._expired(row[0], now)
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Store *value*; results that cannot be JSON-encoded are skipped."""
+        if not self.config.enabled:
+            return
+        try:
+            encoded = json.dumps(value, default=str)
+        except (TypeError, ValueError) as exc:
+            logger.warning("Tag cache skipped unserialisable result: %s", exc)
+            return
+        now = self._clock()
+        with self._lock:
+            self._remember(key, now, encoded)
+            self._counters.stores += 1
+            try:
+                conn = self._connection()
+                if conn is None:
+                    return
+                conn.execute(
+                    "INSERT OR REPLACE INTO tag_results (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, encoded, now, now),
+                )
+                conn.commit()
+                self._writes_since_prune += 1
+                if self._writes_since_prune >= _PRUNE_EVERY:
+                    self._prune(conn, now)
+            except sqlite3.Error as exc:
+                logger.warning("Tag cache write failed: %s", exc)
+                self._counters.errors += 1
+
+    def _prune(self, conn: sqlite3.Connection, now: float) -> None:
+        self._writes_since_prune = 0
+        if self.config.ttl_s > 0:
+            cur = conn.execute("DELETE FROM tag_results WHERE created_at < ?", (now - self.config.ttl_s,))
+            self._counters.expired += cur.rowcount
+        cur = conn.execute(
+            "DELETE FROM tag_results WHERE key IN ("
+            " SELECT key FROM tag_results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (max(self.config.max_rows, 0),),
+        )
+        self._counters.evicted += cur.rowcount
+        conn.commit()
+
+    def prune(self) -> None:
+        """Apply TTL and row-limit eviction to the persistent tier now."""
+        with self._lock:
+            conn = self._connection()
+            if conn is not None:
+                self._prune(conn, self._clock())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            conn = self._connection()
+            if conn is not None:
+                conn.execute("DELETE FROM tag_results")
+                conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = self._counters
+            hits = counters.memory_hits + counters.disk_hits
+            lookups = hits + counters.misses
+            return {
+                "enabled": self.config.enabled,
+                "memory_entries": len(self._memory),
+                "memory_hits": counters.memory_hits,
+                "disk_hits": counters.disk_hits,
+                "misses": counters.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "stores": counters.stores,
+                "expired": counters.expired,
+                "evicted": counters.evicted,
+                "errors": counters.errors,
+                "path": self.config.path,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+            self._conn_pid = None
+
+
+_CACHE: Optional[TagResultCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_tag_cache() -> TagResultCache:
+    """Return the process-wide cache, creating it from the environment on first use."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = TagResultCache(TagCacheConfig.from_env())
+        return _CACHE
+
+
+def configure_tag_cache(config: TagCacheConfig) -> TagResultCache:
+    """Replace the process-wide cache (closing the previous one)."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is not None:
+            _CACHE.close()
+        _CACHE = TagResultCache(config)
+        return _CACHE
+
+
+__all__ = [
+    "TagCacheConfig",
+    "TagResultCache",
+    "configure_tag_cache",
+    "get_tag_cache",
+    "make_key",
+    "normalize_fen",
+]
@@ -1,4 +1,5 @@
 """Test fixtures for rule_tagger2 integration tests."""
+from .analysis_cache import use_fresh_analysis_cache
 from .mock_engine import MockEngine, get_mock_engine
 
-__all__ = ["MockEngine", "get_mock_engine"]
+__all__ = ["MockEngine", "get_mock_engine", "use_fresh_analysis_cache"]
@@ -0,0 +1,23 @@
+"""
+Process-wide analysis cache isolation for engine-backed tests.
+
+``engine_utils.analysis_cache`` keeps one cache per process, keyed by engine
+path and position. MockEngine answers depend on the move stack, so a cache
+warmed by an earlier test changes later results; tests that compare tagging
+outputs install a fresh cache of their own instead.
+"""
+import unittest
+from unittest.mock import patch
+
+from engine_utils import analysis_cache
+from engine_utils.analysis_cache import AnalysisCache, AnalysisCacheConfig
+
+
+def use_fresh_analysis_cache(test: unittest.TestCase, *, enabled: bool = False, size: int = 64) -> AnalysisCache:
+    """Swap in an empty process-wide cache until ``test`` finishes (disabled by default)."""
+    cache = AnalysisCache(AnalysisCacheConfig(enabled=enabled, size=size, path=None))
+    patcher = patch.object(analysis_cache, "_CACHE", cache)
+    patcher.start()
+    test.addCleanup(patcher.stop)
+    test.addCleanup(cache.close)
+    return cache
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Scripted UCI engine for protocol tests of imitator_uci_engine.
+
+Answers every search with deterministic MultiPV lines (legal moves in UCI
+order, one centipawn score per line).  ``go movetime N`` waits N ms and
+``go depth N`` waits FAKE_UCI_DEPTH_DELAY_MS (default 0) so tests can hold
+the search or the tagging phase open; ``stop`` ends a waiting search early.
+"""
+import os
+import select
+import sys
+import time
+
+import chess
+
+DEPTH_DELAY_S = float(os.environ.get("FAKE_UCI_DEPTH_DELAY_MS", "0")) / 1000.0
+
+
+class _LineReader:
+    """Unbuffered line reader on fd 0 so select() sees every pending byte."""
+
+    def __init__(self):
+        self._buffer = b""
+        self.eof = False
+
+    def readline(self, timeout=None):
+        while b"\n" not in self._buffer:
+            if self.eof:
+                break
+            if timeout is not None:
+                ready, _, _ = select.select([0], [], [], max(timeout, 0.0))
+                if not ready:
+                    return None
+            chunk = os.read(0, 4096)
+            if not chunk:
+                self.eof = True
+                break
+            self._buffer += chunk
+        line, sep, rest = self._buffer.partition(b"\n")
+        if not sep and not self.eof:
+            return None
+        self._buffer = rest
+        return line.decode()
+
+
+def _out(line):
+    sys.stdout.write(line + "\n")
+    sys.stdout.flush()
+
+
+def _search(board, multipv, wait_s, reader, pending):
+    end = time.monotonic() + wait_s
+    while True:
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            break
+        line = reader.readline(timeout=remaining)
+        if line is None:
+            continue
+        if line.strip() == "stop" or reader.eof:
+            break
+        pending.append(line)
+    moves = sorted(board.legal_moves, key=lambda move: move.uci())
+    if not moves:
+        _out("info depth 1 score mate 0")
+        _out("bestmove (none)")
+        return
+    for index, move in enumerate(moves[:multipv]):
+        _out(f"info depth 10 multipv {index + 1} score cp {30 - 5 * index} nodes 100 pv {move.uci()}")
+    _out(f"bestmove {moves[0].uci()}")
+
+
+def main():
+    reader = _LineReader()
+    pending = []
+    board = chess.Board()
+    multipv = 1
+    while True:
+        line = pending.pop(0) if pending else reader.readline()
+        if line is None or (not line and reader.eof):
+            break
+        tokens = line.split()
+        if not tokens:
+            continue
+        command = tokens[0]
+        if command == "uci":
+            _out("id name fake_uci_engine")
+            _out("option name MultiPV type spin default 1 min 1 max 500")
+            _out("option name Hash type spin default 16 min 1 max 1024")
+            _out("uciok")
+        elif command == "isready":
+            _out("readyok")
+        elif command == "setoption" and "MultiPV" in tokens:
+            multipv = int(tokens[-1])
+        elif command == "position":
+            if tokens[1] == "startpos":
+                board = chess.Board()
+                rest = tokens[2:]
+            else:
+                board = chess.Board(" ".join(tokens[2:8]))
+                rest = tokens[8:]
+            if rest and rest[0] == "moves":
+                for move in rest[1:]:
+                    board.push_uci(move)
+        elif command == "go":
+            wait_s = 0.0
+            if "movetime" in tokens:
+                wait_s = int(tokens[tokens.index("movetime") + 1]) / 1000.0
+            elif "depth" in tokens:
+                wait_s = DEPTH_DELAY_S
+            _search(board, multipv, wait_s, reader, pending)
+        elif command == "quit":
+            break
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Tests for the transposition-aware engine analysis cache in
+engine_utils.analysis_cache.
+"""
+import os
+import tempfile
+import unittest
+
+import chess
+import chess.engine
+
+from engine_utils.analysis_cache import AnalysisCache, AnalysisCacheConfig
+
+START = chess.STARTING_FEN
+
+
+class _CountingEngine:
+    """Returns ``multipv`` lines scored by depth so tests can tell searches apart."""
+
+    def __init__(self):
+        self.calls = []
+
+    def analyse(self, board, limit, multipv=None):
+        self.calls.append((board.fen(), limit.depth, multipv))
+        moves = list(board.legal_moves)[: multipv or 1]
+        infos = [
+            {
+                "score": chess.engine.PovScore(chess.engine.Cp(limit.depth * 10 - i), board.turn),
+                "pv": [move],
+                "depth": limit.depth,
+            }
+            for i, move in enumerate(moves)
+        ]
+        return infos if multipv is not None else infos[0]
+
+
+class TestAnalysisCache(unittest.TestCase):
+    def setUp(self):
+        self.engine = _CountingEngine()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "analyses.sqlite")
+
+    def _cache(self, **overrides):
+        cache = AnalysisCache(AnalysisCacheConfig(**{"size": 8, "path": None, **overrides}))
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_repeat_request_is_served_from_cache(self):
+        cache = self._cache()
+        board = chess.Board(START)
+        first = cache.analyse(self.engine, "/sf", board, 12, multipv=3)
+        second = cache.analyse(self.engine, "/sf", board, 12, multipv=3)
+        self.assertEqual(len(self.engine.calls), 1)
+        self.assertEqual([line["pv"] for line in second], [line["pv"] for line in first])
+        self.assertEqual(
+            [line["score"].pov(chess.WHITE).score() for line in second],
+            [line["score"].pov(chess.WHITE).score() for line in first],
+        )
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertGreaterEqual(stats["saved_engine_ms"], 0.0)
+
+    def test_deeper_wider_entry_serves_shallower_narrower_request(self):
+        cache = self._cache()
+        board = chess.Board(START)
+        cache.analyse(self.engine, "/sf", board, 14, multipv=4)
+        lines = cache.analyse(self.engine, "/sf", board, 10, multipv=2)
+        self.assertEqual(len(self.engine.calls), 1)
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[0]["depth"], 14)
+
+    def test_shallower_or_narrower_entry_is_not_used(self):
+        cache = self._cache()
+        board = chess.Board(START)
+        cache.analyse(self.engine, "/sf", board, 10, multipv=2)
+        cache.analyse(self.engine, "/sf", board, 14, multipv=2)
+        cache.analyse(self.engine, "/sf", board, 10, multipv=4)
+        self.assertEqual(len(self.engine.calls), 3)
+
+    def test_exact_depth_ignores_deeper_entries(self):
+        cache = self._cache()
+        board = chess.Board(START)
+        cache.analyse(self.engine, "/sf", board, 14, multipv=1)
+        info = cache.analyse(self.engine, "/sf", board, 6, multipv=1, exact_depth=True)
+        self.assertEqual(len(self.engine.calls), 2)
+        self.assertEqual(info[0]["depth"], 6)
+
+    def test_transposition_hits_the_same_entry(self):
+        cache = self._cache()
+        via_knight_first = chess.Board(START)
+        for uci in ("g1f3", "g8f6", "b1c3"):
+            via_knight_first.push_uci(uci)
+        via_other_order = chess.Board(START)
+        for uci in ("b1c3", "g8f6", "g1f3"):
+            via_other_order.push_uci(uci)
+        cache.analyse(self.engine, "/sf", via_knight_first, 12)
+        info = cache.analyse(self.engine, "/sf", via_other_order, 12)
+        self.assertEqual(len(self.engine.calls), 1)
+        self.assertIsInstance(info, dict)
+        self.assertEqual(info["score"].pov(chess.BLACK).score(), 120)
+
+    def test_entries_are_per_engine_path(self):
+        cache = self._cache()
+        board = chess.Board(START)
+        cache.analyse(self.engine, "/sf-a", board, 12)
+        cache.analyse(self.engine, "/sf-b", board, 12)
+        self.assertEqual(len(self.engine.calls), 2)
+
+    def test_lru_evicts_oldest_position(self):
+        cache = self._cache(size=2)
+        boards = []
+        for uci in ("e2e4", "d2d4", "c2c4"):
+            board = chess.Board(START)
+            board.push_uci(uci)
+            boards.append(board)
+            cache.analyse(self.engine, "/sf", board, 8)
+        cache.analyse(self.engine, "/sf", boards[0], 8)
+        self.assertEqual(len(self.engine.calls), 4)
+        self.assertEqual(cache.stats()["evicted"], 2)
+
+    def test_mate_scores_round_trip(self):
+        cache = self._cache()
+        board = chess.Board(START)
+        cache.store(
+            "/sf",
+            board,
+            12,
+            1,
+            [{"score": chess.engine.PovScore(chess.engine.Mate(-3), chess.WHITE), "pv": []}],
+            5.0,
+        )
+        line = cache.lookup("/sf", board, 12, 1)[0]
+        self.assertEqual(line["score"].pov(chess.WHITE).mate(), -3)
+        self.assertNotIn("pv", line)
+
+    def test_persistent_tier_survives_restart(self):
+        board = chess.Board(START)
+        self._cache(path=self.path).analyse(self.engine, "/sf", board, 16, multipv=3)
+        fresh = self._cache(path=self.path)
+        lines = fresh.analyse(self.engine, "/sf", board, 12, multipv=2)
+        self.assertEqual(len(self.engine.calls), 1)
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(fresh.stats()["disk_hits"], 1)
+
+    def test_disabled_cache_always_searches(self):
+        cache = self._cache(enabled=False)
+        board = chess.Board(START)
+        cache.analyse(self.engine, "/sf", board, 12)
+        cache.analyse(self.engine, "/sf", board, 12)
+        self.assertEqual(len(self.engine.calls), 2)
+        self.assertEqual(cache.stats()["hits"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Parity of the bitboard ChessEvaluator components with the reference
+evaluate() over the golden-case positions (before and after the move).
+"""
+import json
+import random
+import unittest
+from pathlib import Path
+
+import chess
+
+from chess_evaluator import ChessEvaluator
+from chess_evaluator.bitboard import evaluate_components
+
+TESTS_DIR = Path(__file__).parent
+
+
+def _golden_boards():
+    boards = {}
+    for path in [TESTS_DIR / "golden_cases.json", *sorted((TESTS_DIR / "golden_cases").glob("*.json"))]:
+        for case in json.loads(path.read_text(encoding="utf-8")):
+            if not isinstance(case, dict) or not case.get("fen"):
+                continue
+            board = chess.Board(case["fen"])
+            boards[board.fen()] = board
+            played = board.copy()
+            try:
+                if case.get("move_uci"):
+                    played.push_uci(case["move_uci"])
+                elif case.get("move"):
+                    played.push_san(case["move"])
+            except ValueError:
+                continue
+            boards[played.fen()] = played
+    return list(boards.values())
+
+
+def _random_boards(count=60, seed=7):
+    rng = random.Random(seed)
+    boards = []
+    for _ in range(count):
+        board = chess.Board()
+        for _ in range(rng.randint(10, 120)):
+            moves = list(board.legal_moves)
+            if not moves:
+                break
+            board.push(rng.choice(moves))
+        boards.append(board)
+    return boards
+
+
+class TestBitboardParity(unittest.TestCase):
+    def assert_parity(self, boards):
+        for board in boards:
+            with self.subTest(fen=board.fen()):
+                expected = ChessEvaluator(board).evaluate()["components"]
+                self.assertEqual(evaluate_components(board), expected)
+
+    def test_golden_positions(self):
+        boards = _golden_boards()
+        self.assertGreater(len(boards), 100)
+        self.assert_parity(boards)
+
+    def test_random_playouts(self):
+        self.assert_parity(_random_boards())
+
+    def test_pins_and_missing_kings(self):
+        self.assert_parity(
+            [
+                chess.Board("4k3/8/8/8/4r3/8/4N3/4K3 w - - 0 1"),
+                chess.Board("4k3/3p4/8/1B6/8/8/8/4K3 b - - 0 1"),
+                chess.Board("8/8/8/8/8/8/PPP5/8 w - - 0 1"),
+                chess.Board("q3k3/8/8/8/8/8/6B1/R3K2R w KQ - 0 1"),
+            ]
+        )
+
+    def test_components_method(self):
+        board = chess.Board("r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3")
+        evaluator = ChessEvaluator(board)
+        self.assertEqual(evaluator.components(), evaluator.evaluate()["components"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,6 +9,7 @@ import unittest
 from unittest.mock import MagicMock, patch
 
 from codex_utils import analyze_position
+from tests.fixtures.analysis_cache import use_fresh_analysis_cache
 from tests.fixtures.mock_engine import MockEngine
 
 
@@ -16,6 +17,7 @@ class TestCodexUtils(unittest.TestCase):
     """codex_utils helper tests."""
 
     def setUp(self):
+        use_fresh_analysis_cache(self)
         self.mock_engine = MockEngine()
         self.mock_context = MagicMock()
         self.mock_context.__enter__.return_value = self.mock_engine
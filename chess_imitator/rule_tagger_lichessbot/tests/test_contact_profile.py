@@ -0,0 +1,111 @@
+"""
+Parity of the bitboard contact_profile with the push/pop implementation it
+replaced, over every position of the fixture PGNs and golden cases (also
+with the turn flipped, as control_helpers probes it), plus its memo.
+"""
+import json
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import chess
+import chess.pgn
+
+from rule_tagger2.legacy import contact
+from rule_tagger2.legacy.contact import contact_memo, contact_profile
+
+TESTS_DIR = Path(__file__).parent
+
+
+def reference_contact_profile(board):
+    total_moves = 0
+    capture_moves = 0
+    checking_moves = 0
+    for mv in board.legal_moves:
+        total_moves += 1
+        if board.is_capture(mv):
+            capture_moves += 1
+        else:
+            board.push(mv)
+            if board.is_check():
+                checking_moves += 1
+            board.pop()
+    contact_moves = capture_moves + checking_moves
+    ratio = (contact_moves / total_moves) if total_moves else 0.0
+    return ratio, total_moves, capture_moves, checking_moves
+
+
+def _fixture_boards():
+    boards = []
+    for path in sorted(TESTS_DIR.glob("**/*.pgn")):
+        with path.open(encoding="utf-8", errors="replace") as handle:
+            while True:
+                game = chess.pgn.read_game(handle)
+                if game is None:
+                    break
+                board = game.board()
+                boards.append(board.copy(stack=False))
+                for move in game.mainline_moves():
+                    board.push(move)
+                    boards.append(board.copy(stack=False))
+    for path in [TESTS_DIR / "golden_cases.json", *sorted((TESTS_DIR / "golden_cases").glob("*.json"))]:
+        for case in json.loads(path.read_text(encoding="utf-8")):
+            if isinstance(case, dict) and case.get("fen"):
+                boards.append(chess.Board(case["fen"]))
+    return boards
+
+
+class TestContactProfileParity(unittest.TestCase):
+    def assert_parity(self, boards):
+        for board in boards:
+            for turn in (chess.WHITE, chess.BLACK):
+                probe = board.copy(stack=False)
+                probe.turn = turn
+                with self.subTest(fen=probe.fen()):
+                    self.assertEqual(contact_profile(probe), reference_contact_profile(probe))
+
+    def test_fixture_positions(self):
+        boards = _fixture_boards()
+        self.assertGreater(len(boards), 100)
+        self.assert_parity(boards)
+
+    def test_special_moves(self):
+        self.assert_parity(
+            [
+                # Discovered checks by a knight and by the king.
+                chess.Board("4k3/8/8/8/4N3/8/8/4R1K1 w - - 0 1"),
+                chess.Board("7k/8/8/8/3K4/8/1B6/8 w - - 0 1"),
+                # Promotions (with check along the vacated file) and en passant.
+                chess.Board("3k4/1P6/8/8/8/8/8/1R4K1 w - - 0 1"),
+                chess.Board("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 2"),
+                # Castling into check.
+                chess.Board("5k2/8/8/8/8/8/8/4K2R w K - 0 1"),
+                # Side not to move already in check.
+                chess.Board("4k3/8/8/8/8/8/4R3/4K3 b - - 0 1"),
+            ]
+        )
+
+
+class TestContactMemo(unittest.TestCase):
+    def test_memo_is_scoped_to_the_block(self):
+        board = chess.Board()
+        with patch.object(contact, "_profile", wraps=contact._profile) as profile:
+            with contact_memo():
+                contact_profile(board)
+                with contact_memo():
+                    contact_profile(board.copy())
+            self.assertEqual(profile.call_count, 1)
+            contact_profile(board)
+            self.assertEqual(profile.call_count, 2)
+
+    def test_memo_distinguishes_side_to_move(self):
+        board = chess.Board("4k3/8/8/8/8/8/4R3/4K3 w - - 0 1")
+        flipped = board.copy()
+        flipped.turn = chess.BLACK
+        with contact_memo():
+            self.assertEqual(contact_profile(board), reference_contact_profile(board))
+            self.assertEqual(contact_profile(flipped), reference_contact_profile(flipped))
+
+
+if __name__ == "__main__":
+    unittest.main()
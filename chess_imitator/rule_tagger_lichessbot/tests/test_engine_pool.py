@@ -0,0 +1,215 @@
+"""
+Tests for the process-wide engine pool in engine_utils.pool.
+
+Uses a fake spawn function so no Stockfish binary is required.
+"""
+import threading
+import unittest
+from contextlib import ExitStack
+from unittest.mock import MagicMock, patch
+
+import chess.engine
+
+from engine_utils.pool import (
+    BorrowCancelled,
+    EnginePool,
+    EnginePoolConfig,
+    HASH_POLICY_CLEAR,
+    _PooledEngine,
+    cancel_borrows,
+)
+from tests.fixtures.mock_engine import MockEngine
+
+
+class _FakeSpawner:
+    """Spawn function that records every engine it creates."""
+
+    def __init__(self):
+        self.spawned = []
+        self.closed = []
+
+    def __call__(self, engine_path: str) -> _PooledEngine:
+        engine = MagicMock(name=f"engine-{len(self.spawned)}")
+        engine.returncode.done.return_value = False
+        engine.options = {"Clear Hash": None}
+        stack = ExitStack()
+        stack.callback(self.closed.append, engine)
+        self.spawned.append(engine)
+        return _PooledEngine(engine=engine, stack=stack)
+
+
+class TestEnginePool(unittest.TestCase):
+    def setUp(self):
+        self.spawner = _FakeSpawner()
+
+    def _pool(self, **overrides) -> EnginePool:
+        config = EnginePoolConfig(**{"size": 2, "borrow_timeout_s": 0.2, **overrides})
+        return EnginePool(config, spawn=self.spawner)
+
+    def test_reuses_engine_between_borrows(self):
+        pool = self._pool()
+        with pool.borrow("/sf") as first:
+            pass
+        with pool.borrow("/sf") as second:
+            pass
+        self.assertIs(first, second)
+        self.assertEqual(len(self.spawner.spawned), 1)
+        stats = pool.stats()
+        self.assertEqual(stats["borrows"], 2)
+        self.assertEqual(stats["reused"], 1)
+
+    def test_engines_are_keyed_by_path(self):
+        pool = self._pool()
+        with pool.borrow("/sf-a") as eng_a:
+            pass
+        with pool.borrow("/sf-b") as eng_b:
+            pass
+        self.assertIsNot(eng_a, eng_b)
+        self.assertEqual(set(pool.stats()["paths"]), {"/sf-a", "/sf-b"})
+
+    def test_concurrent_borrows_get_distinct_engines(self):
+        pool = self._pool(size=2)
+        with pool.borrow("/sf") as first, pool.borrow("/sf") as second:
+            self.assertIsNot(first, second)
+
+    def test_exhausted_pool_spawns_overflow_engine(self):
+        pool = self._pool(size=1)
+        with pool.borrow("/sf") as first:
+            with pool.borrow("/sf") as second:
+                self.assertIsNot(first, second)
+            # Overflow engines are never returned to the pool.
+            self.assertIn(second, self.spawner.closed)
+        self.assertEqual(pool.stats()["overflow"], 1)
+
+    def test_waiting_borrower_receives_released_engine(self):
+        pool = self._pool(size=1, borrow_timeout_s=5.0)
+        received = []
+        acquired = threading.Event()
+        release = threading.Event()
+
+        def holder():
+            with pool.borrow("/sf") as eng:
+                received.append(eng)
+                acquired.set()
+                release.wait(1.0)
+
+        thread = threading.Thread(target=holder)
+        thread.start()
+        acquired.wait(1.0)
+        threading.Timer(0.05, release.set).start()
+        with pool.borrow("/sf") as eng:
+            received.append(eng)
+        thread.join()
+        self.assertIs(received[0], received[1])
+        self.assertEqual(pool.stats()["overflow"], 0)
+
+    def test_engine_error_discards_and_respawns(self):
+        pool = self._pool()
+        with self.assertRaises(chess.engine.EngineTerminatedError):
+            with pool.borrow("/sf") as eng:
+                raise chess.engine.EngineTerminatedError("crashed")
+        self.assertIn(eng, self.spawner.closed)
+        with pool.borrow("/sf") as replacement:
+            self.assertIsNot(eng, replacement)
+        self.assertEqual(pool.stats()["discarded"], 1)
+
+    def test_dead_process_is_respawned_on_borrow(self):
+        pool = self._pool()
+        with pool.borrow("/sf") as eng:
+            pass
+        eng.returncode.done.return_value = True
+        with pool.borrow("/sf") as replacement:
+            self.assertIsNot(eng, replacement)
+        self.assertIn(eng, self.spawner.closed)
+
+    def test_idle_engine_is_pinged_before_reuse(self):
+        pool = self._pool(healthcheck_idle_s=0.0)
+        with pool.borrow("/sf") as eng:
+            pass
+        eng.ping.side_effect = chess.engine.EngineError("no readyok")
+        with pool.borrow("/sf") as replacement:
+            self.assertIsNot(eng, replacement)
+        self.assertEqual(pool.stats()["respawned"], 1)
+
+    def test_clear_hash_policy(self):
+        pool = self._pool(hash_policy=HASH_POLICY_CLEAR)
+        with pool.borrow("/sf") as eng:
+            pass
+        eng.configure.assert_not_called()
+        with pool.borrow("/sf"):
+            pass
+        eng.configure.assert_called_once_with({"Clear Hash": None})
+
+    def test_caller_errors_keep_engine_pooled(self):
+        pool = self._pool()
+        with self.assertRaises(KeyError):
+            with pool.borrow("/sf") as eng:
+                raise KeyError("caller bug")
+        with pool.borrow("/sf") as again:
+            self.assertIs(eng, again)
+
+    def test_close_quits_idle_engines(self):
+        pool = self._pool()
+        with pool.borrow("/sf") as eng:
+            pass
+        pool.close()
+        self.assertIn(eng, self.spawner.closed)
+        with self.assertRaises(RuntimeError):
+            with pool.borrow("/sf"):
+                pass
+
+    def test_default_spawn_enters_popen_uci_context(self):
+        """Call sites patched on popen_uci (see test_codex_utils) keep working."""
+        mock_engine = MockEngine()
+        mock_context = MagicMock()
+        mock_context.__enter__.return_value = mock_engine
+        mock_context.__exit__.return_value = None
+        pool = EnginePool(EnginePoolConfig(size=1))
+        with patch("chess.engine.SimpleEngine.popen_uci", return_value=mock_context) as popen:
+            with pool.borrow("/mock") as eng:
+                self.assertIs(eng, mock_engine)
+            with pool.borrow("/mock"):
+                pass
+        popen.assert_called_once_with("/mock")
+        pool.close()
+        mock_context.__exit__.assert_called_once()
+
+    def test_disabled_pool_spawns_per_borrow(self):
+        mock_context = MagicMock()
+        mock_context.__enter__.return_value = MockEngine()
+        mock_context.__exit__.return_value = None
+        pool = EnginePool(EnginePoolConfig(enabled=False))
+        with patch("chess.engine.SimpleEngine.popen_uci", return_value=mock_context) as popen:
+            with pool.borrow("/mock"):
+                pass
+            with pool.borrow("/mock"):
+                pass
+        self.assertEqual(popen.call_count, 2)
+
+    def test_cancelled_scope_refuses_to_borrow(self):
+        pool = self._pool()
+        stop = threading.Event()
+        with cancel_borrows(stop):
+            with pool.borrow("/sf"):
+                pass
+            stop.set()
+            with self.assertRaises(BorrowCancelled):
+                with pool.borrow("/sf"):
+                    pass
+        with pool.borrow("/sf"):
+            pass
+        self.assertEqual(len(self.spawner.spawned), 1)
+
+    def test_cancel_wakes_a_waiting_borrower(self):
+        pool = self._pool(size=1, borrow_timeout_s=5.0)
+        stop = threading.Event()
+        threading.Timer(0.1, stop.set).start()
+        with pool.borrow("/sf"):
+            with cancel_borrows(stop), self.assertRaises(BorrowCancelled):
+                with pool.borrow("/sf"):
+                    pass
+        self.assertEqual(pool.stats()["overflow"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
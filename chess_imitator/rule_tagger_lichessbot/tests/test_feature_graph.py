@@ -0,0 +1,103 @@
+"""
+FeatureGraph semantics (lazy, cached, dependency-ordered, cost-reported) and
+its use in tag_position: every declared feature of a move is either computed
+once or counted as skipped.
+"""
+import unittest
+from pathlib import Path
+
+from rule_tagger2.legacy.core import tag_position
+from rule_tagger2.legacy.feature_graph import FeatureGraph, feature_cost_report, reset_feature_costs
+
+FAKE_ENGINE = Path(__file__).resolve().parent / "fixtures" / "fake_uci_engine.py"
+
+
+class FeatureGraphTests(unittest.TestCase):
+    def setUp(self):
+        reset_feature_costs()
+
+    def test_features_are_computed_on_first_access_only(self):
+        calls = []
+        graph = FeatureGraph()
+        graph.define("probe", lambda: calls.append("probe") or 7)
+
+        self.assertFalse(graph.computed("probe"))
+        self.assertEqual(graph["probe"], 7)
+        self.assertEqual(graph.get("probe"), 7)
+        self.assertEqual(calls, ["probe"])
+        self.assertTrue(graph.computed("probe"))
+
+    def test_dependencies_are_resolved_and_shared(self):
+        calls = []
+        graph = FeatureGraph()
+
+        @graph.feature("base")
+        def base():
+            calls.append("base")
+            return 2
+
+        graph.define("double", lambda value: value * 2, deps=("base",))
+        graph.define("square", lambda value: value * value, deps=("base",))
+
+        self.assertEqual(graph["double"], 4)
+        self.assertEqual(graph["square"], 4)
+        self.assertEqual(calls, ["base"])
+
+    def test_unread_features_are_never_computed_and_reported_as_skipped(self):
+        graph = FeatureGraph()
+        graph.define("cheap", lambda: 1)
+        graph.define("expensive", lambda: self.fail("gated feature was computed"))
+
+        graph["cheap"]
+        self.assertEqual(graph.skipped(), ["expensive"])
+        graph.close()
+
+        report = feature_cost_report()
+        self.assertEqual(report["cheap"]["calls"], 1)
+        self.assertEqual(report["cheap"]["skipped"], 0)
+        self.assertEqual(report["expensive"], {"calls": 0, "ms": 0.0, "skipped": 1, "mean_ms": 0.0})
+
+    def test_errors_are_not_cached(self):
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("engine died")
+            return "ok"
+
+        graph = FeatureGraph()
+        graph.define("probe", flaky)
+        with self.assertRaises(RuntimeError):
+            graph["probe"]
+        self.assertFalse(graph.computed("probe"))
+        self.assertEqual(graph["probe"], "ok")
+
+    def test_definition_errors(self):
+        graph = FeatureGraph()
+        graph.define("a", lambda b: b, deps=("b",))
+        graph.define("b", lambda a: a, deps=("a",))
+        with self.assertRaises(ValueError):
+            graph.define("a", lambda: None)
+        with self.assertRaisesRegex(ValueError, "a -> b -> a"):
+            graph["a"]
+        with self.assertRaises(KeyError):
+            graph["missing"]
+
+
+class TagPositionFeatureTests(unittest.TestCase):
+    def test_each_feature_is_computed_or_skipped_once_per_move(self):
+        reset_feature_costs()
+        fen = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+        for move in ("f1b5", "d2d3"):
+            tag_position(str(FAKE_ENGINE), fen, move, depth=6, multipv=3)
+
+        report = feature_cost_report()
+        self.assertIn("followup_played", report)
+        self.assertEqual(report["evaluation_played"]["calls"], 2)
+        for name, entry in report.items():
+            self.assertEqual(entry["calls"] + entry["skipped"], 2, name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Tests for the follow-up simulation: MultiPV reuse, engine fallback and the
+pooled, concurrent simulate_followups helper.
+"""
+import threading
+import unittest
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import chess
+import chess.engine
+
+from rule_tagger2.core import engine_io
+from rule_tagger2.core.engine_io import followup_pv_covers, simulate_followup_metrics, simulate_followups
+from tests.fixtures.analysis_cache import use_fresh_analysis_cache
+
+FEN = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+PV = [chess.Move.from_uci(uci) for uci in ("f1b5", "a7a6", "b5a4", "g8f6")]
+
+
+class _FirstLegalEngine:
+    """Plays the first legal move and counts calls."""
+
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def play(self, board, limit):
+        with self.lock:
+            self.calls += 1
+        return chess.engine.PlayResult(next(iter(board.legal_moves)), None)
+
+
+class TestFollowupFromPV(unittest.TestCase):
+    def setUp(self):
+        use_fresh_analysis_cache(self)
+        self.board = chess.Board(FEN)
+
+    def test_pv_covers(self):
+        self.assertTrue(followup_pv_covers(self.board, PV, 3))
+        self.assertFalse(followup_pv_covers(self.board, PV[:2], 3))
+        self.assertFalse(followup_pv_covers(self.board, [PV[1]] + PV[1:], 3))
+        mated = chess.Board("rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3")
+        self.assertTrue(followup_pv_covers(mated, [], 3))
+
+    def test_full_pv_needs_no_engine(self):
+        base, opp_base, seq, opp_seq = simulate_followup_metrics(None, self.board, chess.WHITE, steps=3, pv=PV)
+        self.assertEqual(len(seq), 3)
+        self.assertEqual(len(opp_seq), 3)
+        played = self.board.copy()
+        for move in PV[:3]:
+            played.push(move)
+        expected, _, _ = engine_io.evaluation_and_metrics(played, chess.WHITE)
+        self.assertEqual(seq[-1], expected)
+        self.assertEqual(opp_base, {key: round(-value, 3) for key, value in base.items()})
+
+    def test_short_pv_falls_back_to_engine(self):
+        engine = _FirstLegalEngine()
+        _, _, seq, _ = simulate_followup_metrics(engine, self.board, chess.WHITE, steps=3, pv=PV[:1])
+        self.assertEqual(len(seq), 3)
+        self.assertEqual(engine.calls, 2)
+
+    def test_illegal_pv_move_falls_back_to_engine(self):
+        engine = _FirstLegalEngine()
+        simulate_followup_metrics(engine, self.board, chess.WHITE, steps=3, pv=[PV[1]] + PV)
+        self.assertEqual(engine.calls, 3)
+
+    def test_missing_engine_is_an_error(self):
+        with self.assertRaises(ValueError):
+            simulate_followup_metrics(None, self.board, chess.WHITE, steps=3, pv=PV[:1])
+
+
+class TestSimulateFollowups(unittest.TestCase):
+    def setUp(self):
+        use_fresh_analysis_cache(self)
+        self.engine = _FirstLegalEngine()
+        self.borrows = 0
+
+        @contextmanager
+        def borrow(engine_path):
+            self.borrows += 1
+            yield self.engine
+
+        patcher = patch.object(engine_io, "borrow_engine", borrow)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_results_in_job_order_and_covered_jobs_skip_the_engine(self):
+        board = chess.Board(FEN)
+        jobs = [(board, PV), (board, ()), (board, PV[:2]), (board, PV)]
+        results = simulate_followups("/mock", jobs, chess.WHITE, steps=3)
+        expected = [
+            simulate_followup_metrics(self.engine, job_board, chess.WHITE, steps=3, pv=pv) for job_board, pv in jobs
+        ]
+        self.assertEqual(results, expected)
+        self.assertEqual(self.borrows, 2)
+
+    def test_all_covered_borrows_nothing(self):
+        board = chess.Board(FEN)
+        simulate_followups("/mock", [(board, PV), (board, PV)], chess.WHITE, steps=3)
+        self.assertEqual(self.borrows, 0)
+        self.assertEqual(self.engine.calls, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
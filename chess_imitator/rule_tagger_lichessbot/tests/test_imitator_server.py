@@ -0,0 +1,172 @@
+"""
+Tests for the multi-game imitator server: round-robin scheduling in
+fair_pool and concurrent sessions driven by load_generator.
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+IMITATOR_ROOT = Path(__file__).resolve().parents[2]
+if str(IMITATOR_ROOT) not in sys.path:
+    sys.path.insert(0, str(IMITATOR_ROOT))
+
+from fair_pool import FairPool  # noqa: E402
+from load_generator import percentile, run_load  # noqa: E402
+
+FAKE_ENGINE = Path(__file__).resolve().parent / "fixtures" / "fake_uci_engine.py"
+
+
+class TestFairPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = FairPool(1)
+        self.addCleanup(self.pool.shutdown)
+        self.order = []
+        self.release = threading.Event()
+        # Occupy the only worker so the queues fill up before anything runs.
+        self.blocker = self.pool.submit("blocker", self.release.wait)
+
+    def _job(self, name):
+        return lambda: self.order.append(name)
+
+    def test_sessions_are_served_in_turn(self):
+        session_a = self.pool.session("a")
+        session_b = self.pool.session("b")
+        futures = [session_a.submit(self._job(f"a{index}")) for index in range(3)]
+        futures += [session_b.submit(self._job(f"b{index}")) for index in range(2)]
+        self.release.set()
+        for future in futures:
+            future.result(timeout=5)
+        self.assertEqual(self.order, ["a0", "b0", "a1", "b1", "a2"])
+
+    def test_cancelled_jobs_are_skipped(self):
+        session = self.pool.session("a")
+        kept = session.submit(self._job("kept"))
+        dropped = session.submit(self._job("dropped"))
+        dropped.cancel()
+        self.release.set()
+        kept.result(timeout=5)
+        self.blocker.result(timeout=5)
+        self.pool.submit("a", lambda: None).result(timeout=5)
+        self.assertEqual(self.order, ["kept"])
+
+    def test_session_shutdown_cancels_its_queue_only(self):
+        session_a = self.pool.session("a")
+        session_b = self.pool.session("b")
+        queued_a = session_a.submit(self._job("a"))
+        queued_b = session_b.submit(self._job("b"))
+        session_a.shutdown(cancel_futures=True)
+        self.release.set()
+        queued_b.result(timeout=5)
+        self.assertTrue(queued_a.cancelled())
+        self.assertEqual(self.order, ["b"])
+
+    def test_close_session_forgets_its_stats(self):
+        session = self.pool.session("a")
+        session.submit(self._job("done"))
+        self.release.set()
+        # Joining the workers makes every completion count visible.
+        self.pool.shutdown()
+        self.assertEqual(self.pool.stats()["completed"], {"blocker": 1, "a": 1})
+        self.pool.close_session("a")
+        self.pool.close_session("blocker")
+        stats = self.pool.stats()
+        self.assertEqual(stats["completed"], {})
+        self.assertEqual(stats["completed_total"], 2)
+
+    def test_close_session_cancels_queued_jobs(self):
+        queued = self.pool.session("a").submit(self._job("a"))
+        self.pool.close_session("a")
+        self.release.set()
+        self.blocker.result(timeout=5)
+        self.pool.submit("b", lambda: None).result(timeout=5)
+        self.assertTrue(queued.cancelled())
+        self.assertEqual(self.order, [])
+        self.assertNotIn("a", self.pool.stats()["completed"])
+
+    def test_exceptions_reach_the_future(self):
+        def boom():
+            raise ValueError("boom")
+
+        self.release.set()
+        with self.assertRaises(ValueError):
+            self.pool.submit("a", boom).result(timeout=5)
+
+
+class TestPercentile(unittest.TestCase):
+    def test_nearest_rank(self):
+        values = [float(value) for value in range(1, 21)]
+        self.assertEqual(percentile(values, 0.95), 19.0)
+        self.assertEqual(percentile(values, 0.5), 10.0)
+        self.assertEqual(percentile([], 0.95), 0.0)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestImitatorServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        os.chmod(FAKE_ENGINE, 0o755)
+        cls.port = _free_port()
+        cls.server = subprocess.Popen(
+            [
+                sys.executable,
+                str(IMITATOR_ROOT / "imitator_server.py"),
+                "--port",
+                str(cls.port),
+                "--max-sessions",
+                "3",
+                "--workers",
+                "2",
+            ],
+            cwd=str(IMITATOR_ROOT),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            env={
+                **os.environ,
+                "CHESS_IMITATOR_STOCKFISH_PATH": str(FAKE_ENGINE),
+                "TAG_CACHE_ENABLED": "0",
+                "ENGINE_CACHE_ENABLED": "0",
+                "MOVE_LOG_ENABLED": "0",
+            },
+        )
+        for line in cls.server.stderr:
+            if "listening on" in line:
+                break
+        threading.Thread(target=cls.server.stderr.read, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.terminate()
+        cls.server.wait(timeout=30)
+
+    def test_concurrent_games_with_their_own_styles(self):
+        report = asyncio.run(
+            run_load(
+                "127.0.0.1",
+                self.port,
+                games=3,
+                moves=3,
+                tc="60+0",
+                styles=["MihailTal", "Petrosian"],
+                move_timeout=60.0,
+            )
+        )
+        self.assertEqual(report["errors"], [])
+        self.assertEqual(report["moves"], 9)
+        self.assertEqual(report["flagged"], 0)
+        self.assertGreater(report["latency_p95_s"], 0.0)
+        self.assertGreater(report["throughput_moves_per_s"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+Tests for the buffered, rotating JSONL writer (chess_imitator/jsonl_log.py).
+"""
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+IMITATOR_ROOT = Path(__file__).resolve().parents[2]
+if str(IMITATOR_ROOT) not in sys.path:
+    sys.path.insert(0, str(IMITATOR_ROOT))
+
+from jsonl_log import JsonlLogConfig, JsonlLogWriter  # noqa: E402
+
+
+def _read_lines(path):
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle]
+
+
+class TestJsonlLogWriter(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.directory = Path(self._tmp.name)
+
+    def _writer(self, **overrides):
+        config = JsonlLogConfig(directory=self.directory, name_pattern="moves_log", **overrides)
+        writer = JsonlLogWriter(config)
+        self.addCleanup(writer.close)
+        return writer
+
+    def test_entries_are_written_in_order(self):
+        writer = self._writer()
+        for index in range(50):
+            self.assertTrue(writer.write({"i": index}))
+        writer.flush()
+        self.assertEqual([entry["i"] for entry in _read_lines(self.directory / "moves_log.jsonl")], list(range(50)))
+        self.assertEqual(writer.stats()["written"], 50)
+
+    def test_rotates_by_size_and_resumes_last_file(self):
+        writer = self._writer(max_bytes=200, batch_size=1)
+        for index in range(20):
+            writer.write({"i": index, "pad": "x" * 40})
+            writer.flush()
+        writer.close()
+        files = sorted(self.directory.glob("moves_log*.jsonl"), key=lambda p: p.stat().st_mtime_ns)
+        self.assertGreater(len(files), 1)
+        for path in files[:-1]:
+            self.assertGreaterEqual(path.stat().st_size, 200)
+        entries = [entry["i"] for path in files for entry in _read_lines(path)]
+        self.assertEqual(entries, list(range(20)))
+
+        # A new writer continues in the last file while it has room.
+        last = files[-1]
+        with last.open("w", encoding="utf-8") as handle:
+            handle.write(json.dumps({"i": 19}) + "\n")
+        resumed = self._writer(max_bytes=200)
+        resumed.write({"i": 20})
+        resumed.flush()
+        self.assertEqual(resumed.stats()["path"], str(last))
+        self.assertEqual([entry["i"] for entry in _read_lines(last)], [19, 20])
+
+    def test_dated_pattern_starts_a_new_file_per_day(self):
+        now = [time.mktime((2026, 10, 17, 23, 59, 0, 0, 0, -1))]
+        config = JsonlLogConfig(directory=self.directory, name_pattern="log_%Y%m%d")
+        writer = JsonlLogWriter(config, clock=lambda: now[0])
+        self.addCleanup(writer.close)
+        writer.write({"day": 1})
+        writer.flush()
+        now[0] += 120
+        writer.write({"day": 2})
+        writer.flush()
+        self.assertEqual(_read_lines(self.directory / "log_20261017.jsonl"), [{"day": 1}])
+        self.assertEqual(_read_lines(self.directory / "log_20261018.jsonl"), [{"day": 2}])
+
+    def test_rotated_files_are_compressed(self):
+        writer = self._writer(max_bytes=100, batch_size=1, compress=True)
+        for index in range(10):
+            writer.write({"i": index, "pad": "y" * 40})
+            writer.flush()
+        writer.close()
+        compressed = sorted(self.directory.glob("moves_log*.jsonl.gz"))
+        plain = list(self.directory.glob("moves_log*.jsonl"))
+        self.assertTrue(compressed)
+        self.assertEqual(len(plain), 1)
+        entries = sorted(entry["i"] for path in compressed + plain for entry in _read_lines(path))
+        self.assertEqual(entries, list(range(10)))
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        config = JsonlLogConfig(directory=self.directory, name_pattern="moves_log", queue_size=2)
+        writer = JsonlLogWriter(config, autostart=False)
+        self.addCleanup(writer.close)
+        results = [writer.write({"i": index}) for index in range(5)]
+        self.assertEqual(results, [True, True, False, False, False])
+        self.assertEqual(writer.stats()["dropped"], 3)
+        writer.start()
+        writer.flush()
+        self.assertEqual(_read_lines(self.directory / "moves_log.jsonl"), [{"i": 0}, {"i": 1}])
+
+    def test_disabled_log_writes_nothing(self):
+        writer = self._writer(enabled=False)
+        self.assertFalse(writer.write({"i": 0}))
+        writer.close()
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+    def test_from_env_overrides(self):
+        env = {"TEST_LOG_ENABLED": "0", "TEST_LOG_MAX_BYTES": "123", "TEST_LOG_COMPRESS": "1"}
+        with mock.patch.dict(os.environ, env):
+            config = JsonlLogConfig.from_env("TEST_LOG", directory=self.directory, name_pattern="x", max_bytes=9)
+        self.assertFalse(config.enabled)
+        self.assertEqual(config.max_bytes, 123)
+        self.assertTrue(config.compress)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -12,6 +12,7 @@ from unittest.mock import patch, MagicMock
 import chess
 
 from rule_tagger2.core.facade import tag_position
+from tests.fixtures.analysis_cache import use_fresh_analysis_cache
 from tests.fixtures.mock_engine import MockEngine
 
 
@@ -20,6 +21,7 @@ class TestKnightBishopExchangeIntegration(unittest.TestCase):
 
     def setUp(self):
         """Set up test environment"""
+        use_fresh_analysis_cache(self)
         # Use mock engine by default (CI-friendly, deterministic)
         self.use_mock = os.environ.get("USE_REAL_ENGINE", "0") == "0"
 
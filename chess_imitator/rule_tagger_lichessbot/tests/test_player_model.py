@@ -0,0 +1,104 @@
+"""
+Tests for the compiled GM-probability model in superchess_predictor.
+"""
+import json
+import os
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from superchess_predictor.backend.file_utils import load_player_summaries
+from superchess_predictor.backend.predictor import PlayerModel, compute_move_probabilities, get_player_model
+
+
+def _loop_probabilities(tagged_moves, player_distributions):
+    """The original per-move, per-player scoring, kept as the reference."""
+    all_tags = sorted({tag for dist in player_distributions.values() for tag in dist})
+    players = list(player_distributions)
+    vectors = {}
+    for player, dist in player_distributions.items():
+        vec = np.array([dist.get(tag, 0.0) for tag in all_tags], dtype=float)
+        norm = np.linalg.norm(vec)
+        vectors[player] = vec / norm if norm > 0 else vec
+    result = []
+    for move in tagged_moves:
+        tags = set(move.get("tags") or [])
+        move_vec = np.array([1.0 if tag in tags else 0.0 for tag in all_tags], dtype=float)
+        norm = np.linalg.norm(move_vec)
+        if norm > 0:
+            move_vec /= norm
+        scores = np.array([float(np.dot(move_vec, vectors[p])) if norm > 0 else 0.0 for p in players])
+        if np.all(scores == 0):
+            probs = np.full(len(players), 1.0 / len(players))
+        else:
+            exp_scores = np.exp(scores - np.max(scores))
+            probs = exp_scores / exp_scores.sum()
+        result.append(dict(zip(players, probs)))
+    return result
+
+
+def _synthetic(players=40, tags=30, moves=12, seed=3):
+    rng = random.Random(seed)
+    vocab = [f"tag_{index}" for index in range(tags)]
+    distributions = {
+        f"player_{index}": {tag: rng.random() for tag in rng.sample(vocab, rng.randint(0, tags))}
+        for index in range(players)
+    }
+    tagged = [{"tags": rng.sample(vocab + ["unknown"], rng.randint(0, 5))} for _ in range(moves)]
+    return tagged, distributions
+
+
+class TestPlayerModel(unittest.TestCase):
+    def test_matches_reference_scoring(self):
+        tagged, distributions = _synthetic()
+        expected = _loop_probabilities(tagged, distributions)
+        actual = PlayerModel(distributions).probabilities(tagged)
+        self.assertEqual(len(actual), len(expected))
+        for got, want in zip(actual, expected):
+            self.assertEqual(list(got), list(want))
+            for player in want:
+                self.assertAlmostEqual(got[player], want[player], places=12)
+
+    def test_untagged_move_is_uniform(self):
+        model = PlayerModel({"a": {"x": 1.0}, "b": {"y": 2.0}})
+        self.assertEqual(model.probabilities([{"tags": []}, {"tags": ["z"]}]), [{"a": 0.5, "b": 0.5}] * 2)
+
+    def test_empty_inputs(self):
+        self.assertEqual(compute_move_probabilities([], {"a": {"x": 1.0}}), [])
+        self.assertEqual(PlayerModel({}).probabilities([{"tags": ["x"]}]), [{}])
+
+
+class TestPlayerModelReload(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.reports = Path(self.tmp.name)
+        self._write("alpha", {"x": 0.5})
+
+    def _write(self, name, ratios, mtime_ns=None):
+        path = self.reports / f"universal_{name}_summary.json"
+        distribution = {tag: {"ratio": ratio} for tag, ratio in ratios.items()}
+        path.write_text(json.dumps({"global_tag_distribution": distribution}), encoding="utf-8")
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def test_model_is_reused_until_summaries_change(self):
+        model = get_player_model(self.reports)
+        self.assertIs(get_player_model(self.reports), model)
+        self.assertIs(load_player_summaries(self.reports), load_player_summaries(self.reports))
+
+        self._write("alpha", {"x": 0.5, "y": 0.25}, mtime_ns=10**18)
+        updated = get_player_model(self.reports)
+        self.assertIsNot(updated, model)
+        self.assertEqual(updated.tags, ["x", "y"])
+
+        self._write("beta", {"z": 1.0})
+        os.utime(self.reports, ns=(2 * 10**18, 2 * 10**18))
+        self.assertEqual(get_player_model(self.reports).players, ["Alpha", "Beta"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Tests for the imitator's ponder bookkeeping (chess_imitator/ponder.py).
+"""
+import sys
+import unittest
+from pathlib import Path
+
+import chess
+
+IMITATOR_ROOT = Path(__file__).resolve().parents[2]
+if str(IMITATOR_ROOT) not in sys.path:
+    sys.path.insert(0, str(IMITATOR_ROOT))
+
+from ponder import PonderBook, PonderEntry, predicted_replies  # noqa: E402
+
+
+def _entry(fen, tagged=(True, True)):
+    candidates = [{"uci": uci, "sf_eval": 10.0} for uci in ("e7e5", "c7c5")[: len(tagged)]]
+    payload = {
+        "fen": fen,
+        "candidates": [dict(candidate, tagged=flag) for candidate, flag in zip(candidates, tagged)],
+        "tagging": {"tagged": sum(tagged)},
+    }
+    return PonderEntry(fen=fen, candidates=candidates, best_move="e7e5", search_s=0.5, tagged_payload=payload, tag_s=1.5)
+
+
+class TestPredictedReplies(unittest.TestCase):
+    def test_pv_reply_comes_first_and_duplicates_are_dropped(self):
+        board = chess.Board()
+        board.push_uci("e2e4")
+        replies = predicted_replies(board, "c7c5", ["e7e5", "c7c5", "e7e6"], limit=3)
+        self.assertEqual([move.uci() for move in replies], ["c7c5", "e7e5", "e7e6"])
+
+    def test_illegal_and_malformed_moves_are_skipped(self):
+        board = chess.Board()
+        board.push_uci("e2e4")
+        replies = predicted_replies(board, "e2e4", ["zz", "e7e5"], limit=2)
+        self.assertEqual([move.uci() for move in replies], ["e7e5"])
+
+
+class TestPonderBook(unittest.TestCase):
+    def test_hit_counts_only_moves_with_predictions(self):
+        book = PonderBook()
+        self.assertIsNone(book.take("fen-a"))
+        self.assertEqual(book.stats.moves, 0)
+
+        book.prepare(["fen-a", "fen-b"])
+        book.add(_entry("fen-a"))
+        self.assertIsNotNone(book.take("fen-a"))
+        book.prepare(["fen-c"])
+        self.assertIsNone(book.take("fen-d"))
+        self.assertEqual((book.stats.hits, book.stats.moves), (1, 2))
+        self.assertAlmostEqual(book.stats.hit_rate, 0.5)
+
+    def test_take_forgets_the_move_predictions(self):
+        book = PonderBook()
+        book.prepare(["fen-a"])
+        book.add(_entry("fen-a"))
+        book.take("fen-b")
+        self.assertEqual(book.entries, {})
+        self.assertIsNone(book.take("fen-a"))
+
+    def test_reset_returns_finished_game_stats(self):
+        book = PonderBook()
+        book.prepare(["fen-a"])
+        book.add(_entry("fen-a"))
+        book.take("fen-a")
+        book.record_saved(2.0)
+        finished = book.reset()
+        self.assertEqual((finished.hits, finished.saved_s), (1, 2.0))
+        self.assertEqual(book.stats.moves, 0)
+
+
+class TestPonderEntry(unittest.TestCase):
+    def test_tagged_payload_is_cut_to_multipv(self):
+        payload = _entry("fen-a").tagged_for(1)
+        self.assertEqual([candidate["uci"] for candidate in payload["candidates"]], ["e7e5"])
+
+    def test_partially_tagged_payload_is_not_reused(self):
+        entry = _entry("fen-a", tagged=(True, False))
+        self.assertIsNotNone(entry.tagged_for(1))
+        self.assertIsNone(entry.tagged_for(2))
+
+
+if __name__ == "__main__":
+    unittest.main()
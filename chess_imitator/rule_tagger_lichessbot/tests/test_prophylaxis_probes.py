@@ -0,0 +1,135 @@
+"""
+Opponent-threat and plan-drop probes: they share one borrowed engine and the
+analysis cache, and a plan search at the threat depth answers the threat
+probe of the same position.
+"""
+import unittest
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import chess
+import chess.engine
+
+from engine_utils import prophylaxis as plan_probe
+from rule_tagger2.legacy import prophylaxis
+from rule_tagger2.legacy.prophylaxis import (
+    ProphylaxisConfig,
+    estimate_opponent_threat,
+    prefetch_prophylaxis_probes,
+)
+from tests.fixtures.analysis_cache import use_fresh_analysis_cache
+
+ENGINE = "/fake/stockfish"
+CONFIG = ProphylaxisConfig()
+FEN = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+
+
+class _CountingEngine:
+    """Scores the i-th legal move ``-10 * i`` so plan rankings are stable."""
+
+    def __init__(self):
+        self.calls = []
+
+    def analyse(self, board, limit, multipv=None):
+        self.calls.append((board.fen(), limit.depth, multipv))
+        infos = [
+            {
+                "score": chess.engine.PovScore(chess.engine.Cp(-10 * i), board.turn),
+                "pv": [move],
+                "depth": limit.depth,
+            }
+            for i, move in enumerate(list(board.legal_moves)[: multipv or 1])
+        ]
+        return infos if multipv is not None else infos[0]
+
+
+class ProphylaxisProbeTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = _CountingEngine()
+        self.borrows = 0
+
+        @contextmanager
+        def borrow(engine_path):
+            self.borrows += 1
+            yield self.engine
+
+        for module in (prophylaxis, plan_probe):
+            patcher = patch.object(module, "borrow_engine", borrow)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        use_fresh_analysis_cache(self, enabled=True)
+
+        self.board = chess.Board(FEN)
+        self.played = self.board.copy(stack=False)
+        self.played.push_uci("d2d3")
+
+    def _plan_drop(self, **kwargs):
+        return plan_probe.detect_prophylaxis_plan_drop(
+            ENGINE,
+            self.board,
+            self.played,
+            depth=8,
+            multipv=4,
+            sample_rate=1.0,
+            variance_cap=10.0,
+            runtime_cap_ms=10_000.0,
+            **kwargs,
+        )
+
+    def test_plan_search_answers_threat_probes(self):
+        prefetch_prophylaxis_probes(
+            ENGINE, self.board, self.played, chess.WHITE, config=CONFIG, plan_depth=8, plan_multipv=4
+        )
+        self.assertEqual(self.borrows, 1)
+        self.assertEqual([(depth, multipv) for _, depth, multipv in self.engine.calls], [(8, 4), (8, 4)])
+
+        searched = len(self.engine.calls)
+        estimate_opponent_threat(ENGINE, self.board, chess.WHITE, config=CONFIG)
+        estimate_opponent_threat(ENGINE, self.played, chess.WHITE, config=CONFIG)
+        result = self._plan_drop()
+        self.assertIsNotNone(result)
+        self.assertEqual(len(self.engine.calls), searched)
+
+    def test_threat_only_prefetch_searches_single_lines(self):
+        prefetch_prophylaxis_probes(ENGINE, self.board, self.played, chess.WHITE, config=CONFIG)
+        self.assertEqual([(depth, multipv) for _, depth, multipv in self.engine.calls], [(8, None), (8, None)])
+        # The null-move probe of the root and the position after the move.
+        self.assertEqual(self.engine.calls[0][0].split()[1], "b")
+        self.assertEqual(self.engine.calls[1][0], self.played.fen())
+
+    def test_shallower_plan_search_does_not_cover_threats(self):
+        prefetch_prophylaxis_probes(
+            ENGINE, self.board, self.played, chess.WHITE, config=CONFIG, plan_depth=4, plan_multipv=3
+        )
+        self.assertEqual(
+            sorted((depth, multipv or 1) for _, depth, multipv in self.engine.calls),
+            [(4, 3), (4, 3), (8, 1), (8, 1)],
+        )
+
+    def test_prefetch_is_a_no_op_without_the_cache(self):
+        use_fresh_analysis_cache(self, enabled=False)
+        prefetch_prophylaxis_probes(
+            ENGINE, self.board, self.played, chess.WHITE, config=CONFIG, plan_depth=8, plan_multipv=4
+        )
+        self.assertEqual((self.borrows, self.engine.calls), (0, []))
+
+    def test_plan_drop_borrows_one_engine_and_reuses_the_cache(self):
+        with patch.object(chess.engine.SimpleEngine, "popen_uci") as popen:
+            first = self._plan_drop()
+            second = self._plan_drop()
+        popen.assert_not_called()
+        self.assertEqual(self.borrows, 2)
+        self.assertEqual(len(self.engine.calls), 2)
+        self.assertEqual((first.psi, first.plan_loss), (second.psi, second.plan_loss))
+
+    def test_plan_drop_sampling_decision_can_be_drawn_up_front(self):
+        skipped = self._plan_drop(sampled=False)
+        self.assertEqual(skipped.reasons, ("sample_skipped",))
+        self.assertEqual(self.engine.calls, [])
+        with patch.object(plan_probe.random, "random", return_value=0.9):
+            self.assertFalse(plan_probe.sample_plan_drop(0.3))
+            self.assertTrue(plan_probe.sample_plan_drop(1.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+Tests for the two-tier tag result cache in tag_cache and its use by
+codex_utils.analyze_position.
+"""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import codex_utils
+from tag_cache import TagCacheConfig, TagResultCache, configure_tag_cache, make_key
+from tests.fixtures.analysis_cache import use_fresh_analysis_cache
+
+FEN = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _key(move="f1b5", fingerprint="abc", fen=FEN):
+    return make_key(fen, move, depth=14, multipv=6, pipeline="new", engine_path="/sf", fingerprint=fingerprint)
+
+
+class TestTagResultCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = _Clock()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "tags.sqlite")
+
+    def _cache(self, **overrides):
+        config = TagCacheConfig(**{"memory_size": 4, "path": self.path, "ttl_s": 60.0, **overrides})
+        cache = TagResultCache(config, clock=self.clock)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_memory_hit_returns_independent_copy(self):
+        cache = self._cache(path=None)
+        cache.put(_key(), {"tags": {"active": ["a"]}})
+        first = cache.get(_key())
+        first["tags"]["active"].append("mutated")
+        self.assertEqual(cache.get(_key()), {"tags": {"active": ["a"]}})
+        self.assertEqual(cache.stats()["memory_hits"], 2)
+
+    def test_key_normalizes_fen_and_includes_fingerprint(self):
+        spaced = FEN.replace(" w ", "  w ")
+        self.assertEqual(_key(fen=spaced), _key())
+        self.assertNotEqual(_key(fingerprint="abc"), _key(fingerprint="def"))
+
+    def test_lru_evicts_oldest_memory_entry(self):
+        cache = self._cache(path=None, memory_size=2)
+        for move in ("a2a3", "b2b3", "c2c3"):
+            cache.put(_key(move), {"move": move})
+        self.assertIsNone(cache.get(_key("a2a3")))
+        self.assertEqual(cache.get(_key("c2c3")), {"move": "c2c3"})
+        self.assertEqual(cache.stats()["evicted"], 1)
+
+    def test_persistent_tier_survives_new_instance(self):
+        self._cache().put(_key(), {"tags": ["x"]})
+        fresh = self._cache()
+        self.assertEqual(fresh.get(_key()), {"tags": ["x"]})
+        stats = fresh.stats()
+        self.assertEqual((stats["disk_hits"], stats["misses"]), (1, 0))
+        # Promoted into memory on the first disk hit.
+        fresh.get(_key())
+        self.assertEqual(fresh.stats()["memory_hits"], 1)
+
+    def test_ttl_expires_both_tiers(self):
+        cache = self._cache()
+        cache.put(_key(), {"tags": ["x"]})
+        self.clock.now += 61.0
+        self.assertIsNone(cache.get(_key()))
+        self.assertIsNone(self._cache().get(_key()))
+        self.assertGreaterEqual(cache.stats()["expired"], 1)
+
+    def test_prune_enforces_row_limit(self):
+        cache = self._cache(max_rows=2)
+        for idx, move in enumerate(("a2a3", "b2b3", "c2c3")):
+            self.clock.now += idx
+            cache.put(_key(move), {"move": move})
+        cache.prune()
+        fresh = self._cache()
+        self.assertIsNone(fresh.get(_key("a2a3")))
+        self.assertIsNotNone(fresh.get(_key("c2c3")))
+
+    def test_disabled_cache_never_stores(self):
+        cache = self._cache(enabled=False)
+        cache.put(_key(), {"tags": ["x"]})
+        self.assertIsNone(cache.get(_key()))
+        self.assertFalse(cache.contains(_key()))
+
+
+class TestAnalyzePositionCache(unittest.TestCase):
+    def setUp(self):
+        use_fresh_analysis_cache(self)
+        self.cache = configure_tag_cache(TagCacheConfig(path=None))
+        self.addCleanup(configure_tag_cache, TagCacheConfig.from_env())
+        patcher = patch.object(codex_utils, "_normalize_result", side_effect=lambda fen, move, result: {"fen": fen, "move": move, "tags": result})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_second_call_is_served_from_cache(self):
+        with patch.object(codex_utils, "tag_position_impl", return_value=["t"]) as impl:
+            first = codex_utils.analyze_position(FEN, "f1b5", engine_path="/sf")
+            second = codex_utils.analyze_position(FEN, "f1b5", engine_path="/sf")
+        self.assertEqual(impl.call_count, 1)
+        self.assertEqual(first, second)
+
+    def test_config_change_invalidates(self):
+        with patch.object(codex_utils, "tag_position_impl", return_value=["t"]) as impl:
+            codex_utils.analyze_position(FEN, "f1b5", engine_path="/sf")
+            with patch.object(codex_utils, "config_fingerprint", return_value="changed"):
+                codex_utils.analyze_position(FEN, "f1b5", engine_path="/sf")
+        self.assertEqual(impl.call_count, 2)
+
+    def test_batch_only_tags_missing_moves(self):
+        with patch.object(codex_utils, "tag_position_impl", return_value=["t"]):
+            codex_utils.analyze_position(FEN, "f1b5", engine_path="/sf")
+        with patch.object(codex_utils, "tag_position_batch_impl", return_value=[["b"]]) as batch:
+            results = codex_utils.analyze_positions(FEN, ["f1b5", "d2d4"], engine_path="/sf")
+        self.assertEqual(batch.call_args.args[2], ["d2d4"])
+        self.assertEqual([r["tags"] for r in results], [["t"], ["b"]])
+        self.assertIsNone(codex_utils.prepare_root_analysis(FEN, engine_path="/sf", moves=["f1b5", "d2d4"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Tests for tag_position_batch and the shared root analysis.
+
+A batch over several moves of one FEN must analyse the root once and return
+exactly what per-move tag_position calls return.
+"""
+import json
+import unittest
+from copy import deepcopy
+from unittest.mock import MagicMock, patch
+
+from rule_tagger2.legacy import core as legacy_core
+from rule_tagger2.legacy import root_analysis
+from rule_tagger2.legacy.control_helpers import CONTROL
+from rule_tagger2.legacy.core import prepare_root, tag_position, tag_position_batch
+from tests.fixtures.analysis_cache import use_fresh_analysis_cache
+from tests.fixtures.mock_engine import MockEngine
+
+FEN = "r1b2rk1/p5b1/q1p2npp/1p1pNp2/3Pn3/1PN3P1/PQ1BPPBP/2R2RK1 b - - 3 17"
+MOVES = ["e4d2", "e4c3", "c8b7"]
+
+
+def _snapshot(result) -> str:
+    return json.dumps(vars(result), sort_keys=True, default=str)
+
+
+class TestTagPositionBatch(unittest.TestCase):
+    def setUp(self):
+        use_fresh_analysis_cache(self)
+        mock_context = MagicMock()
+        mock_context.__enter__.return_value = MockEngine()
+        mock_context.__exit__.return_value = None
+        patches = [
+            patch("chess.engine.SimpleEngine.popen_uci", return_value=mock_context),
+            patch.dict(CONTROL, {"enabled": True}),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_batch_matches_single_move_results(self):
+        single = [tag_position("/mock", FEN, move) for move in MOVES]
+        batch = tag_position_batch("/mock", FEN, MOVES)
+        self.assertEqual([_snapshot(r) for r in batch], [_snapshot(r) for r in single])
+
+    def test_root_is_analysed_once_per_batch(self):
+        with patch.object(legacy_core, "analyse_root", wraps=legacy_core.analyse_root) as analyse_root:
+            tag_position_batch("/mock", FEN, MOVES)
+        self.assertEqual(analyse_root.call_count, 1)
+
+    def test_played_followups_are_simulated_in_one_prefetch(self):
+        with patch.object(root_analysis, "simulate_followups", wraps=root_analysis.simulate_followups) as simulate:
+            tag_position_batch("/mock", FEN, MOVES)
+        # Root (before/best), then one concurrent prefetch of every played move.
+        self.assertEqual(simulate.call_count, 2)
+        self.assertEqual(len(simulate.call_args_list[1].args[1]), len(MOVES))
+
+    def test_root_is_not_mutated_by_tagging(self):
+        root = prepare_root("/mock", FEN)
+        before = deepcopy(root)
+        tag_position("/mock", FEN, MOVES[0], root=root)
+        self.assertEqual(before.analysis_meta, root.analysis_meta)
+        self.assertEqual(before.evaluation_before, root.evaluation_before)
+        self.assertEqual(before.followup_before, root.followup_before)
+
+    def test_mismatched_root_is_rejected(self):
+        root = prepare_root("/mock", FEN, depth=14)
+        with self.assertRaises(ValueError):
+            tag_position("/mock", FEN, MOVES[0], depth=10, root=root)
+
+    def test_v8_path_does_not_prepare_root(self):
+        with patch.dict(CONTROL, {"enabled": False}):
+            self.assertIsNone(prepare_root("/mock", FEN))
+
+
+if __name__ == "__main__":
+    unittest.main()
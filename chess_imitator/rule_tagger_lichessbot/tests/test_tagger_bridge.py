@@ -0,0 +1,261 @@
+"""
+Tests for the concurrent candidate tagging in players/tagger_bridge.py.
+
+tag_single_move and prepare_root are replaced by module-level fakes so the
+serial, thread and process modes can be compared without an engine.
+"""
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+IMITATOR_ROOT = Path(__file__).resolve().parents[2]
+if str(IMITATOR_ROOT) not in sys.path:
+    sys.path.insert(0, str(IMITATOR_ROOT))
+
+from players import tagger_bridge  # noqa: E402
+
+from engine_utils import pool as engine_pool  # noqa: E402
+from rule_tagger2.core import facade  # noqa: E402
+from tag_cache import TagCacheConfig, TagResultCache  # noqa: E402
+from tests.test_engine_pool import _FakeSpawner  # noqa: E402
+
+FEN = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+MOVES = ["f1b5", "f1c4", "d2d4", "b1c3", "d2d3", "c2c3"]
+# Process workers only see the patched fakes when they are forked.
+MODES = [
+    mode
+    for mode in tagger_bridge.TAGGER_MODES
+    if mode != "process" or multiprocessing.get_start_method() == "fork"
+]
+
+
+def _fake_tag_single_move(fen, move_uci, engine_meta=None, root=None, stop_event=None):
+    if move_uci == "boom":
+        raise RuntimeError("engine crashed")
+    if move_uci == "die":
+        # Kills the (process) worker outright, as a segfaulting tagger would.
+        os._exit(1)
+    return {"tags": [f"tag_{move_uci}"], "analysis": {}}
+
+
+def _fake_prepare_root(fen, engine_meta=None, moves=None):
+    return None
+
+
+def _payload(moves=MOVES):
+    return {"fen": FEN, "candidates": [{"uci": uci, "sf_eval": 0.1 * idx} for idx, uci in enumerate(moves)]}
+
+
+class TagCandidatesPayloadTests(unittest.TestCase):
+    def setUp(self):
+        # Fresh long-lived executors per test, so forked process workers see the fakes.
+        executors = patch.dict(tagger_bridge._EXECUTORS, clear=True)
+        executors.start()
+        self.addCleanup(executors.stop)
+        self.addCleanup(self._shutdown_executors)
+        for name, fake in (("tag_single_move", _fake_tag_single_move), ("prepare_root", _fake_prepare_root)):
+            patcher = patch.object(tagger_bridge, name, fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _shutdown_executors():
+        for executor in tagger_bridge._EXECUTORS.values():
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def test_output_order_matches_input_in_every_mode(self):
+        for mode in MODES:
+            with self.subTest(mode=mode):
+                tagged = tagger_bridge.tag_candidates_payload(_payload(), workers=3, mode=mode)
+                self.assertEqual([c["uci"] for c in tagged["candidates"]], MOVES)
+                self.assertEqual([c["tags"] for c in tagged["candidates"]], [[f"tag_{uci}"] for uci in MOVES])
+                self.assertEqual(tagged["tagging"]["mode"], mode)
+                self.assertEqual(tagged["tagging"]["tagged"], len(MOVES))
+
+    def test_failing_candidate_gets_an_error_marker(self):
+        moves = ["f1b5", "boom", "d2d4"]
+        for mode in MODES:
+            with self.subTest(mode=mode):
+                tagged = tagger_bridge.tag_candidates_payload(_payload(moves), workers=2, mode=mode)
+                tags = [c["tags"] for c in tagged["candidates"]]
+                self.assertEqual(tags, [["tag_f1b5"], [tagger_bridge._TAGGER_ERROR], ["tag_d2d4"]])
+                self.assertTrue(all(c["tagged"] for c in tagged["candidates"]))
+
+    @unittest.skipUnless("process" in MODES, "needs fork-started process workers")
+    def test_dead_process_worker_errors_its_candidates_and_resets_the_executor(self):
+        tagged = tagger_bridge.tag_candidates_payload(_payload(["f1b5", "die", "d2d4"]), workers=2, mode="process")
+        candidates = tagged["candidates"]
+        self.assertEqual([c["uci"] for c in candidates], ["f1b5", "die", "d2d4"])
+        self.assertEqual(candidates[1]["tags"], [tagger_bridge._TAGGER_ERROR])
+        for candidate in candidates:
+            self.assertIn(candidate["tags"], ([f"tag_{candidate['uci']}"], [tagger_bridge._TAGGER_ERROR]))
+        self.assertNotIn(("process", 2), tagger_bridge._EXECUTORS)
+        retried = tagger_bridge.tag_candidates_payload(_payload(), workers=2, mode="process")
+        self.assertEqual([c["tags"] for c in retried["candidates"]], [[f"tag_{uci}"] for uci in MOVES])
+
+    def test_candidates_without_uci_are_skipped(self):
+        payload = _payload(["f1b5"])
+        payload["candidates"].append({"sf_eval": 0.0})
+        tagged = tagger_bridge.tag_candidates_payload(payload, mode="serial")
+        self.assertEqual([c["uci"] for c in tagged["candidates"]], ["f1b5"])
+
+    def test_executor_is_reused_between_calls(self):
+        tagger_bridge.tag_candidates_payload(_payload(), workers=3, mode="thread")
+        executor = tagger_bridge._EXECUTORS[("thread", 3)]
+        tagger_bridge.tag_candidates_payload(_payload(), workers=3, mode="thread")
+        self.assertEqual(list(tagger_bridge._EXECUTORS), [("thread", 3)])
+        self.assertIs(tagger_bridge._EXECUTORS[("thread", 3)], executor)
+
+    def test_unknown_mode_falls_back_to_serial(self):
+        tagged = tagger_bridge.tag_candidates_payload(_payload(), workers=3, mode="gpu")
+        self.assertEqual(tagged["tagging"]["mode"], "serial")
+        self.assertEqual(tagger_bridge._EXECUTORS, {})
+
+
+class _GatedTagger:
+    """Fake tagger whose "slow" moves and root analyses block until released."""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.block_root = False
+        self.started = []
+        self.lock = threading.Lock()
+
+    def tag_single_move(self, fen, move_uci, engine_meta=None, root=None, stop_event=None):
+        with self.lock:
+            self.started.append(move_uci)
+        if move_uci.startswith("slow"):
+            self.gate.wait(10.0)
+        return {"tags": [f"tag_{move_uci}"], "analysis": {}}
+
+    def prepare_root(self, fen, engine_meta=None, moves=None):
+        if self.block_root:
+            self.gate.wait(10.0)
+        return None
+
+
+class AnytimeTaggingTests(unittest.TestCase):
+    def setUp(self):
+        executors = patch.dict(tagger_bridge._EXECUTORS, clear=True)
+        executors.start()
+        self.addCleanup(executors.stop)
+        self.tagger = _GatedTagger()
+        # Release blocked work before the patches are undone.
+        self.addCleanup(self.tagger.gate.set)
+        for name in ("tag_single_move", "prepare_root"):
+            patcher = patch.object(tagger_bridge, name, getattr(self.tagger, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(TagCandidatesPayloadTests._shutdown_executors)
+
+    def _tag(self, moves, *, budget_s=None, stop_event=None, workers=2):
+        deadline = None if budget_s is None else time.monotonic() + budget_s
+        start = time.monotonic()
+        tagged = tagger_bridge.tag_candidates_payload(
+            _payload(moves), workers=workers, mode="thread", deadline=deadline, stop_event=stop_event
+        )
+        return tagged, time.monotonic() - start
+
+    def test_unfinished_candidates_are_marked_untagged_at_the_deadline(self):
+        tagged, elapsed = self._tag(["f1b5", "slow1", "d2d4"], budget_s=0.2, workers=3)
+        candidates = tagged["candidates"]
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual([c["uci"] for c in candidates], ["f1b5", "slow1", "d2d4"])
+        self.assertEqual([c["tagged"] for c in candidates], [True, False, True])
+        self.assertEqual(candidates[1]["tags"], [tagger_bridge._TAGGER_TIMEOUT])
+        self.assertIsNone(candidates[1]["tag_ms"])
+        self.assertEqual((tagged["tagging"]["tagged"], tagged["tagging"]["untagged"]), (2, 1))
+
+    def test_queued_candidates_are_cancelled(self):
+        tagged, _ = self._tag(["slow1", "f1b5", "d2d4"], budget_s=0.2, workers=1)
+        self.assertEqual(tagged["tagging"]["untagged"], 3)
+        self.tagger.gate.set()
+        time.sleep(0.1)
+        self.assertEqual(self.tagger.started, ["slow1"])
+
+    def test_stop_during_root_returns_everything_untagged(self):
+        self.tagger.block_root = True
+        stop = threading.Event()
+        threading.Timer(0.1, stop.set).start()
+        tagged, elapsed = self._tag(["f1b5", "d2d4"], stop_event=stop)
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual([c["tagged"] for c in tagged["candidates"]], [False, False])
+        self.assertEqual(self.tagger.started, [])
+
+    def test_abandoned_root_does_not_delay_the_next_call(self):
+        self.tagger.block_root = True
+        self._tag(["f1b5", "d2d4"], budget_s=0.1)
+        self.tagger.block_root = False
+        tagged, elapsed = self._tag(["f1b5", "d2d4"], budget_s=2.0)
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(tagged["tagging"]["untagged"], 0)
+
+    def test_abandoned_candidates_do_not_delay_the_next_call(self):
+        self._tag(["slow1", "slow2"], budget_s=0.1, workers=2)
+        tagged, elapsed = self._tag(["f1b5", "d2d4"], budget_s=2.0, workers=2)
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(tagged["tagging"]["untagged"], 0)
+
+
+class PooledAnytimeTaggingTests(unittest.TestCase):
+    """
+    Runs the real tag_single_move -> analyze_position -> tag_position chain;
+    only the engine work behind tag_position is faked, as a series of short
+    borrows from an engine pool with one engine per tagger worker.
+    """
+
+    WORKERS = 2
+    STEPS = 20
+    STEP_S = 0.2
+
+    def setUp(self):
+        executors = patch.dict(tagger_bridge._EXECUTORS, clear=True)
+        executors.start()
+        self.addCleanup(executors.stop)
+        self.gate = threading.Event()
+        self.addCleanup(self.gate.set)
+        config = engine_pool.EnginePoolConfig(size=self.WORKERS, borrow_timeout_s=10.0)
+        self.pool = engine_pool.EnginePool(config, spawn=_FakeSpawner())
+        codex_utils = sys.modules["rule_tagger_lichessbot.codex_utils"]
+        no_cache = TagResultCache(TagCacheConfig(enabled=False))
+        for target, name, value in (
+            (engine_pool, "_POOL", self.pool),
+            (facade, "_tag_position", self._tag_position),
+            (codex_utils, "get_tag_cache", lambda: no_cache),
+            (codex_utils, "_normalize_result", lambda fen, move, result: result),
+            (tagger_bridge, "prepare_root", _fake_prepare_root),
+        ):
+            patcher = patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _tag_position(self, engine_path, fen, played_move_uci, **kwargs):
+        for _ in range(self.STEPS):
+            with engine_pool.borrow_engine(engine_path):
+                if played_move_uci.startswith("slow"):
+                    self.gate.wait(self.STEP_S)
+        return {"tags": {"primary": [f"tag_{played_move_uci}"]}}
+
+    def _tag(self, moves, budget_s):
+        start = time.monotonic()
+        tagged = tagger_bridge.tag_candidates_payload(
+            _payload(moves), workers=self.WORKERS, mode="thread", deadline=time.monotonic() + budget_s
+        )
+        return tagged, time.monotonic() - start
+
+    def test_abandoned_candidates_release_their_engines(self):
+        abandoned, _ = self._tag(["slow1", "slow2"], budget_s=0.1)
+        self.assertEqual(abandoned["tagging"]["untagged"], 2)
+        tagged, elapsed = self._tag(["f1b5", "d2d4"], budget_s=3.0)
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual([c["tags"] for c in tagged["candidates"]], [["tag_f1b5"], ["tag_d2d4"]])
+        self.assertEqual(self.pool.stats()["overflow"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+Tests for the imitator's clock-aware time management (chess_imitator/time_manager.py).
+"""
+import sys
+import unittest
+from pathlib import Path
+
+import chess
+
+IMITATOR_ROOT = Path(__file__).resolve().parents[2]
+if str(IMITATOR_ROOT) not in sys.path:
+    sys.path.insert(0, str(IMITATOR_ROOT))
+
+import time_manager  # noqa: E402
+from time_manager import GoParams, TimeManager  # noqa: E402
+
+# Bare kings: game_phase 0, so MOVES_LEFT_MIN moves are expected.
+ENDGAME = chess.Board("8/8/4k3/8/8/4K3/8/8 w - - 0 60")
+
+
+def _manager(**overrides):
+    options = {"move_overhead_s": 0.0, "root_cost_s": 1.0, "candidate_cost_s": 0.5, **overrides}
+    return TimeManager(25.0, 0.2, 10, **options)
+
+
+class TestGoParams(unittest.TestCase):
+    def test_clock_fields(self):
+        go = GoParams.parse("go wtime 60000 btime 58000 winc 1000 binc 2000 movestogo 20")
+        self.assertEqual((go.wtime, go.btime, go.winc, go.binc, go.movestogo), (60000, 58000, 1000, 2000, 20))
+        self.assertEqual(go.clock_for(chess.WHITE), 60.0)
+        self.assertEqual(go.clock_for(chess.BLACK), 58.0)
+        self.assertEqual(go.increment_for(chess.BLACK), 2.0)
+
+    def test_flags_and_fixed_limits(self):
+        go = GoParams.parse("go ponder infinite movetime 500 depth 12")
+        self.assertTrue(go.ponder and go.infinite)
+        self.assertEqual((go.movetime, go.depth), (500, 12))
+
+    def test_malformed_tokens_are_ignored(self):
+        go = GoParams.parse("go wtime abc btime 5000 searchmoves e2e4 winc")
+        self.assertIsNone(go.wtime)
+        self.assertEqual(go.btime, 5000)
+        self.assertEqual(go.winc, 0)
+        self.assertIsNone(go.clock_for(chess.WHITE))
+        self.assertEqual(GoParams.parse("go"), GoParams())
+
+
+class TestTotalBudget(unittest.TestCase):
+    def test_movetime_wins_over_the_clock(self):
+        manager = _manager(move_overhead_s=0.3)
+        total, reason = manager.total_budget(GoParams.parse("go movetime 2000 wtime 1000"), ENDGAME)
+        self.assertAlmostEqual(total, 1.7)
+        self.assertEqual(reason, "movetime")
+
+    def test_movetime_is_capped_by_max_think(self):
+        total, _ = _manager().total_budget(GoParams.parse("go movetime 60000"), ENDGAME)
+        self.assertEqual(total, 25.0)
+
+    def test_no_clock_or_infinite_uses_the_fixed_budget(self):
+        self.assertEqual(_manager().total_budget(GoParams.parse("go"), ENDGAME), (25.0, "fixed"))
+        go = GoParams.parse("go infinite wtime 60000")
+        self.assertEqual(_manager().total_budget(go, ENDGAME), (25.0, "fixed"))
+
+    def test_clock_is_split_over_expected_moves_left(self):
+        total, reason = _manager().total_budget(GoParams.parse("go wtime 60000 btime 60000"), ENDGAME)
+        self.assertEqual(reason, "clock")
+        self.assertAlmostEqual(total, 60.0 / time_manager.MOVES_LEFT_MIN)
+        opening, _ = _manager().total_budget(GoParams.parse("go wtime 60000 btime 60000"), chess.Board())
+        self.assertAlmostEqual(opening, 60.0 / time_manager.MOVES_LEFT_MAX)
+
+    def test_movestogo_overrides_the_estimate(self):
+        total, _ = _manager().total_budget(GoParams.parse("go wtime 60000 movestogo 10"), ENDGAME)
+        self.assertAlmostEqual(total, 6.0)
+
+    def test_increment_share_is_added(self):
+        go = GoParams.parse("go wtime 60000 winc 2000 binc 0")
+        total, _ = _manager().total_budget(go, ENDGAME)
+        self.assertAlmostEqual(total, 60.0 / time_manager.MOVES_LEFT_MIN + 2.0 * time_manager.INCREMENT_SHARE)
+
+    def test_clock_share_caps_a_single_move(self):
+        go = GoParams.parse("go wtime 10000 movestogo 1")
+        total, _ = _manager().total_budget(go, ENDGAME)
+        self.assertAlmostEqual(total, 10.0 * time_manager.MAX_CLOCK_SHARE)
+
+    def test_overhead_and_minimum_budget(self):
+        go = GoParams.parse("go wtime 200 btime 200")
+        total, _ = _manager(move_overhead_s=0.3).total_budget(go, ENDGAME)
+        self.assertEqual(total, time_manager.MIN_BUDGET_S)
+
+
+class TestAllocate(unittest.TestCase):
+    def test_tagging_gets_what_the_search_leaves(self):
+        budget = _manager().allocate(GoParams.parse("go movetime 5000"), ENDGAME)
+        self.assertAlmostEqual(budget.search_s, 1.0)
+        self.assertAlmostEqual(budget.tagging_s, 4.0)
+        # (4.0 s tagging - 1.0 s root) / 0.5 s per candidate.
+        self.assertEqual(budget.multipv, 6)
+        self.assertTrue(budget.tag)
+        self.assertEqual(budget.reason, "movetime")
+
+    def test_multipv_is_capped(self):
+        budget = _manager(candidate_cost_s=0.01).allocate(GoParams.parse("go movetime 5000"), ENDGAME)
+        self.assertEqual(budget.multipv, 10)
+
+    def test_search_only_when_tagging_cannot_afford_min_multipv(self):
+        # 1.2 s tagging - 1.0 s root leaves room for a single 0.5 s candidate.
+        budget = _manager().allocate(GoParams.parse("go movetime 1500"), ENDGAME)
+        self.assertFalse(budget.tag)
+        self.assertEqual((budget.multipv, budget.search_s), (1, budget.total_s))
+        self.assertEqual(budget.reason, "movetime:search_only")
+
+    def test_exactly_min_multipv_still_tags(self):
+        # 2.0 s tagging = 1.0 s root + 2 * 0.5 s.
+        budget = _manager().allocate(GoParams.parse("go movetime 2500"), ENDGAME)
+        self.assertEqual(budget.multipv, time_manager.MIN_TAGGED_MULTIPV)
+        self.assertTrue(budget.tag)
+
+
+class TestObserve(unittest.TestCase):
+    def test_costs_follow_an_ema(self):
+        manager = _manager()
+        manager.observe({"tagged": 4, "root_ms": 2000.0, "wall_ms": 4000.0})
+        alpha = time_manager.COST_EMA_ALPHA
+        self.assertAlmostEqual(manager.root_cost_s, (1 - alpha) * 1.0 + alpha * 2.0)
+        self.assertAlmostEqual(manager.candidate_cost_s, (1 - alpha) * 0.5 + alpha * 0.5)
+        manager.observe({"tagged": 2, "root_ms": 0.0, "wall_ms": 200.0})
+        self.assertAlmostEqual(manager.candidate_cost_s, (1 - alpha) * 0.5 + alpha * 0.1)
+
+    def test_untagged_runs_only_update_the_root_cost(self):
+        manager = _manager()
+        manager.observe({"tagged": 0, "root_ms": 500.0, "wall_ms": 3000.0})
+        self.assertLess(manager.root_cost_s, 1.0)
+        self.assertEqual(manager.candidate_cost_s, 0.5)
+
+    def test_missing_fields_change_nothing(self):
+        manager = _manager()
+        manager.observe({})
+        self.assertEqual((manager.root_cost_s, manager.candidate_cost_s), (1.0, 0.5))
+
+    def test_cheaper_tagging_widens_multipv(self):
+        manager = _manager()
+        go = GoParams.parse("go movetime 5000")
+        before = manager.allocate(go, ENDGAME).multipv
+        for _ in range(5):
+            manager.observe({"tagged": 6, "root_ms": 200.0, "wall_ms": 800.0})
+        self.assertGreater(manager.allocate(go, ENDGAME).multipv, before)
+
+
+if __name__ == "__main__":
+    unittest.main()
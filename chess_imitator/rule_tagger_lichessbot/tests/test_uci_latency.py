@@ -0,0 +1,280 @@
+"""
+Protocol tests for the asyncio core of imitator_uci_engine.
+
+The engine runs as a subprocess against tests/fixtures/fake_uci_engine.py,
+so the numbers measure the wrapper itself: the time between writing ``go``
+and reading ``bestmove`` minus the search budget, how quickly ``stop``
+ends a search that is busy tagging, and what a ponder hit saves.
+TestPonderMissLatency drives ImitatorEngine in-process instead, with a fake
+tagger that never finishes the pondered position.
+"""
+import asyncio
+import os
+import queue
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import chess
+
+IMITATOR_ROOT = Path(__file__).resolve().parents[2]
+ENGINE_SCRIPT = IMITATOR_ROOT / "imitator_uci_engine.py"
+FAKE_ENGINE = Path(__file__).resolve().parent / "fixtures" / "fake_uci_engine.py"
+
+# Budgets below MIN_TAGGED_MULTIPV candidates skip tagging, so "go movetime 200"
+# is a pure 50 ms search: the rest of the round trip is wrapper overhead.
+SEARCH_ONLY_BUDGET_S = 0.05
+MAX_MEDIAN_OVERHEAD_S = 0.05
+ROUNDS = 10
+
+
+class _UciProcess:
+    def __init__(self, **env):
+        os.chmod(FAKE_ENGINE, 0o755)
+        self.lines: "queue.Queue[str]" = queue.Queue()
+        self.proc = subprocess.Popen(
+            [sys.executable, str(ENGINE_SCRIPT)],
+            cwd=str(IMITATOR_ROOT),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+            env={
+                **os.environ,
+                "CHESS_IMITATOR_STOCKFISH_PATH": str(FAKE_ENGINE),
+                "TAG_CACHE_ENABLED": "0",
+                "ENGINE_CACHE_ENABLED": "0",
+                "MOVE_LOG_ENABLED": "0",
+                "CHESS_IMITATOR_PONDER": "0",
+                **env,
+            },
+        )
+        threading.Thread(target=self._pump, daemon=True).start()
+
+    def _pump(self):
+        for line in self.proc.stdout:
+            self.lines.put(line.strip())
+
+    def send(self, command):
+        self.proc.stdin.write(command + "\n")
+        self.proc.stdin.flush()
+
+    def expect(self, prefix, timeout=30.0):
+        end = time.monotonic() + timeout
+        while True:
+            line = self.lines.get(timeout=max(end - time.monotonic(), 0.001))
+            if line.startswith(prefix):
+                return line
+
+    def go(self, position, go_command):
+        self.send(position)
+        start = time.monotonic()
+        self.send(go_command)
+        line = self.expect("bestmove")
+        return line.split()[1], time.monotonic() - start
+
+    def kill(self):
+        self.proc.kill()
+        self.proc.wait(timeout=30)
+
+    def close(self):
+        try:
+            self.send("quit")
+            self.proc.wait(timeout=30)
+        except (BrokenPipeError, subprocess.TimeoutExpired):
+            self.proc.kill()
+
+
+class TestUciLatency(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.uci = _UciProcess()
+        cls.uci.send("uci")
+        cls.uci.expect("uciok")
+        cls.uci.send("isready")
+        cls.uci.expect("readyok")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.uci.close()
+
+    def test_forced_opening_round_trip(self):
+        samples = []
+        for _ in range(ROUNDS):
+            move, elapsed = self.uci.go("position startpos", "go wtime 60000 btime 60000")
+            self.assertEqual(move, "g1f3")
+            samples.append(elapsed)
+        median = statistics.median(samples)
+        self.assertLess(median, MAX_MEDIAN_OVERHEAD_S, f"go->bestmove median {median * 1000:.1f} ms")
+
+    def test_search_only_overhead(self):
+        samples = []
+        for _ in range(ROUNDS):
+            move, elapsed = self.uci.go("position startpos moves g1f3 d7d6", "go movetime 200")
+            self.assertEqual(move, "a2a3")
+            samples.append(elapsed - SEARCH_ONLY_BUDGET_S)
+        median = statistics.median(samples)
+        self.assertLess(median, MAX_MEDIAN_OVERHEAD_S, f"go->bestmove overhead median {median * 1000:.1f} ms")
+
+    def test_isready_is_answered_during_search(self):
+        self.uci.send("position startpos moves g1f3 d7d6")
+        self.uci.send("go movetime 2000")
+        self.uci.send("isready")
+        self.uci.expect("readyok", timeout=1.0)
+        self.uci.send("stop")
+        self.uci.expect("bestmove")
+
+
+class TestUciStop(unittest.TestCase):
+    def setUp(self):
+        # Every tagger search takes 200 ms, so tagging outlasts the test's stop.
+        self.uci = _UciProcess(FAKE_UCI_DEPTH_DELAY_MS="200")
+        # The abandoned root analysis would hold a graceful quit for seconds.
+        self.addCleanup(self.uci.kill)
+        self.uci.send("uci")
+        self.uci.expect("uciok")
+
+    def test_stop_interrupts_tagging(self):
+        self.uci.send("position startpos moves g1f3 d7d6")
+        # 4.7 s budget: a ~0.9 s search, then several seconds of tagging.
+        self.uci.send("go movetime 5000")
+        time.sleep(1.5)
+        start = time.monotonic()
+        self.uci.send("stop")
+        line = self.uci.expect("bestmove", timeout=10.0)
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(len(line.split()), 2)
+
+
+class TestUciPonder(unittest.TestCase):
+    def setUp(self):
+        self.uci = _UciProcess(CHESS_IMITATOR_PONDER="1")
+        self.addCleanup(self.uci.close)
+        self.uci.send("uci")
+        self.uci.expect("uciok")
+
+    def test_predicted_reply_skips_the_search(self):
+        moves = ["g1f3", "d7d6"]
+        # 4.7 s budget with a ~0.9 s Stockfish slice.
+        move, _ = self.uci.go("position startpos moves " + " ".join(moves), "go movetime 5000")
+        moves.append(move)
+        board = chess.Board()
+        for uci in moves:
+            board.push_uci(uci)
+        # The fake engine ranks replies in UCI order, so this is the predicted reply.
+        moves.append(min(reply.uci() for reply in board.legal_moves))
+        time.sleep(3.0)
+        _, elapsed = self.uci.go("position startpos moves " + " ".join(moves), "go movetime 5000")
+        self.assertLess(elapsed, 0.5)
+
+
+
+class TestPonderMissLatency(unittest.TestCase):
+    """A ponder stopped by a miss must not hold up the real move's tagging."""
+
+    REAL_MOVES = ["g1f3", "d7d6", "a2a3"]
+
+    def setUp(self):
+        os.chmod(FAKE_ENGINE, 0o755)
+        if str(IMITATOR_ROOT) not in sys.path:
+            sys.path.insert(0, str(IMITATOR_ROOT))
+        import imitator_uci_engine
+        from players import tagger_bridge
+
+        self.engine_module = imitator_uci_engine
+        board = chess.Board()
+        for uci in self.REAL_MOVES[:2]:
+            board.push_uci(uci)
+        self.first_fen = board.fen()
+        board.push_uci(self.REAL_MOVES[2])
+        # The fake engine ranks replies in UCI order, so the last one is never pondered.
+        board.push_uci(max(reply.uci() for reply in board.legal_moves))
+        self.real_fen = board.fen()
+        self.gate = threading.Event()
+        self.ponder_blocked = threading.Event()
+        self.real_tagged = []
+        self.addCleanup(self.gate.set)
+
+        def pondered(fen):
+            return fen not in (self.first_fen, self.real_fen)
+
+        def prepare_root(fen, engine_meta=None, moves=None):
+            if pondered(fen) and self.block == "root":
+                self.ponder_blocked.set()
+                self.gate.wait(30.0)
+            return None
+
+        def tag_single_move(fen, move_uci, engine_meta=None, root=None, stop_event=None):
+            if fen == self.real_fen:
+                self.real_tagged.append(move_uci)
+            elif pondered(fen) and self.block == "candidates":
+                self.ponder_blocked.set()
+                self.gate.wait(30.0)
+            return {"tags": ["deferred_initiative"], "analysis": {}}
+
+        patches = [
+            patch.object(tagger_bridge, "prepare_root", prepare_root),
+            patch.object(tagger_bridge, "tag_single_move", tag_single_move),
+            patch("style_scorer._log_move_decision"),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def _real_move_after_ponder(self, **executors):
+        module = self.engine_module
+        stockfish = module.StockfishProcess(str(FAKE_ENGINE))
+        await stockfish.initialize()
+        lines = []
+        time_manager = module.TimeManager(10.0, 0.2, 3, move_overhead_s=0.0, root_cost_s=0.1, candidate_cost_s=0.1)
+        engine = module.ImitatorEngine(
+            stockfish, multipv=3, time_manager=time_manager, ponder=True, output=lines.append, **executors
+        )
+        try:
+            await engine.handle("position startpos moves " + " ".join(self.REAL_MOVES[:2]))
+            await engine.handle("go movetime 2000")
+            await engine.search_task
+            self.assertEqual(lines[-1], "bestmove " + self.REAL_MOVES[2])
+            # The ponder is now stuck tagging a predicted reply.
+            blocked = await asyncio.get_running_loop().run_in_executor(None, self.ponder_blocked.wait, 10.0)
+            self.assertTrue(blocked)
+            await engine.handle(f"position fen {self.real_fen}")
+            start = time.monotonic()
+            await engine.handle("go movetime 2000")
+            await engine.search_task
+            return time.monotonic() - start
+        finally:
+            self.gate.set()
+            await engine.shutdown()
+            await stockfish.quit()
+
+    def _assert_prompt(self, elapsed):
+        # 2 s budget: a 0.4 s search, then instant tagging.
+        self.assertLess(elapsed, 1.2)
+        self.assertEqual(len(self.real_tagged), 3)
+
+    def test_ponder_stopped_mid_root(self):
+        self.block = "root"
+        self._assert_prompt(asyncio.run(self._real_move_after_ponder()))
+
+    def test_ponder_stopped_mid_candidates_with_shared_pools(self):
+        from fair_pool import FairPool
+
+        self.block = "candidates"
+        tag_pool, ponder_pool = FairPool(2, thread_name_prefix="tagger"), FairPool(1, thread_name_prefix="ponder")
+        self.addCleanup(tag_pool.shutdown, False)
+        self.addCleanup(ponder_pool.shutdown, False)
+        elapsed = asyncio.run(
+            self._real_move_after_ponder(tag_executor=tag_pool.session(1), ponder_executor=ponder_pool.session(1))
+        )
+        self._assert_prompt(elapsed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Replay PGN games under a time control to check the imitator's time manager.
+
+Every move of the chosen side(s) is given the ``go`` command a lichess bot
+would receive, budgeted by ``time_manager.TimeManager`` and charged with a
+simulated cost: the Stockfish search uses its full slice, tagging costs the
+shared root analysis plus a per-candidate cost (cut off at the anytime
+deadline, except for the root analysis which cannot be interrupted), and
+every reply pays a random network lag.  No engine is started.
+
+Usage:
+    python3 simulate_time_control.py games.pgn --tc 180+2
+    python3 simulate_time_control.py games.pgn --tc 60+0 --side white --candidate-cost 0.3 --lag-ms 150
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import chess
+import chess.pgn
+
+from time_manager import GoParams, TimeManager
+
+# Defaults mirror imitator_uci_engine (importing it would start its UCI banner).
+DEFAULT_MAX_THINK_S = 25.0
+DEFAULT_STOCKFISH_FRACTION = 0.2
+DEFAULT_MULTIPV = 10
+DEFAULT_SCORING_RESERVE_S = 0.1
+
+
+@dataclass
+class SimulationStats:
+    games: int = 0
+    flagged: int = 0
+    moves: int = 0
+    search_only: int = 0
+    utilisation: List[float] = field(default_factory=list)
+    budgets: List[float] = field(default_factory=list)
+    multipv: List[int] = field(default_factory=list)
+
+
+def parse_time_control(value: str) -> Tuple[float, float]:
+    """Parse ``base+increment`` in seconds, e.g. ``180+2``."""
+    base, _, increment = value.partition("+")
+    return float(base), float(increment or 0.0)
+
+
+def _go_command(clocks: Dict[chess.Color, float], increment: float) -> str:
+    inc_ms = int(increment * 1000)
+    return (
+        f"go wtime {int(clocks[chess.WHITE] * 1000)} btime {int(clocks[chess.BLACK] * 1000)} "
+        f"winc {inc_ms} binc {inc_ms}"
+    )
+
+
+def simulate_move(
+    manager: TimeManager,
+    board: chess.Board,
+    go_command: str,
+    args: argparse.Namespace,
+    rng: random.Random,
+) -> Tuple[float, float, int]:
+    """Return (seconds spent, budget, multipv) for one imitator move."""
+    budget = manager.allocate(GoParams.parse(go_command), board)
+    spent = budget.search_s
+    multipv = 1
+    if budget.tag:
+        multipv = budget.multipv
+        jitter = max(0.1, rng.gauss(1.0, args.jitter))
+        root = args.root_cost * jitter
+        per_candidate = args.candidate_cost * jitter
+        window = max(budget.total_s - budget.search_s - args.scoring_reserve, 0.0)
+        if root >= window:
+            tagging = root
+            tagged = 0
+        else:
+            tagged = min(multipv, int((window - root) / per_candidate)) if per_candidate > 0 else multipv
+            tagging = min(root + multipv * per_candidate, window)
+        spent += tagging
+        manager.observe(
+            {
+                "tagged": tagged,
+                "root_ms": root * 1000.0,
+                "wall_ms": tagging * 1000.0,
+            }
+        )
+    spent += args.scoring_cost
+    return spent, budget.total_s, multipv
+
+
+def replay_game(
+    game: chess.pgn.Game,
+    args: argparse.Namespace,
+    stats: SimulationStats,
+    rng: random.Random,
+) -> bool:
+    """Replay *game* and return True if the imitator flagged."""
+    base, increment = parse_time_control(args.tc)
+    clocks = {chess.WHITE: base, chess.BLACK: base}
+    managers = {
+        color: TimeManager(
+            args.max_think,
+            args.stockfish_fraction,
+            args.multipv,
+            root_cost_s=args.root_cost,
+            candidate_cost_s=args.candidate_cost,
+        )
+        for color in (chess.WHITE, chess.BLACK)
+    }
+    sides = {"white": (chess.WHITE,), "black": (chess.BLACK,), "both": (chess.WHITE, chess.BLACK)}[args.side]
+    board = game.board()
+    for move in game.mainline_moves():
+        color = board.turn
+        lag = max(0.0, rng.gauss(args.lag_ms, args.lag_ms / 3)) / 1000.0
+        if color in sides:
+            spent, budget, multipv = simulate_move(managers[color], board, _go_command(clocks, increment), args, rng)
+            stats.moves += 1
+            stats.budgets.append(budget)
+            stats.utilisation.append(spent / budget if budget else 0.0)
+            stats.multipv.append(multipv)
+            if multipv <= 1:
+                stats.search_only += 1
+        else:
+            spent = args.opponent_move_s
+        clocks[color] -= spent + lag
+        if clocks[color] < 0 and color in sides:
+            return True
+        clocks[color] += increment
+        board.push(move)
+    return False
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate the imitator's clock usage over PGN games.")
+    parser.add_argument("pgn", type=Path, help="PGN file to replay")
+    parser.add_argument("--tc", default="180+2", help="Time control as base+increment seconds (default 180+2)")
+    parser.add_argument("--side", choices=("white", "black", "both"), default="both", help="Side(s) played by the imitator")
+    parser.add_argument("--games", type=int, default=50, help="Maximum number of games to replay")
+    parser.add_argument("--multipv", type=int, default=DEFAULT_MULTIPV, help="Maximum MultiPV width")
+    parser.add_argument("--max-think", type=float, default=DEFAULT_MAX_THINK_S, help="Upper bound per move in seconds")
+    parser.add_argument("--stockfish-fraction", type=float, default=DEFAULT_STOCKFISH_FRACTION, help="Budget share of the search")
+    parser.add_argument("--scoring-reserve", type=float, default=DEFAULT_SCORING_RESERVE_S, help="Seconds kept back from tagging")
+    parser.add_argument("--root-cost", type=float, default=1.0, help="Seconds for the shared root analysis")
+    parser.add_argument("--candidate-cost", type=float, default=0.5, help="Seconds of wall time per tagged candidate")
+    parser.add_argument("--scoring-cost", type=float, default=0.02, help="Seconds for style scoring and the reply")
+    parser.add_argument("--jitter", type=float, default=0.25, help="Relative std-dev of tagging costs")
+    parser.add_argument("--lag-ms", type=float, default=100.0, help="Mean network lag per move in ms")
+    parser.add_argument("--opponent-move-s", type=float, default=1.0, help="Seconds the opponent spends per move")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    if not args.pgn.exists():
+        print(f"❌ PGN not found: {args.pgn}")
+        sys.exit(1)
+
+    rng = random.Random(args.seed)
+    stats = SimulationStats()
+    with args.pgn.open("r", encoding="utf-8", errors="ignore") as handle:
+        while stats.games < args.games:
+            game = chess.pgn.read_game(handle)
+            if game is None:
+                break
+            stats.games += 1
+            if replay_game(game, args, stats, rng):
+                stats.flagged += 1
+
+    if not stats.moves:
+        print("No moves simulated.")
+        sys.exit(1)
+
+    def mean(values: List[float]) -> float:
+        return sum(values) / len(values) if values else 0.0
+
+    print(f"Time control: {args.tc}  side={args.side}  games={stats.games}  moves={stats.moves}")
+    print("-" * 60)
+    print(f"Flag rate:           {stats.flagged / stats.games:6.1%}  ({stats.flagged}/{stats.games})")
+    print(f"Budget utilisation:  {mean(stats.utilisation):6.1%}")
+    print(f"Average budget:      {mean(stats.budgets):6.2f}s")
+    print(f"Average MultiPV:     {mean(stats.multipv):6.2f}")
+    print(f"Search-only moves:   {stats.search_only / stats.moves:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
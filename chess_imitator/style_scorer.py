@@ -151,10 +151,14 @@ def score_candidate(
 def pick_best_move(payload_with_tags: Dict[str, Any], style_profile: Dict[str, Any]) -> Dict[str, Any]:
     """
     Pick the candidate move that best matches *style_profile*, possibly forcing a failure.
+
+    Candidates marked ``tagged: False`` (the tagger ran out of time) still count
+    towards the best engine eval but are only scored when nothing was tagged.
     """
     candidates = payload_with_tags.get("candidates", [])
     if not candidates:
         raise ValueError("Payload must contain at least one candidate move.")
+    scorable = [candidate for candidate in candidates if candidate.get("tagged", True)] or candidates
 
     config = style_profile.get("config", {}) or {}
     deterministic = bool(config.get("deterministic", False))
@@ -165,7 +169,7 @@ def pick_best_move(payload_with_tags: Dict[str, Any], style_profile: Dict[str, A
     )
 
     scored: List[Dict[str, Any]] = []
-    for candidate in candidates:
+    for candidate in scorable:
         candidate_copy = dict(candidate)
         score = score_candidate(
             tags=candidate_copy.get("tags", []),
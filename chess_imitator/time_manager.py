@@ -0,0 +1,191 @@
+"""Clock-aware time management for the imitator UCI engine.
+
+The imitator spends every move in two phases: a Stockfish MultiPV search and
+the (much slower) tagging/scoring of the candidates it returns.  The
+``TimeManager`` turns the real ``go`` parameters into a per-move budget,
+splits it between the two phases and sizes MultiPV to what tagging can
+finish in time.  With no clock information it falls back to the fixed
+``max_think_s`` budget the engine always used.
+
+Environment:
+    CHESS_IMITATOR_MOVE_OVERHEAD_MS  Network/GUI lag reserved per move (300).
+    CHESS_IMITATOR_ROOT_COST_S       Initial estimate of the shared root
+                                     analysis cost in seconds (1.0).
+    CHESS_IMITATOR_CANDIDATE_COST_S  Initial estimate of the wall time added
+                                     by each tagged candidate (0.5).
+"""
+
+from __future__ import annotations
+
+import math
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import chess
+
+MOVE_OVERHEAD_S = float(os.environ.get("CHESS_IMITATOR_MOVE_OVERHEAD_MS", "300")) / 1000.0
+ROOT_COST_S = float(os.environ.get("CHESS_IMITATOR_ROOT_COST_S", "1.0"))
+CANDIDATE_COST_S = float(os.environ.get("CHESS_IMITATOR_CANDIDATE_COST_S", "0.5"))
+
+# Expected moves left in the game: MOVES_LEFT_MIN in a bare endgame, growing
+# linearly with remaining non-pawn material up to MOVES_LEFT_MAX.
+MOVES_LEFT_MIN = 15
+MOVES_LEFT_MAX = 40
+# Share of the increment spent on the current move.
+INCREMENT_SHARE = 0.75
+# Never spend more than this share of the remaining clock on one move.
+MAX_CLOCK_SHARE = 0.2
+MIN_BUDGET_S = 0.05
+MIN_SEARCH_S = 0.05
+# Tagging needs at least this many candidates to be worth starting.
+MIN_TAGGED_MULTIPV = 2
+# Smoothing factor for the observed tagging costs.
+COST_EMA_ALPHA = 0.3
+
+_PHASE_WEIGHTS = {chess.KNIGHT: 1, chess.BISHOP: 1, chess.ROOK: 2, chess.QUEEN: 4}
+_PHASE_TOTAL = 24
+
+
+@dataclass(frozen=True)
+class GoParams:
+    """Parameters of a UCI ``go`` command that matter for time management."""
+
+    wtime: Optional[int] = None
+    btime: Optional[int] = None
+    winc: int = 0
+    binc: int = 0
+    movestogo: Optional[int] = None
+    movetime: Optional[int] = None
+    depth: Optional[int] = None
+    infinite: bool = False
+    ponder: bool = False
+
+    @classmethod
+    def parse(cls, command: str) -> "GoParams":
+        """Parse ``go wtime 60000 btime 58000 winc 1000 ...``; unknown tokens are ignored."""
+        tokens = command.split()
+        values: Dict[str, Any] = {}
+        i = 1
+        while i < len(tokens):
+            token = tokens[i]
+            if token in ("infinite", "ponder"):
+                values[token] = True
+                i += 1
+            elif token in ("wtime", "btime", "winc", "binc", "movestogo", "movetime", "depth") and i + 1 < len(tokens):
+                try:
+                    values[token] = int(tokens[i + 1])
+                except ValueError:
+                    pass
+                i += 2
+            else:
+                i += 1
+        return cls(**values)
+
+    def clock_for(self, color: chess.Color) -> Optional[float]:
+        """Remaining clock of *color* in seconds, if the GUI sent one."""
+        remaining = self.wtime if color == chess.WHITE else self.btime
+        return None if remaining is None else remaining / 1000.0
+
+    def increment_for(self, color: chess.Color) -> float:
+        return (self.winc if color == chess.WHITE else self.binc) / 1000.0
+
+
+@dataclass(frozen=True)
+class MoveBudget:
+    """Per-move time allocation."""
+
+    total_s: float
+    search_s: float
+    tagging_s: float
+    multipv: int
+    reason: str
+
+    @property
+    def search_ms(self) -> int:
+        return max(int(self.search_s * 1000), 1)
+
+    @property
+    def tag(self) -> bool:
+        return self.tagging_s > 0.0
+
+
+def game_phase(board: chess.Board) -> float:
+    """Remaining non-pawn material as a 0 (bare endgame) .. 1 (opening) ratio."""
+    current = sum(
+        weight * len(board.pieces(piece_type, color))
+        for piece_type, weight in _PHASE_WEIGHTS.items()
+        for color in (chess.WHITE, chess.BLACK)
+    )
+    return min(current / _PHASE_TOTAL, 1.0)
+
+
+class TimeManager:
+    """Allocate per-move budgets from the real clock and learned tagging costs."""
+
+    def __init__(
+        self,
+        max_think_s: float,
+        stockfish_fraction: float,
+        max_multipv: int,
+        *,
+        move_overhead_s: float = MOVE_OVERHEAD_S,
+        root_cost_s: float = ROOT_COST_S,
+        candidate_cost_s: float = CANDIDATE_COST_S,
+    ):
+        self.max_think_s = max_think_s
+        self.stockfish_fraction = stockfish_fraction
+        self.max_multipv = max(1, max_multipv)
+        self.move_overhead_s = move_overhead_s
+        self.root_cost_s = root_cost_s
+        self.candidate_cost_s = candidate_cost_s
+
+    def total_budget(self, go: GoParams, board: chess.Board) -> tuple[float, str]:
+        """Return the wall-clock budget for this move and the rule that set it."""
+        if go.movetime is not None:
+            total = go.movetime / 1000.0 - self.move_overhead_s
+            reason = "movetime"
+        else:
+            remaining = go.clock_for(board.turn)
+            if remaining is None or go.infinite:
+                return self.max_think_s, "fixed"
+            increment = go.increment_for(board.turn)
+            if go.movestogo:
+                moves_left = float(go.movestogo)
+            else:
+                moves_left = MOVES_LEFT_MIN + (MOVES_LEFT_MAX - MOVES_LEFT_MIN) * game_phase(board)
+            usable = max(remaining - self.move_overhead_s, 0.0)
+            total = usable / moves_left + increment * INCREMENT_SHARE
+            total = min(total, usable * MAX_CLOCK_SHARE + increment * INCREMENT_SHARE, usable)
+            reason = "clock"
+        return max(MIN_BUDGET_S, min(total, self.max_think_s)), reason
+
+    def allocate(self, go: GoParams, board: chess.Board) -> MoveBudget:
+        """Split the move budget between the Stockfish search and tagging."""
+        total, reason = self.total_budget(go, board)
+        search = max(MIN_SEARCH_S, total * self.stockfish_fraction)
+        tagging = total - search
+        affordable = (tagging - self.root_cost_s) / self.candidate_cost_s if self.candidate_cost_s > 0 else 0.0
+        multipv = min(self.max_multipv, int(math.floor(affordable))) if affordable > 0 else 0
+        if multipv < MIN_TAGGED_MULTIPV:
+            # Not enough time to tag a meaningful set: spend it all searching.
+            return MoveBudget(total_s=total, search_s=total, tagging_s=0.0, multipv=1, reason=f"{reason}:search_only")
+        return MoveBudget(total_s=total, search_s=search, tagging_s=tagging, multipv=multipv, reason=reason)
+
+    def observe(self, tagging: Dict[str, Any]) -> None:
+        """Fold the ``tagging`` summary of tag_candidates_payload into the cost estimates."""
+        tagged = int(tagging.get("tagged") or 0)
+        root_ms = tagging.get("root_ms")
+        wall_ms = tagging.get("wall_ms")
+        if root_ms is not None:
+            self.root_cost_s = _ema(self.root_cost_s, root_ms / 1000.0)
+        if tagged and wall_ms is not None:
+            per_candidate = max(wall_ms - (root_ms or 0.0), 0.0) / 1000.0 / tagged
+            self.candidate_cost_s = _ema(self.candidate_cost_s, per_candidate)
+
+
+def _ema(previous: float, sample: float) -> float:
+    return (1.0 - COST_EMA_ALPHA) * previous + COST_EMA_ALPHA * sample
+
+
+__all__ = ["GoParams", "MoveBudget", "TimeManager", "game_phase"]